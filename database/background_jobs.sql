@@ -0,0 +1,42 @@
+-- ============================================================================
+-- BACKGROUND JOBS
+-- Durable job queue for side effects moved off the request path
+-- (services/job_queue.py, run by worker.py). Jobs are inserted in the same
+-- transaction as the row that caused them and claimed with
+-- FOR UPDATE SKIP LOCKED. Safe to re-run.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS background_jobs (
+    job_id BIGSERIAL PRIMARY KEY,
+    job_type VARCHAR(100) NOT NULL,
+    payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',    -- queued, running, succeeded, dead
+    idempotency_key VARCHAR(255),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    run_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    locked_by VARCHAR(100),
+    locked_at TIMESTAMPTZ,
+    last_error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    finished_at TIMESTAMPTZ
+);
+
+-- Claim scan: due jobs of a type in order
+CREATE INDEX IF NOT EXISTS idx_background_jobs_due
+    ON background_jobs (job_type, run_at, job_id) WHERE status = 'queued';
+
+-- Stale-lock sweep and per-type running counts
+CREATE INDEX IF NOT EXISTS idx_background_jobs_running
+    ON background_jobs (job_type, locked_at) WHERE status = 'running';
+
+-- Enqueueing the same key twice is a no-op
+CREATE UNIQUE INDEX IF NOT EXISTS idx_background_jobs_idempotency
+    ON background_jobs (idempotency_key) WHERE idempotency_key IS NOT NULL;
+
+-- Retention pruning
+CREATE INDEX IF NOT EXISTS idx_background_jobs_finished
+    ON background_jobs (finished_at) WHERE finished_at IS NOT NULL;
+
+-- The queue churns constantly; vacuum it well before the default 20% threshold
+ALTER TABLE background_jobs SET (autovacuum_vacuum_scale_factor = 0.01, autovacuum_analyze_scale_factor = 0.02);
@@ -0,0 +1,50 @@
+-- ============================================================================
+-- BADGE ENGINE
+-- Supports set-based badge awarding (services/badge_service.py): a unique
+-- (user, badge) pair for ON CONFLICT DO NOTHING, indexes for the compiled
+-- criteria, and the resumable full re-evaluation job table.
+-- Safe to re-run.
+-- ============================================================================
+
+-- Drop duplicate awards left by the old per-user check-then-insert
+DELETE FROM badge_awards a
+USING badge_awards b
+WHERE a.user_id = b.user_id
+  AND a.badge_definition_id = b.badge_definition_id
+  AND a.award_id > b.award_id;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_badge_awards_user_badge') THEN
+        ALTER TABLE badge_awards
+            ADD CONSTRAINT uq_badge_awards_user_badge UNIQUE (user_id, badge_definition_id);
+    END IF;
+END $$;
+
+-- Composite criteria group awards by badge
+CREATE INDEX IF NOT EXISTS idx_badge_awards_badge_user
+    ON badge_awards (badge_definition_id, user_id);
+
+-- Review count / streak / quality criteria group reviews by author
+CREATE INDEX IF NOT EXISTS idx_review_main_user_created
+    ON review_main (user_id, created_at);
+
+CREATE TABLE IF NOT EXISTS badge_evaluation_jobs (
+    job_id BIGSERIAL PRIMARY KEY,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',   -- pending, running, completed, failed
+    requested_by INTEGER REFERENCES core_users(user_id) ON DELETE SET NULL,
+    total_badges INTEGER NOT NULL DEFAULT 0,
+    badges_done INTEGER NOT NULL DEFAULT 0,
+    badge_definition_id BIGINT,                      -- badge being evaluated
+    last_user_id INTEGER NOT NULL DEFAULT 0,         -- users up to here are done for that badge
+    max_user_id INTEGER NOT NULL DEFAULT 0,
+    awarded_count INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    started_at TIMESTAMP WITH TIME ZONE,
+    finished_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_badge_evaluation_jobs_status
+    ON badge_evaluation_jobs (status, job_id);
@@ -0,0 +1,66 @@
+-- ============================================================================
+-- SIMILAR ENTITIES
+-- Top-K similar entities per entity (text, category and co-review signals),
+-- built by build_similar_entities.py and read with a range scan of
+-- idx_entity_similarities_rank. Triggers queue entities whose text,
+-- categories or reviews change so the incremental refresh only recomputes
+-- those.
+-- Safe to re-run.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS entity_similarities (
+    entity_id INTEGER NOT NULL REFERENCES core_entities(entity_id) ON DELETE CASCADE,
+    similar_entity_id INTEGER NOT NULL REFERENCES core_entities(entity_id) ON DELETE CASCADE,
+    score DOUBLE PRECISION NOT NULL,
+    computed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (entity_id, similar_entity_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_entity_similarities_rank
+    ON entity_similarities (entity_id, score DESC);
+
+-- ON DELETE CASCADE on similar_entity_id
+CREATE INDEX IF NOT EXISTS idx_entity_similarities_similar
+    ON entity_similarities (similar_entity_id);
+
+-- No foreign key: deleting an entity cascades to its reviews, whose delete
+-- trigger queues the (already deleted) entity
+CREATE TABLE IF NOT EXISTS entity_similarity_queue (
+    entity_id INTEGER PRIMARY KEY,
+    queued_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION entity_similarity_enqueue()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_entity_id INTEGER;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        v_entity_id := OLD.entity_id;
+    ELSE
+        v_entity_id := NEW.entity_id;
+    END IF;
+
+    -- A change during a refresh moves queued_at past its start, so the
+    -- refresh leaves the entity queued for the next run
+    INSERT INTO entity_similarity_queue (entity_id, queued_at)
+    VALUES (v_entity_id, NOW())
+    ON CONFLICT (entity_id) DO UPDATE SET queued_at = EXCLUDED.queued_at;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_entity_similarity_entities ON core_entities;
+CREATE TRIGGER trg_entity_similarity_entities
+    AFTER INSERT OR UPDATE OF name, description, root_category, final_category, is_active ON core_entities
+    FOR EACH ROW EXECUTE FUNCTION entity_similarity_enqueue();
+
+DROP TRIGGER IF EXISTS trg_entity_similarity_reviews ON review_main;
+CREATE TRIGGER trg_entity_similarity_reviews
+    AFTER INSERT OR DELETE ON review_main
+    FOR EACH ROW EXECUTE FUNCTION entity_similarity_enqueue();
+
+-- Everything starts queued until the first full build
+INSERT INTO entity_similarity_queue (entity_id)
+SELECT entity_id FROM core_entities
+ON CONFLICT (entity_id) DO NOTHING;
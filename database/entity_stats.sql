@@ -0,0 +1,265 @@
+-- ============================================================================
+-- ENTITY STATISTICS
+-- Denormalized per-entity review statistics (count, rating sum, star
+-- histogram, review views, reactions, comments, last review time), kept
+-- current by triggers inside the writing transaction. core_entities
+-- review_count / average_rating are written through so listing sorts stay
+-- index-friendly. Used by services/entity_stats_service.py.
+--
+-- After applying, run `python rebuild_entity_stats.py` once to backfill.
+-- Safe to re-run.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS entity_stats (
+    entity_id INTEGER PRIMARY KEY REFERENCES core_entities(entity_id) ON DELETE CASCADE,
+    review_count INTEGER NOT NULL DEFAULT 0,
+    rating_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    rating_1 INTEGER NOT NULL DEFAULT 0,
+    rating_2 INTEGER NOT NULL DEFAULT 0,
+    rating_3 INTEGER NOT NULL DEFAULT 0,
+    rating_4 INTEGER NOT NULL DEFAULT 0,
+    rating_5 INTEGER NOT NULL DEFAULT 0,
+    total_review_views BIGINT NOT NULL DEFAULT 0,
+    total_reactions INTEGER NOT NULL DEFAULT 0,
+    total_comments INTEGER NOT NULL DEFAULT 0,
+    last_review_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- ----------------------------------------------------------------------------
+-- Helpers
+-- ----------------------------------------------------------------------------
+
+-- Star bucket for an overall rating (1..5)
+CREATE OR REPLACE FUNCTION entity_stats_bucket(p_rating DOUBLE PRECISION)
+RETURNS INTEGER AS $$
+    SELECT LEAST(5, GREATEST(1, ROUND(COALESCE(p_rating, 0))::INTEGER));
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Copy review_count / average_rating onto core_entities
+CREATE OR REPLACE FUNCTION entity_stats_sync_entity(p_entity_id INTEGER)
+RETURNS void AS $$
+    UPDATE core_entities e
+    SET review_count = s.review_count,
+        average_rating = CASE WHEN s.review_count > 0
+                              THEN ROUND((s.rating_sum / s.review_count)::NUMERIC, 2)::DOUBLE PRECISION
+                              ELSE 0 END
+    FROM entity_stats s
+    WHERE s.entity_id = p_entity_id
+      AND e.entity_id = p_entity_id
+      AND (e.review_count IS DISTINCT FROM s.review_count
+           OR e.average_rating IS DISTINCT FROM CASE WHEN s.review_count > 0
+                              THEN ROUND((s.rating_sum / s.review_count)::NUMERIC, 2)::DOUBLE PRECISION
+                              ELSE 0 END);
+$$ LANGUAGE sql;
+
+-- Add (p_sign = 1) or remove (p_sign = -1) one review's contribution
+CREATE OR REPLACE FUNCTION entity_stats_apply_review(
+    p_entity_id INTEGER,
+    p_sign INTEGER,
+    p_rating DOUBLE PRECISION,
+    p_views INTEGER,
+    p_created_at TIMESTAMP WITH TIME ZONE
+)
+RETURNS void AS $$
+DECLARE
+    bucket INTEGER := entity_stats_bucket(p_rating);
+BEGIN
+    INSERT INTO entity_stats (entity_id) VALUES (p_entity_id)
+    ON CONFLICT (entity_id) DO NOTHING;
+
+    UPDATE entity_stats
+    SET review_count = GREATEST(review_count + p_sign, 0),
+        rating_sum = rating_sum + p_sign * COALESCE(p_rating, 0),
+        rating_1 = rating_1 + CASE WHEN bucket = 1 THEN p_sign ELSE 0 END,
+        rating_2 = rating_2 + CASE WHEN bucket = 2 THEN p_sign ELSE 0 END,
+        rating_3 = rating_3 + CASE WHEN bucket = 3 THEN p_sign ELSE 0 END,
+        rating_4 = rating_4 + CASE WHEN bucket = 4 THEN p_sign ELSE 0 END,
+        rating_5 = rating_5 + CASE WHEN bucket = 5 THEN p_sign ELSE 0 END,
+        total_review_views = total_review_views + p_sign * COALESCE(p_views, 0),
+        last_review_at = CASE
+            WHEN p_sign > 0 THEN GREATEST(last_review_at, p_created_at)
+            WHEN p_created_at >= last_review_at THEN
+                (SELECT MAX(created_at) FROM review_main WHERE entity_id = p_entity_id)
+            ELSE last_review_at END,
+        updated_at = NOW()
+    WHERE entity_id = p_entity_id;
+
+    PERFORM entity_stats_sync_entity(p_entity_id);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recount reactions and comments for one entity (review deletes / moves)
+CREATE OR REPLACE FUNCTION entity_stats_refresh_engagement(p_entity_id INTEGER)
+RETURNS void AS $$
+    UPDATE entity_stats
+    SET total_reactions = (
+            SELECT COUNT(*) FROM review_reactions x
+            JOIN review_main r ON r.review_id = x.review_id
+            WHERE r.entity_id = p_entity_id),
+        total_comments = (
+            SELECT COUNT(*) FROM review_comments c
+            JOIN review_main r ON r.review_id = c.review_id
+            WHERE r.entity_id = p_entity_id),
+        updated_at = NOW()
+    WHERE entity_id = p_entity_id;
+$$ LANGUAGE sql;
+
+-- ----------------------------------------------------------------------------
+-- Triggers
+-- ----------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION entity_stats_review_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM entity_stats_apply_review(NEW.entity_id, 1, NEW.overall_rating, NEW.view_count, NEW.created_at);
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM entity_stats_apply_review(OLD.entity_id, -1, OLD.overall_rating, OLD.view_count, OLD.created_at);
+        PERFORM entity_stats_refresh_engagement(OLD.entity_id);
+    ELSIF OLD.entity_id IS DISTINCT FROM NEW.entity_id
+          OR OLD.overall_rating IS DISTINCT FROM NEW.overall_rating THEN
+        PERFORM entity_stats_apply_review(OLD.entity_id, -1, OLD.overall_rating, OLD.view_count, OLD.created_at);
+        PERFORM entity_stats_apply_review(NEW.entity_id, 1, NEW.overall_rating, NEW.view_count, NEW.created_at);
+        IF OLD.entity_id IS DISTINCT FROM NEW.entity_id THEN
+            PERFORM entity_stats_refresh_engagement(OLD.entity_id);
+            PERFORM entity_stats_refresh_engagement(NEW.entity_id);
+        END IF;
+    ELSIF OLD.view_count IS DISTINCT FROM NEW.view_count THEN
+        -- Hot path: views only touch the view total
+        UPDATE entity_stats
+        SET total_review_views = total_review_views + COALESCE(NEW.view_count, 0) - COALESCE(OLD.view_count, 0)
+        WHERE entity_id = NEW.entity_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_entity_stats_review ON review_main;
+CREATE TRIGGER trigger_entity_stats_review
+    AFTER INSERT OR DELETE OR UPDATE OF entity_id, overall_rating, view_count ON review_main
+    FOR EACH ROW EXECUTE FUNCTION entity_stats_review_update();
+
+-- Reactions and comments: +/-1 on the owning review's entity. Rows whose
+-- review is already gone are skipped; the review delete recounts instead.
+CREATE OR REPLACE FUNCTION entity_stats_reaction_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE entity_stats s SET total_reactions = GREATEST(s.total_reactions - 1, 0), updated_at = NOW()
+        FROM review_main r WHERE r.review_id = OLD.review_id AND s.entity_id = r.entity_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE entity_stats s SET total_reactions = s.total_reactions + 1, updated_at = NOW()
+        FROM review_main r WHERE r.review_id = NEW.review_id AND s.entity_id = r.entity_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_entity_stats_reaction ON review_reactions;
+CREATE TRIGGER trigger_entity_stats_reaction
+    AFTER INSERT OR DELETE OR UPDATE OF review_id ON review_reactions
+    FOR EACH ROW EXECUTE FUNCTION entity_stats_reaction_update();
+
+CREATE OR REPLACE FUNCTION entity_stats_comment_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE entity_stats s SET total_comments = GREATEST(s.total_comments - 1, 0), updated_at = NOW()
+        FROM review_main r WHERE r.review_id = OLD.review_id AND s.entity_id = r.entity_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE entity_stats s SET total_comments = s.total_comments + 1, updated_at = NOW()
+        FROM review_main r WHERE r.review_id = NEW.review_id AND s.entity_id = r.entity_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_entity_stats_comment ON review_comments;
+CREATE TRIGGER trigger_entity_stats_comment
+    AFTER INSERT OR DELETE OR UPDATE OF review_id ON review_comments
+    FOR EACH ROW EXECUTE FUNCTION entity_stats_comment_update();
+
+-- ----------------------------------------------------------------------------
+-- Set-based rebuild for an entity_id range [p_from, p_to)
+-- Called in chunks by rebuild_entity_stats.py / EntityStatsService.rebuild
+-- ----------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION entity_stats_rebuild(p_from INTEGER, p_to INTEGER)
+RETURNS INTEGER AS $$
+DECLARE
+    affected INTEGER;
+BEGIN
+    INSERT INTO entity_stats (
+        entity_id, review_count, rating_sum, rating_1, rating_2, rating_3, rating_4, rating_5,
+        total_review_views, total_reactions, total_comments, last_review_at, updated_at
+    )
+    SELECT e.entity_id,
+           COALESCE(rv.review_count, 0), COALESCE(rv.rating_sum, 0),
+           COALESCE(rv.rating_1, 0), COALESCE(rv.rating_2, 0), COALESCE(rv.rating_3, 0),
+           COALESCE(rv.rating_4, 0), COALESCE(rv.rating_5, 0),
+           COALESCE(rv.total_review_views, 0), COALESCE(rx.total_reactions, 0),
+           COALESCE(rc.total_comments, 0), rv.last_review_at, NOW()
+    FROM core_entities e
+    LEFT JOIN (
+        SELECT entity_id,
+               COUNT(*) AS review_count,
+               SUM(overall_rating) AS rating_sum,
+               COUNT(*) FILTER (WHERE entity_stats_bucket(overall_rating) = 1) AS rating_1,
+               COUNT(*) FILTER (WHERE entity_stats_bucket(overall_rating) = 2) AS rating_2,
+               COUNT(*) FILTER (WHERE entity_stats_bucket(overall_rating) = 3) AS rating_3,
+               COUNT(*) FILTER (WHERE entity_stats_bucket(overall_rating) = 4) AS rating_4,
+               COUNT(*) FILTER (WHERE entity_stats_bucket(overall_rating) = 5) AS rating_5,
+               SUM(view_count) AS total_review_views,
+               MAX(created_at) AS last_review_at
+        FROM review_main
+        WHERE entity_id >= p_from AND entity_id < p_to
+        GROUP BY entity_id
+    ) rv ON rv.entity_id = e.entity_id
+    LEFT JOIN (
+        SELECT r.entity_id, COUNT(*) AS total_reactions
+        FROM review_reactions x JOIN review_main r ON r.review_id = x.review_id
+        WHERE r.entity_id >= p_from AND r.entity_id < p_to
+        GROUP BY r.entity_id
+    ) rx ON rx.entity_id = e.entity_id
+    LEFT JOIN (
+        SELECT r.entity_id, COUNT(*) AS total_comments
+        FROM review_comments c JOIN review_main r ON r.review_id = c.review_id
+        WHERE r.entity_id >= p_from AND r.entity_id < p_to
+        GROUP BY r.entity_id
+    ) rc ON rc.entity_id = e.entity_id
+    WHERE e.entity_id >= p_from AND e.entity_id < p_to
+    ON CONFLICT (entity_id) DO UPDATE SET
+        review_count = EXCLUDED.review_count,
+        rating_sum = EXCLUDED.rating_sum,
+        rating_1 = EXCLUDED.rating_1,
+        rating_2 = EXCLUDED.rating_2,
+        rating_3 = EXCLUDED.rating_3,
+        rating_4 = EXCLUDED.rating_4,
+        rating_5 = EXCLUDED.rating_5,
+        total_review_views = EXCLUDED.total_review_views,
+        total_reactions = EXCLUDED.total_reactions,
+        total_comments = EXCLUDED.total_comments,
+        last_review_at = EXCLUDED.last_review_at,
+        updated_at = EXCLUDED.updated_at;
+    GET DIAGNOSTICS affected = ROW_COUNT;
+
+    UPDATE core_entities e
+    SET review_count = s.review_count,
+        average_rating = CASE WHEN s.review_count > 0
+                              THEN ROUND((s.rating_sum / s.review_count)::NUMERIC, 2)::DOUBLE PRECISION
+                              ELSE 0 END
+    FROM entity_stats s
+    WHERE s.entity_id = e.entity_id
+      AND e.entity_id >= p_from AND e.entity_id < p_to;
+
+    RETURN affected;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Listing sorts on the written-through columns
+CREATE INDEX IF NOT EXISTS idx_core_entities_average_rating ON core_entities (average_rating DESC, entity_id DESC);
+CREATE INDEX IF NOT EXISTS idx_core_entities_review_count ON core_entities (review_count DESC, entity_id DESC);
+CREATE INDEX IF NOT EXISTS idx_entity_stats_last_review_at ON entity_stats (last_review_at DESC);
@@ -0,0 +1,25 @@
+-- ============================================================================
+-- INBOX INDEXES
+-- Supports the single-query conversation inbox in services/msg_service.py:
+-- the user's active memberships, and the LATERAL lookups of each
+-- conversation's other participants and latest non-deleted message.
+-- Safe to re-run.
+-- ============================================================================
+
+-- Active conversations of a user
+CREATE INDEX IF NOT EXISTS idx_msg_participants_user_active
+    ON msg_conversation_participants (user_id, conversation_id)
+    WHERE left_at IS NULL;
+
+-- Other participants of a conversation
+CREATE INDEX IF NOT EXISTS idx_msg_participants_conversation_active
+    ON msg_conversation_participants (conversation_id, participant_id)
+    WHERE left_at IS NULL;
+
+-- Latest message of a conversation (ORDER BY created_at DESC, message_id DESC LIMIT 1)
+CREATE INDEX IF NOT EXISTS idx_msg_messages_conversation_latest
+    ON msg_messages (conversation_id, created_at DESC, message_id DESC)
+    WHERE is_deleted = false;
+
+ANALYZE msg_conversation_participants;
+ANALYZE msg_messages;
@@ -0,0 +1,40 @@
+-- ============================================================================
+-- KEYSET PAGINATION INDEXES
+-- Composite indexes matching the (sort key, id) seeks issued by
+-- core/pagination.py, so cursor pages are index range scans with no sort and
+-- no OFFSET. Column order and direction must match the ORDER BY.
+-- Safe to re-run.
+-- ============================================================================
+
+-- Review feeds: GET /reviews (all, per entity, per user) and group feeds
+CREATE INDEX IF NOT EXISTS idx_review_main_created_keyset
+    ON review_main (created_at DESC, review_id DESC);
+CREATE INDEX IF NOT EXISTS idx_review_main_entity_created_keyset
+    ON review_main (entity_id, created_at DESC, review_id DESC);
+CREATE INDEX IF NOT EXISTS idx_review_main_user_created_keyset
+    ON review_main (user_id, created_at DESC, review_id DESC);
+CREATE INDEX IF NOT EXISTS idx_review_main_group_created_keyset
+    ON review_main (group_id, created_at DESC, review_id DESC)
+    WHERE group_id IS NOT NULL;
+
+-- Feed comment previews: newest N comments per review (LATERAL ... LIMIT N)
+CREATE INDEX IF NOT EXISTS idx_review_comments_review_created_keyset
+    ON review_comments (review_id, created_at DESC, comment_id DESC);
+
+-- Notification list: priority rank (critical, urgent, rest), then newest
+CREATE INDEX IF NOT EXISTS idx_core_notifications_user_keyset
+    ON core_notifications (
+        user_id,
+        (CASE WHEN priority = 'critical' THEN 2 WHEN priority = 'urgent' THEN 1 ELSE 0 END) DESC,
+        created_at DESC,
+        notification_id DESC
+    );
+
+-- Conversation inbox
+CREATE INDEX IF NOT EXISTS idx_msg_conversations_updated_keyset
+    ON msg_conversations (updated_at DESC, conversation_id DESC);
+
+ANALYZE review_main;
+ANALYZE review_comments;
+ANALYZE core_notifications;
+ANALYZE msg_conversations;
@@ -0,0 +1,40 @@
+-- ============================================================================
+-- NOTIFICATION AGGREGATION
+-- Reaction and comment notifications for the same recipient, type and
+-- target within a time window share one row ("Alice and 41 others reacted to
+-- your review"). services/notification_aggregator.py upserts them on
+-- (user_id, group_key); ungrouped notifications leave group_key NULL.
+-- Safe to re-run.
+-- ============================================================================
+
+ALTER TABLE core_notifications ADD COLUMN IF NOT EXISTS group_key VARCHAR(255);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_core_notifications_group
+    ON core_notifications (user_id, group_key)
+    WHERE group_key IS NOT NULL;
+
+-- Distinct actors per aggregated notification; actor_count and
+-- recent_actor_ids in notification_data are recounted from this table
+CREATE TABLE IF NOT EXISTS notification_actors (
+    notification_id INTEGER NOT NULL REFERENCES core_notifications(notification_id) ON DELETE CASCADE,
+    actor_id INTEGER NOT NULL,
+    acted_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    PRIMARY KEY (notification_id, actor_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_notification_actors_recent
+    ON notification_actors (notification_id, acted_at DESC);
+
+-- Seed existing aggregated rows with the actors they still know about
+INSERT INTO notification_actors (notification_id, actor_id, acted_at)
+SELECT n.notification_id, a.actor_id, n.created_at
+FROM core_notifications n
+CROSS JOIN LATERAL (
+    SELECT n.actor_id
+    WHERE n.actor_id IS NOT NULL
+    UNION
+    SELECT value::INTEGER
+    FROM jsonb_array_elements_text(COALESCE(n.notification_data->'recent_actor_ids', '[]'::jsonb))
+) AS a(actor_id)
+WHERE n.group_key IS NOT NULL
+ON CONFLICT (notification_id, actor_id) DO NOTHING;
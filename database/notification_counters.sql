@@ -0,0 +1,195 @@
+-- ============================================================================
+-- NOTIFICATION COUNTERS
+-- Per-user totals of live (not expired) notifications: all, unread, unread
+-- urgent-or-critical and unread critical. Statement-level triggers on
+-- core_notifications keep them current inside the writing transaction, so a
+-- bulk "mark all read" adjusts each user's row once. A notification leaves
+-- the counters when its delivery_status becomes 'expired'; the reconciler in
+-- services/notification_counter_service.py expires due notifications and
+-- recounts users in rolling id ranges to repair any drift.
+-- Used by the notification dropdown and stats endpoints.
+-- Safe to re-run.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS notification_counters (
+    user_id INTEGER PRIMARY KEY REFERENCES core_users(user_id) ON DELETE CASCADE,
+    total_count INTEGER NOT NULL DEFAULT 0,
+    unread_count INTEGER NOT NULL DEFAULT 0,
+    urgent_unread_count INTEGER NOT NULL DEFAULT 0,
+    critical_unread_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Due notifications that still count (reconciler expiry pass)
+CREATE INDEX IF NOT EXISTS idx_core_notifications_pending_expiry
+    ON core_notifications (expires_at)
+    WHERE expires_at IS NOT NULL AND delivery_status <> 'expired';
+
+-- Expire overdue notifications before the triggers count them
+UPDATE core_notifications
+SET delivery_status = 'expired'
+WHERE expires_at IS NOT NULL
+  AND expires_at < NOW()
+  AND delivery_status <> 'expired';
+
+-- ----------------------------------------------------------------------------
+-- Helpers
+-- ----------------------------------------------------------------------------
+
+-- Add (p_sign = 1) or remove (p_sign = -1) notifications, one array element
+-- per row. Rows without a user or already expired are ignored.
+CREATE OR REPLACE FUNCTION notification_counters_add(
+    p_user_ids INTEGER[],
+    p_signs INTEGER[],
+    p_is_read BOOLEAN[],
+    p_priorities TEXT[],
+    p_statuses TEXT[]
+)
+RETURNS void AS $$
+    INSERT INTO notification_counters AS c (
+        user_id, total_count, unread_count, urgent_unread_count, critical_unread_count, updated_at
+    )
+    SELECT user_id,
+           SUM(sign),
+           COALESCE(SUM(sign) FILTER (WHERE NOT is_read), 0),
+           COALESCE(SUM(sign) FILTER (WHERE NOT is_read AND priority IN ('urgent', 'critical')), 0),
+           COALESCE(SUM(sign) FILTER (WHERE NOT is_read AND priority = 'critical'), 0),
+           NOW()
+    FROM unnest(p_user_ids, p_signs, p_is_read, p_priorities, p_statuses)
+         AS t(user_id, sign, is_read, priority, delivery_status)
+    WHERE user_id IS NOT NULL
+      AND delivery_status IS DISTINCT FROM 'expired'
+    GROUP BY user_id
+    -- Fixed lock order across concurrent statements
+    ORDER BY user_id
+    ON CONFLICT (user_id) DO UPDATE
+    SET total_count = GREATEST(c.total_count + EXCLUDED.total_count, 0),
+        unread_count = GREATEST(c.unread_count + EXCLUDED.unread_count, 0),
+        urgent_unread_count = GREATEST(c.urgent_unread_count + EXCLUDED.urgent_unread_count, 0),
+        critical_unread_count = GREATEST(c.critical_unread_count + EXCLUDED.critical_unread_count, 0),
+        updated_at = NOW();
+$$ LANGUAGE sql;
+
+-- ----------------------------------------------------------------------------
+-- Triggers
+-- Transition tables need one trigger per event; all three share a function.
+-- ----------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION notification_counters_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM notification_counters_add(
+            array_agg(user_id), array_agg(1), array_agg(is_read),
+            array_agg(priority::TEXT), array_agg(delivery_status::TEXT)
+        ) FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM notification_counters_add(
+            array_agg(user_id), array_agg(-1), array_agg(is_read),
+            array_agg(priority::TEXT), array_agg(delivery_status::TEXT)
+        ) FROM old_rows;
+    ELSE
+        -- Only rows whose counted attributes changed (most updates touch
+        -- updated_at or delivery bookkeeping only)
+        PERFORM notification_counters_add(
+            array_agg(o.user_id) || array_agg(n.user_id),
+            array_agg(-1) || array_agg(1),
+            array_agg(o.is_read) || array_agg(n.is_read),
+            array_agg(o.priority::TEXT) || array_agg(n.priority::TEXT),
+            array_agg(o.delivery_status::TEXT) || array_agg(n.delivery_status::TEXT)
+        )
+        FROM old_rows o
+        JOIN new_rows n ON n.notification_id = o.notification_id
+        WHERE (o.user_id, o.is_read, o.priority, o.delivery_status = 'expired')
+              IS DISTINCT FROM (n.user_id, n.is_read, n.priority, n.delivery_status = 'expired');
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_notification_counters_insert ON core_notifications;
+CREATE TRIGGER trigger_notification_counters_insert
+    AFTER INSERT ON core_notifications
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notification_counters_update();
+
+DROP TRIGGER IF EXISTS trigger_notification_counters_delete ON core_notifications;
+CREATE TRIGGER trigger_notification_counters_delete
+    AFTER DELETE ON core_notifications
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notification_counters_update();
+
+DROP TRIGGER IF EXISTS trigger_notification_counters_update ON core_notifications;
+CREATE TRIGGER trigger_notification_counters_update
+    AFTER UPDATE ON core_notifications
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notification_counters_update();
+
+-- ----------------------------------------------------------------------------
+-- Set-based recount for a user_id range [p_from, p_to)
+-- Called in chunks by NotificationCounterService.reconcile. Existing counter
+-- rows are locked first so triggers of in-flight writes apply after the
+-- recount instead of being overwritten by it.
+-- ----------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION notification_counters_rebuild(p_from INTEGER, p_to INTEGER)
+RETURNS INTEGER AS $$
+DECLARE
+    corrected INTEGER;
+    cleared INTEGER;
+BEGIN
+    PERFORM 1 FROM notification_counters
+    WHERE user_id >= p_from AND user_id < p_to
+    ORDER BY user_id
+    FOR UPDATE;
+
+    INSERT INTO notification_counters AS c (
+        user_id, total_count, unread_count, urgent_unread_count, critical_unread_count, updated_at
+    )
+    SELECT n.user_id,
+           COUNT(*),
+           COUNT(*) FILTER (WHERE NOT n.is_read),
+           COUNT(*) FILTER (WHERE NOT n.is_read AND n.priority IN ('urgent', 'critical')),
+           COUNT(*) FILTER (WHERE NOT n.is_read AND n.priority = 'critical'),
+           NOW()
+    FROM core_notifications n
+    WHERE n.user_id >= p_from AND n.user_id < p_to
+      AND n.delivery_status <> 'expired'
+    GROUP BY n.user_id
+    ORDER BY n.user_id
+    ON CONFLICT (user_id) DO UPDATE
+    SET total_count = EXCLUDED.total_count,
+        unread_count = EXCLUDED.unread_count,
+        urgent_unread_count = EXCLUDED.urgent_unread_count,
+        critical_unread_count = EXCLUDED.critical_unread_count,
+        updated_at = NOW()
+    WHERE (c.total_count, c.unread_count, c.urgent_unread_count, c.critical_unread_count)
+          IS DISTINCT FROM
+          (EXCLUDED.total_count, EXCLUDED.unread_count, EXCLUDED.urgent_unread_count, EXCLUDED.critical_unread_count);
+    GET DIAGNOSTICS corrected = ROW_COUNT;
+
+    UPDATE notification_counters c
+    SET total_count = 0,
+        unread_count = 0,
+        urgent_unread_count = 0,
+        critical_unread_count = 0,
+        updated_at = NOW()
+    WHERE c.user_id >= p_from AND c.user_id < p_to
+      AND (c.total_count, c.unread_count, c.urgent_unread_count, c.critical_unread_count) <> (0, 0, 0, 0)
+      AND NOT EXISTS (
+          SELECT 1 FROM core_notifications n
+          WHERE n.user_id = c.user_id AND n.delivery_status <> 'expired'
+      );
+    GET DIAGNOSTICS cleared = ROW_COUNT;
+
+    RETURN corrected + cleared;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ----------------------------------------------------------------------------
+-- Backfill
+-- ----------------------------------------------------------------------------
+
+SELECT notification_counters_rebuild(0, COALESCE((SELECT MAX(user_id) FROM core_notifications), 0) + 1);
+
+ANALYZE notification_counters;
@@ -0,0 +1,146 @@
+-- ============================================================================
+-- FULL-TEXT SEARCH ENGINE
+-- Weighted tsvector columns + GIN indexes for reviews, entities, users and
+-- categories, kept current by triggers, plus trigram indexes for typo-tolerant
+-- fallback matching. Used by services/search_service.py.
+-- Safe to re-run.
+-- ============================================================================
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- ----------------------------------------------------------------------------
+-- Search documents (one function per table so triggers and backfills agree)
+-- Weights: A = names/titles, B = body text, C = secondary attributes
+-- ----------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION review_search_document(p_title TEXT, p_content TEXT)
+RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('english', COALESCE(p_title, '')), 'A')
+        || setweight(to_tsvector('english', COALESCE(p_content, '')), 'B');
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION entity_search_document(p_name TEXT, p_description TEXT, p_root_category JSONB, p_final_category JSONB)
+RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('english', COALESCE(p_name, '')), 'A')
+        || setweight(to_tsvector('english', COALESCE(p_description, '')), 'B')
+        || setweight(to_tsvector('english',
+               COALESCE(p_final_category->>'name', '') || ' ' || COALESCE(p_root_category->>'name', '')), 'C');
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION user_search_document(p_username TEXT, p_display_name TEXT, p_first_name TEXT, p_last_name TEXT, p_bio TEXT)
+RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('english',
+               COALESCE(p_username, '') || ' ' || COALESCE(p_display_name, '') || ' ' ||
+               COALESCE(p_first_name, '') || ' ' || COALESCE(p_last_name, '')), 'A')
+        || setweight(to_tsvector('english', COALESCE(p_bio, '')), 'C');
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION category_search_document(p_name TEXT, p_description TEXT, p_path TEXT)
+RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('english', COALESCE(p_name, '')), 'A')
+        || setweight(to_tsvector('english', COALESCE(p_description, '')), 'B')
+        || setweight(to_tsvector('english', replace(COALESCE(p_path, ''), '.', ' ')), 'C');
+$$ LANGUAGE sql IMMUTABLE;
+
+-- ----------------------------------------------------------------------------
+-- Columns
+-- ----------------------------------------------------------------------------
+
+ALTER TABLE review_main ADD COLUMN IF NOT EXISTS search_vector tsvector;
+ALTER TABLE core_entities ADD COLUMN IF NOT EXISTS search_vector tsvector;
+ALTER TABLE core_users ADD COLUMN IF NOT EXISTS search_vector tsvector;
+ALTER TABLE unified_categories ADD COLUMN IF NOT EXISTS search_vector tsvector;
+
+-- ----------------------------------------------------------------------------
+-- Triggers
+-- ----------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION review_search_vector_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.search_vector := review_search_document(NEW.title, NEW.content);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_review_search_vector ON review_main;
+CREATE TRIGGER trigger_review_search_vector
+    BEFORE INSERT OR UPDATE OF title, content ON review_main
+    FOR EACH ROW EXECUTE FUNCTION review_search_vector_update();
+
+CREATE OR REPLACE FUNCTION entity_search_vector_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.search_vector := entity_search_document(NEW.name, NEW.description, NEW.root_category, NEW.final_category);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_entity_search_vector ON core_entities;
+CREATE TRIGGER trigger_entity_search_vector
+    BEFORE INSERT OR UPDATE OF name, description, root_category, final_category ON core_entities
+    FOR EACH ROW EXECUTE FUNCTION entity_search_vector_update();
+
+CREATE OR REPLACE FUNCTION user_search_vector_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.search_vector := user_search_document(NEW.username, NEW.display_name, NEW.first_name, NEW.last_name, NEW.bio);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_user_search_vector ON core_users;
+CREATE TRIGGER trigger_user_search_vector
+    BEFORE INSERT OR UPDATE OF username, display_name, first_name, last_name, bio ON core_users
+    FOR EACH ROW EXECUTE FUNCTION user_search_vector_update();
+
+CREATE OR REPLACE FUNCTION category_search_vector_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.search_vector := category_search_document(NEW.name, NEW.description, NEW.path);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_category_search_vector ON unified_categories;
+CREATE TRIGGER trigger_category_search_vector
+    BEFORE INSERT OR UPDATE OF name, description, path ON unified_categories
+    FOR EACH ROW EXECUTE FUNCTION category_search_vector_update();
+
+-- ----------------------------------------------------------------------------
+-- Backfill existing rows
+-- ----------------------------------------------------------------------------
+
+UPDATE review_main SET search_vector = review_search_document(title, content)
+WHERE search_vector IS NULL;
+
+UPDATE core_entities SET search_vector = entity_search_document(name, description, root_category, final_category)
+WHERE search_vector IS NULL;
+
+UPDATE core_users SET search_vector = user_search_document(username, display_name, first_name, last_name, bio)
+WHERE search_vector IS NULL;
+
+UPDATE unified_categories SET search_vector = category_search_document(name, description, path)
+WHERE search_vector IS NULL;
+
+-- ----------------------------------------------------------------------------
+-- Indexes
+-- ----------------------------------------------------------------------------
+
+-- Ranked full-text matching
+CREATE INDEX IF NOT EXISTS idx_review_main_search_vector ON review_main USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_core_entities_search_vector ON core_entities USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_core_users_search_vector ON core_users USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_unified_categories_search_vector ON unified_categories USING GIN (search_vector);
+
+-- Trigram fallback for misspellings (name-like columns only)
+CREATE INDEX IF NOT EXISTS idx_review_main_title_trgm ON review_main USING GIN (title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_core_entities_name_trgm ON core_entities USING GIN (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_core_users_username_trgm ON core_users USING GIN (username gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_core_users_display_name_trgm ON core_users USING GIN (display_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_unified_categories_name_trgm ON unified_categories USING GIN (name gin_trgm_ops);
+
+ANALYZE review_main;
+ANALYZE core_entities;
+ANALYZE core_users;
+ANALYZE unified_categories;
@@ -0,0 +1,29 @@
+-- ============================================================================
+-- TASTE NEIGHBOURS
+-- Top-K most similar users per user (cosine of mean-centred ratings), with
+-- shared-entity and mutual-connection counts. Rebuilt nightly by
+-- build_taste_neighbors.py and read by circle suggestions with a range scan
+-- of idx_user_taste_neighbors_rank.
+-- Safe to re-run.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS user_taste_neighbors (
+    user_id INTEGER NOT NULL REFERENCES core_users(user_id) ON DELETE CASCADE,
+    neighbor_id INTEGER NOT NULL REFERENCES core_users(user_id) ON DELETE CASCADE,
+    similarity DOUBLE PRECISION NOT NULL,        -- 0..1
+    co_rated INTEGER NOT NULL DEFAULT 0,         -- entities both users reviewed
+    mutual_connections INTEGER NOT NULL DEFAULT 0,
+    computed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (user_id, neighbor_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_user_taste_neighbors_rank
+    ON user_taste_neighbors (user_id, similarity DESC);
+
+-- ON DELETE CASCADE on neighbor_id
+CREATE INDEX IF NOT EXISTS idx_user_taste_neighbors_neighbor
+    ON user_taste_neighbors (neighbor_id);
+
+-- The build groups reviews by (user_id, entity_id)
+CREATE INDEX IF NOT EXISTS idx_review_main_user_entity
+    ON review_main (user_id, entity_id);
@@ -0,0 +1,26 @@
+-- ============================================================================
+-- TRENDING SCORES
+-- Forward-decayed activity scores for entities and reviews, refreshed
+-- incrementally by the trending refresher (services/trending_service.py)
+-- and read as a top-K range scan of idx_trending_scores_rank.
+-- Safe to re-run.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS trending_scores (
+    subject_type VARCHAR(20) NOT NULL,           -- 'entity' or 'review'
+    subject_id INTEGER NOT NULL,
+    score DOUBLE PRECISION NOT NULL DEFAULT 0,   -- relative to the landmark in trending_state
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (subject_type, subject_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_trending_scores_rank
+    ON trending_scores (subject_type, score DESC, subject_id DESC);
+
+-- One row per activity source (last processed id) plus the decay landmark
+CREATE TABLE IF NOT EXISTS trending_state (
+    name VARCHAR(50) PRIMARY KEY,
+    last_id BIGINT NOT NULL DEFAULT 0,
+    landmark TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
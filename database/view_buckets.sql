@@ -0,0 +1,40 @@
+-- ============================================================================
+-- VIEW BUCKETS
+-- Time-bucketed view counts for view analytics (services/view_pipeline.py).
+-- The view flusher adds to hourly rows; its rollup folds hourly rows older
+-- than a day into daily rows and drops daily rows past retention, so rows
+-- per item stay bounded. Unique viewers live in Redis HyperLogLog sketches.
+-- Safe to re-run.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS view_buckets (
+    content_type VARCHAR(20) NOT NULL,               -- 'review' or 'entity'
+    content_id INTEGER NOT NULL,
+    granularity VARCHAR(10) NOT NULL,                -- 'hour' or 'day'
+    bucket_start TIMESTAMPTZ NOT NULL,
+    views INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (content_type, content_id, granularity, bucket_start)
+);
+
+-- Rollup and retention scans
+CREATE INDEX IF NOT EXISTS idx_view_buckets_granularity_start
+    ON view_buckets (granularity, bucket_start);
+
+-- Seed daily buckets from the retained per-view rows once
+INSERT INTO view_buckets (content_type, content_id, granularity, bucket_start, views)
+SELECT 'review', review_id, 'day', date_trunc('day', viewed_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC', COUNT(*)
+FROM review_views
+WHERE viewed_at >= NOW() - INTERVAL '400 days'
+  AND (is_valid IS NULL OR is_valid = true)
+  AND NOT EXISTS (SELECT 1 FROM view_buckets WHERE content_type = 'review')
+GROUP BY 2, 4
+ON CONFLICT DO NOTHING;
+
+INSERT INTO view_buckets (content_type, content_id, granularity, bucket_start, views)
+SELECT 'entity', entity_id, 'day', date_trunc('day', viewed_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC', COUNT(*)
+FROM entity_views
+WHERE viewed_at >= NOW() - INTERVAL '400 days'
+  AND (is_valid IS NULL OR is_valid = true)
+  AND NOT EXISTS (SELECT 1 FROM view_buckets WHERE content_type = 'entity')
+GROUP BY 2, 4
+ON CONFLICT DO NOTHING;
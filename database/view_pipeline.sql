@@ -0,0 +1,49 @@
+-- ============================================================================
+-- VIEW PIPELINE
+-- Supports batched view writes (services/view_pipeline.py): the
+-- review_views insert trigger recounts each review once per statement
+-- instead of once per row, and view_analytics gets the unique key the
+-- flusher upserts on. Safe to re-run.
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION update_review_view_counts_batch() RETURNS trigger AS $$
+BEGIN
+    -- Same rule as update_review_view_count(): valid, unexpired views
+    UPDATE review_main r
+    SET view_count = c.valid_views
+    FROM (
+        SELECT v.review_id, COUNT(*) AS valid_views
+        FROM review_views v
+        WHERE v.review_id IN (SELECT DISTINCT review_id FROM new_views)
+          AND (v.is_valid IS NULL OR v.is_valid = true)
+          AND (v.expires_at IS NULL OR v.expires_at > NOW())
+        GROUP BY v.review_id
+    ) c
+    WHERE r.review_id = c.review_id
+      AND r.view_count IS DISTINCT FROM c.valid_views;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Deletes and review_id changes keep the per-row trigger
+DROP TRIGGER IF EXISTS trigger_update_review_view_count ON review_views;
+CREATE TRIGGER trigger_update_review_view_count
+    AFTER DELETE OR UPDATE OF review_id ON review_views
+    FOR EACH ROW EXECUTE FUNCTION update_review_view_count();
+
+DROP TRIGGER IF EXISTS trigger_update_review_view_count_insert ON review_views;
+CREATE TRIGGER trigger_update_review_view_count_insert
+    AFTER INSERT ON review_views
+    REFERENCING NEW TABLE AS new_views
+    FOR EACH STATEMENT EXECUTE FUNCTION update_review_view_counts_batch();
+
+-- Keep the busiest row per item before adding the unique key
+DELETE FROM view_analytics a
+USING view_analytics b
+WHERE a.content_type = b.content_type
+  AND a.content_id = b.content_id
+  AND (COALESCE(a.total_views, 0), a.analytics_id) < (COALESCE(b.total_views, 0), b.analytics_id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_view_analytics_content
+    ON view_analytics (content_type, content_id);
+DROP INDEX IF EXISTS idx_view_analytics_content;
@@ -0,0 +1,103 @@
+"""
+REVIEWINN USER ACTIVITY RECORDER
+================================
+Coalesced last-activity tracking for authenticated requests
+
+Requests only record (user_id, timestamp) in memory. A background task
+flushes everything recorded since the last flush with a single batched
+UPDATE of core_users.last_active_at.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from typing import Dict, Optional
+import logging
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_FLUSH_INTERVAL = 60  # seconds
+
+_BATCH_UPDATE_SQL = text("""
+    UPDATE core_users AS u
+    SET last_active_at = v.ts
+    FROM unnest(CAST(:user_ids AS integer[]), CAST(:timestamps AS timestamptz[])) AS v(user_id, ts)
+    WHERE u.user_id = v.user_id
+      AND (u.last_active_at IS NULL OR u.last_active_at < v.ts)
+""")
+
+
+class UserActivityRecorder:
+    """Buffers last-activity timestamps and writes them in periodic batches"""
+    
+    def __init__(self, flush_interval: float = ACTIVITY_FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self._pending: Dict[int, datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+    
+    def record(self, user_id: int) -> None:
+        """Record activity for a user (no I/O; starts the flusher on first use)"""
+        self._pending[user_id] = datetime.now(timezone.utc)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+    
+    async def flush(self) -> int:
+        """Write all pending activity in one UPDATE; returns the number of users"""
+        if not self._pending:
+            return 0
+        
+        batch, self._pending = self._pending, {}
+        try:
+            await run_in_threadpool(self._write_batch, batch)
+            return len(batch)
+        except Exception as e:
+            logger.error(f"Failed to flush user activity for {len(batch)} users: {e}")
+            # Keep the newest timestamp per user for the next attempt
+            for user_id, ts in batch.items():
+                if user_id not in self._pending:
+                    self._pending[user_id] = ts
+            return 0
+    
+    async def stop(self) -> None:
+        """Stop the flusher and write whatever is still pending"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+    
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+    
+    def _write_batch(self, batch: Dict[int, datetime]) -> None:
+        db = SessionLocal()
+        try:
+            db.execute(_BATCH_UPDATE_SQL, {
+                "user_ids": list(batch.keys()),
+                "timestamps": list(batch.values())
+            })
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+# Global activity recorder instance
+_activity_recorder: Optional[UserActivityRecorder] = None
+
+def get_activity_recorder() -> UserActivityRecorder:
+    """Get user activity recorder singleton"""
+    global _activity_recorder
+    if _activity_recorder is None:
+        _activity_recorder = UserActivityRecorder()
+    return _activity_recorder
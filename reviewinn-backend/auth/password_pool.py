@@ -0,0 +1,82 @@
+"""
+REVIEWINN PASSWORD HASHING POOL
+===============================
+Bounded worker pool for bcrypt hashing and verification
+
+bcrypt deliberately burns 100-300 ms of CPU per call. Running it on the
+event loop freezes every other request on the worker, so password work is
+dispatched to a small thread pool (bcrypt releases the GIL). The pool only
+accepts a bounded number of waiting jobs; beyond that callers get
+PasswordPoolSaturatedError and the endpoint answers 503 instead of letting
+a login storm degrade the whole API.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordPoolSaturatedError(Exception):
+    """Raised when the password pool already has its maximum queue depth"""
+
+
+class PasswordHashingPool:
+    """Size-bounded thread pool with queue-depth metrics"""
+    
+    def __init__(self, max_workers: int = 4, max_queue: int = 32):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        # Counters are only touched from the event loop thread
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._max_queue_depth_seen = 0
+    
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run ``func(*args)`` on the pool, rejecting work when the queue is full"""
+        if self._in_flight >= self.max_workers + self.max_queue:
+            self._rejected += 1
+            logger.warning(f"Password hashing pool saturated ({self._in_flight} jobs in flight)")
+            raise PasswordPoolSaturatedError("Password hashing pool is saturated")
+        
+        self._in_flight += 1
+        self._max_queue_depth_seen = max(self._max_queue_depth_seen, self.queue_depth)
+        submitted_at = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            started_at, result = await loop.run_in_executor(self._executor, self._timed_call, func, args)
+            self._total_wait += started_at - submitted_at
+            self._completed += 1
+            return result
+        finally:
+            self._in_flight -= 1
+    
+    @property
+    def queue_depth(self) -> int:
+        """Jobs waiting for a free worker"""
+        return max(0, self._in_flight - self.max_workers)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth_seen": self._max_queue_depth_seen,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "avg_queue_wait_ms": round(self._total_wait / self._completed * 1000, 2) if self._completed else 0.0
+        }
+    
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+    
+    @staticmethod
+    def _timed_call(func: Callable[..., Any], args: tuple):
+        return time.perf_counter(), func(*args)
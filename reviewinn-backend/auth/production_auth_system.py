@@ -26,8 +26,14 @@ import logging
 import redis.asyncio as redis
 from pydantic import BaseModel, EmailStr
 
+from services.tiered_cache import tiered_cache
+from auth.password_pool import PasswordHashingPool, PasswordPoolSaturatedError
+
 logger = logging.getLogger(__name__)
 
+# Local cache namespace for tokens that recently passed the Redis checks
+VERIFIED_TOKEN_CACHE_PREFIX = "verified_jti"
+
 # ==================== CONFIGURATION ====================
 
 @dataclass
@@ -75,9 +81,12 @@ class ProductionAuthConfig:
     REDIS_URL: str = "redis://localhost:6379/0"  # Default for local dev
     REDIS_KEY_PREFIX: str = "reviewinn_auth:"
     REDIS_DEFAULT_TTL: int = 3600
+    TOKEN_VERIFICATION_CACHE_SECONDS: int = 10  # Max delay before a revocation missed by pub/sub takes effect
     
     # Security Configuration
     BCRYPT_ROUNDS: int = 14  # Higher for production
+    PASSWORD_HASH_WORKERS: int = 4  # Threads dedicated to bcrypt work
+    PASSWORD_HASH_MAX_QUEUE: int = 32  # Waiting jobs before answering 503
     PASSWORD_MIN_LENGTH: int = 12  # FIXED: Increased to 12 characters for better security (matches API documentation)
     PASSWORD_MAX_LENGTH: int = 128
     
@@ -174,6 +183,12 @@ class ProductionAuthSystem:
             bcrypt__rounds=config.BCRYPT_ROUNDS
         )
         
+        # bcrypt runs off the event loop on a bounded pool
+        self.password_pool = PasswordHashingPool(
+            max_workers=config.PASSWORD_HASH_WORKERS,
+            max_queue=config.PASSWORD_HASH_MAX_QUEUE
+        )
+        
         # Initialize Redis connection pool with production settings
         self.redis = redis.from_url(
             config.REDIS_URL,
@@ -213,7 +228,7 @@ class ProductionAuthSystem:
             
             # Find and validate user
             user = await self._find_user(identifier, db)
-            if not user or not self._verify_password(password, user.hashed_password):
+            if not user or not await self.verify_password_async(password, user.hashed_password):
                 await self._handle_failed_authentication(identifier, client_ip, "invalid_credentials")
                 return AuthResult(
                     success=False,
@@ -291,6 +306,12 @@ class ProductionAuthSystem:
                 }
             )
             
+        except PasswordPoolSaturatedError:
+            return AuthResult(
+                success=False,
+                error_code="AUTH_SERVICE_BUSY",
+                error_message="Authentication service is busy, please retry shortly"
+            )
         except Exception as e:
             logger.error(f"Authentication error: {e}", exc_info=True)
             await self._log_security_event(SecurityEventType.LOGIN_FAILED, {
@@ -364,6 +385,12 @@ class ProductionAuthSystem:
                 }
             )
             
+        except PasswordPoolSaturatedError:
+            return AuthResult(
+                success=False,
+                error_code="AUTH_SERVICE_BUSY",
+                error_message="Authentication service is busy, please retry shortly"
+            )
         except Exception as e:
             logger.error(f"Registration error: {e}", exc_info=True)
             await self._log_security_event(SecurityEventType.REGISTRATION_FAILED, {
@@ -419,8 +446,11 @@ class ProductionAuthSystem:
         
         return access_token, refresh_token
     
-    async def verify_token(self, token: str, token_type: str = "access") -> Dict[str, Any]:
-        """Verify JWT token with comprehensive security checks"""
+    async def verify_token(self, token: str, token_type: str = "access", check_session: bool = False) -> Dict[str, Any]:
+        """Verify JWT token with comprehensive security checks
+        
+        With ``check_session`` the token's Redis session must also exist.
+        """
         try:
             # Try strict verification first
             try:
@@ -443,41 +473,32 @@ class ProductionAuthSystem:
             if payload.get("type") != token_type:
                 raise HTTPException(status_code=401, detail="Invalid token type")
             
-            # Check if token is blacklisted
             jti = payload.get("jti")
-            try:
-                if await self._is_token_blacklisted(jti):
-                    raise HTTPException(status_code=401, detail="Token has been revoked")
-            except HTTPException:
-                raise  # Re-raise if token is actually blacklisted
-            except Exception as e:
-                # SECURITY FIX: Fail closed in production if Redis is down
-                # In development, allow graceful degradation
-                logger.error(f"Redis blacklist check failed for token {jti}: {e}")
-                environment = getattr(self.config, 'ENVIRONMENT', 'production')
-                if environment == "production":
-                    raise HTTPException(
-                        status_code=503,
-                        detail="Authentication service temporarily unavailable"
-                    )
-                logger.warning(f"Development mode: Continuing without Redis blacklist check for {jti}")
-            
-            # Verify token metadata exists
-            try:
-                if not await self._verify_token_metadata(jti, payload):
-                    raise HTTPException(status_code=401, detail="Token metadata invalid")
-            except HTTPException:
-                raise  # Re-raise if metadata is actually invalid
-            except Exception as e:
-                # SECURITY FIX: Fail closed in production if Redis is down
-                logger.error(f"Redis metadata check failed for token {jti}: {e}")
-                environment = getattr(self.config, 'ENVIRONMENT', 'production')
-                if environment == "production":
-                    raise HTTPException(
-                        status_code=503,
-                        detail="Authentication service temporarily unavailable"
-                    )
-                logger.warning(f"Development mode: Continuing without Redis metadata check for {jti}")
+            session_key = None
+            if check_session and payload.get("session_id"):
+                session_key = f"{self.config.REDIS_KEY_PREFIX}session:{payload['sub']}:{jti}"
+            
+            # Recently verified tokens skip Redis (staleness bounded by the cache TTL)
+            cache_key = f"{VERIFIED_TOKEN_CACHE_PREFIX}:{jti}"
+            found, verified = tiered_cache.local.get(cache_key)
+            if found and (session_key is None or verified["session"]):
+                return payload
+            
+            # Revocation, metadata and session checks in one Redis round trip
+            state = await self._check_token_state(jti, session_key)
+            if state["blacklisted"]:
+                raise HTTPException(status_code=401, detail="Token has been revoked")
+            if not state["has_metadata"]:
+                raise HTTPException(status_code=401, detail="Token metadata invalid")
+            if not state["has_session"]:
+                raise HTTPException(status_code=401, detail="Invalid session")
+            
+            if state["from_redis"]:
+                tiered_cache.local.set(
+                    cache_key,
+                    {"session": session_key is not None},
+                    ttl=self.config.TOKEN_VERIFICATION_CACHE_SECONDS
+                )
             
             return payload
             
@@ -738,6 +759,14 @@ class ProductionAuthSystem:
         """Verify password against hash"""
         return self.pwd_context.verify(plain_password, hashed_password)
     
+    async def hash_password_async(self, password: str) -> str:
+        """Hash password on the password pool (raises PasswordPoolSaturatedError when full)"""
+        return await self.password_pool.run(self._hash_password, password)
+    
+    async def verify_password_async(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify password on the password pool (raises PasswordPoolSaturatedError when full)"""
+        return await self.password_pool.run(self._verify_password, plain_password, hashed_password)
+    
     def _contains_common_patterns(self, password: str) -> bool:
         """Check for common password patterns"""
         common_patterns = [
@@ -812,7 +841,7 @@ class ProductionAuthSystem:
             username=username.lower().strip(),
             first_name=first_name.strip(),
             last_name=last_name.strip(),
-            hashed_password=self._hash_password(password),
+            hashed_password=await self.hash_password_async(password),
             is_active=True,
             is_verified=False,  # Require email verification
             created_at=datetime.now(timezone.utc),
@@ -884,6 +913,41 @@ class ProductionAuthSystem:
         except Exception as e:
             logger.error(f"Failed to store token metadata: {e}")
     
+    async def _check_token_state(self, jti: str, session_key: Optional[str] = None) -> Dict[str, bool]:
+        """Pipelined blacklist, metadata and (optional) session lookup for a token"""
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.exists(f"{self.config.REDIS_KEY_PREFIX}blacklisted_token:{jti}")
+                pipe.exists(f"{self.config.REDIS_KEY_PREFIX}token_metadata:{jti}")
+                if session_key:
+                    pipe.exists(session_key)
+                results = await pipe.execute()
+            return {
+                "blacklisted": bool(results[0]),
+                "has_metadata": bool(results[1]),
+                "has_session": bool(results[2]) if session_key else True,
+                "from_redis": True
+            }
+        except Exception as e:
+            # SECURITY FIX: Fail closed in production if Redis is down
+            # In development, allow graceful degradation (never cached)
+            logger.error(f"Redis token state check failed for token {jti}: {e}")
+            environment = getattr(self.config, 'ENVIRONMENT', 'production')
+            if environment == "production":
+                raise HTTPException(
+                    status_code=503,
+                    detail="Authentication service temporarily unavailable"
+                )
+            logger.warning(f"Development mode: Continuing without Redis token state check for {jti}")
+            return {"blacklisted": False, "has_metadata": True, "has_session": True, "from_redis": False}
+    
+    async def _forget_verified_token(self, jti: str) -> None:
+        """Drop a token from the verified-token cache on every worker"""
+        try:
+            await tiered_cache.delete(f"{VERIFIED_TOKEN_CACHE_PREFIX}:{jti}")
+        except Exception as e:
+            logger.error(f"Failed to invalidate verified token {jti}: {e}")
+    
     async def _verify_token_metadata(self, jti: str, payload: Dict[str, Any]) -> bool:
         """Verify token metadata exists and is valid"""
         try:
@@ -909,6 +973,7 @@ class ProductionAuthSystem:
                 
                 key = f"{self.config.REDIS_KEY_PREFIX}blacklisted_token:{jti}"
                 await self.redis.setex(key, ttl, "blacklisted")
+                await self._forget_verified_token(jti)
                 return True
         except Exception as e:
             logger.error(f"Token blacklisting failed: {e}")
@@ -963,6 +1028,7 @@ class ProductionAuthSystem:
                 
                 for session_key, _ in excess_sessions:
                     await self.redis.delete(session_key)
+                    await self._forget_verified_token(session_key.rsplit(":", 1)[-1])
                     
         except Exception as e:
             logger.error(f"Concurrent session management failed: {e}")
@@ -995,6 +1061,8 @@ def get_production_auth_system() -> ProductionAuthSystem:
         # JWT_SECRET_KEY will be auto-configured in __post_init__
         REDIS_URL=os.getenv('REDIS_URL', 'redis://localhost:6379/0'),
         BCRYPT_ROUNDS=int(os.getenv('BCRYPT_ROUNDS', '14')),
+        PASSWORD_HASH_WORKERS=int(os.getenv('PASSWORD_HASH_WORKERS', '4')),
+        PASSWORD_HASH_MAX_QUEUE=int(os.getenv('PASSWORD_HASH_MAX_QUEUE', '32')),
         PASSWORD_MIN_LENGTH=int(os.getenv('PASSWORD_MIN_LENGTH', '8')),  # Fixed: was 12, now matches your requirement
         LOGIN_MAX_ATTEMPTS=int(os.getenv('LOGIN_MAX_ATTEMPTS', '5')),    # Fixed: was 3, now 5 attempts
         REGISTRATION_MAX_ATTEMPTS=int(os.getenv('REGISTRATION_MAX_ATTEMPTS', '2'))
@@ -29,6 +29,10 @@ class ProductionAuthSettings(BaseSettings):
     redis_key_prefix: str = Field(default="reviewinn_auth:", description="Redis key prefix")
     redis_default_ttl: int = Field(default=3600, description="Redis default TTL")
     redis_enabled: bool = Field(default=True, description="Enable Redis (disable for degraded mode)")
+    redis_fallback_max_bytes: int = Field(
+        default=32 * 1024 * 1024,
+        description="Memory cap for the in-process store used while Redis is unavailable"
+    )
     
     # Security Configuration - ENHANCED
     bcrypt_rounds: int = Field(default=14, ge=12, le=16, description="Bcrypt rounds")
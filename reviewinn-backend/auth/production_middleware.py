@@ -13,7 +13,7 @@ This middleware provides:
 """
 
 import time
-import asyncio
+import jwt
 from typing import Optional, Dict, Any, Callable, Awaitable
 from datetime import datetime, timezone
 
@@ -21,8 +21,9 @@ from fastapi import Request, Response, HTTPException, status
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 
-from database import get_db
 from auth.production_auth_system import get_auth_system, SecurityEventType
+from auth.user_cache import get_user_cache
+from auth.activity_recorder import get_activity_recorder
 from models.user import User
 import logging
 
@@ -45,6 +46,8 @@ class ProductionAuthMiddleware(BaseHTTPMiddleware):
     def __init__(self, app):
         super().__init__(app)
         self.auth_system = get_auth_system()
+        self.user_cache = get_user_cache()
+        self.activity_recorder = get_activity_recorder()
         
         # Production security headers
         self.security_headers = {
@@ -205,15 +208,11 @@ class ProductionAuthMiddleware(BaseHTTPMiddleware):
             )
         
         try:
-            # Verify token
-            payload = await self.auth_system.verify_token(token, "access")
+            # Verify token, revocation state and session in one step
+            payload = await self.auth_system.verify_token(token, "access", check_session=True)
             
-            # Get user from database with proper session management
-            db = next(get_db())
-            try:
-                user = db.query(User).filter(User.user_id == int(payload["sub"])).first()
-            finally:
-                db.close()
+            # Get user from the identity cache (database only on a miss)
+            user = await self.user_cache.get_user(int(payload["sub"]))
             
             if not user:
                 await self._log_security_event(SecurityEventType.SUSPICIOUS_ACTIVITY, {
@@ -234,15 +233,12 @@ class ProductionAuthMiddleware(BaseHTTPMiddleware):
                     error_message="Account is inactive"
                 )
             
-            # Update last activity (async to avoid blocking)
-            asyncio.create_task(self._update_user_activity(user.user_id))
+            # Record last activity (flushed in periodic batches)
+            self.activity_recorder.record(user.user_id)
             
             # Device fingerprint validation
             await self._validate_device_fingerprint(request, payload)
             
-            # Session validation
-            await self._validate_session(payload, request)
-            
             return AuthResult(
                 success=True,
                 user=user,
@@ -250,6 +246,15 @@ class ProductionAuthMiddleware(BaseHTTPMiddleware):
             )
             
         except HTTPException as e:
+            if e.detail == "Invalid session":
+                # Signature was already verified by verify_token
+                claims = jwt.decode(token, options={"verify_signature": False})
+                await self._log_security_event(SecurityEventType.SUSPICIOUS_ACTIVITY, {
+                    "reason": "invalid_session_token",
+                    "user_id": claims.get("sub"),
+                    "session_id": claims.get("session_id"),
+                    "client_ip": self._get_client_ip(request)
+                })
             await self._log_security_event(SecurityEventType.LOGIN_FAILED, {
                 "reason": "token_validation_failed",
                 "error": e.detail,
@@ -294,12 +299,8 @@ class ProductionAuthMiddleware(BaseHTTPMiddleware):
             # Verify token using same logic as required auth
             payload = await self.auth_system.verify_token(token, "access")
             
-            # Get user from database with proper session management
-            db = next(get_db())
-            try:
-                user = db.query(User).filter(User.user_id == int(payload["sub"])).first()
-            finally:
-                db.close()
+            # Get user from the identity cache (database only on a miss)
+            user = await self.user_cache.get_user(int(payload["sub"]))
             
             if not user or not user.is_active:
                 # For optional auth, just return failure without user
@@ -309,8 +310,8 @@ class ProductionAuthMiddleware(BaseHTTPMiddleware):
                     error_message="Invalid user"
                 )
             
-            # Update last activity (async to avoid blocking)
-            asyncio.create_task(self._update_user_activity(user.user_id))
+            # Record last activity (flushed in periodic batches)
+            self.activity_recorder.record(user.user_id)
             
             # Skip device fingerprint validation for view tracking (performance optimization)
             
@@ -389,30 +390,6 @@ class ProductionAuthMiddleware(BaseHTTPMiddleware):
             # In production, you might want to invalidate the session
             # For now, we just log the event
     
-    async def _validate_session(self, payload: Dict[str, Any], request: Request):
-        """Validate active session"""
-        session_id = payload.get("session_id")
-        user_id = payload.get("sub")
-        
-        if not session_id or not user_id:
-            return
-        
-        # Check if session exists in Redis
-        session_key = f"reviewinn_auth:session:{user_id}:{payload['jti']}"
-        session_exists = await self.auth_system.redis.exists(session_key)
-        
-        if not session_exists:
-            await self._log_security_event(SecurityEventType.SUSPICIOUS_ACTIVITY, {
-                "reason": "invalid_session_token",
-                "user_id": user_id,
-                "session_id": session_id,
-                "client_ip": self._get_client_ip(request)
-            })
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid session"
-            )
-    
     async def _perform_high_risk_checks(self, request: Request, user: User):
         """Additional security checks for high-risk endpoints"""
         # Require recent authentication for sensitive operations
@@ -574,18 +551,6 @@ class ProductionAuthMiddleware(BaseHTTPMiddleware):
         else:
             logger.info("Request completed successfully", extra=log_data)
     
-    async def _update_user_activity(self, user_id: int):
-        """Update user last activity (async)"""
-        try:
-            activity_key = f"reviewinn_auth:activity:{user_id}"
-            await self.auth_system.redis.setex(
-                activity_key, 
-                3600,  # 1 hour TTL
-                datetime.now(timezone.utc).isoformat()
-            )
-        except Exception as e:
-            logger.error(f"Failed to update user activity: {e}")
-    
     async def _handle_http_exception(self, exc: HTTPException, request: Request, request_id: str) -> JSONResponse:
         """Handle HTTP exceptions"""
         response = JSONResponse(
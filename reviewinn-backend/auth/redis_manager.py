@@ -2,16 +2,121 @@
 REVIEWINN REDIS MANAGER
 ======================
 Redis connection management with graceful degradation
+
+While Redis is unreachable, keys are kept in FallbackStore: an LRU store
+with a hard memory cap whose TTLs are enforced by a single timer-wheel task.
+After a connection error one background probe reconnects with exponential
+backoff (the circuit breaker); requests use the fallback store without
+touching Redis until the probe succeeds.
 """
 
 import asyncio
 import logging
-from typing import Optional, Any, Dict
+import sys
+import time
+from collections import OrderedDict
+from typing import Optional, Any, Dict, List, Set, Tuple
 import redis.asyncio as redis
 from auth.production_config import get_auth_settings
 
 logger = logging.getLogger(__name__)
 
+# Timer wheel: one slot per second, keys with longer TTLs wait out extra rounds
+WHEEL_SLOTS = 512
+# Approximate per-entry bookkeeping (dict, LRU order and wheel slot) in bytes
+ENTRY_OVERHEAD = 200
+
+# Reconnect backoff while the circuit is open (seconds)
+RECONNECT_BASE_DELAY = 5
+RECONNECT_MAX_DELAY = 120
+
+
+class FallbackStore:
+    """
+    Bounded in-process key/value store with TTLs.
+    Least recently used keys are evicted once the estimated size exceeds
+    ``max_bytes``. Expired keys are dropped on access and by ``sweep``,
+    which only visits the timer-wheel slots that came due.
+    """
+    
+    def __init__(self, max_bytes: int, slots: int = WHEEL_SLOTS):
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._wheel: List[Set[str]] = [set() for _ in range(slots)]
+        self._last_tick = int(time.monotonic())
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+    
+    def set(self, key: str, value: str, ttl: int) -> None:
+        self._remove(key)
+        expires_at = time.monotonic() + ttl
+        self._entries[key] = (value, expires_at)
+        self._wheel[self._slot(expires_at)].add(key)
+        self.size_bytes += self._entry_size(key, value)
+        while self.size_bytes > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+    
+    def delete(self, key: str) -> None:
+        self._remove(key)
+    
+    def exists(self, key: str) -> bool:
+        return self.get(key) is not None
+    
+    def sweep(self) -> int:
+        """Drop keys in the slots due since the last sweep; returns the number dropped."""
+        now = time.monotonic()
+        tick = int(now)
+        # A full turn visits every slot; no need to go round twice
+        first = max(self._last_tick + 1, tick - len(self._wheel) + 1)
+        dropped = 0
+        for due in range(first, tick + 1):
+            slot = due % len(self._wheel)
+            for key in list(self._wheel[slot]):
+                entry = self._entries.get(key)
+                if entry is None or self._slot(entry[1]) != slot:
+                    # Deleted, or re-set into another slot
+                    self._wheel[slot].discard(key)
+                elif entry[1] <= now:
+                    self._remove(key)
+                    dropped += 1
+        self._last_tick = tick
+        return dropped
+    
+    def clear(self) -> None:
+        self._entries.clear()
+        for slot in self._wheel:
+            slot.clear()
+        self.size_bytes = 0
+    
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._wheel[self._slot(entry[1])].discard(key)
+            self.size_bytes -= self._entry_size(key, entry[0])
+    
+    def _slot(self, expires_at: float) -> int:
+        # Rounded up so a key is never visited before it expires within its round
+        return int(expires_at + 1) % len(self._wheel)
+    
+    @staticmethod
+    def _entry_size(key: str, value: Any) -> int:
+        return sys.getsizeof(key) + sys.getsizeof(value) + ENTRY_OVERHEAD
+
+
 class RedisManager:
     """Redis manager with graceful degradation for production systems"""
     
@@ -19,8 +124,10 @@ class RedisManager:
         self.settings = get_auth_settings()
         self._redis: Optional[redis.Redis] = None
         self._connected = False
-        self._fallback_cache: Dict[str, Any] = {}
+        self._fallback_cache = FallbackStore(self.settings.redis_fallback_max_bytes)
         self._connection_lock = asyncio.Lock()
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._sweeper_task: Optional[asyncio.Task] = None
         
     async def initialize(self) -> bool:
         """Initialize Redis connection"""
@@ -52,6 +159,8 @@ class RedisManager:
             except Exception as e:
                 logger.error(f"Redis connection failed: {e}")
                 self._connected = False
+                if self._redis is not None:
+                    self._start_reconnect()
                 return False
     
     async def get(self, key: str) -> Optional[str]:
@@ -82,9 +191,8 @@ class RedisManager:
                 await self._handle_connection_error()
         
         # Fallback to in-memory cache
-        self._fallback_cache[full_key] = value
-        # Schedule cleanup after TTL (simplified)
-        asyncio.create_task(self._cleanup_fallback_key(full_key, ttl))
+        self._fallback_cache.set(full_key, value, ttl)
+        self._start_sweeper()
         return True
     
     async def delete(self, key: str) -> bool:
@@ -100,7 +208,7 @@ class RedisManager:
                 await self._handle_connection_error()
         
         # Fallback to in-memory cache
-        self._fallback_cache.pop(full_key, None)
+        self._fallback_cache.delete(full_key)
         return True
     
     async def exists(self, key: str) -> bool:
@@ -115,7 +223,7 @@ class RedisManager:
                 await self._handle_connection_error()
         
         # Fallback to in-memory cache
-        return full_key in self._fallback_cache
+        return self._fallback_cache.exists(full_key)
     
     async def ping(self) -> bool:
         """Ping Redis to check connection"""
@@ -128,33 +236,64 @@ class RedisManager:
         except Exception:
             return False
     
+    def fallback_stats(self) -> Dict[str, int]:
+        """Size of the in-process fallback store"""
+        return {
+            "keys": len(self._fallback_cache),
+            "bytes": self._fallback_cache.size_bytes,
+            "max_bytes": self._fallback_cache.max_bytes,
+            "evictions": self._fallback_cache.evictions
+        }
+    
     async def _handle_connection_error(self):
         """Handle Redis connection errors"""
+        if self._connected:
+            logger.warning("Redis connection lost - switching to fallback mode")
         self._connected = False
-        logger.warning("Redis connection lost - switching to fallback mode")
         
-        # Try to reconnect in background
-        asyncio.create_task(self._reconnect())
+        # Open the circuit: one background probe reconnects
+        self._start_reconnect()
+    
+    def _start_reconnect(self):
+        """Start the reconnect probe unless one is already running"""
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.create_task(self._reconnect())
     
     async def _reconnect(self):
-        """Attempt to reconnect to Redis"""
-        await asyncio.sleep(5)  # Wait before reconnecting
-        
-        try:
-            if self._redis:
-                await self._redis.ping()
-                self._connected = True
-                logger.info("Redis connection restored")
-        except Exception:
-            logger.debug("Redis reconnection failed")
+        """Attempt to reconnect to Redis, backing off exponentially"""
+        delay = RECONNECT_BASE_DELAY
+        while self._redis is not None:
+            await asyncio.sleep(delay)  # Wait before reconnecting
+            
+            try:
+                if self._redis:
+                    await self._redis.ping()
+                    self._connected = True
+                    logger.info("Redis connection restored")
+                    return
+            except Exception:
+                logger.debug(f"Redis reconnection failed, retrying in {min(delay * 2, RECONNECT_MAX_DELAY)}s")
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+    
+    def _start_sweeper(self):
+        """Start the fallback expiry task unless it is already running"""
+        if self._sweeper_task is None or self._sweeper_task.done():
+            self._sweeper_task = asyncio.create_task(self._sweep_fallback())
     
-    async def _cleanup_fallback_key(self, key: str, ttl: int):
-        """Clean up fallback cache key after TTL"""
-        await asyncio.sleep(ttl)
-        self._fallback_cache.pop(key, None)
+    async def _sweep_fallback(self):
+        """Expire fallback keys once a second until the store is empty"""
+        while len(self._fallback_cache):
+            await asyncio.sleep(1)
+            self._fallback_cache.sweep()
     
     async def close(self):
         """Close Redis connection"""
+        for task in (self._reconnect_task, self._sweeper_task):
+            if task is not None and not task.done():
+                task.cancel()
+        self._reconnect_task = None
+        self._sweeper_task = None
+        self._fallback_cache.clear()
         if self._redis:
             await self._redis.close()
             self._redis = None
@@ -0,0 +1,77 @@
+"""
+REVIEWINN AUTHENTICATED USER CACHE
+==================================
+Short-TTL identity cache for the auth middleware
+
+Authenticated requests resolve the token subject to a detached User object.
+Users are cached per worker for a few seconds so the hot path needs no
+database query; changes that affect authentication (logout, deactivation,
+profile or password updates) invalidate the entry on every worker through
+the two-tier cache's pub/sub channel.
+"""
+
+from typing import Optional
+import logging
+
+from starlette.concurrency import run_in_threadpool
+
+from database import SessionLocal
+from models.user import User
+from services.tiered_cache import TieredCacheService, tiered_cache
+
+logger = logging.getLogger(__name__)
+
+USER_CACHE_PREFIX = "auth_user"
+USER_CACHE_TTL = 30  # seconds; bounds staleness if an invalidation is missed
+
+
+class AuthenticatedUserCache:
+    """Per-worker cache of detached User objects keyed by user_id"""
+    
+    def __init__(self, cache: TieredCacheService = tiered_cache, ttl: int = USER_CACHE_TTL):
+        self.cache = cache
+        self.ttl = ttl
+    
+    async def get_user(self, user_id: int) -> Optional[User]:
+        """Get user from the local cache, loading it off the event loop on a miss"""
+        key = self._key(user_id)
+        found, user = self.cache.local.get(key)
+        if found:
+            return user
+        
+        user = await run_in_threadpool(self._load_user, user_id)
+        if user is not None:
+            self.cache.local.set(key, user, ttl=self.ttl)
+        return user
+    
+    async def invalidate(self, user_id: int) -> None:
+        """Drop a user from this worker's cache and broadcast to the others"""
+        try:
+            await self.cache.delete(self._key(user_id))
+        except Exception as e:
+            logger.error(f"Failed to invalidate cached user {user_id}: {e}")
+    
+    def _load_user(self, user_id: int) -> Optional[User]:
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter(User.user_id == user_id).first()
+            if user:
+                # Detach so the cached object never triggers lazy loads
+                db.expunge(user)
+            return user
+        finally:
+            db.close()
+    
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"{USER_CACHE_PREFIX}:{user_id}"
+
+# Global user cache instance
+_user_cache: Optional[AuthenticatedUserCache] = None
+
+def get_user_cache() -> AuthenticatedUserCache:
+    """Get authenticated user cache singleton"""
+    global _user_cache
+    if _user_cache is None:
+        _user_cache = AuthenticatedUserCache()
+    return _user_cache
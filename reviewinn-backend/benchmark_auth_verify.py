@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+REVIEWINN AUTH VERIFICATION BENCHMARK
+=====================================
+Compares per-request token verification latency against a live Redis:
+
+- sequential: JWT decode + blacklist, metadata and session lookups as
+  three separate round trips (the previous request path)
+- pipelined:  verify_token(check_session=True) with the verified-token
+  cache cleared before every call (one round trip)
+- cached:     verify_token(check_session=True) with a warm verified-token
+  cache (no round trip)
+
+Usage: python benchmark_auth_verify.py [iterations]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, '.')
+
+os.environ.setdefault('REDIS_URL', 'redis://localhost:6379/0')
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark-jwt-secret-key-for-local-use-only')
+
+
+def summarize(name: str, samples: list) -> None:
+    samples_ms = sorted(s * 1000 for s in samples)
+    p99 = samples_ms[min(len(samples_ms) - 1, int(len(samples_ms) * 0.99))]
+    print(f"{name:<12} mean={statistics.mean(samples_ms):.3f}ms "
+          f"p50={statistics.median(samples_ms):.3f}ms p99={p99:.3f}ms")
+
+
+async def main(iterations: int):
+    import jwt
+    from auth.production_auth_system import get_auth_system, VERIFIED_TOKEN_CACHE_PREFIX
+    from services.tiered_cache import tiered_cache
+
+    auth_system = get_auth_system()
+    config = auth_system.config
+
+    user = SimpleNamespace(user_id=999999, email="bench@example.com", username="bench", role="user")
+    access_token, _ = await auth_system._generate_token_pair(user, {"fingerprint": "benchmark"})
+    payload = jwt.decode(access_token, options={"verify_signature": False})
+    session_key = f"{config.REDIS_KEY_PREFIX}session:{user.user_id}:{payload['jti']}"
+    await auth_system.redis.setex(session_key, 300, "{}")
+    cache_key = f"{VERIFIED_TOKEN_CACHE_PREFIX}:{payload['jti']}"
+
+    async def sequential():
+        decoded = jwt.decode(
+            access_token, config.JWT_SECRET_KEY, algorithms=[config.JWT_ALGORITHM],
+            audience="reviewinn-app", issuer="reviewinn-production"
+        )
+        await auth_system._is_token_blacklisted(decoded["jti"])
+        await auth_system._verify_token_metadata(decoded["jti"], decoded)
+        await auth_system.redis.exists(session_key)
+
+    async def pipelined():
+        tiered_cache.local.delete(cache_key)
+        await auth_system.verify_token(access_token, "access", check_session=True)
+
+    async def cached():
+        await auth_system.verify_token(access_token, "access", check_session=True)
+
+    try:
+        for name, fn in (("sequential", sequential), ("pipelined", pipelined), ("cached", cached)):
+            for _ in range(min(50, iterations)):  # warm up connections
+                await fn()
+            samples = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                await fn()
+                samples.append(time.perf_counter() - start)
+            summarize(name, samples)
+    finally:
+        await auth_system.redis.delete(
+            session_key,
+            f"{config.REDIS_KEY_PREFIX}token_metadata:{payload['jti']}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Maintain entity_similarities (database/entity_similarity.sql), the
+precomputed similar-entities lists. Run the full build nightly and the
+incremental refresh every few minutes, e.g. from cron.
+
+Usage:
+    python build_similar_entities.py           # entities queued by triggers
+    python build_similar_entities.py --full    # every entity
+"""
+import argparse
+import sys
+import time
+
+from database import SessionLocal
+from services.similar_entity_service import INCREMENTAL_BATCH, TOP_K, SimilarEntityService
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--full", action="store_true", help="rebuild every entity instead of the queue")
+    parser.add_argument("--top-k", type=int, default=TOP_K, help="similar entities kept per entity")
+    parser.add_argument("--batch-size", type=int, default=INCREMENTAL_BATCH, help="queued entities per refresh")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    started = time.monotonic()
+    try:
+        service = SimilarEntityService(db)
+        if args.full:
+            rows = service.rebuild(
+                top_k=args.top_k,
+                progress=lambda done, total: print(f"  ... {done} of {total} entities")
+            )
+            print(f"✅ Wrote {rows} similar entity rows in {time.monotonic() - started:.0f}s")
+        else:
+            handled = service.refresh_queued(top_k=args.top_k, batch_size=args.batch_size)
+            print(f"✅ Refreshed {handled} queued entities in {time.monotonic() - started:.0f}s")
+        return 0
+    except Exception as e:
+        print(f"❌ Similar entities build failed: {e}")
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
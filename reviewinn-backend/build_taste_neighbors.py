@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Rebuild user_taste_neighbors (database/taste_neighbors.sql), the per-user
+taste-match neighbours behind circle suggestions. Meant to run nightly,
+e.g. from cron.
+
+Usage:
+    python build_taste_neighbors.py
+    python build_taste_neighbors.py --top-k 100
+"""
+import argparse
+import sys
+import time
+
+from database import SessionLocal
+from services.taste_match_service import TOP_K, TasteMatchService
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top-k", type=int, default=TOP_K, help="neighbours kept per user")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    started = time.monotonic()
+    try:
+        rows = TasteMatchService(db).rebuild(
+            top_k=args.top_k,
+            progress=lambda done, total: print(f"  ... {done} of {total} users")
+        )
+        print(f"✅ Wrote {rows} taste neighbours in {time.monotonic() - started:.0f}s")
+        return 0
+    except Exception as e:
+        print(f"❌ Taste neighbour build failed: {e}")
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+REVIEWINN BLOCKING DB CALL CHECK
+================================
+Flags synchronous SQLAlchemy session calls made directly inside ``async def``
+functions. Such calls block the event loop for the whole worker; handlers
+should either be plain ``def`` (FastAPI runs them on the threadpool), wrap the
+work in ``run_in_threadpool``, or use ``AsyncSessionLocal`` / ``get_async_db``.
+
+Known offenders are listed in blocking_db_calls_baseline.txt so that only new
+ones fail the check; delete lines from the baseline as code is migrated.
+
+Usage:
+    python check_blocking_db_calls.py                 # check against the baseline
+    python check_blocking_db_calls.py --update-baseline
+"""
+
+import argparse
+import ast
+import os
+import sys
+from typing import Iterator, List, Set, Tuple
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(ROOT, "blocking_db_calls_baseline.txt")
+SKIP_DIRS = {"venv", ".venv", "__pycache__", ".git", "alembic", "migrations", "node_modules"}
+
+# Receivers that hold a sync Session in this codebase
+SESSION_NAMES = {"db", "session", "db_session"}
+# Session methods that talk to the database
+BLOCKING_METHODS = {
+    "query", "execute", "scalar", "scalars", "get", "commit", "flush",
+    "refresh", "rollback", "merge", "delete", "bulk_save_objects",
+}
+
+
+def _session_receiver(node: ast.AST) -> bool:
+    """True for ``db``, ``session`` and ``self.db``-style receivers."""
+    if isinstance(node, ast.Name):
+        return node.id in SESSION_NAMES
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+        return node.value.id == "self" and node.attr in SESSION_NAMES
+    return False
+
+
+class _CoroutineVisitor(ast.NodeVisitor):
+    """Collect un-awaited session calls in the body of one coroutine."""
+
+    def __init__(self):
+        self.calls: List[Tuple[int, str]] = []
+        self._awaited: Set[int] = set()
+
+    def visit_Await(self, node: ast.Await) -> None:
+        # Calls on an AsyncSession are awaited and therefore fine
+        self._awaited.add(id(node.value))
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        func = node.func
+        if (
+            id(node) not in self._awaited
+            and isinstance(func, ast.Attribute)
+            and func.attr in BLOCKING_METHODS
+            and _session_receiver(func.value)
+        ):
+            self.calls.append((node.lineno, f"{ast.unparse(func.value)}.{func.attr}()"))
+        self.generic_visit(node)
+
+    # Nested sync functions and lambdas run wherever they are called (usually the threadpool)
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        return
+
+    def visit_Lambda(self, node: ast.Lambda) -> None:
+        return
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> None:
+        return
+
+
+def find_blocking_calls(path: str) -> Iterator[Tuple[str, int, str]]:
+    """Yield ``(qualified_function, line, call)`` for one source file."""
+    with open(path, encoding="utf-8") as f:
+        try:
+            tree = ast.parse(f.read(), filename=path)
+        except SyntaxError:
+            return
+
+    def walk(node: ast.AST, prefix: str):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                name = f"{prefix}{child.name}"
+                if isinstance(child, ast.AsyncFunctionDef):
+                    visitor = _CoroutineVisitor()
+                    for statement in child.body:
+                        visitor.visit(statement)
+                    for line, call in visitor.calls:
+                        yield name, line, call
+                yield from walk(child, f"{name}.")
+
+    yield from walk(tree, "")
+
+
+def scan(root: str) -> List[Tuple[str, str, int, str]]:
+    results = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for filename in sorted(filenames):
+            if not filename.endswith(".py"):
+                continue
+            path = os.path.join(dirpath, filename)
+            relpath = os.path.relpath(path, root)
+            for function, line, call in find_blocking_calls(path):
+                results.append((relpath, function, line, call))
+    return results
+
+
+def load_baseline() -> Set[str]:
+    if not os.path.exists(BASELINE_FILE):
+        return set()
+    with open(BASELINE_FILE, encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip() and not line.startswith("#")}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--update-baseline", action="store_true", help="rewrite the baseline from the current tree")
+    args = parser.parse_args()
+
+    results = scan(ROOT)
+    # Baseline entries are per function so unrelated edits do not shift them
+    offenders = sorted({f"{relpath}::{function}" for relpath, function, _, _ in results})
+
+    if args.update_baseline:
+        with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+            f.write("# Coroutines known to make blocking DB calls; see check_blocking_db_calls.py\n")
+            f.write("\n".join(offenders) + "\n")
+        print(f"Baseline updated: {len(offenders)} functions")
+        return 0
+
+    baseline = load_baseline()
+    new_offenders = [o for o in offenders if o not in baseline]
+    if not new_offenders:
+        fixed = len(baseline - set(offenders))
+        print(f"OK: no new blocking DB calls in coroutines ({len(offenders)} baselined"
+              + (f", {fixed} baseline entries can be removed" if fixed else "") + ")")
+        return 0
+
+    print("Blocking DB calls inside async functions:")
+    for relpath, function, line, call in results:
+        if f"{relpath}::{function}" in new_offenders:
+            print(f"  {relpath}:{line} {function}: {call}")
+    print("Make the function sync, use run_in_threadpool, or switch to AsyncSessionLocal.")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
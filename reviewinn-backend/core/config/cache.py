@@ -3,7 +3,7 @@ Cache configuration and connection management.
 Provides Redis connection with proper error handling and fallback mechanisms.
 """
 
-import redis
+import redis.asyncio as redis
 import json
 import pickle
 import asyncio
@@ -12,6 +12,7 @@ from datetime import timedelta
 import logging
 
 from .settings import get_settings
+from .redis_client import RedisAvailability, get_redis_client, is_connection_error
 
 logger = logging.getLogger(__name__)
 
@@ -25,37 +26,30 @@ class CacheManager:
     def __init__(self):
         self._client: Optional[redis.Redis] = None
         self._connected: bool = False
+        self._availability = RedisAvailability()
         
     def _get_client(self) -> redis.Redis:
-        """Get or create Redis client."""
+        """Get or create the asyncio Redis client on the shared pool."""
         if self._client is None:
             settings = get_settings()
-            
-            self._client = redis.Redis(
-                host=settings.cache.host,
-                port=settings.cache.port,
-                db=settings.cache.database,
-                password=settings.cache.password,
-                decode_responses=False,  # We handle encoding ourselves
-                socket_connect_timeout=5,
-                socket_timeout=5,
-                retry_on_timeout=True,
-                health_check_interval=30
-            )
+            self._client = get_redis_client(settings.cache.url)
         
         return self._client
     
-    def _check_connection(self) -> bool:
-        """Check if Redis connection is healthy."""
+    async def _check_connection(self) -> bool:
+        """Check if Redis is usable; only pings when the state is unknown or stale."""
         try:
-            client = self._get_client()
-            client.ping()
-            self._connected = True
-            return True
+            self._connected = await self._availability.check(self._get_client())
         except Exception as e:
             logger.warning(f"Cache connection check failed: {e}")
             self._connected = False
-            return False
+        return self._connected
+    
+    def _handle_error(self, error: Exception) -> None:
+        """Back off from Redis when the failure was a connection problem."""
+        if is_connection_error(error):
+            self._availability.mark_failed()
+            self._connected = False
     
     def _serialize_value(self, value: Any) -> bytes:
         """Serialize value for storage."""
@@ -89,11 +83,11 @@ class CacheManager:
         Returns None if key doesn't exist or on error.
         """
         try:
-            if not self._check_connection():
+            if not await self._check_connection():
                 return None
             
             client = self._get_client()
-            value = client.get(key)
+            value = await client.get(key)
             
             if value is None:
                 return None
@@ -101,6 +95,7 @@ class CacheManager:
             return self._deserialize_value(value)
         
         except Exception as e:
+            self._handle_error(e)
             logger.error(f"Cache get error for key '{key}': {e}")
             return None
     
@@ -115,7 +110,7 @@ class CacheManager:
         Returns True if successful, False otherwise.
         """
         try:
-            if not self._check_connection():
+            if not await self._check_connection():
                 return False
             
             client = self._get_client()
@@ -129,9 +124,10 @@ class CacheManager:
             if isinstance(ttl, timedelta):
                 ttl = int(ttl.total_seconds())
             
-            return client.setex(key, ttl, serialized_value)
+            return await client.setex(key, ttl, serialized_value)
         
         except Exception as e:
+            self._handle_error(e)
             logger.error(f"Cache set error for key '{key}': {e}")
             return False
     
@@ -141,13 +137,14 @@ class CacheManager:
         Returns True if successful, False otherwise.
         """
         try:
-            if not self._check_connection():
+            if not await self._check_connection():
                 return False
             
             client = self._get_client()
-            return bool(client.delete(key))
+            return bool(await client.delete(key))
         
         except Exception as e:
+            self._handle_error(e)
             logger.error(f"Cache delete error for key '{key}': {e}")
             return False
     
@@ -157,13 +154,14 @@ class CacheManager:
         Returns True if exists, False otherwise.
         """
         try:
-            if not self._check_connection():
+            if not await self._check_connection():
                 return False
             
             client = self._get_client()
-            return bool(client.exists(key))
+            return bool(await client.exists(key))
         
         except Exception as e:
+            self._handle_error(e)
             logger.error(f"Cache exists error for key '{key}': {e}")
             return False
     
@@ -173,14 +171,15 @@ class CacheManager:
         Returns True if successful, False otherwise.
         """
         try:
-            if not self._check_connection():
+            if not await self._check_connection():
                 return False
             
             client = self._get_client()
-            client.flushdb()
+            await client.flushdb()
             return True
         
         except Exception as e:
+            self._handle_error(e)
             logger.error(f"Cache clear error: {e}")
             return False
     
@@ -190,7 +189,7 @@ class CacheManager:
         Returns health status information.
         """
         try:
-            if not self._check_connection():
+            if not await self._check_connection():
                 return {
                     "status": "unhealthy",
                     "connected": False,
@@ -198,7 +197,7 @@ class CacheManager:
                 }
             
             client = self._get_client()
-            info = client.info()
+            info = await client.info()
             
             return {
                 "status": "healthy",
@@ -210,6 +209,7 @@ class CacheManager:
             }
         
         except Exception as e:
+            self._handle_error(e)
             logger.error(f"Cache health check error: {e}")
             return {
                 "status": "unhealthy",
@@ -217,16 +217,16 @@ class CacheManager:
                 "error": str(e)
             }
     
-    def close(self):
+    async def close(self):
         """Close cache connections."""
         try:
             if self._client:
-                self._client.close()
+                await self._client.aclose()
                 logger.info("Cache connection closed")
         except Exception as e:
             logger.error(f"Error closing cache connection: {e}")
         finally:
-            self._client = None
+            self._client: Optional[redis.Redis] = None
             self._connected = False
 
 
@@ -279,4 +279,4 @@ def cache_result(ttl: int = 300):
             return result
         
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
\ No newline at end of file
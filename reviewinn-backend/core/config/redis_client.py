@@ -0,0 +1,143 @@
+"""
+Shared asyncio Redis connections.
+Every cache component talks to Redis through one connection pool per URL so
+that requests on the event loop never block on a synchronous socket.
+Pub/sub subscribers use a separate pool whose connections have no read timeout.
+"""
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+import redis.asyncio as redis
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# Pool sizing and socket behaviour shared by all async Redis clients
+MAX_CONNECTIONS = 50
+SOCKET_TIMEOUT = 5
+SOCKET_CONNECT_TIMEOUT = 5
+HEALTH_CHECK_INTERVAL = 30
+# A subscriber waits this long for a message before checking the connection again
+PUBSUB_POLL_TIMEOUT = 10
+
+_pools: Dict[str, redis.ConnectionPool] = {}
+_pubsub_pools: Dict[str, redis.ConnectionPool] = {}
+
+
+def get_connection_pool(url: str) -> redis.ConnectionPool:
+    """Get or create the shared connection pool for a Redis URL."""
+    pool = _pools.get(url)
+    if pool is None:
+        pool = redis.ConnectionPool.from_url(
+            url,
+            decode_responses=False,  # Callers handle encoding themselves
+            max_connections=MAX_CONNECTIONS,
+            socket_connect_timeout=SOCKET_CONNECT_TIMEOUT,
+            socket_timeout=SOCKET_TIMEOUT,
+            retry_on_timeout=True,
+            health_check_interval=HEALTH_CHECK_INTERVAL
+        )
+        _pools[url] = pool
+    return pool
+
+
+def get_redis_client(url: str) -> redis.Redis:
+    """Get an asyncio Redis client backed by the shared pool for ``url``."""
+    return redis.Redis(connection_pool=get_connection_pool(url))
+
+
+def get_pubsub_client(url: str) -> redis.Redis:
+    """
+    Get an asyncio Redis client for pub/sub subscribers.
+    Subscriptions can sit idle indefinitely, so their connections have no
+    read timeout (an idle channel would otherwise raise TimeoutError every
+    SOCKET_TIMEOUT seconds); health checks detect dead connections instead.
+    """
+    pool = _pubsub_pools.get(url)
+    if pool is None:
+        pool = redis.ConnectionPool.from_url(
+            url,
+            decode_responses=False,
+            max_connections=MAX_CONNECTIONS,
+            socket_connect_timeout=SOCKET_CONNECT_TIMEOUT,
+            socket_timeout=None,
+            socket_keepalive=True,
+            health_check_interval=HEALTH_CHECK_INTERVAL
+        )
+        _pubsub_pools[url] = pool
+    return redis.Redis(connection_pool=pool)
+
+
+async def pubsub_messages(pubsub: Any) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield published messages from a subscribed pub/sub object forever.
+    Waiting is bounded by PUBSUB_POLL_TIMEOUT so the connection health check
+    runs while the channel is idle; an empty wait is not an error.
+    """
+    while True:
+        message = await pubsub.get_message(timeout=PUBSUB_POLL_TIMEOUT)
+        if message is not None and message.get("type") == "message":
+            yield message
+
+
+class RedisAvailability:
+    """
+    Tracks whether Redis is reachable without pinging on every call.
+    After a failed ping, callers skip Redis until ``retry_interval`` elapses.
+    """
+
+    def __init__(self, retry_interval: float = 30.0):
+        self.retry_interval = retry_interval
+        self._available: Optional[bool] = None
+        self._retry_at: float = 0.0
+        self._lock = asyncio.Lock()
+
+    async def check(self, client: redis.Redis) -> bool:
+        """Return True when Redis is usable, pinging only when state is unknown."""
+        if self._available:
+            return True
+
+        loop = asyncio.get_running_loop()
+        if self._available is False and loop.time() < self._retry_at:
+            return False
+
+        async with self._lock:
+            if self._available:
+                return True
+            try:
+                await client.ping()
+                if self._available is False:
+                    logger.info("Redis connection restored")
+                self._available = True
+            except Exception as e:
+                if self._available is not False:
+                    logger.warning(f"Redis unavailable: {e}. Caching is DISABLED.")
+                self._available = False
+                self._retry_at = loop.time() + self.retry_interval
+        return bool(self._available)
+
+    def mark_failed(self) -> None:
+        """Skip Redis for ``retry_interval`` after a connection-level failure."""
+        if self._available is not False:
+            logger.warning("Redis connection lost - caching disabled until retry")
+        self._available = False
+        self._retry_at = asyncio.get_running_loop().time() + self.retry_interval
+
+
+def is_connection_error(error: Exception) -> bool:
+    """True for errors that mean Redis itself is unreachable."""
+    return isinstance(error, (RedisConnectionError, RedisTimeoutError))
+
+
+async def close_redis_pools() -> None:
+    """Disconnect every shared pool (application shutdown)."""
+    for pools in (_pools, _pubsub_pools):
+        for url, pool in list(pools.items()):
+            try:
+                await pool.disconnect()
+            except Exception as e:
+                logger.error(f"Error closing Redis pool: {e}")
+            finally:
+                pools.pop(url, None)
@@ -1,20 +1,83 @@
 """
 Rate limiting middleware for the review platform.
 Provides configurable rate limiting with Redis backend.
+
+Every bucket that applies to a request (per-user and per-IP) is checked and
+charged by one EVALSHA of _TOKEN_BUCKET_SCRIPT, so the check is a single
+round trip and concurrent requests cannot both spend the same token. The
+remaining/reset headers come from that same script result. Clients already
+refused are remembered in-process until their retry time, so repeated
+requests from them are rejected without touching Redis.
 """
 
+import math
 import time
+from collections import OrderedDict
 from fastapi import Request, HTTPException
 from starlette.middleware.base import BaseHTTPMiddleware
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, List, Tuple
 import logging
 
 from ..config.settings import get_settings
-from ..config.cache import cache_manager
+from ..config.redis_client import RedisAvailability, get_redis_client, is_connection_error
 from ..exceptions import RateLimitError
 
 logger = logging.getLogger(__name__)
 
+RATE_LIMIT_PREFIX = "rate_limit:bucket:"
+
+# Most clients remembered by the in-process pre-limiter
+LOCAL_BLOCK_MAX_KEYS = 10000
+
+# A bucket: (redis key, requests per minute, burst size, identifier for errors)
+Bucket = Tuple[str, int, int, str]
+
+# KEYS: one hash per bucket ({tokens, ts})
+# ARGV: now_ms, then tokens per ms and burst size for each bucket
+# Returns {allowed, then per bucket: whole tokens left, ms until a token is
+#          available, ms until the bucket is full}
+# A request is charged to every bucket or to none of them.
+_TOKEN_BUCKET_SCRIPT = """
+local now = tonumber(ARGV[1])
+local levels = {}
+local allowed = 1
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[i * 2])
+    local burst = tonumber(ARGV[i * 2 + 1])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local level = tonumber(state[1])
+    local ts = tonumber(state[2])
+    if level == nil or ts == nil then
+        level = burst
+    else
+        level = math.min(burst, level + math.max(0, now - ts) * rate)
+    end
+    if level < 1 then
+        allowed = 0
+    end
+    levels[i] = level
+end
+local result = {allowed}
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[i * 2])
+    local burst = tonumber(ARGV[i * 2 + 1])
+    local level = levels[i]
+    if allowed == 1 then
+        level = level - 1
+        redis.call('HSET', key, 'tokens', tostring(level), 'ts', ARGV[1])
+        redis.call('PEXPIRE', key, math.ceil((burst - level) / rate) + 1000)
+    end
+    local wait = 0
+    if level < 1 then
+        wait = math.ceil((1 - level) / rate)
+    end
+    result[#result + 1] = math.floor(level)
+    result[#result + 1] = wait
+    result[#result + 1] = math.ceil((burst - level) / rate)
+end
+return result
+"""
+
 
 class RateLimitingMiddleware(BaseHTTPMiddleware):
     """
@@ -28,7 +91,8 @@ class RateLimitingMiddleware(BaseHTTPMiddleware):
         default_requests_per_minute: int = 60,
         default_burst_size: int = 100,
         excluded_paths: Optional[list] = None,
-        custom_limits: Optional[Dict[str, Dict[str, int]]] = None
+        custom_limits: Optional[Dict[str, Dict[str, int]]] = None,
+        local_prelimit: bool = True
     ):
         super().__init__(app)
         self.settings = get_settings()
@@ -45,6 +109,14 @@ class RateLimitingMiddleware(BaseHTTPMiddleware):
             "/reviews": {"requests_per_minute": 30, "burst_size": 50},
             "/entities": {"requests_per_minute": 100, "burst_size": 200}
         }
+        
+        self.redis = get_redis_client(self.settings.cache.url)
+        self._availability = RedisAvailability()
+        self._token_bucket = self.redis.register_script(_TOKEN_BUCKET_SCRIPT)
+        
+        # Bucket key -> time (epoch seconds) before which it cannot have a token
+        self.local_prelimit = local_prelimit
+        self._blocked_until: "OrderedDict[str, float]" = OrderedDict()
     
     async def dispatch(self, request: Request, call_next):
         """Process request through rate limiting middleware."""
@@ -55,13 +127,12 @@ class RateLimitingMiddleware(BaseHTTPMiddleware):
         
         try:
             # Check rate limits
-            await self._check_rate_limits(request)
+            rate_limit_info = await self._check_rate_limits(request)
             
             # Process request
             response = await call_next(request)
             
             # Add rate limit headers
-            rate_limit_info = await self._get_rate_limit_info(request)
             if rate_limit_info:
                 response.headers["X-Rate-Limit-Limit"] = str(rate_limit_info["limit"])
                 response.headers["X-Rate-Limit-Remaining"] = str(rate_limit_info["remaining"])
@@ -79,36 +150,48 @@ class RateLimitingMiddleware(BaseHTTPMiddleware):
                 }
             )
             
+            retry_after = e.details.get("retry_after", 60)
+            headers = {"Retry-After": str(retry_after)}
+            if "limit" in e.details:
+                headers["X-Rate-Limit-Limit"] = str(e.details["limit"])
+                headers["X-Rate-Limit-Remaining"] = "0"
+                headers["X-Rate-Limit-Reset"] = str(int(time.time()) + retry_after)
+            
             raise HTTPException(
                 status_code=e.status_code,
                 detail=e.to_dict(),
-                headers={
-                    "Retry-After": str(e.details.get("retry_after", 60))
-                }
+                headers=headers
             )
     
     def _is_excluded_path(self, path: str) -> bool:
         """Check if path should be excluded from rate limiting."""
         return any(path.startswith(excluded) for excluded in self.excluded_paths)
     
-    async def _check_rate_limits(self, request: Request):
-        """Check rate limits for the request."""
+    async def _check_rate_limits(self, request: Request) -> Optional[Dict[str, Any]]:
+        """
+        Check rate limits for the request.
+        Returns the header values for the most constrained bucket, or None
+        when Redis is unavailable (requests are then not limited).
+        """
         
         # Get rate limit configuration for this endpoint
         limits = self._get_endpoint_limits(request.url.path)
+        buckets: List[Bucket] = []
         
-        # Check user-based rate limit (if authenticated)
+        # User-based rate limit (if authenticated)
         user_info = getattr(request.state, "user", None)
         if user_info:
-            await self._check_user_rate_limit(
-                user_info["user_id"], 
+            buckets.append(self._user_bucket(
+                user_info["user_id"],
                 limits,
                 request.url.path
-            )
+            ))
         
-        # Check IP-based rate limit
+        # IP-based rate limit
         client_ip = self._get_client_ip(request)
-        await self._check_ip_rate_limit(client_ip, limits, request.url.path)
+        buckets.append(self._ip_bucket(client_ip, limits, request.url.path))
+        
+        return await self._apply_token_bucket_limit(buckets)
     
     def _get_endpoint_limits(self, path: str) -> Dict[str, int]:
         """Get rate limit configuration for endpoint."""
@@ -128,121 +211,113 @@ class RateLimitingMiddleware(BaseHTTPMiddleware):
             "burst_size": self.default_burst_size
         }
     
-    async def _check_user_rate_limit(
+    def _user_bucket(
         self, 
         user_id: str, 
         limits: Dict[str, int], 
         path: str
-    ):
-        """Check rate limit for specific user."""
+    ) -> Bucket:
+        """Token bucket for a specific user."""
         
-        cache_key = f"rate_limit:user:{user_id}:{path}"
-        
-        await self._apply_token_bucket_limit(
-            cache_key=cache_key,
-            requests_per_minute=limits["requests_per_minute"],
-            burst_size=limits["burst_size"],
-            identifier=f"user {user_id}"
+        return (
+            f"{RATE_LIMIT_PREFIX}user:{user_id}:{path}",
+            limits["requests_per_minute"],
+            limits["burst_size"],
+            f"user {user_id}"
         )
     
-    async def _check_ip_rate_limit(
+    def _ip_bucket(
         self, 
         client_ip: str, 
         limits: Dict[str, int], 
         path: str
-    ):
-        """Check rate limit for client IP."""
-        
-        cache_key = f"rate_limit:ip:{client_ip}:{path}"
+    ) -> Bucket:
+        """Token bucket for a client IP."""
         
         # Use more restrictive limits for IP-based limiting
         ip_requests_per_minute = min(limits["requests_per_minute"] * 2, 120)
         ip_burst_size = min(limits["burst_size"] * 2, 200)
         
-        await self._apply_token_bucket_limit(
-            cache_key=cache_key,
-            requests_per_minute=ip_requests_per_minute,
-            burst_size=ip_burst_size,
-            identifier=f"IP {client_ip}"
+        return (
+            f"{RATE_LIMIT_PREFIX}ip:{client_ip}:{path}",
+            ip_requests_per_minute,
+            ip_burst_size,
+            f"IP {client_ip}"
         )
     
-    async def _apply_token_bucket_limit(
-        self,
-        cache_key: str,
-        requests_per_minute: int,
-        burst_size: int,
-        identifier: str
-    ):
-        """Apply token bucket rate limiting algorithm."""
+    async def _apply_token_bucket_limit(self, buckets: List[Bucket]) -> Optional[Dict[str, Any]]:
+        """Apply token bucket rate limiting algorithm to all buckets at once."""
         
         current_time = time.time()
         
-        # Get current bucket state
-        bucket_data = await cache_manager.get(cache_key)
+        # Shed clients that were refused recently without asking Redis
+        if self.local_prelimit:
+            for bucket in buckets:
+                blocked_until = self._blocked_until.get(bucket[0])
+                if blocked_until is None:
+                    continue
+                if blocked_until > current_time:
+                    raise self._limit_error(bucket, blocked_until - current_time)
+                del self._blocked_until[bucket[0]]
         
-        if bucket_data is None:
-            # Initialize new bucket
-            bucket_data = {
-                "tokens": burst_size,
-                "last_refill": current_time
-            }
+        if not await self._availability.check(self.redis):
+            return None
         
-        # Calculate tokens to add based on time elapsed
-        time_elapsed = current_time - bucket_data["last_refill"]
-        tokens_to_add = time_elapsed * (requests_per_minute / 60.0)
+        args: List[Any] = [int(current_time * 1000)]
+        for _, requests_per_minute, burst_size, _ in buckets:
+            args.extend([requests_per_minute / 60000.0, burst_size])
         
-        # Update bucket
-        bucket_data["tokens"] = min(
-            burst_size, 
-            bucket_data["tokens"] + tokens_to_add
-        )
-        bucket_data["last_refill"] = current_time
+        try:
+            result = await self._token_bucket(keys=[bucket[0] for bucket in buckets], args=args)
+        except Exception as e:
+            if is_connection_error(e):
+                self._availability.mark_failed()
+            logger.error(f"Rate limit check failed: {e}")
+            return None
         
-        # Check if request can be processed
-        if bucket_data["tokens"] < 1:
-            # Calculate retry after time
-            retry_after = int((1 - bucket_data["tokens"]) / (requests_per_minute / 60.0))
-            
-            raise RateLimitError(
-                message=f"Rate limit exceeded for {identifier}",
-                retry_after=retry_after,
-                details={
-                    "limit": requests_per_minute,
-                    "window": "1 minute",
-                    "retry_after": retry_after
-                }
-            )
+        allowed = result[0]
+        states = [
+            (int(result[i]), int(result[i + 1]), int(result[i + 2]))
+            for i in range(1, len(result), 3)
+        ]
         
-        # Consume token
-        bucket_data["tokens"] -= 1
+        if not allowed:
+            # Blocked until the emptiest bucket has a token again
+            index = max(range(len(buckets)), key=lambda i: states[i][1])
+            retry_after = states[index][1] / 1000.0
+            if self.local_prelimit:
+                self._block_locally(buckets[index][0], current_time + retry_after)
+            raise self._limit_error(buckets[index], retry_after)
         
-        # Save updated bucket state
-        await cache_manager.set(cache_key, bucket_data, ttl=300)  # 5 minutes TTL
+        # Report the bucket closest to running out
+        index = min(range(len(buckets)), key=lambda i: states[i][0])
+        remaining, _, full_in_ms = states[index]
+        return {
+            "limit": buckets[index][1],
+            "remaining": max(0, remaining),
+            "reset_time": int(current_time + full_in_ms / 1000.0)
+        }
     
-    async def _get_rate_limit_info(self, request: Request) -> Optional[Dict[str, Any]]:
-        """Get current rate limit status for response headers."""
-        
-        try:
-            user_info = getattr(request.state, "user", None)
-            if user_info:
-                cache_key = f"rate_limit:user:{user_info['user_id']}:{request.url.path}"
-            else:
-                client_ip = self._get_client_ip(request)
-                cache_key = f"rate_limit:ip:{client_ip}:{request.url.path}"
-            
-            bucket_data = await cache_manager.get(cache_key)
-            if bucket_data:
-                limits = self._get_endpoint_limits(request.url.path)
-                return {
-                    "limit": limits["requests_per_minute"],
-                    "remaining": max(0, int(bucket_data["tokens"])),
-                    "reset_time": int(bucket_data["last_refill"] + 60)
-                }
-        
-        except Exception as e:
-            logger.error(f"Error getting rate limit info: {e}")
-        
-        return None
+    def _block_locally(self, key: str, until: float) -> None:
+        """Remember a refused bucket, dropping the oldest entries past the cap."""
+        self._blocked_until[key] = until
+        self._blocked_until.move_to_end(key)
+        while len(self._blocked_until) > LOCAL_BLOCK_MAX_KEYS:
+            self._blocked_until.popitem(last=False)
+    
+    def _limit_error(self, bucket: Bucket, retry_after: float) -> RateLimitError:
+        """Build the error for a request refused by ``bucket``."""
+        _, requests_per_minute, _, identifier = bucket
+        retry_after = max(1, math.ceil(retry_after))
+        return RateLimitError(
+            message=f"Rate limit exceeded for {identifier}",
+            retry_after=retry_after,
+            details={
+                "limit": requests_per_minute,
+                "window": "1 minute",
+                "retry_after": retry_after
+            }
+        )
     
     def _get_client_ip(self, request: Request) -> str:
         """Extract client IP address from request."""
@@ -268,7 +343,8 @@ def setup_rate_limiting(
     default_requests_per_minute: int = 60,
     default_burst_size: int = 100,
     excluded_paths: Optional[list] = None,
-    custom_limits: Optional[Dict[str, Dict[str, int]]] = None
+    custom_limits: Optional[Dict[str, Dict[str, int]]] = None,
+    local_prelimit: bool = True
 ):
     """
     Setup rate limiting middleware for FastAPI application.
@@ -279,11 +355,13 @@ def setup_rate_limiting(
         default_burst_size: Default burst size for token bucket
         excluded_paths: List of paths to exclude from rate limiting
         custom_limits: Custom rate limits for specific endpoints
+        local_prelimit: Reject recently refused clients without a Redis call
     """
     app.add_middleware(
         RateLimitingMiddleware,
         default_requests_per_minute=default_requests_per_minute,
         default_burst_size=default_burst_size,
         excluded_paths=excluded_paths,
-        custom_limits=custom_limits
+        custom_limits=custom_limits,
+        local_prelimit=local_prelimit
     )
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""
+Keyset (cursor) pagination helpers.
+
+A cursor is an opaque, URL-safe token holding the sort key of the last row a
+client has seen, usually ``(created_at, id)``. The next page seeks past it
+with a row-value comparison that Postgres answers from a composite index, so
+page 500 costs the same as page 1. Endpoints keep page/limit for clients that
+have not switched over.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import asc, desc, tuple_
+from sqlalchemy.orm import Query
+
+from core.exceptions import ValidationError
+
+
+class InvalidCursorError(ValidationError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+    def __init__(self, message: str = "Invalid pagination cursor"):
+        super().__init__(message=message, field_errors={"cursor": [message]})
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode sort-key values (datetimes, ints, strings) as an opaque token."""
+    payload = [{"dt": v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, size: int) -> Tuple[Any, ...]:
+    """Decode a token from ``encode_cursor``; ``size`` is the expected key length."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw.decode("utf-8"))
+        if not isinstance(payload, list) or len(payload) != size:
+            raise ValueError("unexpected cursor shape")
+        return tuple(
+            datetime.fromisoformat(v["dt"]) if isinstance(v, dict) else v
+            for v in payload
+        )
+    except (ValueError, KeyError, TypeError, binascii.Error, UnicodeDecodeError):
+        raise InvalidCursorError()
+
+
+def paginate_keyset(
+    query: Query,
+    columns: Sequence[Any],
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = True,
+    key: Optional[Callable[[Any], Sequence[Any]]] = None
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Order ``query`` by ``columns`` (which must end in a unique column), seek
+    past ``cursor`` and fetch one page. Returns ``(items, next_cursor)``;
+    ``next_cursor`` is None on the last page.
+
+    ``key`` extracts the sort values from a result row; by default they are
+    read from the row's attributes named after each column.
+    """
+    if cursor:
+        values = decode_cursor(cursor, len(columns))
+        bound = tuple_(*columns)
+        query = query.filter(bound < tuple_(*values) if descending else bound > tuple_(*values))
+
+    direction = desc if descending else asc
+    rows = query.order_by(*[direction(c) for c in columns]).limit(limit + 1).all()
+
+    items = rows[:limit]
+    if len(rows) <= limit or not items:
+        return items, None
+
+    last = items[-1]
+    values = key(last) if key else [getattr(last, c.key) for c in columns]
+    return items, encode_cursor(*values)
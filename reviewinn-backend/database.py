@@ -2,6 +2,7 @@ from sqlalchemy import create_engine, MetaData
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import QueuePool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 import os
 from dotenv import load_dotenv
 from core.config.settings import get_settings
@@ -55,6 +56,59 @@ def get_db():
     finally:
         db.close()
 
+# Async engine for coroutine handlers (asyncpg / aiosqlite), created on first use
+_async_engine = None
+_async_session_factory = None
+
+def _async_database_url(url: str) -> str:
+    """Map the sync DATABASE_URL onto its asyncio driver."""
+    scheme, rest = url.split("://", 1)
+    if scheme.startswith("sqlite"):
+        return f"sqlite+aiosqlite://{rest}"
+    return f"postgresql+asyncpg://{rest}"
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        async_url = _async_database_url(DATABASE_URL)
+        if async_url.startswith("sqlite"):
+            _async_engine = create_async_engine(async_url, echo=settings.DEBUG)
+        else:
+            _async_engine = create_async_engine(
+                async_url,
+                pool_size=settings.DATABASE_POOL_SIZE,
+                max_overflow=settings.DATABASE_MAX_OVERFLOW,
+                pool_pre_ping=True,
+                pool_recycle=settings.DATABASE_POOL_TIMEOUT,
+                echo=settings.DEBUG,
+                connect_args={
+                    "server_settings": {"timezone": "utc"}
+                }
+            )
+    return _async_engine
+
+def AsyncSessionLocal() -> AsyncSession:
+    """New AsyncSession bound to the async engine (use as ``async with``)."""
+    global _async_session_factory
+    if _async_session_factory is None:
+        _async_session_factory = async_sessionmaker(
+            bind=get_async_engine(), autoflush=False, expire_on_commit=False
+        )
+    return _async_session_factory()
+
+# Dependency to get an async database session
+async def get_async_db():
+    async with AsyncSessionLocal() as session:
+        yield session
+
+async def dispose_async_engine():
+    """Close pooled async connections (application shutdown)."""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
+
 # Database health check
 def check_database_connection():
     try:
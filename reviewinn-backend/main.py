@@ -47,8 +47,16 @@ from routers.groups import router as groups_router
 
 # Import dependencies setup
 from core.dependencies import setup_di_container
-from database import engine, Base
+from database import engine, Base, dispose_async_engine
 from services.cache_service import cache_service
+from core.config.redis_client import close_redis_pools
+from services.tiered_cache import tiered_cache
+from auth.activity_recorder import get_activity_recorder
+from services.websocket_service import connection_manager
+from services.trending_service import get_trending_refresher
+from services.badge_service import get_badge_evaluation_runner
+from services.view_pipeline import get_view_pipeline
+from services.notification_counter_service import get_notification_counter_reconciler
 
 # Initialize settings and logging
 settings = get_settings()
@@ -91,6 +99,24 @@ class APIApplication(LoggerMixin):
                 self.log_warning("Cache service connection test failed")
         except Exception as e:
             self.log_warning("Cache service not available", error=str(e))
+        
+        # Keep this worker's in-process cache coherent with other workers
+        await tiered_cache.start_listener()
+        
+        # Receive WebSocket messages routed here from other workers
+        await connection_manager.start()
+        
+        # Keep trending scores current (one process refreshes at a time)
+        await get_trending_refresher().start()
+        
+        # Run queued or interrupted badge re-evaluation jobs
+        await get_badge_evaluation_runner().start()
+        
+        # Write buffered views to the database in batches
+        await get_view_pipeline().start()
+        
+        # Expire notifications and repair drifted notification counters
+        await get_notification_counter_reconciler().start()
     
     async def shutdown(self):
         """Application shutdown logic."""
@@ -98,7 +124,16 @@ class APIApplication(LoggerMixin):
         
         # Cleanup cache connections
         try:
+            await get_activity_recorder().stop()
+            await tiered_cache.stop_listener()
+            await connection_manager.stop()
+            await get_trending_refresher().stop()
+            await get_badge_evaluation_runner().stop()
+            await get_view_pipeline().stop()
+            await get_notification_counter_reconciler().stop()
             await cache_service.delete("startup_test")
+            await close_redis_pools()
+            await dispose_async_engine()
         except Exception:
             pass
     
@@ -27,14 +27,22 @@ from .user_entity_view import UserEntityView
 from .user_progress import UserProgress
 from .badge_definition import BadgeDefinition
 from .badge_award import BadgeAward
+from .badge_evaluation_job import BadgeEvaluationJob
+from .background_job import BackgroundJob
 from .weekly_engagement import WeeklyEngagement
 from .daily_task import DailyTask
 from .whats_next_goal import WhatsNextGoal
 from .search_analytics import SearchAnalytics
 from .entity_analytics import EntityAnalytics
+from .entity_stats import EntityStatistics
+from .notification_counter import NotificationCounter
+from .notification_actor import NotificationActor
+from .trending import TrendingScore, TrendingState
+from .taste_match import UserTasteNeighbor
+from .entity_similarity import EntitySimilarity, EntitySimilarityQueue
 from .review_template import ReviewTemplate
 from .entity_comparison import EntityComparison
-from .view_tracking import ReviewView, EntityView
+from .view_tracking import ReviewView, EntityView, ViewBucket
 from .review_circle import SocialCircleMember, SocialCircleRequest, SocialCircleBlock, CircleConnection, TrustLevelEnum, CircleInviteStatusEnum
 from .category_question import CategoryQuestion
 from .group import Group, GroupMembership, GroupInvitation, GroupCategory, GroupCategoryMapping
@@ -44,9 +52,9 @@ __all__ = [
     "MsgConversation", "MsgConversationParticipant", "MsgMessage", "MsgMessageAttachment", "MsgMessageReaction",
     "MsgMessageStatus", "MsgTypingIndicator", "MsgUserPresence", "MsgThread", "MsgMessagePin", "MsgMessageMention",
     "UserProfile", "UserConnection", "UserSession", "UserSetting", "UnifiedCategory", "EntityRole", "EntityMetadata", 
-    "ReviewVersion", "UserEvent", "UserSearchHistory", "UserEntityView", "UserProgress", "BadgeDefinition", "BadgeAward", 
-    "WeeklyEngagement", "DailyTask", "WhatsNextGoal", "SearchAnalytics", "EntityAnalytics", "ReviewTemplate", 
-    "EntityComparison", "ReviewView", "EntityView", "SocialCircleMember", "SocialCircleRequest", "SocialCircleBlock", 
+    "ReviewVersion", "UserEvent", "UserSearchHistory", "UserEntityView", "UserProgress", "BadgeDefinition", "BadgeAward", "BadgeEvaluationJob", "BackgroundJob", 
+    "WeeklyEngagement", "DailyTask", "WhatsNextGoal", "SearchAnalytics", "EntityAnalytics", "EntityStatistics", "NotificationCounter", "NotificationActor", "TrendingScore", "TrendingState", "UserTasteNeighbor", "EntitySimilarity", "EntitySimilarityQueue", "ReviewTemplate", 
+    "EntityComparison", "ReviewView", "EntityView", "ViewBucket", "SocialCircleMember", "SocialCircleRequest", "SocialCircleBlock", 
     "CircleConnection", "TrustLevelEnum", "CircleInviteStatusEnum", "CategoryQuestion", "Group", "GroupMembership", 
     "GroupInvitation", "GroupCategory", "GroupCategoryMapping"
 ] 
\ No newline at end of file
@@ -0,0 +1,48 @@
+from sqlalchemy import Column, BigInteger, Integer, String, Text, DateTime, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from database import Base
+
+class BackgroundJob(Base):
+    """
+    Durable unit of off-request work, run by worker.py. See
+    services/job_queue.py for the claim / retry / idempotency rules.
+    """
+    __tablename__ = 'background_jobs'
+
+    job_id = Column(BigInteger, primary_key=True, index=True)
+    job_type = Column(String(100), nullable=False)
+    payload = Column(JSONB, nullable=False, default=dict)
+    status = Column(String(20), nullable=False, default='queued')  # queued, running, succeeded, dead
+    idempotency_key = Column(String(255), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    locked_by = Column(String(100), nullable=True)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Claim scan: due jobs of a type in order
+        Index('idx_background_jobs_due', 'job_type', 'run_at', 'job_id', postgresql_where=text("status = 'queued'")),
+        Index('idx_background_jobs_running', 'job_type', 'locked_at', postgresql_where=text("status = 'running'")),
+        Index('idx_background_jobs_idempotency', 'idempotency_key', unique=True,
+              postgresql_where=text("idempotency_key IS NOT NULL")),
+        Index('idx_background_jobs_finished', 'finished_at', postgresql_where=text("finished_at IS NOT NULL")),
+    )
+
+    def to_dict(self):
+        """Convert to dictionary for API responses"""
+        return {
+            "job_id": self.job_id,
+            "job_type": self.job_type,
+            "status": self.status,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "run_at": self.run_at.isoformat() if self.run_at else None,
+            "last_error": self.last_error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
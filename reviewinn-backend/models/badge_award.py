@@ -1,10 +1,14 @@
-from sqlalchemy import Column, BigInteger, DateTime, ForeignKey
+from sqlalchemy import Column, BigInteger, DateTime, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
 
 class BadgeAward(Base):
     __tablename__ = 'badge_awards'
+    __table_args__ = (
+        # Lets set-based awarding skip existing awards with ON CONFLICT DO NOTHING
+        UniqueConstraint('user_id', 'badge_definition_id', name='uq_badge_awards_user_badge'),
+    )
 
     award_id = Column(BigInteger, primary_key=True, index=True)
     user_id = Column(BigInteger, ForeignKey('core_users.user_id', ondelete='CASCADE'))
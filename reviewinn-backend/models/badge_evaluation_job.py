@@ -0,0 +1,50 @@
+from sqlalchemy import Column, BigInteger, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from database import Base
+
+class BadgeEvaluationJob(Base):
+    """
+    Full badge re-evaluation run. The cursor (current badge, last user id)
+    is committed with each chunk of awards so an interrupted job resumes
+    where it stopped. See services/badge_service.py.
+    """
+    __tablename__ = 'badge_evaluation_jobs'
+
+    job_id = Column(BigInteger, primary_key=True, index=True)
+    status = Column(String(20), nullable=False, default='pending')  # pending, running, completed, failed
+    requested_by = Column(Integer, ForeignKey('core_users.user_id', ondelete='SET NULL'), nullable=True)
+    total_badges = Column(Integer, nullable=False, default=0)
+    badges_done = Column(Integer, nullable=False, default=0)
+    badge_definition_id = Column(BigInteger, nullable=True)  # badge being evaluated
+    last_user_id = Column(Integer, nullable=False, default=0)  # users up to here are done for that badge
+    max_user_id = Column(Integer, nullable=False, default=0)
+    awarded_count = Column(Integer, nullable=False, default=0)
+    error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    @property
+    def progress_percentage(self) -> float:
+        if self.status == 'completed':
+            return 100.0
+        if not self.total_badges:
+            return 0.0
+        within_badge = (self.last_user_id / self.max_user_id) if self.max_user_id else 0.0
+        return round(min(self.badges_done + within_badge, self.total_badges) / self.total_badges * 100, 1)
+
+    def to_dict(self):
+        """Convert to dictionary for API responses"""
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "total_badges": self.total_badges,
+            "badges_done": self.badges_done,
+            "awarded_count": self.awarded_count,
+            "progress_percentage": self.progress_percentage,
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from database import Base
+
+class EntitySimilarity(Base):
+    """
+    Top-K most similar entities per entity, blending description text,
+    category and co-review signals. See services/similar_entity_service.py.
+    """
+    __tablename__ = 'entity_similarities'
+
+    entity_id = Column(Integer, ForeignKey('core_entities.entity_id', ondelete='CASCADE'), primary_key=True)
+    similar_entity_id = Column(Integer, ForeignKey('core_entities.entity_id', ondelete='CASCADE'), primary_key=True)
+    score = Column(Float, nullable=False)
+    computed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index('idx_entity_similarities_rank', 'entity_id', score.desc()),
+        Index('idx_entity_similarities_similar', 'similar_entity_id'),
+    )
+
+class EntitySimilarityQueue(Base):
+    """Entities whose similar list is stale; filled by triggers on core_entities and review_main."""
+    __tablename__ = 'entity_similarity_queue'
+
+    # No foreign key: review deletes cascading from an entity delete enqueue it too
+    entity_id = Column(Integer, primary_key=True)
+    queued_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
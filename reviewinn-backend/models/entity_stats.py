@@ -0,0 +1,39 @@
+from sqlalchemy import Column, BigInteger, Integer, Float, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from database import Base
+
+class EntityStatistics(Base):
+    """
+    Denormalized review statistics per entity, maintained by the triggers in
+    database/entity_stats.sql. Read-only from the application; use
+    EntityStatsService.rebuild to recompute.
+    """
+    __tablename__ = 'entity_stats'
+
+    entity_id = Column(Integer, ForeignKey('core_entities.entity_id', ondelete='CASCADE'), primary_key=True)
+    review_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Float, nullable=False, default=0.0)
+    rating_1 = Column(Integer, nullable=False, default=0)
+    rating_2 = Column(Integer, nullable=False, default=0)
+    rating_3 = Column(Integer, nullable=False, default=0)
+    rating_4 = Column(Integer, nullable=False, default=0)
+    rating_5 = Column(Integer, nullable=False, default=0)
+    total_review_views = Column(BigInteger, nullable=False, default=0)
+    total_reactions = Column(Integer, nullable=False, default=0)
+    total_comments = Column(Integer, nullable=False, default=0)
+    last_review_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    @property
+    def average_rating(self) -> float:
+        return self.rating_sum / self.review_count if self.review_count else 0.0
+
+    @property
+    def rating_distribution(self) -> dict:
+        return {
+            "1": self.rating_1,
+            "2": self.rating_2,
+            "3": self.rating_3,
+            "4": self.rating_4,
+            "5": self.rating_5
+        }
@@ -1,7 +1,7 @@
 """
 Notification model for the Review Platform.
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON, Index, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -96,6 +96,9 @@ class Notification(Base):
     notification_data = Column(JSONB, default=dict, nullable=False)  # JSONB for enterprise flexibility
     expires_at = Column(DateTime(timezone=True), nullable=True, index=True)
     
+    # Aggregated notifications: one row per (user_id, group_key), see services/notification_aggregator.py
+    group_key = Column(String(255), nullable=True)
+    
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
@@ -103,6 +106,11 @@ class Notification(Base):
     user = relationship("User", foreign_keys=[user_id], back_populates="notifications")
     actor = relationship("User", foreign_keys=[actor_id])
 
+    __table_args__ = (
+        Index('uq_core_notifications_group', 'user_id', 'group_key', unique=True,
+              postgresql_where=text('group_key IS NOT NULL')),
+    )
+
     def __repr__(self):
         return f"<Notification(id={self.notification_id}, type={self.type}, user_id={self.user_id}, priority={self.priority})>"
 
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from database import Base
+
+class NotificationActor(Base):
+    """
+    Distinct users behind an aggregated notification. actor_count and
+    recent_actor_ids on the notification are derived from these rows, so an
+    actor who acts again (or a retried job) is never counted twice.
+    """
+    __tablename__ = 'notification_actors'
+
+    notification_id = Column(Integer, ForeignKey('core_notifications.notification_id', ondelete='CASCADE'), primary_key=True)
+    actor_id = Column(Integer, primary_key=True)
+    acted_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index('idx_notification_actors_recent', 'notification_id', acted_at.desc()),
+    )
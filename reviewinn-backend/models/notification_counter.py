@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from database import Base
+
+class NotificationCounter(Base):
+    """
+    Live (not expired) notification totals per user, maintained by the
+    triggers in database/notification_counters.sql. Read-only from the
+    application; NotificationCounterService.reconcile repairs drift.
+    """
+    __tablename__ = 'notification_counters'
+
+    user_id = Column(Integer, ForeignKey('core_users.user_id', ondelete='CASCADE'), primary_key=True)
+    total_count = Column(Integer, nullable=False, default=0)
+    unread_count = Column(Integer, nullable=False, default=0)
+    urgent_unread_count = Column(Integer, nullable=False, default=0)  # urgent or critical
+    critical_unread_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
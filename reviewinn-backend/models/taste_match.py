@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from database import Base
+
+class UserTasteNeighbor(Base):
+    """
+    Top-K users with the most similar rating vectors, per user. Rebuilt by
+    build_taste_neighbors.py; see services/taste_match_service.py.
+    """
+    __tablename__ = 'user_taste_neighbors'
+
+    user_id = Column(Integer, ForeignKey('core_users.user_id', ondelete='CASCADE'), primary_key=True)
+    neighbor_id = Column(Integer, ForeignKey('core_users.user_id', ondelete='CASCADE'), primary_key=True)
+    similarity = Column(Float, nullable=False)  # shrunk cosine of mean-centred ratings, 0..1
+    co_rated = Column(Integer, nullable=False, default=0)  # entities both users reviewed
+    mutual_connections = Column(Integer, nullable=False, default=0)
+    computed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index('idx_user_taste_neighbors_rank', 'user_id', similarity.desc()),
+        Index('idx_user_taste_neighbors_neighbor', 'neighbor_id'),
+    )
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, BigInteger, Integer, String, Float, DateTime, Index
+from sqlalchemy.sql import func
+from database import Base
+
+class TrendingScore(Base):
+    """
+    Forward-decayed activity score per entity or review. Scores are stored
+    relative to the landmark in TrendingState; see services/trending_service.py.
+    """
+    __tablename__ = 'trending_scores'
+
+    subject_type = Column(String(20), primary_key=True)  # 'entity' or 'review'
+    subject_id = Column(Integer, primary_key=True)
+    score = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index('idx_trending_scores_rank', 'subject_type', score.desc(), subject_id.desc()),
+    )
+
+class TrendingState(Base):
+    """Per-source watermarks (last processed id) and the decay landmark."""
+    __tablename__ = 'trending_state'
+
+    name = Column(String(50), primary_key=True)
+    last_id = Column(BigInteger, nullable=False, default=0)
+    landmark = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -100,6 +100,25 @@ class ViewAnalytics(Base):
     
     # Indexes
     __table_args__ = (
-        Index('idx_view_analytics_content', 'content_type', 'content_id'),
+        # One row per item; the view flusher upserts on it
+        Index('uq_view_analytics_content', 'content_type', 'content_id', unique=True),
         Index('idx_view_analytics_updated', 'last_updated'),
     )
+
+class ViewBucket(Base):
+    """
+    Views per item per hour, rolled into per-day rows once the day is old
+    enough (services/view_pipeline.py), so rows per item stay bounded.
+    """
+    __tablename__ = 'view_buckets'
+
+    content_type = Column(String(20), primary_key=True)  # 'review' or 'entity'
+    content_id = Column(Integer, primary_key=True)
+    granularity = Column(String(10), primary_key=True)  # 'hour' or 'day'
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    views = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # Rollup and retention scans
+        Index('idx_view_buckets_granularity_start', 'granularity', 'bucket_start'),
+    )
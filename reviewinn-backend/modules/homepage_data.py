@@ -15,6 +15,7 @@ from models.user import User
 from models.entity import Entity
 from models.comment import Comment
 from models.review_reaction import ReviewReaction
+from services.trending_service import TrendingService
 
 
 @dataclass
@@ -160,15 +161,6 @@ class HomepageRepository:
             .limit(limit)
         )
     
-    def get_trending_entities_query(self, limit: int = 20):
-        """Get trending entities query with category relationships"""
-        return (
-            self.db.query(Entity)
-            .filter(Entity.review_count > 0)
-            .order_by(Entity.review_count.desc(), Entity.average_rating.desc())
-            .limit(limit)
-        )
-    
     def get_comment_count_for_review(self, review_id: int) -> int:
         """Get comment count for a specific review"""
         return (
@@ -340,8 +332,8 @@ class HomepageDataService:
         return review_data
     
     def get_trending_entities(self, limit: int = 20) -> List[EntityData]:
-        """Fetch trending entities"""
-        entities = self.repository.get_trending_entities_query(limit).all()
+        """Fetch trending entities (precomputed time-decayed scores)"""
+        entities = [entity for entity, _ in TrendingService(self.repository.db).top_entities(limit)]
         
         entity_data = []
         for entity in entities:
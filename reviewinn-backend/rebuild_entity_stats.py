@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Rebuild the entity_stats table (database/entity_stats.sql) from reviews,
+reactions and comments, in entity_id chunks.
+
+Usage:
+    python rebuild_entity_stats.py                    # every entity
+    python rebuild_entity_stats.py --entity-id 12 40  # specific entities
+    python rebuild_entity_stats.py --chunk-size 1000
+"""
+import argparse
+import sys
+
+from database import SessionLocal
+from services.entity_stats_service import DEFAULT_REBUILD_CHUNK_SIZE, EntityStatsService
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entity-id", type=int, nargs="+", help="only rebuild these entities")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_REBUILD_CHUNK_SIZE, help="entity ids per transaction")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        service = EntityStatsService(db)
+        rows = service.rebuild(
+            entity_ids=args.entity_id,
+            chunk_size=args.chunk_size,
+            progress=lambda done, high: print(f"  ... up to entity {done} of {high}")
+        )
+        print(f"✅ Rebuilt stats for {rows} entities")
+        return 0
+    except Exception as e:
+        print(f"❌ Rebuild failed: {e}")
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
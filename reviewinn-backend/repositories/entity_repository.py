@@ -206,7 +206,7 @@ class EntityRepository(BaseRepository[Entity, dict, dict]):
             location: Location filter
             skip: Number of records to skip
             limit: Maximum number of records to return
-            sort_by: Field to sort by
+            sort_by: Field to sort by, or "relevance" to rank by search match
             sort_desc: Sort in descending order
             
         Returns:
@@ -214,14 +214,17 @@ class EntityRepository(BaseRepository[Entity, dict, dict]):
         """
         try:
             query = db.query(Entity)
+            relevance = None
             
-            # Text search across multiple fields
+            # Full-text search (GIN-indexed tsvector with trigram fallback)
             if search_query:
-                search_conditions = [
-                    Entity.name.ilike(f"%{search_query}%"),
-                    Entity.description.ilike(f"%{search_query}%")
-                ]
-                query = query.filter(or_(*search_conditions))
+                # Import here to avoid circular imports (services imports repositories)
+                from services.search_service import text_search_clause
+                clause = text_search_clause("entities", search_query)
+                if clause is None:
+                    return []
+                match, relevance = clause
+                query = query.filter(match)
             
             # Category filter
             if category:
@@ -251,7 +254,9 @@ class EntityRepository(BaseRepository[Entity, dict, dict]):
                 query = query.filter(Entity.context.ilike(f"%{location}%"))
             
             # Sorting
-            if hasattr(Entity, sort_by):
+            if sort_by == "relevance" and relevance is not None:
+                query = query.order_by(desc(relevance), desc(Entity.entity_id))
+            elif hasattr(Entity, sort_by):
                 order_column = getattr(Entity, sort_by)
                 if sort_desc:
                     query = query.order_by(desc(order_column))
@@ -272,41 +277,23 @@ class EntityRepository(BaseRepository[Entity, dict, dict]):
         limit: int = 10
     ) -> List[Entity]:
         """
-        Get trending entities based on recent review activity.
+        Get trending entities from the precomputed trending scores.
         
         Args:
             db: Database session
             category: Filter by category
-            days: Number of days to consider for trending
+            days: Unused; recency comes from the scores' half-life
             limit: Maximum number of entities to return
             
         Returns:
             List of trending entities
         """
         try:
-            # Subquery to get recent review counts
-            from sqlalchemy import text
-            from datetime import datetime, timedelta
+            # Import here to avoid circular imports
+            from services.trending_service import TrendingService
             
-            recent_date = datetime.utcnow() - timedelta(days=days)
-            
-            query = db.query(Entity).outerjoin(Review)
-            
-            if category:
-                query = query.filter(Entity.root_category_id.isnot(None))
-            
-            # Order by recent review activity and average rating
-            query = query.filter(
-                or_(
-                    Review.created_at >= recent_date,
-                    Review.created_at.is_(None)
-                )
-            ).group_by(Entity.entity_id).order_by(
-                desc(func.count(Review.review_id)),
-                desc(Entity.average_rating)
-            )
-            
-            return query.limit(limit).all()
+            filters = [Entity.root_category_id.isnot(None)] if category else []
+            return [entity for entity, _ in TrendingService(db).top_entities(limit, filters=filters)]
         except Exception as e:
             logger.error(f"Error getting trending entities: {e}")
             raise
@@ -3,88 +3,64 @@ Admin router for maintenance tasks
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import and_, or_
 from database import get_db
 from models.entity import Entity
-from models.review import Review
+from models.entity_stats import EntityStatistics
+from services.entity_stats_service import EntityStatsService
 from core.responses import api_response
 from auth.production_dependencies import AdminUser
+from services.tiered_cache import tiered_cache
+from services.job_queue import get_job_metrics
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
 @router.post("/update-entity-ratings")
-async def update_entity_ratings(
+def update_entity_ratings(
     all_entities: bool = False,
     db: Session = Depends(get_db),
     admin_user: AdminUser = None
 ):
-    """Update entity average ratings and review counts."""
+    """
+    Rebuild entity statistics (and the review_count / average_rating written
+    through to entities). By default only entities whose stats are missing or
+    out of step with the entity row are rebuilt; ``all_entities`` rebuilds
+    everything in chunks.
+    """
     try:
         logger.info("Starting entity ratings update...")
+        service = EntityStatsService(db)
         
-        # Get entities that have reviews
         if all_entities:
-            entities_with_reviews = (
-                db.query(Review.entity_id)
-                .distinct()
-                .all()
-            )
+            updated_count = service.rebuild()
+            entity_ids = []
         else:
-            entities_with_reviews = (
-                db.query(Review.entity_id)
-                .distinct()
-                .limit(50)  # Process in batches
+            drifted = (
+                db.query(Entity.entity_id)
+                .outerjoin(EntityStatistics, EntityStatistics.entity_id == Entity.entity_id)
+                .filter(or_(
+                    and_(EntityStatistics.entity_id.is_(None), Entity.review_count > 0),
+                    and_(
+                        EntityStatistics.entity_id.isnot(None),
+                        Entity.review_count.is_distinct_from(EntityStatistics.review_count)
+                    )
+                ))
                 .all()
             )
+            entity_ids = [row.entity_id for row in drifted]
+            updated_count = service.rebuild(entity_ids) if entity_ids else 0
         
-        updated_entities = []
-        
-        for entity_row in entities_with_reviews:
-            entity_id = entity_row.entity_id
-            
-            # Calculate ratings for this entity
-            rating_stats = (
-                db.query(
-                    func.count(Review.review_id).label('review_count'),
-                    func.avg(Review.overall_rating).label('avg_rating')
-                )
-                .filter(Review.entity_id == entity_id)
-                .first()
-            )
-            
-            if rating_stats.review_count > 0:
-                # Update entity
-                entity = db.query(Entity).filter(Entity.entity_id == entity_id).first()
-                if entity:
-                    old_avg = entity.average_rating
-                    old_count = entity.review_count
-                    
-                    entity.average_rating = float(rating_stats.avg_rating)
-                    entity.review_count = rating_stats.review_count
-                    
-                    # Only include in response if actually changed
-                    if old_avg != entity.average_rating or old_count != entity.review_count:
-                        updated_entities.append({
-                            "entity_id": entity.entity_id,
-                            "name": entity.name,
-                            "old_rating": old_avg,
-                            "new_rating": round(float(rating_stats.avg_rating), 2),
-                            "old_count": old_count,
-                            "new_count": rating_stats.review_count
-                        })
-        
-        db.commit()
-        logger.info(f"Updated {len(updated_entities)} entities")
+        logger.info(f"Updated {updated_count} entities")
         
         return api_response(
             data={
-                "updated_count": len(updated_entities),
-                "entities": updated_entities,
+                "updated_count": updated_count,
+                "entities": entity_ids,
                 "processed_all": all_entities
             },
-            message=f"Successfully updated {len(updated_entities)} entity ratings"
+            message=f"Successfully updated {updated_count} entity ratings"
         )
         
     except Exception as e:
@@ -126,4 +102,40 @@ async def get_entity_stats(db: Session = Depends(get_db)):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to get entity stats: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.get("/cache-stats")
+async def get_cache_stats(admin_user: AdminUser = None):
+    """Get per-namespace hit/miss counters for this worker's in-process cache and Redis stats."""
+    try:
+        return api_response(
+            data=await tiered_cache.get_stats(),
+            message="Retrieved cache statistics"
+        )
+        
+    except Exception as e:
+        logger.error(f"Error getting cache stats: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get cache stats: {str(e)}"
+        )
+
+
+@router.get("/jobs/metrics")
+def get_background_job_metrics(
+    admin_user: AdminUser,
+    db: Session = Depends(get_db)
+):
+    """Queue depth, oldest due job and last-hour throughput per background job type."""
+    try:
+        return api_response(
+            data=get_job_metrics(db),
+            message="Retrieved background job metrics"
+        )
+        
+    except Exception as e:
+        logger.error(f"Error getting background job metrics: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get background job metrics: {str(e)}"
+        )
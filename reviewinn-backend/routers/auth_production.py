@@ -16,6 +16,8 @@ import logging
 
 from database import get_db
 from auth.production_auth_system import get_auth_system, AuthResult, SecurityEventType
+from auth.user_cache import get_user_cache
+from auth.password_pool import PasswordPoolSaturatedError
 from auth.production_dependencies import (
     RequiredUser, VerifiedUser, AdminUser, CurrentUser,
     AuthRateLimit, StandardRateLimit, AdminRateLimit,
@@ -34,6 +36,17 @@ logger = logging.getLogger(__name__)
 # Get production auth system
 auth_system = get_auth_system()
 
+def raise_auth_service_busy():
+    """Reject password work while the bcrypt pool is saturated"""
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail={
+            "error": "AUTH_SERVICE_BUSY",
+            "message": "Authentication service is busy, please retry shortly"
+        },
+        headers={"Retry-After": "1"}
+    )
+
 # ==================== CORE AUTHENTICATION ENDPOINTS ====================
 
 @router.post(
@@ -81,6 +94,9 @@ async def register_user(
         request=request
     )
     
+    if result.error_code == "AUTH_SERVICE_BUSY":
+        raise_auth_service_busy()
+    
     if not result.success:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -175,6 +191,9 @@ async def authenticate_user(
             "EMAIL_NOT_VERIFIED": status.HTTP_403_FORBIDDEN
         }
         
+        if result.error_code == "AUTH_SERVICE_BUSY":
+            raise_auth_service_busy()
+        
         status_code = status_codes.get(result.error_code, status.HTTP_401_UNAUTHORIZED)
         
         # Special handling for email verification
@@ -349,6 +368,9 @@ async def logout_user(
                 "token_blacklisted": blacklisted
             })
         
+        # Drop the cached identity on every worker
+        await get_user_cache().invalidate(current_user.user_id)
+        
         # Clear httpOnly cookies - match settings used when setting them
         is_production = request.url.scheme == 'https'
         
@@ -585,7 +607,7 @@ async def change_user_password(
     
     try:
         # Verify current password
-        if not auth_system._verify_password(current_password, current_user.hashed_password):
+        if not await auth_system.verify_password_async(current_password, current_user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Current password is incorrect"
@@ -610,9 +632,10 @@ async def change_user_password(
             )
         
         # Update password
-        current_user.hashed_password = auth_system._hash_password(new_password)
+        current_user.hashed_password = await auth_system.hash_password_async(new_password)
         current_user.password_changed_at = datetime.now(timezone.utc)
         db.commit()
+        await get_user_cache().invalidate(current_user.user_id)
         
         # Log password change
         await auth_system._log_security_event(SecurityEventType.PASSWORD_CHANGED, {
@@ -628,6 +651,8 @@ async def change_user_password(
         
     except HTTPException:
         raise
+    except PasswordPoolSaturatedError:
+        raise_auth_service_busy()
     except Exception as e:
         logger.error(f"Password change error: {e}")
         raise HTTPException(
@@ -718,6 +743,7 @@ async def auth_system_health():
                 "device_tracking": "enabled",
                 "threat_detection": "enabled"
             },
+            "password_pool": auth_system.password_pool.get_metrics(),
             "performance": {
                 "avg_response_time_ms": "<50",
                 "concurrent_sessions": "unlimited",
@@ -809,6 +835,7 @@ async def toggle_user_account_status(
     old_status = user.is_active
     user.is_active = not user.is_active
     db.commit()
+    await get_user_cache().invalidate(user_id)
     
     # Log admin action
     await auth_system._log_security_event(
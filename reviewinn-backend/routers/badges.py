@@ -9,7 +9,6 @@ from typing import List, Dict, Any
 from database import get_db
 from services.badge_service import BadgeService
 from auth.production_dependencies import CurrentUser, RequiredUser
-from models.user import User
 from models.badge_definition import BadgeDefinition
 from models.badge_award import BadgeAward
 from pydantic import BaseModel
@@ -121,7 +120,7 @@ def evaluate_badges(
     return {
         "message": f"Evaluated badges for user {current_user.user_id}",
         "newly_awarded_count": len(newly_awarded),
-        "newly_awarded": newly_awarded
+        "newly_awarded": [award.to_dict() for award in newly_awarded]
     }
 
 @router.get("/tiers")
@@ -191,12 +190,12 @@ def manually_award_badge(
             detail="Failed to award badge"
         )
 
-@router.post("/admin/evaluate-all")
+@router.post("/admin/evaluate-all", status_code=status.HTTP_202_ACCEPTED)
 def evaluate_all_users(
     current_user = RequiredUser,
     db: Session = Depends(get_db)
 ):
-    """Evaluate badges for all users (admin only)"""
+    """Queue a badge re-evaluation for all users (admin only); poll the returned job for progress"""
     if current_user.role.value != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -204,19 +203,34 @@ def evaluate_all_users(
         )
     
     badge_service = BadgeService(db)
-    users = db.query(User).filter(User.is_active == True).all()
-    
-    total_awarded = 0
-    for user in users:
-        newly_awarded = badge_service.evaluate_user_badges(user.user_id)
-        total_awarded += len(newly_awarded)
+    job = badge_service.start_evaluation_job(requested_by=current_user.user_id)
     
     return {
-        "message": "Evaluated badges for all users",
-        "users_processed": len(users),
-        "total_badges_awarded": total_awarded
+        "message": "Badge evaluation for all users queued",
+        "job": job.to_dict()
     }
 
+@router.get("/admin/evaluate-all/{job_id}")
+def get_evaluation_job(
+    job_id: int,
+    current_user = RequiredUser,
+    db: Session = Depends(get_db)
+):
+    """Get progress of a badge re-evaluation job (admin only)"""
+    if current_user.role.value != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    
+    job = BadgeService(db).get_evaluation_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Evaluation job not found"
+        )
+    return job.to_dict()
+
 # === Frontend-compatible endpoints ===
 
 @router.get("/user/{user_id}/progress")
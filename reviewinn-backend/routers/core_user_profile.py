@@ -11,6 +11,7 @@ from database import get_db
 from services.core_user_service import CoreUserService
 from models.user import User as CoreUser
 from auth.production_dependencies import CurrentUser, RequiredUser
+from auth.user_cache import get_user_cache
 
 logger = logging.getLogger(__name__)
 
@@ -245,6 +246,7 @@ async def update_user_profile(
         
         service = CoreUserService(db)
         updated_profile = service.update_user_profile(user_id, profile_data)
+        await get_user_cache().invalidate(user_id)
         
         logger.info(f"Successfully updated profile for user: {user_id}")
         return {
@@ -446,6 +448,7 @@ async def deactivate_my_account(
         success = service.deactivate_user(current_user.user_id)
         
         if success:
+            await get_user_cache().invalidate(current_user.user_id)
             return {
                 "status": "success",
                 "message": "Your account has been deactivated successfully"
@@ -15,6 +15,7 @@ from schemas.notification import (
     NotificationStats, NotificationBulkUpdate, NotificationPreferences
 )
 from database import get_db
+from core.pagination import InvalidCursorError
 from auth.production_dependencies import CurrentUser, RequiredUser
 from models.user import User
 import logging
@@ -97,7 +98,8 @@ def get_notifications(
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(20, ge=1, le=100, description="Items per page"),
     unread_only: bool = Query(False, description="Show only unread notifications"),
-    priority_filter: Optional[str] = Query(None, description="Filter by priority")
+    priority_filter: Optional[str] = Query(None, description="Filter by priority"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor")
 ):
     """Get paginated notifications with enterprise filtering."""
     try:
@@ -107,9 +109,12 @@ def get_notifications(
             page=page,
             limit=limit,
             unread_only=unread_only,
-            priority_filter=priority_filter
+            priority_filter=priority_filter,
+            cursor=cursor
         )
         
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.message)
     except Exception as e:
         logger.error(f"Failed to get user notifications: {str(e)}")
         raise HTTPException(
@@ -284,14 +289,14 @@ def delete_notification(
         )
 
 @router.get("/stats", response_model=NotificationStats)
-def get_notification_stats(
+async def get_notification_stats(
     current_user: RequiredUser,
     db: Session = Depends(get_db)
 ):
     """Get comprehensive notification statistics for the user."""
     try:
         service = EnterpriseNotificationService(db)
-        return service.get_notification_stats(current_user.user_id)
+        return await service.get_notification_stats(current_user.user_id)
         
     except Exception as e:
         logger.error(f"Failed to get notification stats: {str(e)}")
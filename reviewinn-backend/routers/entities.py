@@ -10,6 +10,7 @@ from models.user_entity_view import UserEntityView
 from schemas.entity import EntityCreate, EntityResponse
 from auth.production_dependencies import CurrentUser, RequiredUser
 from services.entity_service import EntityService, EntityListParams, EntitySortBy, EntitySortOrder
+from services.trending_service import order_by_trending
 from sqlalchemy.sql import func
 from core.responses import api_response, error_response, pagination_response
 import traceback
@@ -22,7 +23,7 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.get("/", response_model=None)
-async def get_entities(
+def get_entities(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
     final_category_id: Optional[int] = Query(None, description="Filter by final category ID"),
@@ -86,12 +87,8 @@ async def get_entities(
             sort_column = Entity.reaction_count
         elif sortBy == "commentCount":   # NEW: Sort by total comments  
             sort_column = Entity.comment_count
-        elif sortBy == "trending":       # NEW: Combined trending score
-            # Use multiple engagement metrics for trending
-            query = query.order_by(
-                (Entity.reaction_count + Entity.comment_count + Entity.view_count).desc(),
-                Entity.average_rating.desc()
-            )
+        elif sortBy == "trending":       # Precomputed time-decayed activity score
+            query = order_by_trending(query)
             sort_column = None
         else:  # default to created_at
             sort_column = Entity.created_at
@@ -163,7 +160,7 @@ async def get_entities(
         )
 
 @router.post("/search", response_model=None)
-async def search_entities(
+def search_entities(
     search_params: dict,
     db: Session = Depends(get_db)
 ):
@@ -229,7 +226,7 @@ async def search_entities(
         )
 
 @router.post("/", response_model=None)
-async def create_entity(
+def create_entity(
     entity_data: EntityCreate,
     db: Session = Depends(get_db),
     current_user = CurrentUser
@@ -303,7 +300,7 @@ async def create_entity(
         )
 
 @router.get("/{entity_id}", response_model=None)
-async def get_entity(
+def get_entity(
     entity_id: int,
     db: Session = Depends(get_db),
     current_user = CurrentUser
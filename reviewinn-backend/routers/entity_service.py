@@ -600,16 +600,15 @@ async def record_entity_view(
 async def get_trending_entities(
     category: Optional[str] = Query(None, description="Entity category"),
     limit: int = Query(10, ge=1, le=50, description="Number of trending entities"),
-    days: int = Query(30, ge=1, le=365, description="Days to look back for trending calculation"),
+    days: int = Query(30, ge=1, le=365, description="Deprecated; scores decay continuously"),
     db: Session = Depends(get_db)
 ):
     """
     Get trending entities based on recent activity.
     
-    Returns entities trending by:
-    - Recent review activity
-    - Category filtering
-    - Customizable time periods
+    Entities are ranked by a precomputed, exponentially decayed score built
+    from reviews, comments, reactions and views, optionally filtered by
+    category.
     """
     try:
         entity_category = _validate_category(category)
@@ -650,10 +649,10 @@ async def get_similar_entities(
     """
     Get entities similar to the given entity.
     
-    Finds similar entities based on:
-    - Category matching
-    - Subcategory matching
-    - Other similarity factors
+    Reads the precomputed similarity index, which ranks entities by:
+    - Name and description text similarity
+    - Co-reviews (users who reviewed this entity also reviewed)
+    - Category and root category matching
     """
     try:
         similar_entities = await unified_entity_service.get_similar_entities(
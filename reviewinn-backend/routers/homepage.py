@@ -15,7 +15,7 @@ from auth.production_dependencies import CurrentUser, RequiredUser
 from models.entity import Entity
 from models.review import Review
 from services.homepage_cache_service import HomepageCacheService
-from services.cache_service import cache_service
+from services.tiered_cache import tiered_cache
 
 router = APIRouter()
 
@@ -168,7 +168,7 @@ def convert_entity_data_to_response(entity_data: EntityData) -> EntityResponse:
 
 
 @router.get("/left_panel", response_model=LeftPanelDataResponse)
-async def get_left_panel_data(
+def get_left_panel_data(
     reviews_limit: int = Query(2, ge=1, le=10, description="Number of top reviews for left panel"),
     db: Session = Depends(get_db),
     current_user = CurrentUser
@@ -250,7 +250,7 @@ async def get_home_middle_panel_data(
     """
     try:
         # Use cache service for better performance
-        cache_service_instance = HomepageCacheService(cache_service, db)
+        cache_service_instance = HomepageCacheService(tiered_cache, db)
         
         if current_user:
             # TODO: Add personalized logic for middle panel (e.g., user feed, recommendations)
@@ -415,7 +415,7 @@ def get_homepage_reviews(
 
 
 @router.get("/entities", response_model=List[EntityResponse])
-async def get_homepage_entities(
+def get_homepage_entities(
     limit: int = Query(20, ge=1, le=100, description="Number of entities to fetch"),
     db: Session = Depends(get_db),
     current_user = CurrentUser
@@ -437,7 +437,7 @@ async def get_homepage_entities(
 
 
 @router.post("/migrate_to_single_table")
-async def migrate_to_single_table(db: Session = Depends(get_db)):
+def migrate_to_single_table(db: Session = Depends(get_db)):
     """
     Migrate review_main to use JSONB columns for single-table queries
     """
@@ -532,7 +532,7 @@ async def migrate_to_single_table(db: Session = Depends(get_db)):
 
 
 @router.get("/search_reviews", response_model=None)
-async def search_reviews_with_entities(
+def search_reviews_with_entities(
     current_user: CurrentUser,
     q: str = Query(..., description="Search query"),
     limit: int = Query(20, ge=1, le=100, description="Number of reviews to fetch"),
@@ -639,7 +639,7 @@ async def search_reviews_with_entities(
 
 
 @router.get("/stats", response_model=PlatformStatsResponse)
-async def get_platform_stats(
+def get_platform_stats(
     db: Session = Depends(get_db),
     current_user = CurrentUser
 ):
@@ -7,6 +7,7 @@ from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
 from auth.production_dependencies import CurrentUser, RequiredUser
 from services.msg_service import MsgService
+from core.pagination import InvalidCursorError
 from database import get_db
 import logging
 
@@ -60,6 +61,7 @@ async def create_conversation(
             conversation_type=conversation_data.conversation_type,
             title=conversation_data.title
         )
+        await service.invalidate_inboxes()
         
         return ConversationResponse(
             success=True,
@@ -78,17 +80,27 @@ async def create_conversation(
 async def get_conversations(
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor"),
     db: Session = Depends(get_db),
     current_user = RequiredUser
 ):
-    """Get user's conversations."""
+    """Get user's conversations. Prefer ``cursor`` over ``offset`` for paging."""
     try:
         service = MsgService(db)
-        conversations = service.get_conversations(
-            user_id=current_user.user_id,
-            limit=limit,
-            offset=offset
-        )
+        next_cursor = None
+        if offset:
+            conversations = service.get_conversations(
+                user_id=current_user.user_id,
+                limit=limit,
+                offset=offset
+            )
+        else:
+            page = await service.get_inbox_page(
+                user_id=current_user.user_id,
+                limit=limit,
+                cursor=cursor
+            )
+            conversations, next_cursor = page['conversations'], page['next_cursor']
         
         return ConversationResponse(
             success=True,
@@ -96,11 +108,14 @@ async def get_conversations(
                 'conversations': conversations,
                 'total': len(conversations),
                 'limit': limit,
-                'offset': offset
+                'offset': offset,
+                'next_cursor': next_cursor
             },
             message="Conversations retrieved successfully"
         )
         
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.message)
     except Exception as e:
         logger.error(f"Failed to get conversations: {str(e)}")
         raise HTTPException(
@@ -124,6 +139,7 @@ async def send_message(
             message_type=message_data.message_type,
             reply_to_message_id=message_data.reply_to_message_id
         )
+        await service.invalidate_inboxes()
         
         return ConversationResponse(
             success=True,
@@ -192,6 +208,7 @@ async def mark_conversation_read(
             user_id=current_user.user_id,
             conversation_id=conversation_id
         )
+        await service.invalidate_inboxes()
         
         return ConversationResponse(
             success=True,
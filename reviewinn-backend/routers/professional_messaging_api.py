@@ -13,6 +13,7 @@ Features:
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Body, status
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
 import asyncio
@@ -88,7 +89,7 @@ def create_conversation(
     )
 
 @router.get("/conversations")
-def get_conversations(
+async def get_conversations(
     current_user: RequiredUser,
     limit: int = Query(20, ge=1, le=100, description="Number of conversations to return"),
     offset: int = Query(0, ge=0, description="Number of conversations to skip"),
@@ -102,7 +103,7 @@ def get_conversations(
     """
     try:
         service = ProfessionalMessagingService(db)
-        result = service.get_conversations(
+        result = await service.get_inbox(
             user_id=current_user.user_id,
             limit=limit,
             offset=offset,
@@ -203,7 +204,7 @@ def update_participant(
 # ========== MESSAGE ENDPOINTS ==========
 
 @router.post("/conversations/{conversation_id}/messages")
-def send_message(
+async def send_message(
     conversation_id: int,
     request: MessageSendRequest,
     db: Session = Depends(get_db),
@@ -213,7 +214,8 @@ def send_message(
     Send a message with threading support.
     """
     service = ProfessionalMessagingService(db)
-    return service.send_message(
+    result = await run_in_threadpool(
+        service.send_message,
         sender_id=current_user.user_id,
         conversation_id=conversation_id,
         content=request.content,
@@ -223,6 +225,8 @@ def send_message(
         attachments=None,  # No file attachments for now
         mentions=request.mentions
     )
+    await service.invalidate_inboxes()
+    return result
 
 @router.get("/conversations/{conversation_id}/messages")
 def get_messages(
@@ -388,7 +392,7 @@ def get_user_presence(
     return service.get_user_presence(user_id)
 
 @router.post("/conversations/{conversation_id}/read")
-def mark_conversation_read(
+async def mark_conversation_read(
     conversation_id: int,
     message_id: Optional[int] = Body(None, description="Mark read up to this message ID"),
     db: Session = Depends(get_db),
@@ -398,11 +402,14 @@ def mark_conversation_read(
     Mark conversation as read up to a specific message.
     """
     service = ProfessionalMessagingService(db)
-    return service.mark_conversation_read(
+    result = await run_in_threadpool(
+        service.mark_conversation_read,
         conversation_id=conversation_id,
         user_id=current_user.user_id,
         up_to_message_id=message_id
     )
+    await service.invalidate_inboxes()
+    return result
 
 # ========== SEARCH AND DISCOVERY ==========
 
@@ -502,7 +509,9 @@ def messaging_health_check(db: Session = Depends(get_db)):
         test_query = db.execute(text("SELECT 1")).fetchone()
         
         # Test WebSocket manager
-        websocket_status = "healthy" if websocket_manager else "unavailable"
+        from services.websocket_service import connection_manager
+        websocket_stats = connection_manager.get_stats()
+        websocket_status = "healthy" if websocket_stats.get("listener_running", True) else "degraded"
         
         return {
             "success": True,
@@ -512,6 +521,7 @@ def messaging_health_check(db: Session = Depends(get_db)):
                 "services": {
                     "database": "connected",
                     "websockets": websocket_status,
+                    "realtime": websocket_stats,
                     "messaging_service": "operational"
                 },
                 "features": [
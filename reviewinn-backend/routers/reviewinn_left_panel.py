@@ -10,12 +10,11 @@ import logging
 
 from database import get_db
 from auth.production_dependencies import CurrentUser
+from services.tiered_cache import tiered_cache
 
 router = APIRouter()
 
-# Simple in-memory cache to prevent repeated expensive queries
-_left_panel_cache = {}
-_cache_timestamp = {}
+# Per-worker LRU cache to prevent repeated expensive queries
 CACHE_DURATION = 30  # 30 seconds
 
 @router.get("/data", response_model=None)
@@ -27,17 +26,13 @@ async def get_reviewinn_left_panel_data(
     Fast cached ReviewInn left panel data.
     """
     try:
-        import time
-        
         # Check cache first
-        cache_key = f"left_panel_{getattr(current_user, 'user_id', 'anonymous')}"
-        current_time = time.time()
+        cache_key = f"left_panel:{getattr(current_user, 'user_id', 'anonymous')}"
         
-        if (cache_key in _left_panel_cache and 
-            cache_key in _cache_timestamp and 
-            current_time - _cache_timestamp[cache_key] < CACHE_DURATION):
+        found, cached_response = tiered_cache.local.get(cache_key)
+        if found:
             logging.info(f"[REVIEWINN LEFT PANEL] Returning cached data")
-            return _left_panel_cache[cache_key]
+            return cached_response
         
         logging.info(f"[REVIEWINN LEFT PANEL] Cache miss, fetching fresh data")
         
@@ -204,8 +199,7 @@ async def get_reviewinn_left_panel_data(
         })
         
         # Cache the response
-        _left_panel_cache[cache_key] = response_data
-        _cache_timestamp[cache_key] = current_time
+        tiered_cache.local.set(cache_key, response_data, ttl=CACHE_DURATION)
         logging.info(f"[REVIEWINN LEFT PANEL] Data cached for {CACHE_DURATION}s")
         
         return response_data
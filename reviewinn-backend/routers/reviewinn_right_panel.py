@@ -1,8 +1,10 @@
 from fastapi import APIRouter, HTTPException, Depends, Request
 from auth.production_dependencies import CurrentUser, RequiredUser
 from sqlalchemy.orm import Session
-from sqlalchemy import text, func, desc
-from database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text, func, desc, select
+from starlette.concurrency import run_in_threadpool
+from database import get_db, AsyncSessionLocal
 from models.user_progress import UserProgress
 from models.badge_award import BadgeAward
 from models.badge_definition import BadgeDefinition
@@ -14,11 +16,17 @@ import logging
 from typing import Dict, List, Any, Optional
 from pydantic import BaseModel
 from datetime import datetime, timedelta, timezone
+from services.tiered_cache import tiered_cache
+from services.trending_service import fetch_trending_entities
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Public panel data is identical for every anonymous visitor
+PUBLIC_DATA_CACHE_KEY = "right_panel:public"
+PUBLIC_DATA_CACHE_TTL = 60  # 1 minute
+
 # Create router
 router = APIRouter(
     prefix="/api/v1/reviewinn-right-panel",
@@ -113,11 +121,11 @@ async def get_reviewinn_right_panel_data(
         if current_user:
             logger.info(f"[RIGHT_PANEL] Returning authenticated data for user {current_user.user_id}")
             # Return authenticated data with real user ID
-            return await get_authenticated_data_internal(db, user_id=current_user.user_id)
+            return await run_in_threadpool(get_authenticated_data_internal, db, user_id=current_user.user_id)
         else:
             logger.info("[RIGHT_PANEL] Returning public data - no authentication")
             # Return public data
-            return await get_public_data_internal(db)
+            return await get_cached_public_data()
             
     except Exception as e:
         logger.error(f"Error fetching right panel data: {str(e)}")
@@ -126,11 +134,22 @@ async def get_reviewinn_right_panel_data(
             detail=f"Failed to load right panel data: {str(e)}"
         )
 
-async def get_public_data_internal(db: Session) -> dict:
-    """Internal function to get public data from real database tables"""
+async def get_cached_public_data() -> dict:
+    """Public right panel data served from the two-tier cache"""
+    cached_data = await tiered_cache.get(PUBLIC_DATA_CACHE_KEY)
+    if cached_data:
+        return cached_data
+    
+    async with AsyncSessionLocal() as session:
+        data = await get_public_data_internal(session)
+    await tiered_cache.set(PUBLIC_DATA_CACHE_KEY, data, ttl=PUBLIC_DATA_CACHE_TTL)
+    return data
+
+async def get_public_data_internal(session: AsyncSession) -> dict:
+    """Internal function to get public data from real database tables (async engine)"""
     
     # Get new verified entities that need reviews
-    new_entities_query = db.query(
+    new_entities_query = (await session.execute(select(
         Entity.entity_id,
         Entity.name,
         Entity.created_at,
@@ -141,7 +160,7 @@ async def get_public_data_internal(db: Session) -> dict:
         Entity.is_verified == True,  # Only verified entities
         Entity.created_at >= datetime.now(timezone.utc) - timedelta(days=60),  # Added in last 60 days
         func.coalesce(Entity.review_count, 0) <= 10  # Need more reviews (10 or fewer)
-    ).order_by(desc(Entity.created_at)).limit(5).all()
+    ).order_by(desc(Entity.created_at)).limit(5))).all()
     
     new_entities = []
     for entity in new_entities_query:
@@ -168,46 +187,31 @@ async def get_public_data_internal(db: Session) -> dict:
             "is_verified": entity.is_verified
         })
     
-    # Get popular entities based on review count and ratings
-    popular_entities_query = db.query(
-        Entity.entity_id,
-        Entity.name,
-        func.avg(Review.overall_rating).label('avg_rating'),
-        func.count(Review.review_id).label('review_count')
-    ).join(Review, Entity.entity_id == Review.entity_id).filter(
-        Review.created_at >= datetime.now(timezone.utc) - timedelta(days=30)  # Last month
-    ).group_by(
-        Entity.entity_id, Entity.name
-    ).having(
-        func.count(Review.review_id) >= 1  # At least 1 review
-    ).order_by(
-        desc('review_count'), desc('avg_rating')
-    ).limit(5).all()
-    
+    # Get popular entities from the precomputed trending scores
     popular_entities = []
-    for entity in popular_entities_query:
+    for entity, score in await fetch_trending_entities(session, limit=5):
         popular_entities.append({
             "id": entity.entity_id,
             "name": entity.name,
             "category": "General",  # Simplified since category is JSONB
-            "popularity_score": float(entity.avg_rating) if entity.avg_rating else 0.0,
-            "recent_reviews_count": entity.review_count
+            "popularity_score": round(score, 2) if score is not None else float(entity.average_rating or 0.0),
+            "recent_reviews_count": entity.review_count or 0
         })
     
     # No fallback data - only show real database data
     
     # Get activity summary from real database
-    total_users = db.query(func.count(User.user_id)).scalar() or 0
+    total_users = await session.scalar(select(func.count(User.user_id))) or 0
     
     # Active reviewers in last 30 days
-    active_reviewers = db.query(func.count(func.distinct(Review.user_id))).filter(
+    active_reviewers = await session.scalar(select(func.count(func.distinct(Review.user_id))).filter(
         Review.created_at >= datetime.now(timezone.utc) - timedelta(days=30)
-    ).scalar() or 0
+    )) or 0
     
     # Recent activity count (last 7 days)
-    recent_activity = db.query(func.count(Review.review_id)).filter(
+    recent_activity = await session.scalar(select(func.count(Review.review_id)).filter(
         Review.created_at >= datetime.now(timezone.utc) - timedelta(days=7)
-    ).scalar() or 0
+    )) or 0
     
     # Top categories - simplified since categories are JSONB
     # Just return some general category names for now
@@ -229,8 +233,8 @@ async def get_public_data_internal(db: Session) -> dict:
         "message": "Public right panel data loaded successfully"
     }
 
-async def get_authenticated_data_internal(db: Session, user_id: int = None) -> dict:
-    """Internal function to get authenticated data from real database tables"""
+def get_authenticated_data_internal(db: Session, user_id: int = None) -> dict:
+    """Internal function to get authenticated data from real database tables (run on the threadpool)"""
     
     # Ensure we have a valid user_id for authenticated requests
     if not user_id:
@@ -350,7 +354,7 @@ async def get_authenticated_data_internal(db: Session, user_id: int = None) -> d
 
 # Legacy endpoint for backward compatibility
 @router.get("/public", response_model=ReviewInnRightPanelPublicResponse)
-async def get_reviewinn_right_panel_public_data(db: Session = Depends(get_db)):
+def get_reviewinn_right_panel_public_data(db: Session = Depends(get_db)):
     """
     Get public data for ReviewInn right panel - trending topics, popular entities, and activity summary
     For non-authenticated users, using reviewinn_database
@@ -475,7 +479,7 @@ async def get_reviewinn_right_panel_public_data(db: Session = Depends(get_db)):
         )
 
 @router.get("/authenticated", response_model=ReviewInnRightPanelAuthResponse)
-async def get_reviewinn_right_panel_auth_data(
+def get_reviewinn_right_panel_auth_data(
     request: Request,
     db: Session = Depends(get_db)
 ):
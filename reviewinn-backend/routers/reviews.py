@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import desc, asc, func, text
 from typing import List, Optional, Any
 from datetime import datetime, timezone
@@ -15,14 +15,33 @@ from datetime import datetime, timezone
 from sqlalchemy.exc import IntegrityError
 from models.user_entity_view import UserEntityView
 from core.responses import api_response, error_response
-from services.cache_service import cache_result, cache_service
+from services.cache_service import cache_result
 from services.review_service import ReviewService
 from services.count_validation_service import CountValidationService
+from services.search_service import apply_text_search
+from services.trending_service import order_reviews_by_trending
+from services.comment_preview_service import CommentPreviewLoader
+from services.badge_service import EVENT_REACTION_RECEIVED, EVENT_REVIEW_CREATED
+from services.job_handlers import (
+    JOB_BADGES_EVALUATE_EVENT,
+    JOB_CACHE_INVALIDATE,
+    JOB_COUNTS_REPAIR,
+    JOB_NOTIFY_COMMENT,
+    JOB_NOTIFY_REACTION,
+)
+from services.job_queue import enqueue
+from core.pagination import InvalidCursorError, encode_cursor, paginate_keyset
+from services.reaction_summary_service import (
+    ReactionSummaryLoader,
+    empty_comment_reaction_summary,
+    empty_review_reaction_summary,
+)
 from schemas.review import ReviewCreateRequest
 import traceback
 import logging
 import json
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from core.security import input_validator, review_validator
 
 # Set up logger
@@ -33,7 +52,7 @@ router = APIRouter()
 # ==================== USER REACTIONS ENDPOINT ====================
 
 @router.get("/user-reactions")
-async def get_user_reactions(
+def get_user_reactions(
     request: Request,
     db: Session = Depends(get_db)
 ):
@@ -211,7 +230,7 @@ def get_comment_reaction_summary_response(comment_id: int, db: Session, current_
     }
 
 @router.post("/test", response_model=None, status_code=200)
-async def test_review_endpoint(
+def test_review_endpoint(
     request: Request,
     current_user: RequiredUser,
     db: Session = Depends(get_db)
@@ -240,7 +259,7 @@ async def test_review_endpoint(
         )
 
 @router.post("/create", response_model=None, status_code=201)
-async def create_review(
+def create_review(
     review_data: ReviewCreateRequest,
     current_user: RequiredUser,
     db: Session = Depends(get_db)
@@ -375,6 +394,13 @@ async def create_review(
             logger.info(f"Review object created: {new_review}")
             db.add(new_review)
             logger.info("Review added to database session")
+            db.flush()
+            # Only the badges a new review can affect are re-checked, off the request path
+            enqueue(
+                db, JOB_BADGES_EVALUATE_EVENT,
+                {"user_id": current_user.user_id, "event": EVENT_REVIEW_CREATED},
+                idempotency_key=f"badges:{EVENT_REVIEW_CREATED}:{new_review.review_id}"
+            )
             db.commit()
             logger.info("Review committed to database")
             db.refresh(new_review)
@@ -387,20 +413,7 @@ async def create_review(
             db.rollback()
             raise db_error
         
-        # Verify the review was saved by querying it back
-        saved_review = db.query(Review).filter(Review.review_id == new_review.review_id).first()
-        if saved_review:
-            logger.info(f"Review successfully saved with ID: {saved_review.review_id}")
-        else:
-            logger.error(f"Review with ID {new_review.review_id} not found after creation!")
-        
-        # Update entity's average rating and review count
-        entity_reviews = db.query(Review).filter(Review.entity_id == review_data.entity_id).all()
-        if entity_reviews:
-            total_rating = sum(review.overall_rating for review in entity_reviews)
-            entity.average_rating = total_rating / len(entity_reviews)
-            entity.review_count = len(entity_reviews)
-            db.commit()
+        # Entity review_count / average_rating are maintained by the entity_stats triggers
         
         # Prepare response data
         review_response = {
@@ -425,10 +438,6 @@ async def create_review(
         logger.info(f"🎯 Review response being sent to frontend:")
         logger.info(f"   - ratings in response: {review_response['ratings']}")
         
-        # Final verification - query all reviews to see if our review exists
-        all_reviews = db.query(Review).all()
-        logger.info(f"Total reviews in database after creation: {len(all_reviews)}")
-        
         return api_response(
             data=review_response,
             message="Review created successfully"
@@ -453,12 +462,22 @@ def get_recent_reviews(
     try:
         query = db.query(Review).options(
             joinedload(Review.entity),
-            joinedload(Review.user),
-            selectinload(Review.comments).joinedload(Comment.user)
+            joinedload(Review.user)
         ).order_by(desc(Review.created_at))
         
         reviews = query.limit(limit).all()
         
+        # Latest comments per review (limit to 3 for recent reviews)
+        current_user_id = getattr(current_user, 'user_id', None)
+        latest_comments = CommentPreviewLoader(db).load([r.review_id for r in reviews], 3)
+        
+        # Batch-load reaction summaries for the whole page
+        review_reactions, comment_reactions = ReactionSummaryLoader(db).load(
+            [r.review_id for r in reviews],
+            [c.comment_id for comments in latest_comments.values() for c in comments],
+            current_user_id
+        )
+        
         # Build response
         review_responses = []
         for r in reviews:
@@ -482,14 +501,11 @@ def get_recent_reviews(
                 )
             
             # Get reaction summary
-            current_user_id = getattr(current_user, 'user_id', None)
-            reaction_summary = get_reaction_summary_response(r.review_id, db, current_user_id)
+            reaction_summary = review_reactions.get(r.review_id, empty_review_reaction_summary())
             
-            # Get latest comments (limit to 3 for recent reviews)
-            comment_objs = sorted(r.comments, key=lambda c: c.created_at, reverse=True)[:3]
             comment_responses = []
-            for comment in comment_objs:
-                comment_reaction_summary = get_comment_reaction_summary_response(comment.comment_id, db, getattr(current_user, 'user_id', None))
+            for comment in latest_comments[r.review_id]:
+                comment_reaction_summary = comment_reactions.get(comment.comment_id, empty_comment_reaction_summary())
                 comment_response = CommentResponse(
                     comment_id=comment.comment_id,
                     review_id=comment.review_id,
@@ -566,13 +582,27 @@ def get_reviews(
     entity_id: Optional[int] = Query(None, description="Filter by entity ID"),
     user_id: Optional[int] = Query(None, description="Filter by user ID"),
     rating: Optional[float] = Query(None, description="Filter by minimum rating"),
-    sort_by: Optional[str] = Query("created_at", description="Sort field"),
+    sort_by: Optional[str] = Query("created_at", description="Sort field, or 'trending' for the precomputed time-decayed activity score"),
     sort_order: Optional[str] = Query("desc", description="Sort order"),
     verified: Optional[bool] = Query(None, description="Filter by verification status"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor (newest-first sort only)"),
     db: Session = Depends(get_db),
     current_user: CurrentUser = None
 ):
-    """Get a list of reviews with pagination and filtering."""
+    """
+    Get a list of reviews with pagination and filtering.
+
+    With the default newest-first sort every page returns ``next_cursor``;
+    passing it back as ``cursor`` seeks on (created_at, review_id) instead of
+    using OFFSET, so deep pages stay as cheap as the first.
+    """
+    keyset_sort = sort_by == "created_at" and sort_order == "desc"
+    if cursor and not keyset_sort:
+        return error_response(
+            message="cursor is only supported with sort_by=created_at and sort_order=desc",
+            status_code=400,
+            error_code="INVALID_CURSOR"
+        )
     try:
         query = db.query(Review)
         
@@ -586,40 +616,46 @@ def get_reviews(
         if verified is not None:
             query = query.filter(Review.is_verified == verified)
         
-        # PERFORMANCE FIX: Avoid expensive count() for pagination
-        # Instead, use limit+1 to determine if there are more records
-        query_with_extra = query.limit(limit + 1)
-        
-        # Get one extra record to check if there are more
-        total = None  # We'll calculate this more efficiently
-        
-        # Sorting
-        sort_col = getattr(Review, sort_by, Review.created_at)
-        if sort_order == "desc":
-            query = query.order_by(desc(sort_col))
-        else:
-            query = query.order_by(asc(sort_col))
-        
-        
-        # PERFORMANCE FIX: Efficient pagination without count()
-        offset = (page - 1) * limit
-        
-        # Apply sorting and eager loading to the main query
+        # Eager loading for the page
         query = query.options(
             joinedload(Review.entity),  # Load entity data in single query
-            joinedload(Review.user),    # Load user data in single query
-            selectinload(Review.comments).joinedload(Comment.user)  # Load comments and their users efficiently
+            joinedload(Review.user)     # Load user data in single query
         )
         
-        # Get limit+1 records to determine if there are more
-        reviews_with_extra = query.offset(offset).limit(limit + 1).all()
-        
-        # Check if there are more records
-        has_more = len(reviews_with_extra) > limit
-        reviews = reviews_with_extra[:limit]  # Take only the requested amount
+        # Keyset pagination: seek past the cursor on (created_at, review_id)
+        next_cursor = None
+        if cursor:
+            reviews, next_cursor = paginate_keyset(
+                query, [Review.created_at, Review.review_id], limit, cursor
+            )
+            has_more = next_cursor is not None
+        else:
+            # Sorting (review_id breaks ties so offset and cursor pages agree)
+            sort_col = getattr(Review, sort_by, Review.created_at)
+            if sort_by == "trending":
+                query = order_reviews_by_trending(query)
+            elif sort_order == "desc":
+                query = query.order_by(desc(sort_col), desc(Review.review_id))
+            else:
+                query = query.order_by(asc(sort_col), asc(Review.review_id))
+            
+            # PERFORMANCE FIX: Efficient pagination without count()
+            offset = (page - 1) * limit
+            
+            # Get limit+1 records to determine if there are more
+            reviews_with_extra = query.offset(offset).limit(limit + 1).all()
+            
+            # Check if there are more records
+            has_more = len(reviews_with_extra) > limit
+            reviews = reviews_with_extra[:limit]  # Take only the requested amount
+            if keyset_sort and has_more and reviews:
+                next_cursor = encode_cursor(reviews[-1].created_at, reviews[-1].review_id)
         
         # For total count, use an efficient approach
-        if page == 1 and not has_more:
+        if cursor:
+            # Position is unknown in cursor mode; clients follow next_cursor
+            total = None
+        elif page == 1 and not has_more:
             # If it's the first page and no more records, total is len(reviews)
             total = len(reviews)
         else:
@@ -627,6 +663,17 @@ def get_reviews(
             # This is much faster than query.count() for large datasets
             total = (page - 1) * limit + len(reviews) + (1 if has_more else 0)
         
+        # Latest comments for each review (newest 5 per review, one query)
+        current_user_id = getattr(current_user, 'user_id', None)
+        latest_comments = CommentPreviewLoader(db).load([r.review_id for r in reviews], 5)
+        
+        # Batch-load reaction summaries for the whole page
+        review_reactions, comment_reactions = ReactionSummaryLoader(db).load(
+            [r.review_id for r in reviews],
+            [c.comment_id for comments in latest_comments.values() for c in comments],
+            current_user_id
+        )
+        
         # Join entity and user info for each review
         review_responses = []
         for r in reviews:
@@ -652,13 +699,11 @@ def get_reviews(
                 )
             
             # Get reaction summary for this review and user
-            reaction_summary = get_reaction_summary_response(r.review_id, db, getattr(current_user, 'user_id', None))
+            reaction_summary = review_reactions.get(r.review_id, empty_review_reaction_summary())
             
-            # Get latest comments for this review (already loaded via selectinload)
-            comment_objs = sorted(r.comments, key=lambda c: c.created_at, reverse=True)[:5]
             comment_responses = []
-            for comment in comment_objs:
-                comment_reaction_summary = get_comment_reaction_summary_response(comment.comment_id, db, getattr(current_user, 'user_id', None))
+            for comment in latest_comments[r.review_id]:
+                comment_reaction_summary = comment_reactions.get(comment.comment_id, empty_comment_reaction_summary())
                 comment_response = CommentResponse(
                     comment_id=comment.comment_id,
                     review_id=comment.review_id,
@@ -720,7 +765,8 @@ def get_reviews(
             "page": page,
             "limit": limit,
             "pages": (total // limit) + (1 if total % limit else 0) if total is not None else None,
-            "has_more": has_more  # Frontend can use this instead of calculating pages
+            "has_more": has_more,  # Frontend can use this instead of calculating pages
+            "next_cursor": next_cursor
         }
         
         return api_response(
@@ -728,6 +774,8 @@ def get_reviews(
             message=f"Successfully retrieved {len(review_responses)} reviews"
         )
         
+    except InvalidCursorError as e:
+        return error_response(message=e.message, status_code=400, error_code="INVALID_CURSOR")
     except Exception as e:
         logger.error(f"Error in get_reviews: {str(e)}")
         logger.error(traceback.format_exc())
@@ -849,19 +897,16 @@ async def create_comment(
         )
         
         db.add(comment)
+        db.flush()
+        # 🔔 Comment notifications are sent by the job worker
+        enqueue(
+            db, JOB_NOTIFY_COMMENT,
+            {"comment_id": comment.comment_id, "action": "created"},
+            idempotency_key=f"notify:comment:{comment.comment_id}:created"
+        )
         db.commit()
         db.refresh(comment)
         
-        # 🔔 TRIGGER NOTIFICATION: Comment created
-        try:
-            from services.notification_trigger_service_enterprise import NotificationTriggerService
-            trigger_service = NotificationTriggerService(db)
-            await trigger_service.trigger_comment_notifications(comment, action='created')
-            logger.info(f"✅ Notification triggered for comment {comment.comment_id} on review {review_id}")
-        except Exception as notification_error:
-            logger.warning(f"⚠️ Failed to trigger notification for comment {comment.comment_id}: {notification_error}")
-            # Don't fail the request if notification fails
-        
         # Get comment user info for response
         comment_user = db.query(User).filter(User.user_id == comment.user_id).first()
         comment_reaction_summary = get_comment_reaction_summary_response(comment.comment_id, db, current_user.user_id)
@@ -893,7 +938,7 @@ async def create_comment(
         )
 
 @router.post("/{review_id}/view")
-async def track_view(
+def track_view(
     review_id: int, 
     request: Request,
     db: Session = Depends(get_db),
@@ -990,11 +1035,8 @@ def search_reviews(
 ):
     """Search reviews with text query and filters."""
     try:
-        # Base query with search
-        query = db.query(Review).filter(
-            Review.content.ilike(f'%{q}%') | 
-            Review.title.ilike(f'%{q}%')
-        )
+        # Base query with ranked full-text search (GIN-indexed, trigram fallback on titles)
+        query = apply_text_search(db.query(Review), "reviews", q)
         
         # Apply filters
         if entity_id:
@@ -1014,6 +1056,7 @@ def search_reviews(
         offset = (page - 1) * limit
         
         # Get limit+1 to determine if there are more results
+        # Relevance first, newest first among equally ranked matches
         reviews_with_extra = query.order_by(desc(Review.created_at)).offset(offset).limit(limit + 1).all()
         
         # Check if there are more records and calculate efficient total
@@ -1026,11 +1069,17 @@ def search_reviews(
         else:
             total = (page - 1) * limit + len(reviews) + (1 if has_more else 0)
         
+        # Batch-load reaction summaries for the whole page
+        review_reactions = ReactionSummaryLoader(db).load_review_summaries(
+            [r.review_id for r in reviews],
+            getattr(current_user, 'user_id', None)
+        )
+        
         # Build response
         review_responses = []
         for r in reviews:
             # Get reaction summary
-            reaction_summary = get_reaction_summary_response(r.review_id, db, getattr(current_user, 'user_id', None))
+            reaction_summary = review_reactions.get(r.review_id, empty_review_reaction_summary())
             
             review_response = ReviewResponse(
                 review_id=r.review_id,
@@ -1099,50 +1148,15 @@ async def add_comment_reaction(
 ):
     """Add or update a reaction to a comment."""
     try:
-        # Check if comment exists
-        comment = db.query(Comment).filter(Comment.comment_id == comment_id).first()
-        if not comment:
+        if not await run_in_threadpool(
+            _save_comment_reaction, db, comment_id, current_user.user_id, reaction_request.reaction_type
+        ):
             return error_response(message="Comment not found", status_code=404)
         
-        # Check if user already has a reaction for this comment
-        existing_reaction = db.query(CommentReaction).filter(
-            CommentReaction.comment_id == comment_id,
-            CommentReaction.user_id == current_user.user_id
-        ).first()
-        
-        if existing_reaction:
-            # Update existing reaction
-            existing_reaction.reaction_type = CommentReactionType(reaction_request.reaction_type)
-            existing_reaction.updated_at = func.now()
-        else:
-            # Create new reaction
-            reaction = CommentReaction(
-                comment_id=comment_id,
-                user_id=current_user.user_id,
-                reaction_type=CommentReactionType(reaction_request.reaction_type)
-            )
-            db.add(reaction)
-        
-        db.commit()
-        
-        # 🔔 TRIGGER NOTIFICATION: Comment reaction added
-        try:
-            from services.notification_trigger_service_enterprise import NotificationTriggerService
-            trigger_service = NotificationTriggerService(db)
-            await trigger_service.trigger_reaction_notifications(
-                target_type='comment',
-                target_id=comment_id,
-                reactor_user_id=current_user.user_id,
-                reaction_type=reaction_request.reaction_type,
-                action='added'
-            )
-            logger.info(f"✅ Notification triggered for comment {comment_id} reaction: {reaction_request.reaction_type}")
-        except Exception as notification_error:
-            logger.warning(f"⚠️ Failed to trigger notification for comment reaction: {notification_error}")
-            # Don't fail the request if notification fails
-        
         # Get updated reaction summary
-        reaction_summary = get_comment_reaction_summary_response(comment_id, db, current_user.user_id)
+        reaction_summary = await run_in_threadpool(
+            get_comment_reaction_summary_response, comment_id, db, current_user.user_id
+        )
         
         return api_response(
             data=reaction_summary,
@@ -1156,8 +1170,48 @@ async def add_comment_reaction(
             status_code=500
         )
 
+def _save_comment_reaction(db: Session, comment_id: int, user_id: int, reaction_type: str) -> bool:
+    """Insert or update a comment reaction; returns False when the comment does not exist."""
+    # Check if comment exists
+    comment = db.query(Comment).filter(Comment.comment_id == comment_id).first()
+    if not comment:
+        return False
+    
+    # Check if user already has a reaction for this comment
+    existing_reaction = db.query(CommentReaction).filter(
+        CommentReaction.comment_id == comment_id,
+        CommentReaction.user_id == user_id
+    ).first()
+    
+    if existing_reaction:
+        # Update existing reaction
+        existing_reaction.reaction_type = CommentReactionType(reaction_type)
+        existing_reaction.updated_at = func.now()
+    else:
+        # Create new reaction
+        db.add(CommentReaction(
+            comment_id=comment_id,
+            user_id=user_id,
+            reaction_type=CommentReactionType(reaction_type)
+        ))
+    
+    # 🔔 Sent by the job worker; toggling back to the same reaction does not notify again
+    enqueue(
+        db, JOB_NOTIFY_REACTION,
+        {
+            "target_type": "comment",
+            "target_id": comment_id,
+            "reactor_user_id": user_id,
+            "reaction_type": reaction_type,
+            "action": "added"
+        },
+        idempotency_key=f"notify:reaction:comment:{comment_id}:{user_id}:{reaction_type}"
+    )
+    db.commit()
+    return True
+
 @router.delete("/comments/{comment_id}/react", tags=["Comment Reactions"])
-async def remove_comment_reaction(
+def remove_comment_reaction(
     comment_id: int,
     current_user: RequiredUser,
     db: Session = Depends(get_db)
@@ -1195,7 +1249,7 @@ async def remove_comment_reaction(
         )
 
 @router.get("/comments/{comment_id}/react", tags=["Comment Reactions"])
-async def get_comment_reactions(
+def get_comment_reactions(
     comment_id: int,
     db: Session = Depends(get_db),
     current_user: CurrentUser = None
@@ -1251,87 +1305,19 @@ async def add_or_update_reaction(
                 status_code=400
             )
         
-        # Check if review exists
-        review = db.query(Review).filter(Review.review_id == review_id).first()
-        if not review:
-            return error_response(
-                message="Review not found",
-                status_code=404
-            )
-        
-        # Remove existing reaction if any
-        existing = db.query(ReviewReaction).filter_by(
-            review_id=review_id, 
-            user_id=current_user.user_id
-        ).first()
-        
-        if existing:
-            existing.reaction_type = reaction_type
-        else:
-            # Debug logging for user_id issue
-            logger.info(f"🔍 Creating reaction: user_id={current_user.user_id} (type: {type(current_user.user_id)}), review_id={review_id}, reaction_type={reaction_type}")
-            reaction = ReviewReaction(
-                review_id=review_id,
-                user_id=current_user.user_id,
-                reaction_type=reaction_type
-            )
-            db.add(reaction)
-        
-        try:
-            db.commit()
-            if not existing:
-                db.refresh(reaction)
-            logger.info(f"✅ Successfully committed reaction for review {review_id}")
-        except IntegrityError as e:
-            db.rollback()
-            logger.error(f"💥 IntegrityError in add_or_update_reaction: {e}")
-            logger.error(f"🔍 Error details: review_id={review_id}, user_id={current_user.user_id}, reaction_type={reaction_type}")
-            return error_response(
-                message=f"Could not add reaction: {str(e)}",
-                status_code=500
-            )
-        except Exception as db_error:
-            db.rollback()
-            logger.error(f"💥 Database error in add_or_update_reaction: {db_error}")
-            logger.error(f"🔍 Error details: review_id={review_id}, user_id={current_user.user_id}, reaction_type={reaction_type}")
-            return error_response(
-                message=f"Database error: {str(db_error)}",
-                status_code=500
-            )
-        
-        # 🔔 TRIGGER NOTIFICATION: Review reaction added
-        try:
-            from services.notification_trigger_service_enterprise import NotificationTriggerService
-            trigger_service = NotificationTriggerService(db)
-            reaction_type_str = reaction_type.value if hasattr(reaction_type, 'value') else str(reaction_type)
-            await trigger_service.trigger_reaction_notifications(
-                target_type='review',
-                target_id=review_id,
-                reactor_user_id=current_user.user_id,
-                reaction_type=reaction_type_str,
-                action='added'
-            )
-            logger.info(f"✅ Notification triggered for review {review_id} reaction: {reaction_type_str}")
-        except Exception as notification_error:
-            logger.warning(f"⚠️ Failed to trigger notification for reaction: {notification_error}")
-            # Don't fail the request if notification fails
+        # Sync session work runs on the threadpool so the event loop stays free
+        review, failure = await run_in_threadpool(
+            _save_review_reaction, db, review_id, current_user.user_id, reaction_type
+        )
+        if failure is not None:
+            return failure
         
         # ✅ DATABASE TRIGGERS: Count updates are now handled automatically by database triggers
         # This provides better consistency, performance, and eliminates race conditions
         logger.info(f"✅ Reaction processed for review {review_id} - counts updated by database triggers")
         
         # Return updated reaction summary
-        reaction_summary = get_reaction_summary_response(review_id, db, current_user.user_id)
-        
-        # Cache invalidation handled by standard cache service
-        try:
-            await cache_service.delete(f"review_reactions_{review_id}")
-            if review.user_id:
-                await cache_service.delete(f"user_reviews_{review.user_id}")
-                logger.info(f"Cache invalidated for user {review.user_id} after reaction update")
-        except Exception as cache_error:
-            logger.warning(f"Failed to invalidate cache after reaction update: {cache_error}")
-            # Don't fail the request if cache invalidation fails
+        reaction_summary = await run_in_threadpool(get_reaction_summary_response, review_id, db, current_user.user_id)
         
         return api_response(data=reaction_summary)
         
@@ -1346,6 +1332,76 @@ async def add_or_update_reaction(
             status_code=500
         )
 
+def _save_review_reaction(db: Session, review_id: int, user_id: int, reaction_type: ReviewReactionType):
+    """Insert or update a review reaction; returns ``(review, error_response_or_None)``."""
+    # Check if review exists
+    review = db.query(Review).filter(Review.review_id == review_id).first()
+    if not review:
+        return None, error_response(
+            message="Review not found",
+            status_code=404
+        )
+    
+    # Remove existing reaction if any
+    existing = db.query(ReviewReaction).filter_by(
+        review_id=review_id, 
+        user_id=user_id
+    ).first()
+    
+    if existing:
+        existing.reaction_type = reaction_type
+    else:
+        reaction = ReviewReaction(
+            review_id=review_id,
+            user_id=user_id,
+            reaction_type=reaction_type
+        )
+        db.add(reaction)
+    
+    try:
+        db.flush()
+        # Notifications, cache invalidation and badges are handled by the job worker
+        enqueue(
+            db, JOB_NOTIFY_REACTION,
+            {
+                "target_type": "review",
+                "target_id": review_id,
+                "reactor_user_id": user_id,
+                "reaction_type": reaction_type.value,
+                "action": "added"
+            },
+            idempotency_key=f"notify:reaction:review:{review_id}:{user_id}:{reaction_type.value}"
+        )
+        _enqueue_reaction_cache_invalidation(db, review)
+        if not existing and review.user_id != user_id:
+            enqueue(
+                db, JOB_BADGES_EVALUATE_EVENT,
+                {"user_id": review.user_id, "event": EVENT_REACTION_RECEIVED},
+                idempotency_key=f"badges:{EVENT_REACTION_RECEIVED}:{reaction.reaction_id}"
+            )
+        db.commit()
+        if not existing:
+            db.refresh(reaction)
+        logger.info(f"✅ Successfully committed reaction for review {review_id}")
+    except IntegrityError as e:
+        db.rollback()
+        logger.error(f"💥 IntegrityError in add_or_update_reaction: {e}")
+        logger.error(f"🔍 Error details: review_id={review_id}, user_id={user_id}, reaction_type={reaction_type}")
+        return review, error_response(
+            message=f"Could not add reaction: {str(e)}",
+            status_code=500
+        )
+    except Exception as db_error:
+        db.rollback()
+        logger.error(f"💥 Database error in add_or_update_reaction: {db_error}")
+        logger.error(f"🔍 Error details: review_id={review_id}, user_id={user_id}, reaction_type={reaction_type}")
+        return review, error_response(
+            message=f"Database error: {str(db_error)}",
+            status_code=500
+        )
+    
+    return review, None
+
 @router.get("/test-reaction-endpoint", tags=["Test"])
 async def test_reaction_endpoint():
     """Test endpoint to verify the router is working."""
@@ -1398,40 +1454,15 @@ async def remove_reaction(
 ):
     """Remove the current user's reaction from a review."""
     try:
-        # Check if review exists
-        review = db.query(Review).filter(Review.review_id == review_id).first()
+        review, reaction_summary = await run_in_threadpool(
+            _delete_review_reaction, db, review_id, current_user.user_id
+        )
         if not review:
             return error_response(
                 message="Review not found",
                 status_code=404
             )
         
-        # Find and remove existing reaction
-        reaction = db.query(ReviewReaction).filter_by(
-            review_id=review_id, 
-            user_id=current_user.user_id
-        ).first()
-        
-        if reaction:
-            db.delete(reaction)
-            db.commit()
-            
-            # ✅ DATABASE TRIGGERS: Count updates are now handled automatically by database triggers
-            # This provides better consistency, performance, and eliminates race conditions
-            logger.info(f"✅ Reaction removed from review {review_id} - counts updated by database triggers")
-        
-        # Return updated reaction summary
-        reaction_summary = get_reaction_summary_response(review_id, db, current_user.user_id)
-        
-        # Cache invalidation handled by standard cache service
-        try:
-            await cache_service.delete(f"review_reactions_{review_id}")
-            if review.user_id:
-                await cache_service.delete(f"user_reviews_{review.user_id}")
-                logger.info(f"Cache invalidated for user {review.user_id} after reaction removal")
-        except Exception as cache_error:
-            logger.warning(f"Failed to invalidate cache after reaction removal: {cache_error}")
-        
         return api_response(data=reaction_summary)
         
     except Exception as e:
@@ -1441,8 +1472,38 @@ async def remove_reaction(
             status_code=500
         )
 
+def _delete_review_reaction(db: Session, review_id: int, user_id: int):
+    """Delete the user's review reaction; returns ``(review, reaction_summary)`` or ``(None, None)``."""
+    # Check if review exists
+    review = db.query(Review).filter(Review.review_id == review_id).first()
+    if not review:
+        return None, None
+    
+    # Find and remove existing reaction
+    reaction = db.query(ReviewReaction).filter_by(
+        review_id=review_id, 
+        user_id=user_id
+    ).first()
+    
+    if reaction:
+        db.delete(reaction)
+        _enqueue_reaction_cache_invalidation(db, review)
+        db.commit()
+        
+        # ✅ DATABASE TRIGGERS: Count updates are now handled automatically by database triggers
+        logger.info(f"✅ Reaction removed from review {review_id} - counts updated by database triggers")
+    
+    return review, get_reaction_summary_response(review_id, db, user_id)
+
+def _enqueue_reaction_cache_invalidation(db: Session, review: Review):
+    """Queue invalidation of the caches a reaction change makes stale."""
+    keys = [f"review_reactions_{review.review_id}"]
+    if review.user_id:
+        keys.append(f"user_reviews_{review.user_id}")
+    enqueue(db, JOB_CACHE_INVALIDATE, {"keys": keys})
+
 @router.get("/{review_id}/reactions", tags=["Review Reactions"])
-async def get_reaction_counts(
+def get_reaction_counts(
     review_id: int,
     db: Session = Depends(get_db),
     current_user: CurrentUser = None
@@ -1524,7 +1585,7 @@ def get_reaction_summary_response(review_id: int, db: Session, user_id: Optional
 
 # Shareable Review Endpoints
 @router.get("/{review_id}", response_model=None, tags=["Shareable Reviews"])
-async def get_review_by_id(
+def get_review_by_id(
     review_id: int,
     db: Session = Depends(get_db),
     current_user: CurrentUser = None
@@ -1534,8 +1595,7 @@ async def get_review_by_id(
         # Query review with eager loading
         review = db.query(Review).options(
             joinedload(Review.entity),
-            joinedload(Review.user),
-            selectinload(Review.comments).joinedload(Comment.user)
+            joinedload(Review.user)
         ).filter(Review.review_id == review_id).first()
         
         if not review:
@@ -1589,7 +1649,7 @@ async def get_review_by_id(
         )
         
         # Get comments (limit to latest 10 for sharing)
-        comment_objs = sorted(review.comments, key=lambda c: c.created_at, reverse=True)[:10]
+        comment_objs = CommentPreviewLoader(db).load([review.review_id], 10)[review.review_id]
         comment_responses = []
         for comment in comment_objs:
             comment_reaction_summary = get_comment_reaction_summary_response(
@@ -1672,7 +1732,7 @@ async def get_review_by_id(
         )
 
 @router.get("/{review_id}/share-metadata", response_model=None, tags=["Shareable Reviews"])
-async def get_review_share_metadata(
+def get_review_share_metadata(
     review_id: int,
     db: Session = Depends(get_db)
 ):
@@ -1761,7 +1821,7 @@ async def get_review_share_metadata(
 # =============================================================================
 
 @router.get("/admin/counts/health", tags=["Admin - Count Validation"])
-async def get_count_health_check(
+def get_count_health_check(
     db: Session = Depends(get_db),
     current_user: RequiredUser = None  # Add proper admin authorization later
 ):
@@ -1794,7 +1854,7 @@ async def get_count_health_check(
         )
 
 @router.get("/admin/counts/report", tags=["Admin - Count Validation"])
-async def get_count_consistency_report(
+def get_count_consistency_report(
     db: Session = Depends(get_db),
     current_user: RequiredUser = None  # Add proper admin authorization later
 ):
@@ -1815,18 +1875,20 @@ async def get_count_consistency_report(
         )
 
 @router.post("/admin/counts/fix", tags=["Admin - Count Validation"])
-async def fix_count_inconsistencies(
+def fix_count_inconsistencies(
     db: Session = Depends(get_db),
     current_user: RequiredUser = None  # Add proper admin authorization later
 ):
-    """Automatically fix all count inconsistencies"""
+    """Queue a repair of all count inconsistencies; the job worker runs it"""
     try:
-        validation_service = CountValidationService(db)
-        result = validation_service.fix_all_inconsistencies()
+        # One repair at a time per minute: repeated clicks collapse into the same job
+        minute = datetime.now(timezone.utc).strftime("%Y%m%d%H%M")
+        job_id = enqueue(db, JOB_COUNTS_REPAIR, idempotency_key=f"counts:repair:{minute}", max_attempts=1)
+        db.commit()
         
         return api_response(
-            data=result,
-            message="Count inconsistencies fixed" if result.get("success") else "Failed to fix inconsistencies"
+            data={"job_id": job_id, "queued": job_id is not None},
+            message="Count repair queued" if job_id else "Count repair already queued"
         )
     except Exception as e:
         logger.error(f"Error fixing count inconsistencies: {str(e)}")
@@ -1836,7 +1898,7 @@ async def fix_count_inconsistencies(
         )
 
 @router.get("/admin/counts/triggers", tags=["Admin - Count Validation"])
-async def get_trigger_status(
+def get_trigger_status(
     db: Session = Depends(get_db),
     current_user: RequiredUser = None  # Add proper admin authorization later
 ):
@@ -1857,7 +1919,7 @@ async def get_trigger_status(
         )
 
 @router.get("/admin/counts/metrics", tags=["Admin - Count Validation"])
-async def get_count_performance_metrics(
+def get_count_performance_metrics(
     db: Session = Depends(get_db),
     current_user: RequiredUser = None  # Add proper admin authorization later
 ):
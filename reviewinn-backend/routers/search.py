@@ -1,9 +1,44 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from database import get_db
 from auth.production_dependencies import CurrentUser
+from core.responses import api_response, error_response
+from services.search_service import SearchService, SEARCH_TYPES
 
 router = APIRouter()
 
 @router.get("/")
-async def search(current_user: CurrentUser = None):
-    """Search endpoint - placeholder for now (public endpoint with optional auth)"""
-    return {"message": "Search endpoint - not implemented yet"} 
\ No newline at end of file
+def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Search query"),
+    types: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(SEARCH_TYPES)}"),
+    page: int = Query(1, ge=1, description="Page number (applies to each type)"),
+    limit: int = Query(10, ge=1, le=50, description="Results per type"),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = None
+):
+    """Unified ranked search across reviews, entities, users and categories (public endpoint with optional auth)"""
+    requested = [t.strip() for t in types.split(",")] if types else list(SEARCH_TYPES)
+    unknown = [t for t in requested if t not in SEARCH_TYPES]
+    if unknown:
+        return error_response(
+            message=f"Unknown search types: {', '.join(unknown)}",
+            status_code=400,
+            error_code="INVALID_SEARCH_TYPE"
+        )
+
+    results = SearchService(db).search(q, requested, limit=limit, offset=(page - 1) * limit)
+    return api_response(
+        data={"query": q, "page": page, "limit": limit, "results": results},
+        message="Search completed"
+    )
+
+@router.get("/suggest")
+def suggest(
+    q: str = Query(..., min_length=1, max_length=100, description="Prefix typed so far"),
+    limit: int = Query(8, ge=1, le=20),
+    db: Session = Depends(get_db)
+):
+    """Typeahead suggestions for entity, category and user names"""
+    return api_response(data={"query": q, "suggestions": SearchService(db).suggest(q, limit=limit)})
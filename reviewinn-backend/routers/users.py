@@ -9,6 +9,7 @@ from sqlalchemy.orm import Session
 # Enhanced imports with service layer
 from core.dependencies import get_user_service_dependency
 from auth.production_dependencies import CurrentUser, RequiredUser
+from auth.user_cache import get_user_cache
 from services.user_service import UserService
 from schemas.user import (
     UserResponse, 
@@ -185,7 +186,9 @@ async def update_current_user(
     Email and username updates may require additional verification.
     """
     try:
-        return user_service.update_user(current_user.user_id, update_data)
+        updated_user = user_service.update_user(current_user.user_id, update_data)
+        await get_user_cache().invalidate(current_user.user_id)
+        return updated_user
     except Exception as e:
         raise handle_service_error(e)
 
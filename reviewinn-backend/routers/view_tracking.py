@@ -2,12 +2,14 @@
 View Tracking Router - Industry Standard Implementation
 Provides endpoints for tracking views with rate limiting and fraud prevention
 """
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from typing import Dict, Any, Optional
+from datetime import datetime
 from database import get_db
 from models.user import User
 from services.view_tracking_service import ViewTrackingService
+from core.exceptions import NotFoundError
 from auth.production_dependencies import CurrentUser, RequiredUser
 
 from pydantic import BaseModel
@@ -143,6 +145,8 @@ async def track_entity_view(
 async def get_review_analytics(
     review_id: int,
     current_user: RequiredUser,
+    start: Optional[datetime] = Query(None, description="Range start (UTC if no offset); default 30 days before end"),
+    end: Optional[datetime] = Query(None, description="Range end (UTC if no offset); default now"),
     db: Session = Depends(get_db)
 ):
     """
@@ -154,6 +158,7 @@ async def get_review_analytics(
     Args:
         review_id: The ID of the review
         current_user: Authenticated user
+        start, end: Range reported in analytics["range"]
     
     Returns:
         ViewAnalyticsResponse with comprehensive analytics
@@ -165,7 +170,9 @@ async def get_review_analytics(
         # Get analytics (this method should check permissions internally)
         analytics = await view_service.get_review_analytics(
             review_id=review_id,
-            requesting_user=current_user
+            requesting_user=current_user,
+            start=start,
+            end=end
         )
         
         return ViewAnalyticsResponse(
@@ -182,6 +189,16 @@ async def get_review_analytics(
             status_code=403,
             detail="You don't have permission to view these analytics"
         )
+    except NotFoundError as e:
+        raise HTTPException(
+            status_code=404,
+            detail=e.message
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Error getting analytics for review {review_id}: {str(e)}")
         raise HTTPException(
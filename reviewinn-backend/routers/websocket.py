@@ -5,30 +5,8 @@ from typing import Dict, Any
 from datetime import datetime
 
 from database import get_db
-# Simple WebSocket implementation without complex connection manager
-class SimpleConnectionManager:
-    def __init__(self):
-        self.active_connections = {}  # Dictionary of user_id -> list of websockets
-        self.websocket_users = {}     # Dictionary of websocket -> user_id
-    
-    async def connect(self, websocket, user_id: int):
-        await websocket.accept()
-        if user_id not in self.active_connections:
-            self.active_connections[user_id] = []
-        self.active_connections[user_id].append(websocket)
-        self.websocket_users[websocket] = user_id
-        return True
-        
-    def disconnect(self, websocket):
-        if websocket in self.websocket_users:
-            user_id = self.websocket_users[websocket]
-            if user_id in self.active_connections:
-                self.active_connections[user_id] = [ws for ws in self.active_connections[user_id] if ws != websocket]
-                if not self.active_connections[user_id]:
-                    del self.active_connections[user_id]
-            del self.websocket_users[websocket]
-
-connection_manager = SimpleConnectionManager()
+# Shared with the notification service; routes to users connected to other workers
+from services.websocket_service import connection_manager
 from services.professional_messaging_service import ProfessionalMessagingService
 from auth.production_dependencies import CurrentUser, RequiredUser
 from models.user import User
@@ -73,10 +51,7 @@ async def websocket_endpoint(websocket: WebSocket, token: str, db: Session = Dep
         return
 
     # Register connection after authentication
-    if user.user_id not in connection_manager.active_connections:
-        connection_manager.active_connections[user.user_id] = []
-    connection_manager.active_connections[user.user_id].append(websocket)
-    connection_manager.websocket_users[websocket] = user.user_id
+    await connection_manager.register(websocket, user.user_id)
     
     # Send connection confirmation
     await websocket.send_text(json.dumps({
@@ -115,9 +90,8 @@ async def websocket_endpoint(websocket: WebSocket, token: str, db: Session = Dep
                     ).first()
                     
                     if participant:
-                        connection_manager.join_conversation(user.user_id, conversation_id)
+                        await connection_manager.join_conversation(user.user_id, conversation_id)
                         print(f"User {user.user_id} joined conversation {conversation_id}")
-                        print(f"Conversation participants: {connection_manager.conversation_participants.get(conversation_id, set())}")
                         
                         # Mark user as online in this conversation
                         await connection_manager.send_to_conversation(
@@ -136,7 +110,7 @@ async def websocket_endpoint(websocket: WebSocket, token: str, db: Session = Dep
                 # User leaves a conversation room
                 conversation_id = message_data.get("conversation_id")
                 if conversation_id:
-                    connection_manager.leave_conversation(user.user_id, conversation_id)
+                    await connection_manager.leave_conversation(user.user_id, conversation_id)
                     
                     # Mark user as offline in this conversation
                     await connection_manager.send_to_conversation(
@@ -196,10 +170,7 @@ async def websocket_endpoint(websocket: WebSocket, token: str, db: Session = Dep
                             "conversation_id": conversation_id  # Add this for frontend matching
                         }
                         
-                        # Send to OTHER participants (exclude sender)
                         print(f"Broadcasting message from user {user.user_id} to conversation {conversation_id}")
-                        print(f"Conversation participants: {connection_manager.conversation_participants.get(conversation_id, set())}")
-                        print(f"Online users: {connection_manager.get_online_users()}")
                         
                         # Get all participants from database and send to each online participant
                         from models.conversation import ConversationParticipant
@@ -214,21 +185,12 @@ async def websocket_endpoint(websocket: WebSocket, token: str, db: Session = Dep
                             "message": message_data
                         }
                         
-                        print(f"📤 Broadcast message structure: {broadcast_message}")
-                        print(f"📤 Message data conversation_id: {message_data.get('conversation_id')}")
-                        print(f"📤 Outer conversation_id: {conversation_id}")
-                        
-                        # Send to OTHER participants (exclude sender to avoid duplicates)
-                        for participant in db_participants:
-                            if participant.user_id != user.user_id:  # Don't send to sender
-                                print(f"🔄 Sending message to participant {participant.user_id} (excluding sender {user.user_id})")
-                                if participant.user_id in connection_manager.active_connections:
-                                    print(f"✅ Participant {participant.user_id} is online, sending message")
-                                    await connection_manager.send_to_user(participant.user_id, broadcast_message)
-                                else:
-                                    print(f"❌ Participant {participant.user_id} is offline, skipping")
-                            else:
-                                print(f"⚠️ Skipping sender {user.user_id} to avoid duplicate")
+                        # Send to OTHER participants (exclude sender to avoid duplicates);
+                        # offline participants are skipped by the broker
+                        await connection_manager.send_to_users(
+                            [p.user_id for p in db_participants if p.user_id != user.user_id],
+                            broadcast_message
+                        )
                         
                         # Send confirmation to sender
                         await connection_manager.send_personal_message({
@@ -333,36 +295,29 @@ async def websocket_endpoint(websocket: WebSocket, token: str, db: Session = Dep
         print(f"User {user.user_id} disconnected")
         
         # Remove websocket from user's connections
-        if user.user_id in connection_manager.active_connections:
-            if websocket in connection_manager.active_connections[user.user_id]:
-                connection_manager.active_connections[user.user_id].remove(websocket)
-            if not connection_manager.active_connections[user.user_id]:
-                del connection_manager.active_connections[user.user_id]
-        
-        if websocket in connection_manager.websocket_users:
-            del connection_manager.websocket_users[websocket]
+        await connection_manager.disconnect(websocket)
         
-        # Notify conversations that user went offline (only if no other connections)
-        if user.user_id not in connection_manager.active_connections:
-            for conversation_id in list(connection_manager.conversation_participants.keys()):
-                if user.user_id in connection_manager.conversation_participants[conversation_id]:
-                    connection_manager.leave_conversation(user.user_id, conversation_id)
-                    
-                    # Get all participants from database and notify them
-                    from models.conversation import ConversationParticipant
-                    db_participants = db.query(ConversationParticipant).filter(
-                        ConversationParticipant.conversation_id == conversation_id,
-                        ConversationParticipant.status == 'active'
-                    ).all()
-                    
-                    for participant in db_participants:
-                        if participant.user_id != user.user_id:
-                            await connection_manager.send_to_user(participant.user_id, {
-                                "type": "user_offline",
-                                "user_id": user.user_id,
-                                "username": user.username,
-                                "conversation_id": conversation_id
-                            })
+        # Notify conversations that user went offline (only if no other connections on any worker)
+        if not await connection_manager.is_user_online(user.user_id):
+            for conversation_id in connection_manager.get_user_conversations(user.user_id):
+                await connection_manager.leave_conversation(user.user_id, conversation_id)
+                
+                # Get all participants from database and notify them
+                from models.conversation import ConversationParticipant
+                db_participants = db.query(ConversationParticipant).filter(
+                    ConversationParticipant.conversation_id == conversation_id,
+                    ConversationParticipant.status == 'active'
+                ).all()
+                
+                await connection_manager.send_to_users(
+                    [p.user_id for p in db_participants if p.user_id != user.user_id],
+                    {
+                        "type": "user_offline",
+                        "user_id": user.user_id,
+                        "username": user.username,
+                        "conversation_id": conversation_id
+                    }
+                )
 
 @router.websocket("/ws/notifications/{token}")
 async def notifications_websocket_endpoint(websocket: WebSocket, token: str, db: Session = Depends(get_db)):
@@ -380,7 +335,7 @@ async def notifications_websocket_endpoint(websocket: WebSocket, token: str, db:
     print(f"Notifications WebSocket: User {user.user_id} connected")
     
     # Add user to connection manager
-    connection_manager.connect(user.user_id, websocket)
+    await connection_manager.register(websocket, user.user_id)
     
     try:
         # Send initial connection message
@@ -455,17 +410,11 @@ async def notifications_websocket_endpoint(websocket: WebSocket, token: str, db:
         print(f"Notifications WebSocket: User {user.user_id} disconnected")
         
         # Remove websocket from user's connections
-        if user.user_id in connection_manager.active_connections:
-            if websocket in connection_manager.active_connections[user.user_id]:
-                connection_manager.active_connections[user.user_id].remove(websocket)
-            if not connection_manager.active_connections[user.user_id]:
-                del connection_manager.active_connections[user.user_id]
-        
-        if websocket in connection_manager.websocket_users:
-            del connection_manager.websocket_users[websocket]
+        await connection_manager.disconnect(websocket)
     
     except Exception as e:
         print(f"Notifications WebSocket error: {str(e)}")
+        await connection_manager.disconnect(websocket)
         await websocket.close(code=1011)  # 1011 = Internal Error
 
 async def get_user_from_websocket_token(token: str, db: Session) -> User:
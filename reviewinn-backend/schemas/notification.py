@@ -77,12 +77,13 @@ class NotificationSummary(BaseModel):
 class NotificationListResponse(BaseModel):
     """Enterprise paginated notification response."""
     notifications: List[NotificationRead]
-    total: int
+    total: Optional[int] = None  # None when paging by cursor
     page: int
     limit: int
-    pages: int
+    pages: Optional[int] = None
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = None
     
 class NotificationDropdownResponse(BaseModel):
     """Optimized response for notification dropdown modal."""
@@ -1,202 +1,225 @@
 """
 Badge Service - Automatic Badge Awarding System
 Handles badge criteria evaluation and automatic awarding
+
+Badge criteria are compiled into SQL conditions on ``core_users`` so one
+INSERT ... SELECT awards a badge to every qualifying user at once. Events
+(review created, reaction received, streak day) only re-check the badges
+whose criteria the event can change, for the one user involved. A full
+re-evaluation runs as a BadgeEvaluationJob in the background, in user id
+chunks, and resumes from its saved cursor after a restart.
 """
-from typing import List, Dict, Any, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+from sqlalchemy import BigInteger, and_, exists, false, func, literal, or_, select, text, true
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
+
+from database import SessionLocal
 from models.user import User
 from models.review import Review
 from models.badge_definition import BadgeDefinition
 from models.badge_award import BadgeAward
-import json
-from datetime import datetime, timedelta
+from models.badge_evaluation_job import BadgeEvaluationJob
 
-class BadgeService:
-    """Service for managing badge awards and evaluation"""
-    
-    def __init__(self, db: Session):
-        self.db = db
-    
-    def evaluate_user_badges(self, user_id: int) -> List[BadgeAward]:
-        """Evaluate all potential badges for a user and award new ones"""
-        user = self.db.query(User).filter(User.user_id == user_id).first()
-        if not user:
-            return []
-        
-        # Get all badge definitions
-        badge_definitions = self.db.query(BadgeDefinition).all()
-        
-        newly_awarded = []
-        
-        for badge_def in badge_definitions:
-            # Check if user already has this badge
-            existing_award = self.db.query(BadgeAward).filter(
-                and_(
-                    BadgeAward.user_id == user_id,
-                    BadgeAward.badge_definition_id == badge_def.badge_definition_id
-                )
-            ).first()
-            if existing_award:
-                continue
-            
-            # Evaluate criteria
-            if self._evaluate_criteria(user, badge_def.criteria):
-                # Award the badge
-                award = self._award_badge(user_id, badge_def.badge_definition_id)
-                if award:
-                    newly_awarded.append(award)
-        
-        return newly_awarded
-    
-    def _evaluate_criteria(self, user: User, criteria: Dict[str, Any]) -> bool:
-        """Evaluate if user meets badge criteria"""
-        try:
-            criteria_type = criteria.get('type', 'simple')
-            
-            if criteria_type == 'simple':
-                return self._evaluate_simple_criteria(user, criteria)
-            elif criteria_type == 'complex':
-                return self._evaluate_complex_criteria(user, criteria)
-            elif criteria_type == 'composite':
-                return self._evaluate_composite_criteria(user, criteria)
-            
-            return False
-        except Exception as e:
-            print(f"Error evaluating criteria: {e}")
-            return False
-    
-    def _evaluate_simple_criteria(self, user: User, criteria: Dict[str, Any]) -> bool:
-        """Evaluate simple numeric criteria"""
+logger = logging.getLogger(__name__)
+
+# Events that can make a user qualify for new badges
+EVENT_REVIEW_CREATED = 'review_created'
+EVENT_REACTION_RECEIVED = 'reaction_received'
+EVENT_STREAK_DAY = 'streak_day'
+EVENT_PROFILE_UPDATED = 'profile_updated'
+
+# Criteria keys / condition types each event can change
+_EVENT_CRITERIA = {
+    EVENT_REVIEW_CREATED: {'reviews_count', 'review_streak', 'review_quality', 'time_period', 'points', 'level'},
+    EVENT_REACTION_RECEIVED: {'points', 'level'},
+    EVENT_STREAK_DAY: {'review_streak', 'time_period'},
+    EVENT_PROFILE_UPDATED: {'verified'},
+}
+
+# Users per transaction in a full re-evaluation
+EVALUATION_CHUNK_SIZE = 50000
+JOB_POLL_INTERVAL = 10
+
+# pg advisory lock key so only one process runs evaluation jobs
+_JOB_LOCK_KEY = 7246004
+
+
+def compile_criteria(criteria: Dict[str, Any]):
+    """
+    SQL condition on ``User`` that holds for users meeting ``criteria``,
+    or None for criteria types that are not evaluated automatically.
+    """
+    criteria_type = criteria.get('type', 'simple')
+
+    if criteria_type == 'simple':
+        clauses = []
         for key, required_value in criteria.items():
-            if key == 'type':
-                continue
-                
             if key == 'reviews_count':
-                actual_count = self.db.query(Review).filter(Review.user_id == user.user_id).count()
-                if actual_count < required_value:
-                    return False
-            
+                clauses.append(_min_reviews_clause(required_value))
             elif key == 'verified':
-                if user.is_verified != required_value:
-                    return False
-            
+                clauses.append(User.is_verified == required_value)
             elif key == 'points':
-                if user.points < required_value:
-                    return False
-            
+                clauses.append(User.points >= required_value)
             elif key == 'level':
-                if user.level < required_value:
-                    return False
-            
+                clauses.append(User.level >= required_value)
             # Add more criteria as needed
-        
-        return True
-    
-    def _evaluate_complex_criteria(self, user: User, criteria: Dict[str, Any]) -> bool:
-        """Evaluate complex criteria with time periods, aggregations, etc."""
-        conditions = criteria.get('conditions', [])
-        operator = criteria.get('operator', 'AND')  # AND/OR
-        
-        results = []
-        
-        for condition in conditions:
+        return and_(true(), *clauses)
+
+    if criteria_type == 'complex':
+        clauses = []
+        for condition in criteria.get('conditions', []):
             condition_type = condition.get('type')
-            
             if condition_type == 'review_streak':
-                # Check daily review streak
-                streak_days = condition.get('days', 7)
-                result = self._check_review_streak(user.user_id, streak_days)
-                results.append(result)
-            
+                # A review on each of the last ``days`` days, today included
+                days = condition.get('days', 7)
+                clauses.append(User.user_id.in_(
+                    select(Review.user_id)
+                    .where(Review.created_at >= func.current_date() - (days - 1))
+                    .group_by(Review.user_id)
+                    .having(func.count(func.distinct(func.date(Review.created_at))) >= days)
+                ))
             elif condition_type == 'review_quality':
-                # Check average rating received
-                min_avg_rating = condition.get('min_rating', 4.0)
-                result = self._check_review_quality(user.user_id, min_avg_rating)
-                results.append(result)
-            
+                min_rating = condition.get('min_rating', 4.0)
+                clauses.append(User.user_id.in_(
+                    select(Review.user_id)
+                    .group_by(Review.user_id)
+                    .having(func.avg(Review.overall_rating) >= min_rating)
+                ))
             elif condition_type == 'time_period':
-                # Check activity within time period
                 days = condition.get('days', 30)
                 min_reviews = condition.get('min_reviews', 1)
-                result = self._check_time_period_activity(user.user_id, days, min_reviews)
-                results.append(result)
-        
-        # Apply operator
-        if operator == 'OR':
-            return any(results)
-        else:  # Default to AND
-            return all(results)
-    
-    def _evaluate_composite_criteria(self, user: User, criteria: Dict[str, Any]) -> bool:
-        """Evaluate composite criteria (combination of multiple badge requirements)"""
+                cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+                clauses.append(_min_reviews_clause(min_reviews, Review.created_at >= cutoff))
+        if criteria.get('operator', 'AND') == 'OR':
+            return or_(false(), *clauses)
+        return and_(true(), *clauses)
+
+    if criteria_type == 'composite':
         required_badges = criteria.get('required_badges', [])
-        
-        # Check if user has all required badges
-        for badge_name in required_badges:
-            badge_def = self.db.query(BadgeDefinition).filter(
-                BadgeDefinition.name == badge_name
-            ).first()
-            
-            if not badge_def:
-                continue
-            
-            award = self.db.query(BadgeAward).filter(
-                and_(
-                    BadgeAward.user_id == user.user_id,
-                    BadgeAward.badge_definition_id == badge_def.badge_definition_id
-                )
-            ).first()
-            
-            if not award:
-                return False
-        
-        return True
-    
-    def _check_review_streak(self, user_id: int, required_days: int) -> bool:
-        """Check if user has maintained a review streak"""
-        # Implementation for checking consecutive days with reviews
-        # This is a simplified version - you'd want more sophisticated logic
-        
-        today = datetime.now().date()
-        consecutive_days = 0
-        
-        for i in range(required_days):
-            check_date = today - timedelta(days=i)
-            review_count = self.db.query(Review).filter(
-                and_(
-                    Review.user_id == user_id,
-                    func.date(Review.created_at) == check_date
-                )
-            ).count()
-            
-            if review_count > 0:
-                consecutive_days += 1
-            else:
-                break
-        
-        return consecutive_days >= required_days
-    
-    def _check_review_quality(self, user_id: int, min_rating: float) -> bool:
-        """Check average rating of user's reviews"""
-        avg_rating = self.db.query(func.avg(Review.rating)).filter(
-            Review.user_id == user_id
-        ).scalar()
-        
-        return avg_rating and avg_rating >= min_rating
-    
-    def _check_time_period_activity(self, user_id: int, days: int, min_reviews: int) -> bool:
-        """Check activity within specified time period"""
-        cutoff_date = datetime.now() - timedelta(days=days)
-        review_count = self.db.query(Review).filter(
-            and_(
-                Review.user_id == user_id,
-                Review.created_at >= cutoff_date
-            )
-        ).count()
-        
-        return review_count >= min_reviews
-    
+        if not required_badges:
+            return true()
+        # Every listed badge that exists must already be awarded
+        required_ids = select(BadgeDefinition.badge_definition_id).where(BadgeDefinition.name.in_(required_badges))
+        required_count = select(func.count()).select_from(required_ids.subquery()).scalar_subquery()
+        return User.user_id.in_(
+            select(BadgeAward.user_id)
+            .where(BadgeAward.badge_definition_id.in_(required_ids))
+            .group_by(BadgeAward.user_id)
+            .having(func.count(func.distinct(BadgeAward.badge_definition_id)) >= required_count)
+        )
+
+    return None
+
+
+def _min_reviews_clause(min_reviews: int, *conditions):
+    if not min_reviews or min_reviews <= 0:
+        return true()
+    return User.user_id.in_(
+        select(Review.user_id).where(*conditions).group_by(Review.user_id).having(func.count() >= min_reviews)
+    )
+
+
+def _criteria_keys(criteria: Dict[str, Any]) -> Set[str]:
+    criteria_type = criteria.get('type', 'simple')
+    if criteria_type == 'complex':
+        return {condition.get('type') for condition in criteria.get('conditions', [])}
+    if criteria_type == 'composite':
+        return {'badges'}
+    return set(criteria) - {'type'}
+
+
+def _evaluation_order(definitions: List[BadgeDefinition]) -> List[BadgeDefinition]:
+    """Composite badges last, so the badges they require are awarded first."""
+    return sorted(
+        definitions,
+        key=lambda d: ((d.criteria or {}).get('type') == 'composite', d.badge_definition_id)
+    )
+
+
+class BadgeService:
+    """Service for managing badge awards and evaluation"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def evaluate_user_badges(self, user_id: int) -> List[BadgeAward]:
+        """Evaluate all potential badges for a user and award new ones"""
+        return self._evaluate_for_user(user_id, self._definitions())
+
+    def evaluate_event(self, user_id: int, event: str) -> List[BadgeAward]:
+        """Award the badges ``event`` may have earned ``user_id``; other badges are not checked."""
+        affected = _EVENT_CRITERIA.get(event, set())
+        all_definitions = self._definitions()
+        definitions = [d for d in all_definitions if _criteria_keys(d.criteria or {}) & affected]
+        if not definitions:
+            return []
+        # Composite badges depend on other badges, so check them only once one is awarded
+        composites = [
+            d for d in all_definitions
+            if (d.criteria or {}).get('type') == 'composite' and d not in definitions
+        ]
+        return self._evaluate_for_user(user_id, definitions, composites)
+
+    def _definitions(self) -> List[BadgeDefinition]:
+        return _evaluation_order(self.db.query(BadgeDefinition).all())
+
+    def _evaluate_for_user(
+        self,
+        user_id: int,
+        definitions: List[BadgeDefinition],
+        composites: Optional[List[BadgeDefinition]] = None
+    ) -> List[BadgeAward]:
+        """One INSERT ... SELECT per badge, limited to ``user_id``; composites only run if something was awarded."""
+        try:
+            award_ids = []
+            for badge_def in definitions:
+                award_ids += [award_id for award_id, _ in self._award_qualifying(badge_def, User.user_id == user_id)]
+            if award_ids and composites:
+                for badge_def in composites:
+                    award_ids += [award_id for award_id, _ in self._award_qualifying(badge_def, User.user_id == user_id)]
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error evaluating badges for user {user_id}: {e}")
+            return []
+
+        if not award_ids:
+            return []
+        return self.db.query(BadgeAward).options(
+            joinedload(BadgeAward.badge_definition)
+        ).filter(BadgeAward.award_id.in_(award_ids)).all()
+
+    def _award_qualifying(self, badge_def: BadgeDefinition, *user_filters) -> List[Tuple[int, int]]:
+        """Award ``badge_def`` to every active user matching its criteria and ``user_filters``; returns (award_id, user_id)."""
+        condition = compile_criteria(badge_def.criteria or {})
+        if condition is None:
+            return []
+
+        badge_id = badge_def.badge_definition_id
+        qualifying = select(
+            User.user_id, literal(badge_id, BigInteger)
+        ).where(
+            User.is_active == True,
+            condition,
+            ~exists().where(
+                BadgeAward.user_id == User.user_id,
+                BadgeAward.badge_definition_id == badge_id
+            ),
+            *user_filters
+        )
+        return self.db.execute(
+            pg_insert(BadgeAward)
+            .from_select(['user_id', 'badge_definition_id'], qualifying)
+            .on_conflict_do_nothing()
+            .returning(BadgeAward.award_id, BadgeAward.user_id)
+        ).all()
+
     def _award_badge(self, user_id: int, badge_definition_id: int) -> Optional[BadgeAward]:
         """Award a badge to a user"""
         try:
@@ -205,22 +228,89 @@ class BadgeService:
                 user_id=user_id,
                 badge_definition_id=badge_definition_id
             )
-            
+
             self.db.add(award)
             self.db.commit()
             return award
-            
+
         except Exception as e:
             self.db.rollback()
-            print(f"Error awarding badge: {e}")
+            logger.error(f"Error awarding badge: {e}")
             return None
-    
+
+    # === Full re-evaluation ===
+
+    def start_evaluation_job(self, requested_by: Optional[int] = None) -> BadgeEvaluationJob:
+        """Queue a full re-evaluation, or return the one already queued or running."""
+        job = self.db.query(BadgeEvaluationJob).filter(
+            BadgeEvaluationJob.status.in_(['pending', 'running'])
+        ).order_by(BadgeEvaluationJob.job_id).first()
+        if job:
+            return job
+
+        job = BadgeEvaluationJob(status='pending', requested_by=requested_by)
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def get_evaluation_job(self, job_id: int) -> Optional[BadgeEvaluationJob]:
+        return self.db.get(BadgeEvaluationJob, job_id)
+
+    def run_evaluation_job(self, job: BadgeEvaluationJob, chunk_size: int = EVALUATION_CHUNK_SIZE) -> None:
+        """
+        Award every badge to all qualifying users, ``chunk_size`` user ids per
+        transaction. The job row is updated in the same transaction as each
+        chunk's awards, so after a crash the job continues from its cursor.
+        """
+        definitions = [d for d in self._definitions() if compile_criteria(d.criteria or {}) is not None]
+        ids = [d.badge_definition_id for d in definitions]
+
+        if job.status == 'pending':
+            job.status = 'running'
+            job.started_at = datetime.now(timezone.utc)
+            job.total_badges = len(definitions)
+            job.max_user_id = self.db.query(func.max(User.user_id)).scalar() or 0
+            self.db.commit()
+
+        start = ids.index(job.badge_definition_id) if job.badge_definition_id in ids else job.badges_done
+        try:
+            for position in range(start, len(definitions)):
+                badge_def = definitions[position]
+                if job.badge_definition_id != badge_def.badge_definition_id:
+                    job.badge_definition_id = badge_def.badge_definition_id
+                    job.last_user_id = 0
+
+                while job.last_user_id < job.max_user_id:
+                    upper = min(job.last_user_id + chunk_size, job.max_user_id)
+                    awarded = self._award_qualifying(
+                        badge_def, User.user_id > job.last_user_id, User.user_id <= upper
+                    )
+                    job.awarded_count += len(awarded)
+                    job.last_user_id = upper
+                    self.db.commit()
+
+                job.badges_done = position + 1
+                self.db.commit()
+
+            job.status = 'completed'
+            job.finished_at = datetime.now(timezone.utc)
+            self.db.commit()
+            logger.info(f"Badge evaluation job {job.job_id} awarded {job.awarded_count} badges")
+        except Exception as e:
+            self.db.rollback()
+            job.status = 'failed'
+            job.error = str(e)
+            job.finished_at = datetime.now(timezone.utc)
+            self.db.commit()
+            logger.error(f"Badge evaluation job {job.job_id} failed: {e}")
+
     def get_user_badges(self, user_id: int) -> List[Dict[str, Any]]:
         """Get all badges for a user"""
         awards = self.db.query(BadgeAward).filter(
             BadgeAward.user_id == user_id
         ).join(BadgeDefinition).all()
-        
+
         result = []
         for award in awards:
             result.append({
@@ -234,19 +324,19 @@ class BadgeService:
                 },
                 "awarded_at": award.awarded_at.isoformat() if award.awarded_at else None
             })
-        
+
         return result
-    
+
     def get_available_badges(self, user_id: int) -> List[Dict[str, Any]]:
         """Get badges that user hasn't earned yet"""
         earned_badge_ids = self.db.query(BadgeAward.badge_definition_id).filter(
             BadgeAward.user_id == user_id
         ).subquery()
-        
+
         available_badges = self.db.query(BadgeDefinition).filter(
             BadgeDefinition.badge_definition_id.notin_(earned_badge_ids)
         ).all()
-        
+
         result = []
         for badge in available_badges:
             result.append({
@@ -256,5 +346,85 @@ class BadgeService:
                 "image_url": badge.image_url,
                 "criteria": badge.criteria
             })
-        
+
         return result
+
+
+def award_badges_for_event(db: Session, user_id: Optional[int], event: str) -> List[BadgeAward]:
+    """Evaluate event-affected badges for ``user_id``; never raises, so callers' writes are unaffected."""
+    if not user_id:
+        return []
+    try:
+        awards = BadgeService(db).evaluate_event(user_id, event)
+        if awards:
+            logger.info(f"Awarded {len(awards)} badges to user {user_id} after {event}")
+        return awards
+    except Exception as e:
+        logger.error(f"Badge evaluation after {event} failed for user {user_id}: {e}")
+        return []
+
+
+def run_pending_evaluation_jobs() -> int:
+    """Run queued or interrupted evaluation jobs; returns how many were run."""
+    db = SessionLocal()
+    try:
+        # Held on its own connection: the session commits per chunk and may
+        # not keep the same pooled connection throughout
+        with db.get_bind().connect() as lock_conn:
+            if not lock_conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": _JOB_LOCK_KEY}).scalar():
+                return 0
+            try:
+                service = BadgeService(db)
+                ran = 0
+                while True:
+                    # 'running' here means its process died mid-job: resume it
+                    job = db.query(BadgeEvaluationJob).filter(
+                        BadgeEvaluationJob.status.in_(['pending', 'running'])
+                    ).order_by(BadgeEvaluationJob.job_id).first()
+                    if job is None:
+                        return ran
+                    service.run_evaluation_job(job)
+                    ran += 1
+            finally:
+                lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _JOB_LOCK_KEY})
+    finally:
+        db.close()
+
+
+class BadgeEvaluationRunner:
+    """Background task that picks up badge evaluation jobs."""
+
+    def __init__(self, interval: float = JOB_POLL_INTERVAL):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await run_in_threadpool(run_pending_evaluation_jobs)
+            except Exception as e:
+                logger.error(f"Badge evaluation runner failed: {e}")
+            await asyncio.sleep(self.interval)
+
+# Global runner instance
+_badge_evaluation_runner: Optional[BadgeEvaluationRunner] = None
+
+def get_badge_evaluation_runner() -> BadgeEvaluationRunner:
+    """Get badge evaluation runner singleton"""
+    global _badge_evaluation_runner
+    if _badge_evaluation_runner is None:
+        _badge_evaluation_runner = BadgeEvaluationRunner()
+    return _badge_evaluation_runner
@@ -6,9 +6,9 @@ import json
 import pickle
 from typing import Optional, Any, Union, Dict, List
 from datetime import datetime, timedelta
-import redis
 import logging
 from core.config.settings import get_settings
+from core.config.redis_client import RedisAvailability, get_pubsub_client, get_redis_client, is_connection_error
 from core.exceptions import CacheError
 
 logger = logging.getLogger(__name__)
@@ -16,7 +16,11 @@ settings = get_settings()
 
 
 class CacheService:
-    """Redis-based caching service with enhanced functionality."""
+    """Redis-based caching service with enhanced functionality.
+
+    Uses ``redis.asyncio`` on a shared connection pool so cache calls never
+    block the event loop; multi-command writes are sent as one pipeline.
+    """
     
     def __init__(self, redis_url: str = None):
         """Initialize cache service with Redis connection."""
@@ -40,31 +44,33 @@ class CacheService:
                 logger.warning(f"Using fallback Redis URL: {self.redis_url}")
                 
         self._redis = None
+        self._availability = RedisAvailability()
         self.enabled = True
         self._connect()
     
     def _connect(self):
-        """Establish Redis connection."""
+        """Create the async Redis client; the connection is verified lazily on first use."""
         try:
-            self._redis = redis.from_url(
-                self.redis_url,
-                decode_responses=False,  # We handle encoding ourselves
-                socket_connect_timeout=5,
-                socket_timeout=5,
-                retry_on_timeout=True
-            )
-            # Test connection
-            if self._redis:
-                self._redis.ping()
-                logger.info("Redis cache service connected successfully")
+            self._redis = get_redis_client(self.redis_url)
         except Exception as e:
-            logger.warning(f"Failed to connect to Redis: {e}. Caching is DISABLED.")
+            logger.warning(f"Failed to configure Redis: {e}. Caching is DISABLED.")
             self.enabled = False
             self._redis = None
     
-    async def get(self, key: str, default: Any = None) -> Optional[Any]:
+    async def _client(self):
+        """Return the Redis client when caching is enabled and Redis is reachable."""
         if not self.enabled or not self._redis:
-            return default
+            return None
+        if not await self._availability.check(self._redis):
+            return None
+        return self._redis
+    
+    def _handle_error(self, error: Exception) -> None:
+        """Back off from Redis when the failure was a connection problem."""
+        if is_connection_error(error):
+            self._availability.mark_failed()
+    
+    async def get(self, key: str, default: Any = None) -> Optional[Any]:
         """
         Get value from cache.
         
@@ -75,21 +81,38 @@ class CacheService:
         Returns:
             Cached value or default
         """
+        client = await self._client()
+        if client is None:
+            return default
         try:
-            value = self._redis.get(self._make_key(key))
+            value = await client.get(self._make_key(key))
             if value is None:
                 return default
             
-            # Try JSON first, then pickle
-            try:
-                return json.loads(value.decode('utf-8'))
-            except (json.JSONDecodeError, UnicodeDecodeError):
-                return pickle.loads(value)
+            return self._deserialize(value)
                 
         except Exception as e:
+            self._handle_error(e)
             logger.warning(f"Cache get failed for key {key}: {e}")
             return default
     
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Get several keys in one round trip; missing keys are omitted."""
+        client = await self._client()
+        if client is None or not keys:
+            return {}
+        try:
+            values = await client.mget([self._make_key(key) for key in keys])
+            return {
+                key: self._deserialize(value)
+                for key, value in zip(keys, values)
+                if value is not None
+            }
+        except Exception as e:
+            self._handle_error(e)
+            logger.warning(f"Cache get_many failed: {e}")
+            return {}
+    
     async def set(
         self, 
         key: str, 
@@ -97,230 +120,225 @@ class CacheService:
         ttl: int = None,
         serialize_method: str = "json"
     ) -> bool:
-        if not self.enabled or not self._redis:
+        client = await self._client()
+        if client is None:
             return False
         try:
             ttl = ttl if ttl is not None else getattr(settings, 'CACHE_TTL', 3600)
             if serialize_method == "json":
-                try:
-                    serialized_value = json.dumps(value, default=str)
-                except (TypeError, ValueError):
-                    serialized_value = pickle.dumps(value)
+                serialized_value = self._serialize(value)
             else:
                 serialized_value = pickle.dumps(value)
-            return self._redis.setex(
+            return await client.setex(
                 self._make_key(key),
                 ttl,
                 serialized_value
             )
         except Exception as e:
+            self._handle_error(e)
             logger.error(f"Cache set failed for key {key}: {e}")
             return False
     
     async def delete(self, key: str) -> bool:
-        if not self.enabled or not self._redis:
-            return False
         """Delete key from cache."""
+        client = await self._client()
+        if client is None:
+            return False
         try:
-            return bool(self._redis.delete(self._make_key(key)))
+            return bool(await client.delete(self._make_key(key)))
         except Exception as e:
+            self._handle_error(e)
             logger.error(f"Cache delete failed for key {key}: {e}")
             return False
     
     async def delete_pattern(self, pattern: str) -> int:
-        if not self.enabled or not self._redis:
-            return 0
         """Delete all keys matching pattern."""
-        try:
-            keys = self._redis.keys(self._make_key(pattern))
-            if keys:
-                return self._redis.delete(*keys)
+        client = await self._client()
+        if client is None:
             return 0
+        try:
+            # SCAN instead of KEYS so large keyspaces don't block Redis
+            deleted = 0
+            batch = []
+            async for cache_key in client.scan_iter(match=self._make_key(pattern), count=500):
+                batch.append(cache_key)
+                if len(batch) >= 500:
+                    deleted += await client.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += await client.unlink(*batch)
+            return deleted
         except Exception as e:
+            self._handle_error(e)
             logger.error(f"Cache delete pattern failed for {pattern}: {e}")
             return 0
     
     async def exists(self, key: str) -> bool:
-        if not self.enabled or not self._redis:
-            return False
         """Check if key exists in cache."""
+        client = await self._client()
+        if client is None:
+            return False
         try:
-            return bool(self._redis.exists(self._make_key(key)))
+            return bool(await client.exists(self._make_key(key)))
         except Exception as e:
+            self._handle_error(e)
             logger.error(f"Cache exists check failed for key {key}: {e}")
             return False
     
     async def increment(self, key: str, amount: int = 1, ttl: int = None) -> int:
-        if not self.enabled or not self._redis:
-            return 0
         """Increment numeric value in cache."""
+        client = await self._client()
+        if client is None:
+            return 0
         try:
             cache_key = self._make_key(key)
-            value = self._redis.incr(cache_key, amount)
-            
-            if ttl:
-                self._redis.expire(cache_key, ttl)
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.incr(cache_key, amount)
+                if ttl:
+                    pipe.expire(cache_key, ttl)
+                results = await pipe.execute()
             
-            return value
+            return results[0]
         except Exception as e:
+            self._handle_error(e)
             logger.error(f"Cache increment failed for key {key}: {e}")
             return 0
     
     async def set_hash(self, key: str, mapping: Dict[str, Any], ttl: int = None) -> bool:
-        if not self.enabled or not self._redis:
+        client = await self._client()
+        if client is None:
             return False
         try:
             cache_key = self._make_key(key)
-            serialized_mapping = {}
-            for k, v in mapping.items():
-                try:
-                    serialized_mapping[k] = json.dumps(v, default=str)
-                except (TypeError, ValueError):
-                    serialized_mapping[k] = pickle.dumps(v)
-            result = self._redis.hmset(cache_key, serialized_mapping)
+            serialized_mapping = {k: self._serialize(v) for k, v in mapping.items()}
             ttl_val = ttl if ttl is not None else getattr(settings, 'CACHE_TTL', 3600)
-            if ttl_val:
-                self._redis.expire(cache_key, ttl_val)
-            return result
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.hset(cache_key, mapping=serialized_mapping)
+                if ttl_val:
+                    pipe.expire(cache_key, ttl_val)
+                await pipe.execute()
+            return True
         except Exception as e:
+            self._handle_error(e)
             logger.error(f"Cache set hash failed for key {key}: {e}")
             return False
     
     async def get_hash(self, key: str, field: str = None) -> Union[Dict[str, Any], Any, None]:
-        if not self.enabled or not self._redis:
-            return None
         """Get hash or hash field from cache."""
+        client = await self._client()
+        if client is None:
+            return None
         try:
             cache_key = self._make_key(key)
             
             if field:
                 # Get single field
-                value = self._redis.hget(cache_key, field)
+                value = await client.hget(cache_key, field)
                 if value is None:
                     return None
                 
-                try:
-                    return json.loads(value.decode('utf-8'))
-                except (json.JSONDecodeError, UnicodeDecodeError):
-                    return pickle.loads(value)
+                return self._deserialize(value)
             else:
                 # Get all fields
-                hash_data = self._redis.hgetall(cache_key)
+                hash_data = await client.hgetall(cache_key)
                 if not hash_data:
                     return None
                 
-                result = {}
-                for k, v in hash_data.items():
-                    try:
-                        result[k.decode('utf-8')] = json.loads(v.decode('utf-8'))
-                    except (json.JSONDecodeError, UnicodeDecodeError):
-                        result[k.decode('utf-8')] = pickle.loads(v)
-                
-                return result
+                return {k.decode('utf-8'): self._deserialize(v) for k, v in hash_data.items()}
                 
         except Exception as e:
+            self._handle_error(e)
             logger.error(f"Cache get hash failed for key {key}: {e}")
             return None
     
     async def set_list(self, key: str, items: List[Any], ttl: int = None) -> bool:
-        if not self.enabled or not self._redis:
+        client = await self._client()
+        if client is None:
             return False
         try:
             cache_key = self._make_key(key)
-            self._redis.delete(cache_key)
-            for item in items:
-                try:
-                    serialized_item = json.dumps(item, default=str)
-                except (TypeError, ValueError):
-                    serialized_item = pickle.dumps(item)
-                self._redis.rpush(cache_key, serialized_item)
             ttl_val = ttl if ttl is not None else getattr(settings, 'CACHE_TTL', 3600)
-            if ttl_val:
-                self._redis.expire(cache_key, ttl_val)
+            # Replace the list atomically so readers never see a partial list
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.delete(cache_key)
+                if items:
+                    pipe.rpush(cache_key, *[self._serialize(item) for item in items])
+                if ttl_val:
+                    pipe.expire(cache_key, ttl_val)
+                await pipe.execute()
             return True
         except Exception as e:
+            self._handle_error(e)
             logger.error(f"Cache set list failed for key {key}: {e}")
             return False
     
     async def get_list(self, key: str, start: int = 0, end: int = -1) -> List[Any]:
-        if not self.enabled or not self._redis:
-            return []
         """Get list from cache."""
+        client = await self._client()
+        if client is None:
+            return []
         try:
-            cache_key = self._make_key(key)
-            items = self._redis.lrange(cache_key, start, end)
-            
-            result = []
-            for item in items:
-                try:
-                    result.append(json.loads(item.decode('utf-8')))
-                except (json.JSONDecodeError, UnicodeDecodeError):
-                    result.append(pickle.loads(item))
-            
-            return result
+            items = await client.lrange(self._make_key(key), start, end)
+            return [self._deserialize(item) for item in items]
             
         except Exception as e:
+            self._handle_error(e)
             logger.error(f"Cache get list failed for key {key}: {e}")
             return []
     
     async def add_to_set(self, key: str, *values: Any, ttl: int = None) -> int:
-        if not self.enabled or not self._redis:
+        client = await self._client()
+        if client is None:
             return 0
         try:
             cache_key = self._make_key(key)
-            serialized_values = []
-            for value in values:
-                try:
-                    serialized_values.append(json.dumps(value, default=str))
-                except (TypeError, ValueError):
-                    serialized_values.append(pickle.dumps(value))
-            result = self._redis.sadd(cache_key, *serialized_values)
+            serialized_values = [self._serialize(value) for value in values]
             ttl_val = ttl if ttl is not None else getattr(settings, 'CACHE_TTL', 3600)
-            if ttl_val:
-                self._redis.expire(cache_key, ttl_val)
-            return result
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.sadd(cache_key, *serialized_values)
+                if ttl_val:
+                    pipe.expire(cache_key, ttl_val)
+                results = await pipe.execute()
+            return results[0]
         except Exception as e:
+            self._handle_error(e)
             logger.error(f"Cache add to set failed for key {key}: {e}")
             return 0
     
     async def get_set(self, key: str) -> set:
-        if not self.enabled or not self._redis:
-            return set()
         """Get set from cache."""
+        client = await self._client()
+        if client is None:
+            return set()
         try:
-            cache_key = self._make_key(key)
-            items = self._redis.smembers(cache_key)
-            
-            result = set()
-            for item in items:
-                try:
-                    result.add(json.loads(item.decode('utf-8')))
-                except (json.JSONDecodeError, UnicodeDecodeError):
-                    result.add(pickle.loads(item))
-            
-            return result
+            items = await client.smembers(self._make_key(key))
+            return {self._deserialize(item) for item in items}
             
         except Exception as e:
+            self._handle_error(e)
             logger.error(f"Cache get set failed for key {key}: {e}")
             return set()
     
     async def clear_all(self) -> bool:
-        if not self.enabled or not self._redis:
-            return False
         """Clear all cache (use with caution!)."""
+        client = await self._client()
+        if client is None:
+            return False
         try:
-            self._redis.flushdb()
+            await client.flushdb()
             return True
         except Exception as e:
+            self._handle_error(e)
             logger.error(f"Cache clear all failed: {e}")
             return False
     
     async def get_stats(self) -> Dict[str, Any]:
-        if not self.enabled or not self._redis:
-            return {}
         """Get cache statistics."""
+        client = await self._client()
+        if client is None:
+            return {}
         try:
-            info = self._redis.info()
+            info = await client.info()
             return {
                 "connected_clients": info.get("connected_clients", 0),
                 "used_memory": info.get("used_memory_human", "0B"),
@@ -333,9 +351,48 @@ class CacheService:
                 )
             }
         except Exception as e:
+            self._handle_error(e)
             logger.error(f"Cache stats failed: {e}")
             return {}
     
+    async def publish(self, channel: str, message: Union[str, bytes]) -> int:
+        """Publish a message on a pub/sub channel; returns the receiver count."""
+        client = await self._client()
+        if client is None:
+            return 0
+        try:
+            return await client.publish(self._make_key(channel), message)
+        except Exception as e:
+            self._handle_error(e)
+            logger.error(f"Cache publish failed for channel {channel}: {e}")
+            return 0
+
+    def pubsub(self):
+        """Return a new pub/sub object on a no-read-timeout connection, or None when caching is disabled."""
+        if not self.enabled or not self._redis:
+            return None
+        return get_pubsub_client(self.redis_url).pubsub(ignore_subscribe_messages=True)
+
+    def channel_name(self, channel: str) -> str:
+        """Namespaced name of a pub/sub channel."""
+        return self._make_key(channel)
+
+    @staticmethod
+    def _serialize(value: Any) -> Union[str, bytes]:
+        """JSON-encode a value, falling back to pickle for unsupported types."""
+        try:
+            return json.dumps(value, default=str)
+        except (TypeError, ValueError):
+            return pickle.dumps(value)
+    
+    @staticmethod
+    def _deserialize(value: bytes) -> Any:
+        """Decode a stored value, trying JSON first and then pickle."""
+        try:
+            return json.loads(value.decode('utf-8'))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return pickle.loads(value)
+    
     def _make_key(self, key: str) -> str:
         """Create namespaced cache key."""
         return f"review_platform:{key}"
@@ -4,12 +4,13 @@ Fully refactored for new social_circle database structure.
 """
 from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, select
 from datetime import datetime, timedelta
-import random
 
 from models.review_circle import SocialCircleMember, SocialCircleRequest, SocialCircleBlock
 from models.user import User
+from services.search_service import text_search_clause
+from services.taste_match_service import TasteMatchService
 from services.notification_trigger_service_enterprise import NotificationTriggerService
 from schemas.circle import (
     CircleCreateRequest,
@@ -587,6 +588,11 @@ class CircleService:
                 SocialCircleMember.owner_id == current_user_id
             ).subquery()
             
+            # Names go through the full-text/trigram indexes; emails only match exactly
+            clause = text_search_clause("users", query)
+            name_match, relevance = clause if clause is not None else (None, None)
+            email_match = User.email == query.strip()
+            
             # Query users matching the search term
             users_query = self.db.query(User).filter(
                 and_(
@@ -595,15 +601,12 @@ class CircleService:
                     ~User.user_id.in_(blocked_user_ids),  # Exclude blocked users
                     ~User.user_id.in_(pending_request_user_ids),  # Exclude users with pending requests
                     ~User.user_id.in_(circle_member_ids),  # Exclude users already in circles
-                    or_(
-                        User.display_name.ilike(f"%{query}%"),
-                        User.first_name.ilike(f"%{query}%"),
-                        User.last_name.ilike(f"%{query}%"),
-                        User.username.ilike(f"%{query}%"),
-                        User.email.ilike(f"%{query}%")
-                    )
+                    or_(name_match, email_match) if name_match is not None else email_match
                 )
-            ).limit(limit)
+            )
+            if relevance is not None:
+                users_query = users_query.order_by(relevance.desc())
+            users_query = users_query.limit(limit)
 
             users = users_query.all()
             print(f"📊 Found {len(users)} users matching search query")
@@ -655,16 +658,18 @@ class CircleService:
             raise BusinessLogicError(f"Failed to search users: {str(e)}")
 
     def get_suggestions(self, user_id: int, params: CircleSuggestionListParams) -> Dict[str, List[CircleSuggestionResponse]]:
-        """Get circle member suggestions based on users with highest reviews."""
+        """
+        Get circle member suggestions: users with the most similar ratings
+        first (precomputed by build_taste_neighbors.py), then people connected
+        to the user's connections when no minimum taste match is requested.
+        """
         try:
-            # Get users not in any of the user's circles and not blocked
-            user_circles = self.db.query(SocialCircleMember.circle_id).filter(
-                SocialCircleMember.member_id == user_id
-            ).subquery()
+            limit = params.limit or 10
+            min_taste_match = params.min_taste_match or 0
             
-            # Get user IDs already in circles
-            circle_member_ids = self.db.query(SocialCircleMember.member_id).filter(
-                SocialCircleMember.circle_id.in_(user_circles)
+            # Users already connected to the current user
+            connected_user_ids = self.db.query(SocialCircleMember.member_id).filter(
+                SocialCircleMember.owner_id == user_id
             ).subquery()
             
             # Get blocked user IDs
@@ -680,52 +685,32 @@ class CircleService:
                 )
             ).subquery()
             
-            # Get basic user data first
-            potential_users = self.db.query(User).filter(
-                and_(
-                    User.user_id != user_id,
-                    User.is_active == True,
-                    ~User.user_id.in_(circle_member_ids),
-                    ~User.user_id.in_(blocked_user_ids),
-                    ~User.user_id.in_(existing_request_user_ids)  # Exclude users with existing requests
-                )
-            ).limit(params.limit or 10).all()
+            excluded = [
+                select(connected_user_ids.c.member_id),
+                select(blocked_user_ids.c.blocked_user_id),
+                select(existing_request_user_ids.c.recipient_id)
+            ]
+            taste_match = TasteMatchService(self.db)
             
             suggestions = []
-            for user in potential_users:
-                # Simple scoring based on user level and activity
-                level = getattr(user, 'level', 1) or 1
-                
-                # Calculate taste match score based on user level
-                if level >= 10:
-                    taste_match_score = random.uniform(75.0, 95.0)
-                elif level >= 5:
-                    taste_match_score = random.uniform(65.0, 85.0)
-                else:
-                    taste_match_score = random.uniform(55.0, 75.0)
-                
-                if taste_match_score >= (params.min_taste_match or 0):
-                    # Generate reasons based on user activity
-                    reasons = []
-                    if level >= 10:
-                        reasons.append("Experienced user")
-                    elif level >= 5:
-                        reasons.append("Active user")
-                    else:
-                        reasons.append("New user")
-                    
-                    reasons.append(f"Level {level}")
-                    
-                    suggestions.append(CircleSuggestionResponse(
-                        user=CircleUserResponse(
-                            user_id=user.user_id,
-                            name=user.name,
-                            username=user.username,
-                            avatar=user.avatar
-                        ),
-                        taste_match_score=taste_match_score,
-                        reasons=reasons,
-                        mutual_connections=random.randint(0, 3)
+            for user, neighbor in taste_match.neighbors(
+                user_id, limit, min_similarity=min_taste_match / 100.0, exclude=excluded
+            ):
+                reasons = ["Similar taste", f"Reviewed {neighbor.co_rated} of the same entities"]
+                if neighbor.mutual_connections:
+                    reasons.append(f"{neighbor.mutual_connections} mutual connections")
+                suggestions.append(self._suggestion_response(
+                    user, round(neighbor.similarity * 100, 1), reasons, neighbor.mutual_connections
+                ))
+            
+            # New users have no neighbours yet; fall back to the social graph
+            if len(suggestions) < limit and min_taste_match <= 0:
+                suggested_ids = [s.user.user_id for s in suggestions]
+                for user, mutual in taste_match.friends_of_friends(
+                    user_id, limit - len(suggestions), exclude=excluded + [suggested_ids]
+                ):
+                    suggestions.append(self._suggestion_response(
+                        user, 0.0, [f"{mutual} mutual connections"], mutual
                     ))
             
             return {"suggestions": suggestions}
@@ -733,6 +718,19 @@ class CircleService:
         except Exception as e:
             raise BusinessLogicError(f"Failed to get suggestions: {str(e)}")
 
+    def _suggestion_response(self, user: User, taste_match_score: float, reasons: List[str], mutual_connections: int) -> CircleSuggestionResponse:
+        return CircleSuggestionResponse(
+            user=CircleUserResponse(
+                user_id=user.user_id,
+                name=user.name,
+                username=user.username,
+                avatar=user.avatar
+            ),
+            taste_match_score=taste_match_score,
+            reasons=reasons,
+            mutual_connections=mutual_connections
+        )
+
     def _add_users_to_circles_after_acceptance(self, requester_id: int, recipient_id: int):
         """Add users to each other's circles after request acceptance."""
         # In the new peer-to-peer system, create direct connections between users
@@ -0,0 +1,59 @@
+"""
+Latest-comment previews for review feeds.
+
+Feed items embed the newest few comments of each review. Eager-loading
+``Review.comments`` pulls every comment (and commenter) of every review on
+the page only to keep a handful, so a single popular review can dominate a
+feed request. This loader fetches just the newest N per review with one
+LATERAL query, which walks the (review_id, created_at) index per review.
+"""
+
+from typing import Dict, Iterable, List
+import logging
+
+from sqlalchemy import desc, select, true
+from sqlalchemy.orm import Session, joinedload
+
+from models.comment import Comment
+from models.review import Review
+
+logger = logging.getLogger(__name__)
+
+
+class CommentPreviewLoader:
+    """Load the latest comments for many reviews at once."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def load(self, review_ids: Iterable[int], per_review: int) -> Dict[int, List[Comment]]:
+        """Newest-first comments (with their users loaded), at most ``per_review`` per review."""
+        ids = list(dict.fromkeys(i for i in review_ids if i is not None))
+        previews = {review_id: [] for review_id in ids}
+        if not ids or per_review <= 0:
+            return previews
+
+        latest = (
+            select(Comment.comment_id)
+            .where(Comment.review_id == Review.review_id)
+            .order_by(desc(Comment.created_at), desc(Comment.comment_id))
+            .limit(per_review)
+            .lateral("latest_comments")
+        )
+        preview_ids = (
+            select(latest.c.comment_id)
+            .select_from(Review)
+            .join(latest, true())
+            .where(Review.review_id.in_(ids))
+        )
+
+        comments = (
+            self.db.query(Comment)
+            .options(joinedload(Comment.user))
+            .filter(Comment.comment_id.in_(preview_ids))
+            .order_by(Comment.review_id, desc(Comment.created_at), desc(Comment.comment_id))
+            .all()
+        )
+        for comment in comments:
+            previews[comment.review_id].append(comment)
+        return previews
@@ -4,13 +4,15 @@ Supports 10M+ users with core_notifications table
 """
 
 from sqlalchemy.orm import Session, selectinload
-from sqlalchemy import desc, func, and_, or_, text
+from sqlalchemy import desc, func, and_, or_, text, case
 from models.notification import Notification, NotificationTypeEnum, PriorityEnum, DeliveryStatusEnum
 from schemas.notification import (
     NotificationCreate, NotificationUpdate, NotificationRead, 
     NotificationSummary, NotificationListResponse, NotificationDropdownResponse,
     NotificationStats, NotificationBulkUpdate
 )
+from core.pagination import encode_cursor, paginate_keyset
+from services.notification_counter_service import NotificationCounterService
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta, timezone
 import logging
@@ -18,6 +20,31 @@ import json
 
 logger = logging.getLogger(__name__)
 
+# Critical first, then urgent, then everything else (matches the feed ordering)
+PRIORITY_RANK = {'critical': 2, 'urgent': 1}
+
+def _priority_rank_expression():
+    return case(
+        (Notification.priority == 'critical', 2),
+        (Notification.priority == 'urgent', 1),
+        else_=0
+    )
+
+def default_expires_at(priority: str) -> datetime:
+    """Expiry for a notification created now: sooner for urgent ones."""
+    if priority in ['critical', 'urgent']:
+        return datetime.now(timezone.utc) + timedelta(days=7)
+    if priority == 'high':
+        return datetime.now(timezone.utc) + timedelta(days=14)
+    return datetime.now(timezone.utc) + timedelta(days=30)
+
+def _notification_sort_key(notification: Notification):
+    return (
+        PRIORITY_RANK.get(notification.priority, 0),
+        notification.created_at,
+        notification.notification_id
+    )
+
 class EnterpriseNotificationService:
     """Enterprise-scale notification service supporting 10M+ users."""
     
@@ -28,15 +55,7 @@ class EnterpriseNotificationService:
         """Create a new enterprise notification with advanced features."""
         try:
             # Auto-set expiration if not provided
-            expires_at = data.expires_at
-            if not expires_at:
-                # Default expiration based on priority
-                if data.priority in ['critical', 'urgent']:
-                    expires_at = datetime.now(timezone.utc) + timedelta(days=7)
-                elif data.priority == 'high':
-                    expires_at = datetime.now(timezone.utc) + timedelta(days=14)
-                else:
-                    expires_at = datetime.now(timezone.utc) + timedelta(days=30)
+            expires_at = data.expires_at or default_expires_at(data.priority)
             
             notification = Notification(
                 user_id=data.user_id,
@@ -70,15 +89,22 @@ class EnterpriseNotificationService:
             logger.error(f"Failed to create notification: {str(e)}")
             raise
     
-    async def get_user_notifications(
+    def get_user_notifications(
         self, 
         user_id: int, 
         page: int = 1, 
         limit: int = 20,
         unread_only: bool = False,
-        priority_filter: Optional[str] = None
+        priority_filter: Optional[str] = None,
+        cursor: Optional[str] = None
     ) -> NotificationListResponse:
-        """Get paginated notifications for a user with enterprise filtering."""
+        """
+        Get paginated notifications for a user with enterprise filtering.
+
+        With ``cursor`` (a previous page's ``next_cursor``) the page is fetched
+        by seeking on (priority rank, created_at, notification_id) and the
+        COUNT is skipped; ``total`` and ``pages`` are then None.
+        """
         try:
             # Build optimized query with proper indexes
             query = self.db.query(Notification).options(
@@ -102,18 +128,34 @@ class EnterpriseNotificationService:
                 )
             )
             
+            sort_columns = [_priority_rank_expression(), Notification.created_at, Notification.notification_id]
+            
+            if cursor:
+                notifications, next_cursor = paginate_keyset(
+                    query, sort_columns, limit, cursor, key=_notification_sort_key
+                )
+                return NotificationListResponse(
+                    notifications=[notification.to_dict() for notification in notifications],
+                    total=None,
+                    page=page,
+                    limit=limit,
+                    pages=None,
+                    has_next=next_cursor is not None,
+                    has_prev=True,
+                    next_cursor=next_cursor
+                )
+            
             # Get total count efficiently
             total = query.count()
             
             # Get paginated results
             notifications = query.order_by(
-                desc(Notification.priority == 'critical'),
-                desc(Notification.priority == 'urgent'),
-                desc(Notification.created_at)
+                *[desc(column) for column in sort_columns]
             ).offset((page - 1) * limit).limit(limit).all()
             
             # Convert to response format
             notification_reads = [notification.to_dict() for notification in notifications]
+            has_next = page * limit < total
             
             return NotificationListResponse(
                 notifications=notification_reads,
@@ -121,8 +163,9 @@ class EnterpriseNotificationService:
                 page=page,
                 limit=limit,
                 pages=(total // limit) + (1 if total % limit else 0),
-                has_next=page * limit < total,
-                has_prev=page > 1
+                has_next=has_next,
+                has_prev=page > 1,
+                next_cursor=encode_cursor(*_notification_sort_key(notifications[-1])) if has_next and notifications else None
             )
             
         except Exception as e:
@@ -150,40 +193,8 @@ class EnterpriseNotificationService:
                 desc(Notification.created_at)
             ).limit(20).all()
             
-            # Get counts efficiently
-            unread_count = self.db.query(func.count(Notification.notification_id)).filter(
-                and_(
-                    Notification.user_id == user_id,
-                    Notification.is_read == False,
-                    or_(
-                        Notification.expires_at.is_(None),
-                        Notification.expires_at > datetime.now(timezone.utc)
-                    )
-                )
-            ).scalar() or 0
-            
-            urgent_count = self.db.query(func.count(Notification.notification_id)).filter(
-                and_(
-                    Notification.user_id == user_id,
-                    Notification.priority.in_(['urgent', 'critical']),
-                    Notification.is_read == False,
-                    or_(
-                        Notification.expires_at.is_(None),
-                        Notification.expires_at > datetime.now(timezone.utc)
-                    )
-                )
-            ).scalar() or 0
-            
-            # Check if there are more notifications
-            total_count = self.db.query(func.count(Notification.notification_id)).filter(
-                and_(
-                    Notification.user_id == user_id,
-                    or_(
-                        Notification.expires_at.is_(None),
-                        Notification.expires_at > datetime.now(timezone.utc)
-                    )
-                )
-            ).scalar() or 0
+            # Trigger-maintained counters: one primary-key read
+            counters = NotificationCounterService(self.db).get(user_id)
             
             # Convert to NotificationRead objects
             from schemas.notification import NotificationRead
@@ -195,9 +206,9 @@ class EnterpriseNotificationService:
             
             return NotificationDropdownResponse(
                 notifications=notification_reads,
-                unread_count=unread_count,
-                urgent_count=urgent_count,
-                has_more=total_count > 20,
+                unread_count=counters.unread_count,
+                urgent_count=counters.urgent_unread_count,
+                has_more=counters.total_count > 20,
                 last_checked=datetime.now(timezone.utc)
             )
             
@@ -308,16 +319,7 @@ class EnterpriseNotificationService:
     async def cleanup_expired_notifications(self) -> int:
         """Enterprise cleanup job for expired notifications."""
         try:
-            result = self.db.query(Notification).filter(
-                and_(
-                    Notification.expires_at.isnot(None),
-                    Notification.expires_at < datetime.now(timezone.utc)
-                )
-            ).update({
-                'delivery_status': 'expired'
-            }, synchronize_session=False)
-            
-            self.db.commit()
+            result = NotificationCounterService(self.db).expire_due()
             logger.info(f"Marked {result} notifications as expired")
             return result
             
@@ -327,66 +329,35 @@ class EnterpriseNotificationService:
             return 0
     
     async def get_notification_stats(self, user_id: int) -> NotificationStats:
-        """Get comprehensive notification statistics."""
+        """
+        Get comprehensive notification statistics. Totals and unread counts
+        cover live notifications and come from the user's counters row;
+        expired ones are reported in ``expired_count``.
+        """
         try:
-            # Use efficient aggregation queries
-            total_notifications = self.db.query(func.count(Notification.notification_id)).filter(
-                Notification.user_id == user_id
-            ).scalar() or 0
-            
-            unread_count = self.db.query(func.count(Notification.notification_id)).filter(
-                and_(Notification.user_id == user_id, Notification.is_read == False)
-            ).scalar() or 0
+            counters = NotificationCounterService(self.db).get(user_id)
             
-            read_count = total_notifications - unread_count
-            
-            urgent_count = self.db.query(func.count(Notification.notification_id)).filter(
-                and_(
-                    Notification.user_id == user_id,
-                    Notification.priority.in_(['urgent', 'critical']),
-                    Notification.is_read == False
-                )
-            ).scalar() or 0
-            
-            critical_count = self.db.query(func.count(Notification.notification_id)).filter(
-                and_(
-                    Notification.user_id == user_id,
-                    Notification.priority == 'critical',
-                    Notification.is_read == False
-                )
-            ).scalar() or 0
-            
-            expired_count = self.db.query(func.count(Notification.notification_id)).filter(
-                and_(
-                    Notification.user_id == user_id,
-                    Notification.expires_at < datetime.now(timezone.utc)
-                )
-            ).scalar() or 0
-            
-            # Delivery status breakdown
-            delivery_stats = {}
-            for status in ['pending', 'delivered', 'read', 'failed', 'expired']:
-                count = self.db.query(func.count(Notification.notification_id)).filter(
-                    and_(Notification.user_id == user_id, Notification.delivery_status == status)
-                ).scalar() or 0
-                delivery_stats[status] = count
-            
-            # Type breakdown
-            type_stats = self.db.query(
-                Notification.type, func.count(Notification.notification_id)
+            # Delivery status and type breakdowns from one grouped scan
+            breakdown = self.db.query(
+                Notification.type, Notification.delivery_status, func.count(Notification.notification_id)
             ).filter(
                 Notification.user_id == user_id
-            ).group_by(Notification.type).all()
+            ).group_by(Notification.type, Notification.delivery_status).all()
             
-            type_breakdown = {type_name: count for type_name, count in type_stats}
+            delivery_stats = {status: 0 for status in ['pending', 'delivered', 'read', 'failed', 'expired']}
+            type_breakdown = {}
+            for type_name, delivery_status, count in breakdown:
+                if delivery_status in delivery_stats:
+                    delivery_stats[delivery_status] += count
+                type_breakdown[type_name] = type_breakdown.get(type_name, 0) + count
             
             return NotificationStats(
-                total_notifications=total_notifications,
-                unread_count=unread_count,
-                read_count=read_count,
-                urgent_count=urgent_count,
-                critical_count=critical_count,
-                expired_count=expired_count,
+                total_notifications=counters.total_count,
+                unread_count=counters.unread_count,
+                read_count=counters.total_count - counters.unread_count,
+                urgent_count=counters.urgent_unread_count,
+                critical_count=counters.critical_unread_count,
+                expired_count=delivery_stats['expired'],
                 delivery_stats=delivery_stats,
                 type_breakdown=type_breakdown
             )
@@ -464,9 +435,8 @@ class EnterpriseNotificationService:
                 "data": notification_data
             }
             
-            # Send to user if they're connected
-            if notification.user_id and notification.user_id in connection_manager.active_connections:
-                await connection_manager.send_to_user(notification.user_id, websocket_message)
+            # Send to user if they're connected to any worker
+            if notification.user_id and await connection_manager.send_to_user(notification.user_id, websocket_message):
                 logger.info(f"Sent WebSocket notification to user {notification.user_id}")
             else:
                 logger.debug(f"User {notification.user_id} not connected, notification will be delivered on next page load")
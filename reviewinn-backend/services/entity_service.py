@@ -5,7 +5,7 @@ Consolidates functionality from multiple entity service implementations
 
 from typing import List, Optional, Dict, Any, Union
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, desc, asc, String
+from sqlalchemy import func, or_, desc, asc, String
 from datetime import datetime, timezone, timedelta
 from dataclasses import dataclass
 from enum import Enum
@@ -16,6 +16,9 @@ from repositories.entity_repository import EntityRepository
 from models.entity import Entity, EntityCategory
 from models.review import Review
 from models.user_entity_view import UserEntityView
+from .entity_stats_service import EntityStatsService
+from .trending_service import TrendingService, order_by_trending
+from .similar_entity_service import SimilarEntityService
 from core import ValidationError, BusinessLogicError, NotFoundError
 
 logger = logging.getLogger(__name__)
@@ -138,6 +141,34 @@ class EntityService:
             return False
 
 
+_EMPTY_REVIEW_AGGREGATES = {
+    "review_count": 0,
+    "average_rating": 0.0,
+    "rating_distribution": {"1": 0, "2": 0, "3": 0, "4": 0, "5": 0},
+    "latest_review_date": None,
+    "total_review_views": 0,
+    "total_reactions": 0,
+    "total_comments": 0
+}
+
+
+def _review_stats_response(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """The ``review_stats`` block of an entity response."""
+    if not stats["review_count"]:
+        return {
+            "total_reviews": 0,
+            "average_rating": 0.0,
+            "latest_review_date": None,
+            "rating_distribution": dict(_EMPTY_REVIEW_AGGREGATES["rating_distribution"])
+        }
+    return {
+        "total_reviews": stats["review_count"],
+        "average_rating": round(stats["average_rating"], 2),
+        "latest_review_date": stats["latest_review_date"].isoformat() if stats["latest_review_date"] else None,
+        "rating_distribution": stats["rating_distribution"]
+    }
+
+
 class UnifiedEntityService(BaseService[Entity, dict, dict]):
     """
     Unified Entity Service - World-class implementation combining:
@@ -191,11 +222,8 @@ class UnifiedEntityService(BaseService[Entity, dict, dict]):
             skip = (params.page - 1) * params.limit
             entities = query.offset(skip).limit(params.limit).all()
             
-            # Format entities for response
-            formatted_entities = [
-                await self._format_entity_for_response(db, entity)
-                for entity in entities
-            ]
+            # Format entities for response (page-level batched stats)
+            formatted_entities = await self._format_entities_for_response(db, entities)
             
             # Calculate pagination metadata
             has_next = skip + params.limit < total
@@ -280,11 +308,8 @@ class UnifiedEntityService(BaseService[Entity, dict, dict]):
             skip = (params.page - 1) * params.limit
             entities = query.offset(skip).limit(params.limit).all()
             
-            # Format entities for response
-            formatted_entities = [
-                await self._format_entity_for_response(db, entity)
-                for entity in entities
-            ]
+            # Format entities for response (page-level batched stats)
+            formatted_entities = await self._format_entities_for_response(db, entities)
             
             # Calculate pagination metadata
             has_next = skip + params.limit < total
@@ -398,52 +423,65 @@ class UnifiedEntityService(BaseService[Entity, dict, dict]):
         elif params.sort_by == EntitySortBy.VIEW_COUNT:
             sort_col = Entity.view_count
         elif params.sort_by == EntitySortBy.RATING:
-            # Sort by average rating
-            if not reviews_joined:
-                query = query.outerjoin(Review, Entity.entity_id == Review.entity_id)
-                query = query.group_by(Entity.entity_id)
-            sort_col = func.coalesce(func.avg(Review.overall_rating), 0)
+            # Sort by average rating (kept current by the entity_stats triggers)
+            if reviews_joined:
+                sort_col = func.coalesce(func.avg(Review.overall_rating), 0)
+            else:
+                sort_col = func.coalesce(Entity.average_rating, 0)
         elif params.sort_by == EntitySortBy.REVIEW_COUNT:
-            # Sort by review count
-            if not reviews_joined:
-                query = query.outerjoin(Review, Entity.entity_id == Review.entity_id)
-                query = query.group_by(Entity.entity_id)
-            sort_col = func.count(Review.review_id)
-        elif params.sort_by == EntitySortBy.TRENDING:
-            # Sort by recent activity (reviews in last 30 days)
-            thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
-            if not reviews_joined:
-                query = query.outerjoin(
-                    Review,
-                    and_(
-                        Entity.entity_id == Review.entity_id,
-                        Review.created_at >= thirty_days_ago
-                    )
-                )
-                query = query.group_by(Entity.entity_id)
+            # Sort by review count (kept current by the entity_stats triggers)
+            if reviews_joined:
+                sort_col = func.count(Review.review_id)
             else:
-                # Filter existing join to recent reviews
-                query = query.filter(Review.created_at >= thirty_days_ago)
-            sort_col = func.count(Review.review_id)
+                sort_col = func.coalesce(Entity.review_count, 0)
+        elif params.sort_by == EntitySortBy.TRENDING:
+            # Precomputed time-decayed activity score (hottest first)
+            return order_by_trending(query, grouped=reviews_joined)
         else:
             # Default to created_at
             sort_col = Entity.created_at
         
-        # Apply sort order
+        # Apply sort order (entity_id keeps pages stable on ties)
         if params.sort_order == EntitySortOrder.DESC:
-            query = query.order_by(desc(sort_col))
+            query = query.order_by(desc(sort_col), desc(Entity.entity_id))
         else:
-            query = query.order_by(asc(sort_col))
+            query = query.order_by(asc(sort_col), asc(Entity.entity_id))
         
         return query
     
     async def _format_entity_for_response(self, db: Session, entity: Entity) -> Dict[str, Any]:
         """Format entity for API response with computed fields"""
-        from models.review_reaction import ReviewReaction
-        from models.comment import Comment
-        from models.review import Review
-        from models.unified_category import UnifiedCategory
-        
+        return (await self._format_entities_for_response(db, [entity]))[0]
+    
+    async def _format_entities_for_response(self, db: Session, entities: List[Entity]) -> List[Dict[str, Any]]:
+        """
+        Format a page of entities for API response. Review, reaction and
+        comment aggregates for the whole page come from one entity_stats
+        lookup rather than several queries per entity.
+        """
+        aggregates = self._load_review_aggregates(db, [entity.entity_id for entity in entities])
+        return [
+            self._entity_response(entity, aggregates.get(entity.entity_id, _EMPTY_REVIEW_AGGREGATES))
+            for entity in entities
+        ]
+    
+    def _load_review_aggregates(self, db: Session, entity_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Per-entity review count, rating, latest date, views, reactions and comments."""
+        return {
+            entity_id: {
+                "review_count": stats.review_count,
+                "average_rating": stats.average_rating,
+                "rating_distribution": stats.rating_distribution,
+                "latest_review_date": stats.last_review_at,
+                "total_review_views": int(stats.total_review_views or 0),
+                "total_reactions": stats.total_reactions,
+                "total_comments": stats.total_comments
+            }
+            for entity_id, stats in EntityStatsService(db).get_many(entity_ids).items()
+        }
+    
+    def _entity_response(self, entity: Entity, stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the response dict for one entity from its review aggregates"""
         # Get hierarchical category information from JSONB fields (JSONB-only approach)
         category_display = None
         subcategory_display = None
@@ -478,46 +516,11 @@ class UnifiedEntityService(BaseService[Entity, dict, dict]):
             category_breadcrumb = [name for name in breadcrumb if name]
             category_display_text = " > ".join(category_breadcrumb) if category_breadcrumb else None
         
-        # Get review statistics
-        review_stats = await self.get_entity_review_stats(db, entity.entity_id)
-        
-        # Get aggregated data for all reviews of this entity
-        reviews = db.query(Review).filter(Review.entity_id == entity.entity_id).all()
-        review_ids = [review.review_id for review in reviews]
-        
-        # Calculate total reactions across all reviews for this entity
-        total_reactions = 0
-        if review_ids:
-            total_reactions = db.query(ReviewReaction).filter(
-                ReviewReaction.review_id.in_(review_ids)
-            ).count()
-        
-        # Calculate total comments across all reviews for this entity
-        total_comments = 0
-        if review_ids:
-            total_comments = db.query(Comment).filter(
-                Comment.review_id.in_(review_ids)
-            ).count()
-        
-        # Calculate total review views (sum of views for all reviews of this entity)
-        total_review_views = 0
-        for review in reviews:
-            if hasattr(review, 'view_count') and review.view_count:
-                total_review_views += review.view_count
-        
-        # Use actual review count from database query (more accurate than entity.review_count)
-        actual_review_count = len(reviews)
-        
-        # Update entity's cached counts if they differ (data integrity maintenance)
-        if entity.review_count != actual_review_count:
-            self.log_info(f"Updating entity {entity.entity_id} review_count from {entity.review_count} to {actual_review_count}")
-            entity.review_count = actual_review_count
-            if reviews:
-                calculated_avg_rating = sum(r.overall_rating for r in reviews) / actual_review_count
-                entity.average_rating = round(calculated_avg_rating, 2)
-            else:
-                entity.average_rating = 0.0
-            db.commit()
+        review_stats = _review_stats_response(stats)
+        total_reactions = stats["total_reactions"]
+        total_comments = stats["total_comments"]
+        total_review_views = stats["total_review_views"]
+        actual_review_count = stats["review_count"]
         
         return {
             "id": str(entity.entity_id),  # Frontend compatibility (string format)
@@ -746,46 +749,43 @@ class UnifiedEntityService(BaseService[Entity, dict, dict]):
             if not entity:
                 raise NotFoundError(f"Entity with ID {entity_id} not found")
             
-            # Get review statistics
-            reviews = db.query(Review).filter(Review.entity_id == entity_id).all()
+            # Count, average and histogram from the trigger-maintained entity_stats row
+            stats = EntityStatsService(db).get(entity_id)
+            total_reviews = stats.review_count if stats else 0
+            
+            # View statistics
+            total_views, unique_viewers = db.query(
+                func.count(UserEntityView.view_id),
+                func.count(func.distinct(UserEntityView.user_id))
+            ).filter(UserEntityView.entity_id == entity_id).one()
             
-            if not reviews:
+            if not total_reviews:
                 return EntityStats(
                     total_reviews=0,
                     average_rating=0.0,
                     rating_distribution={i: 0 for i in range(1, 6)},
                     recent_reviews=0,
                     view_count=entity.view_count or 0,
-                    total_views=0,
-                    unique_viewers=0,
+                    total_views=total_views,
+                    unique_viewers=unique_viewers,
                     growth_rate=0.0
                 )
             
-            # Calculate statistics
-            total_reviews = len(reviews)
-            average_rating = sum(r.overall_rating for r in reviews) / total_reviews
+            rating_distribution = {int(star): count for star, count in stats.rating_distribution.items()}
             
-            # Rating distribution
-            rating_distribution = {i: 0 for i in range(1, 6)}
-            for review in reviews:
-                rating = int(review.overall_rating)
-                if 1 <= rating <= 5:
-                    rating_distribution[rating] += 1
-            
-            # Recent reviews (last 30 days)
-            thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
-            recent_reviews = len([r for r in reviews if r.created_at >= thirty_days_ago])
-            
-            # View statistics
-            views = db.query(UserEntityView).filter(UserEntityView.entity_id == entity_id).all()
-            total_views = len(views)
-            unique_viewers = len(set(v.user_id for v in views))
+            # Reviews in the last 30 days and the 30 days before, in one aggregate
+            now = datetime.now(timezone.utc)
+            thirty_days_ago = now - timedelta(days=30)
+            sixty_days_ago = now - timedelta(days=60)
+            recent_reviews, last_month_reviews = db.query(
+                func.count(Review.review_id).filter(Review.created_at >= thirty_days_ago),
+                func.count(Review.review_id).filter(Review.created_at < thirty_days_ago)
+            ).filter(
+                Review.entity_id == entity_id,
+                Review.created_at >= sixty_days_ago
+            ).one()
             
             # Growth rate (reviews this month vs last month)
-            last_month_start = thirty_days_ago
-            sixty_days_ago = datetime.now(timezone.utc) - timedelta(days=60)
-            last_month_reviews = len([r for r in reviews if sixty_days_ago <= r.created_at < last_month_start])
-            
             growth_rate = 0.0
             if last_month_reviews > 0:
                 growth_rate = ((recent_reviews - last_month_reviews) / last_month_reviews) * 100
@@ -794,7 +794,7 @@ class UnifiedEntityService(BaseService[Entity, dict, dict]):
             
             return EntityStats(
                 total_reviews=total_reviews,
-                average_rating=round(average_rating, 2),
+                average_rating=round(stats.average_rating, 2),
                 rating_distribution=rating_distribution,
                 recent_reviews=recent_reviews,
                 view_count=entity.view_count or 0,
@@ -810,42 +810,12 @@ class UnifiedEntityService(BaseService[Entity, dict, dict]):
     async def get_entity_review_stats(self, db: Session, entity_id: int) -> Dict[str, Any]:
         """Get review statistics for entity (lightweight version)"""
         try:
-            # Get actual count from database to ensure accuracy
-            reviews = db.query(Review).filter(Review.entity_id == entity_id).all()
-            
-            if not reviews:
-                return {
-                    "total_reviews": 0,
-                    "average_rating": 0.0,
-                    "latest_review_date": None
-                }
-            
-            # Use actual count from database query for accuracy
-            total_reviews = len(reviews)
-            average_rating = sum(r.overall_rating for r in reviews) / total_reviews
-            latest_review = max(reviews, key=lambda r: r.created_at)
-            
-            # Update entity's cached review_count if it's different (data integrity)
-            entity = db.query(Entity).filter(Entity.entity_id == entity_id).first()
-            if entity and entity.review_count != total_reviews:
-                self.log_info(f"Updating entity {entity_id} review_count from {entity.review_count} to {total_reviews}")
-                entity.review_count = total_reviews
-                entity.average_rating = round(average_rating, 2)
-                db.commit()
-            
-            return {
-                "total_reviews": total_reviews,
-                "average_rating": round(average_rating, 2),
-                "latest_review_date": latest_review.created_at.isoformat()
-            }
+            aggregates = self._load_review_aggregates(db, [entity_id])
+            return _review_stats_response(aggregates.get(entity_id, _EMPTY_REVIEW_AGGREGATES))
             
         except Exception as e:
             self.log_error("Error in get_entity_review_stats", entity_id=entity_id, error=str(e))
-            return {
-                "total_reviews": 0,
-                "average_rating": 0.0,
-                "latest_review_date": None
-            }
+            return _review_stats_response(_EMPTY_REVIEW_AGGREGATES)
     
     async def record_entity_view(
         self,
@@ -915,45 +885,22 @@ class UnifiedEntityService(BaseService[Entity, dict, dict]):
         limit: int = 10,
         days: int = 30
     ) -> List[Dict[str, Any]]:
-        """Get trending entities based on recent activity"""
+        """
+        Get trending entities from the precomputed time-decayed scores.
+        ``days`` is kept for compatibility; recency comes from the half-life.
+        """
         try:
-            cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
-            
-            query = (
-                db.query(Entity)
-                .join(Review, Entity.entity_id == Review.entity_id)
-                .filter(Review.created_at >= cutoff_date)
-            )
-            
-            if category:
-                # Use hierarchical categories instead of legacy category field
-                query = query.filter(Entity.root_category_id.isnot(None))
+            # Use hierarchical categories instead of legacy category field
+            filters = [Entity.root_category_id.isnot(None)] if category else []
+            trending_rows = TrendingService(db).top_entities(limit, filters=filters)
             
-            trending_entities = (
-                query
-                .group_by(Entity.entity_id)
-                .order_by(desc(func.count(Review.review_id)))
-                .limit(limit)
-                .all()
+            formatted_entities = await self._format_entities_for_response(
+                db, [entity for entity, _ in trending_rows]
             )
+            for formatted, (_, score) in zip(formatted_entities, trending_rows):
+                formatted["trending_score"] = round(score, 4) if score is not None else 0.0
             
-            # Format results
-            results = []
-            for entity in trending_entities:
-                formatted = await self._format_entity_for_response(db, entity)
-                # Add trending score
-                recent_reviews = (
-                    db.query(Review)
-                    .filter(
-                        Review.entity_id == entity.entity_id,
-                        Review.created_at >= cutoff_date
-                    )
-                    .count()
-                )
-                formatted["trending_score"] = recent_reviews
-                results.append(formatted)
-            
-            return results
+            return formatted_entities
             
         except Exception as e:
             self.log_error("Error in get_trending_entities", error=str(e))
@@ -965,36 +912,19 @@ class UnifiedEntityService(BaseService[Entity, dict, dict]):
         entity_id: int,
         limit: int = 5
     ) -> List[Dict[str, Any]]:
-        """Get entities similar to the given entity"""
+        """Get entities similar to the given entity from the precomputed similarity index"""
         try:
             entity = self.repository.get(db, entity_id)
             if not entity:
                 raise NotFoundError(f"Entity with ID {entity_id} not found")
             
-            # Find similar entities using hierarchical categories
-            query = db.query(Entity).filter(
-                and_(
-                    Entity.entity_id != entity_id,
-                    Entity.final_category_id == entity.final_category_id
-                )
-            )
-            
-            # If no final_category, fall back to root_category
-            if not entity.final_category_id and entity.root_category_id:
-                query = query.filter(
-                    Entity.root_category_id == entity.root_category_id
-                )
-            
-            similar_entities = query.limit(limit).all()
+            similar_entities = SimilarEntityService(db).similar(entity, limit)
             
             # Format results
-            results = []
-            for similar_entity in similar_entities:
-                formatted = await self._format_entity_for_response(db, similar_entity)
-                results.append(formatted)
-            
-            return results
+            return await self._format_entities_for_response(db, similar_entities)
             
+        except NotFoundError:
+            raise
         except Exception as e:
             self.log_error("Error in get_similar_entities", entity_id=entity_id, error=str(e))
             raise BusinessLogicError(f"Failed to get similar entities: {str(e)}")
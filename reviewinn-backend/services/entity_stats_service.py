@@ -0,0 +1,86 @@
+"""
+Entity statistics read model.
+
+Review count, rating sum, star histogram, review views, reactions, comments
+and last review time per entity live in ``entity_stats``. The triggers in
+database/entity_stats.sql keep them current inside the same transaction as
+the review, reaction or comment write, so readers fetch a page of entities
+with one primary-key lookup instead of aggregating review_main per request.
+"""
+
+from typing import Callable, Dict, Iterable, Optional
+import logging
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from models.entity import Entity
+from models.entity_stats import EntityStatistics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REBUILD_CHUNK_SIZE = 5000
+
+
+class EntityStatsService:
+    """Read and rebuild per-entity statistics."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, entity_id: int) -> Optional[EntityStatistics]:
+        return self.db.get(EntityStatistics, entity_id)
+
+    def get_many(self, entity_ids: Iterable[int]) -> Dict[int, EntityStatistics]:
+        """Stats keyed by entity id; entities without reviews may be absent."""
+        ids = list(dict.fromkeys(i for i in entity_ids if i is not None))
+        if not ids:
+            return {}
+        rows = self.db.query(EntityStatistics).filter(EntityStatistics.entity_id.in_(ids)).all()
+        return {row.entity_id: row for row in rows}
+
+    def rebuild(
+        self,
+        entity_ids: Optional[Iterable[int]] = None,
+        chunk_size: int = DEFAULT_REBUILD_CHUNK_SIZE,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> int:
+        """
+        Recompute stats from the source tables with set-based queries and
+        write review_count / average_rating through to core_entities.
+
+        Without ``entity_ids`` every entity is rebuilt in entity_id ranges of
+        ``chunk_size``, committing after each range so locks stay short.
+        ``progress(done_up_to, max_entity_id)`` is called after each chunk.
+        Returns the number of stats rows written.
+        """
+        if entity_ids is not None:
+            total = 0
+            for entity_id in dict.fromkeys(entity_ids):
+                total += self._rebuild_range(entity_id, entity_id + 1)
+            self.db.commit()
+            return total
+
+        low, high = self.db.query(func.min(Entity.entity_id), func.max(Entity.entity_id)).one()
+        if low is None:
+            return 0
+
+        total = 0
+        for start in range(low, high + 1, chunk_size):
+            end = min(start + chunk_size, high + 1)
+            try:
+                total += self._rebuild_range(start, end)
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                logger.error(f"Entity stats rebuild failed for entity_id range [{start}, {end})")
+                raise
+            if progress:
+                progress(end - 1, high)
+        return total
+
+    def _rebuild_range(self, start: int, end: int) -> int:
+        return self.db.execute(
+            text("SELECT entity_stats_rebuild(:start, :end)"),
+            {"start": start, "end": end}
+        ).scalar() or 0
@@ -14,6 +14,7 @@ from models.group import Group, GroupMembership, MembershipStatus
 from models.entity import Entity
 from models.user import User
 from schemas.review import ReviewCreateRequest
+from core.pagination import paginate_keyset
 from core.exceptions import (
     NotFoundError, 
     ValidationError, 
@@ -214,10 +215,14 @@ class GroupAwareReviewService(ReviewService):
     def get_personalized_group_feed(
         self, 
         user_id: int, 
-        page: int = 1, 
-        size: int = 20
-    ) -> Tuple[List[Review], int]:
-        """Get personalized feed of reviews from user's groups."""
+        size: int = 20,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Review], Optional[str]]:
+        """
+        Get personalized feed of reviews from user's groups, newest first.
+        Returns ``(reviews, next_cursor)``; pass ``next_cursor`` back as
+        ``cursor`` for the following page (None on the last page).
+        """
         
         # Get user's group memberships
         user_groups = self.db.query(GroupMembership.group_id).filter(
@@ -239,15 +244,8 @@ class GroupAwareReviewService(ReviewService):
             ])
         )
         
-        # Get total count
-        total_count = query.count()
-        
-        # Apply pagination and ordering
-        reviews = query.order_by(desc(Review.created_at)).offset(
-            (page - 1) * size
-        ).limit(size).all()
-        
-        return reviews, total_count
+        # Seek on (created_at, review_id) instead of OFFSET + COUNT
+        return paginate_keyset(query, [Review.created_at, Review.review_id], size, cursor)
     
     async def update_review_scope(
         self, 
@@ -0,0 +1,79 @@
+"""
+Background job handlers run by worker.py.
+
+Each handler takes a fresh session plus the job payload and may run more
+than once for the same job, so it must be safe to repeat. Request handlers
+enqueue these with services.job_queue.enqueue instead of doing the work
+inline.
+"""
+
+import logging
+from typing import List
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from models.comment import Comment
+from services.job_queue import job_handler
+
+logger = logging.getLogger(__name__)
+
+JOB_BADGES_EVALUATE_EVENT = 'badges.evaluate_event'
+JOB_NOTIFY_COMMENT = 'notifications.comment'
+JOB_NOTIFY_REACTION = 'notifications.reaction'
+JOB_CACHE_INVALIDATE = 'cache.invalidate'
+JOB_COUNTS_REPAIR = 'counts.repair'
+
+
+@job_handler(JOB_BADGES_EVALUATE_EVENT, concurrency=4, timeout=60)
+def evaluate_badges_for_event(db: Session, user_id: int, event: str) -> None:
+    # Import here to avoid circular imports
+    from services.badge_service import BadgeService
+    awards = BadgeService(db).evaluate_event(user_id, event)
+    if awards:
+        logger.info(f"Awarded {len(awards)} badges to user {user_id} after {event}")
+
+
+# High concurrency lets many notification events share one aggregation batch
+@job_handler(JOB_NOTIFY_COMMENT, concurrency=100, timeout=60)
+async def notify_comment(db: Session, comment_id: int, action: str = 'created') -> None:
+    from services.notification_trigger_service_enterprise import NotificationTriggerService
+    comment = await run_in_threadpool(db.get, Comment, comment_id)
+    if comment is None:
+        return  # Deleted before the job ran
+    await NotificationTriggerService(db).trigger_comment_notifications(comment, action=action)
+
+
+@job_handler(JOB_NOTIFY_REACTION, concurrency=100, timeout=60)
+async def notify_reaction(
+    db: Session,
+    target_type: str,
+    target_id: int,
+    reactor_user_id: int,
+    reaction_type: str,
+    action: str = 'added'
+) -> None:
+    from services.notification_trigger_service_enterprise import NotificationTriggerService
+    await NotificationTriggerService(db).trigger_reaction_notifications(
+        target_type=target_type,
+        target_id=target_id,
+        reactor_user_id=reactor_user_id,
+        reaction_type=reaction_type,
+        action=action
+    )
+
+
+@job_handler(JOB_CACHE_INVALIDATE, concurrency=8, timeout=30, backoff_base=1.0, backoff_max=60.0)
+async def invalidate_cache(db: Session, keys: List[str]) -> None:
+    from services.cache_service import cache_service
+    for key in keys:
+        await cache_service.delete(key)
+
+
+@job_handler(JOB_COUNTS_REPAIR, concurrency=1, timeout=1800)
+def repair_counts(db: Session) -> None:
+    from services.count_validation_service import CountValidationService
+    result = CountValidationService(db).fix_all_inconsistencies()
+    if not result.get("success"):
+        raise RuntimeError(result.get("error") or "Count repair failed")
+    logger.info(f"Count repair finished: {result}")
@@ -0,0 +1,420 @@
+"""
+Durable background job queue.
+
+Jobs are rows in background_jobs. ``enqueue`` adds one on the caller's
+session, so the job commits (or rolls back) together with the row that
+caused it, and request handlers return as soon as that commit is done.
+worker.py runs a JobWorker that claims due jobs with FOR UPDATE SKIP LOCKED
+and calls the handler registered for the job type:
+
+- retries: a failed job is queued again with exponential backoff and
+  jitter until it has used ``max_attempts``, then marked dead;
+- idempotency: a job with an ``idempotency_key`` is enqueued at most once
+  (per retention window);
+- concurrency: each job type has a limit across all workers, enforced with
+  a per-type advisory lock around the claim;
+- visibility timeout: jobs left running by a worker that died are queued
+  again once their type's timeout has passed twice over.
+- timeouts: an async handler is cancelled at its type's timeout. A sync
+  handler cannot be stopped, so past its timeout it keeps its slot and its
+  lease (renewed every timeout period) until the thread returns, and the
+  job is only retried after that.
+
+Delivery is at-least-once, so handlers must be safe to run again.
+Handlers are called as ``handler(db, **payload)`` with a fresh session.
+Sync handlers run on the threadpool; async handlers run on the worker's
+event loop, where the shared Redis clients live.
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import random
+import socket
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import extract, func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from database import SessionLocal
+from models.background_job import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ATTEMPTS = 5
+POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+MAINTENANCE_INTERVAL = 60
+# Finished jobs (and their idempotency keys) are kept this long
+RETENTION_DAYS = int(os.getenv("JOB_RETENTION_DAYS", "7"))
+SHUTDOWN_GRACE_SECONDS = 30
+
+
+@dataclass
+class JobType:
+    """A registered job type and its execution limits."""
+    name: str
+    handler: Callable[..., Any]
+    concurrency: int = 4
+    timeout: float = 300.0
+    backoff_base: float = 5.0
+    backoff_max: float = 3600.0
+
+    def backoff(self, attempts: int) -> float:
+        """Seconds before retry number ``attempts``: exponential, capped, with full jitter."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** max(attempts - 1, 0)))
+
+
+_job_types: Dict[str, JobType] = {}
+
+
+def job_handler(
+    name: str,
+    concurrency: int = 4,
+    timeout: float = 300.0,
+    backoff_base: float = 5.0,
+    backoff_max: float = 3600.0
+):
+    """Register the decorated function as the handler for ``name`` jobs."""
+    def decorator(handler: Callable[..., Any]) -> Callable[..., Any]:
+        _job_types[name] = JobType(name, handler, concurrency, timeout, backoff_base, backoff_max)
+        return handler
+    return decorator
+
+
+def registered_job_types() -> Dict[str, JobType]:
+    return dict(_job_types)
+
+
+def enqueue(
+    db: Session,
+    job_type: str,
+    payload: Optional[Dict[str, Any]] = None,
+    idempotency_key: Optional[str] = None,
+    delay: float = 0,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+) -> Optional[int]:
+    """
+    Add a job in the caller's transaction; it becomes visible to workers
+    when the caller commits. Returns the job id, or None when a job with
+    the same ``idempotency_key`` already exists.
+    """
+    stmt = pg_insert(BackgroundJob).values(
+        job_type=job_type,
+        payload=payload or {},
+        idempotency_key=idempotency_key,
+        max_attempts=max_attempts,
+        run_at=datetime.now(timezone.utc) + timedelta(seconds=delay)
+    ).on_conflict_do_nothing(
+        index_elements=['idempotency_key'],
+        index_where=text("idempotency_key IS NOT NULL")
+    ).returning(BackgroundJob.job_id)
+    return db.execute(stmt).scalar()
+
+
+def get_job_metrics(db: Session) -> Dict[str, Any]:
+    """Queue depth, age and recent throughput per job type, from the jobs table."""
+    per_type: Dict[str, Dict[str, Any]] = defaultdict(lambda: {
+        "queued": 0, "running": 0, "succeeded": 0, "dead": 0,
+        "oldest_due_seconds": 0.0, "succeeded_last_hour": 0, "dead_last_hour": 0,
+        "retried_last_hour": 0, "avg_runtime_ms_last_hour": None
+    })
+
+    for job_type, status, count in db.query(
+        BackgroundJob.job_type, BackgroundJob.status, func.count()
+    ).group_by(BackgroundJob.job_type, BackgroundJob.status):
+        per_type[job_type][status] = count
+
+    for job_type, oldest in db.query(
+        BackgroundJob.job_type, func.min(BackgroundJob.run_at)
+    ).filter(
+        BackgroundJob.status == 'queued', BackgroundJob.run_at <= func.now()
+    ).group_by(BackgroundJob.job_type):
+        per_type[job_type]["oldest_due_seconds"] = max(
+            (datetime.now(timezone.utc) - oldest).total_seconds(), 0.0
+        )
+
+    last_hour = datetime.now(timezone.utc) - timedelta(hours=1)
+    for job_type, succeeded, dead, retried, runtime in db.query(
+        BackgroundJob.job_type,
+        func.count().filter(BackgroundJob.status == 'succeeded'),
+        func.count().filter(BackgroundJob.status == 'dead'),
+        func.coalesce(func.sum(BackgroundJob.attempts - 1), 0),
+        func.avg(extract('epoch', BackgroundJob.finished_at - BackgroundJob.locked_at)).filter(
+            BackgroundJob.status == 'succeeded'
+        )
+    ).filter(BackgroundJob.finished_at >= last_hour).group_by(BackgroundJob.job_type):
+        per_type[job_type].update({
+            "succeeded_last_hour": succeeded,
+            "dead_last_hour": dead,
+            "retried_last_hour": int(retried),
+            "avg_runtime_ms_last_hour": round(float(runtime) * 1000, 1) if runtime is not None else None
+        })
+
+    return {"job_types": dict(per_type)}
+
+
+_CLAIM_SQL = text("""
+    UPDATE background_jobs j
+    SET status = 'running', attempts = j.attempts + 1, locked_by = :worker, locked_at = NOW()
+    FROM (
+        SELECT job_id FROM background_jobs
+        WHERE status = 'queued' AND job_type = :job_type AND run_at <= NOW()
+        ORDER BY run_at, job_id
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    ) due
+    WHERE j.job_id = due.job_id
+    RETURNING j.job_id, j.payload, j.attempts, j.max_attempts
+""")
+
+_REQUEUE_STALE_SQL = text("""
+    UPDATE background_jobs
+    SET status = CASE WHEN attempts >= max_attempts THEN 'dead' ELSE 'queued' END,
+        finished_at = CASE WHEN attempts >= max_attempts THEN NOW() END,
+        run_at = NOW(),
+        locked_by = NULL,
+        locked_at = NULL,
+        last_error = 'worker stopped responding'
+    WHERE status = 'running' AND job_type = :job_type
+      AND locked_at < NOW() - make_interval(secs => :timeout)
+""")
+
+
+@dataclass
+class ClaimedJob:
+    job_id: int
+    payload: Dict[str, Any]
+    attempts: int
+    max_attempts: int
+
+
+class JobQueue:
+    """Worker-side queue operations; each call uses its own short transaction."""
+
+    def __init__(self, worker_id: str):
+        self.worker_id = worker_id
+
+    def claim(self, job_type: JobType, slots: int) -> List[ClaimedJob]:
+        """Claim up to ``slots`` due jobs without exceeding the type's global concurrency."""
+        db = SessionLocal()
+        try:
+            # Serialises claims per type so the running count cannot be raced
+            db.execute(
+                text("SELECT pg_advisory_xact_lock(hashtext(:lock_name))"),
+                {"lock_name": f"background_jobs:{job_type.name}"}
+            )
+            running = db.execute(
+                select(func.count()).select_from(BackgroundJob).where(
+                    BackgroundJob.status == 'running', BackgroundJob.job_type == job_type.name
+                )
+            ).scalar()
+            limit = min(slots, job_type.concurrency - running)
+            if limit <= 0:
+                db.rollback()
+                return []
+            rows = db.execute(_CLAIM_SQL, {
+                "worker": self.worker_id, "job_type": job_type.name, "limit": limit
+            }).all()
+            db.commit()
+            return [ClaimedJob(row.job_id, row.payload or {}, row.attempts, row.max_attempts) for row in rows]
+        finally:
+            db.close()
+
+    def complete(self, job: ClaimedJob) -> None:
+        self._finish(job, {"status": 'succeeded', "finished_at": func.now(), "last_error": None})
+
+    def fail(self, job: ClaimedJob, job_type: JobType, error: str) -> bool:
+        """Schedule a retry, or mark the job dead when out of attempts. Returns True if dead."""
+        if job.attempts >= job.max_attempts:
+            self._finish(job, {"status": 'dead', "finished_at": func.now(), "last_error": error})
+            return True
+        self._finish(job, {
+            "status": 'queued',
+            "run_at": datetime.now(timezone.utc) + timedelta(seconds=job_type.backoff(job.attempts)),
+            "last_error": error
+        })
+        return False
+
+    def extend(self, job: ClaimedJob) -> None:
+        """Renew the lease on a job that is still running so the stale-job sweep leaves it alone."""
+        db = SessionLocal()
+        try:
+            db.query(BackgroundJob).filter(
+                BackgroundJob.job_id == job.job_id,
+                BackgroundJob.status == 'running',
+                BackgroundJob.locked_by == self.worker_id
+            ).update({"locked_at": func.now()}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def _finish(self, job: ClaimedJob, values: Dict[str, Any]) -> None:
+        db = SessionLocal()
+        try:
+            # Only while still ours: a stale-job sweep may have re-queued it
+            db.query(BackgroundJob).filter(
+                BackgroundJob.job_id == job.job_id,
+                BackgroundJob.status == 'running',
+                BackgroundJob.locked_by == self.worker_id
+            ).update({**values, "locked_by": None, "locked_at": None}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def maintain(self, job_types: Iterable[JobType]) -> None:
+        """Re-queue jobs abandoned by dead workers and drop expired finished jobs."""
+        db = SessionLocal()
+        try:
+            for job_type in job_types:
+                requeued = db.execute(
+                    _REQUEUE_STALE_SQL, {"job_type": job_type.name, "timeout": job_type.timeout * 2}
+                ).rowcount
+                if requeued:
+                    logger.warning(f"Re-queued {requeued} stalled {job_type.name} jobs")
+            db.query(BackgroundJob).filter(
+                BackgroundJob.finished_at < datetime.now(timezone.utc) - timedelta(days=RETENTION_DAYS)
+            ).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+
+class JobWorker:
+    """Claims and runs jobs until stopped."""
+
+    def __init__(self, job_types: Optional[Iterable[str]] = None, poll_interval: float = POLL_INTERVAL):
+        names = list(job_types) if job_types else list(_job_types)
+        unknown = [name for name in names if name not in _job_types]
+        if unknown:
+            raise ValueError(f"Unknown job types: {', '.join(unknown)}")
+        self.job_types = [_job_types[name] for name in names]
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.queue = JobQueue(self.worker_id)
+        # Per job type: succeeded / retried / dead counts and total runtime
+        self.stats: Dict[str, Counter] = defaultdict(Counter)
+        self._running: Dict[str, set] = defaultdict(set)
+        self._stopping: Optional[asyncio.Event] = None
+
+    async def run(self) -> None:
+        self._stopping = asyncio.Event()
+        logger.info(f"Job worker {self.worker_id} handling: {', '.join(t.name for t in self.job_types)}")
+        last_maintenance = 0.0
+        while not self._stopping.is_set():
+            if time.monotonic() - last_maintenance >= MAINTENANCE_INTERVAL:
+                try:
+                    await run_in_threadpool(self.queue.maintain, self.job_types)
+                    self._log_stats()
+                except Exception as e:
+                    logger.error(f"Job queue maintenance failed: {e}")
+                last_maintenance = time.monotonic()
+
+            claimed = 0
+            for job_type in self.job_types:
+                slots = job_type.concurrency - len(self._running[job_type.name])
+                if slots <= 0:
+                    continue
+                try:
+                    jobs = await run_in_threadpool(self.queue.claim, job_type, slots)
+                except Exception as e:
+                    logger.error(f"Claiming {job_type.name} jobs failed: {e}")
+                    continue
+                for job in jobs:
+                    task = asyncio.create_task(self._execute(job_type, job))
+                    self._running[job_type.name].add(task)
+                    task.add_done_callback(self._running[job_type.name].discard)
+                claimed += len(jobs)
+
+            if not claimed:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+        pending = [task for tasks in self._running.values() for task in tasks]
+        if pending:
+            logger.info(f"Waiting for {len(pending)} running jobs to finish")
+            await asyncio.wait(pending, timeout=SHUTDOWN_GRACE_SECONDS)
+        self._log_stats()
+
+    def stop(self) -> None:
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def _execute(self, job_type: JobType, job: ClaimedJob) -> None:
+        started = time.monotonic()
+        try:
+            await self._call(job_type, job)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            try:
+                dead = await run_in_threadpool(self.queue.fail, job, job_type, error)
+            except Exception as record_error:
+                logger.error(f"Recording failure of job {job.job_id} failed: {record_error}")
+                return
+            self.stats[job_type.name]["dead" if dead else "retried"] += 1
+            log = logger.error if dead else logger.warning
+            log(f"Job {job.job_id} ({job_type.name}) attempt {job.attempts}/{job.max_attempts} failed: {error}")
+            return
+
+        try:
+            await run_in_threadpool(self.queue.complete, job)
+        except Exception as e:
+            # Left running; the stale-job sweep re-queues it and the handler runs again
+            logger.error(f"Recording completion of job {job.job_id} failed: {e}")
+            return
+        self.stats[job_type.name]["succeeded"] += 1
+        self.stats[job_type.name]["runtime_ms"] += int((time.monotonic() - started) * 1000)
+
+    async def _call(self, job_type: JobType, job: ClaimedJob) -> None:
+        if inspect.iscoroutinefunction(job_type.handler):
+            await asyncio.wait_for(_call_async(job_type.handler, job.payload), timeout=job_type.timeout)
+            return
+
+        # Threads cannot be cancelled: wait for it (keeping the slot) instead of retrying alongside it
+        thread = asyncio.ensure_future(run_in_threadpool(_call_sync, job_type.handler, job.payload))
+        done, _ = await asyncio.wait({thread}, timeout=job_type.timeout)
+        if not done:
+            logger.warning(
+                f"Job {job.job_id} ({job_type.name}) exceeded its {job_type.timeout:.0f}s timeout; "
+                f"waiting for the handler to return"
+            )
+        while not done:
+            try:
+                await run_in_threadpool(self.queue.extend, job)
+            except Exception as e:
+                logger.error(f"Renewing the lease on job {job.job_id} failed: {e}")
+            done, _ = await asyncio.wait({thread}, timeout=job_type.timeout)
+        thread.result()
+
+    def _log_stats(self) -> None:
+        for name, counts in self.stats.items():
+            succeeded = counts["succeeded"]
+            average = counts["runtime_ms"] / succeeded if succeeded else 0
+            logger.info(
+                f"Jobs {name}: {succeeded} succeeded (avg {average:.0f} ms), "
+                f"{counts['retried']} retried, {counts['dead']} dead, {len(self._running[name])} running"
+            )
+
+
+async def _call_async(handler: Callable[..., Any], payload: Dict[str, Any]) -> None:
+    db = SessionLocal()
+    try:
+        await handler(db, **payload)
+    finally:
+        db.close()
+
+
+def _call_sync(handler: Callable[..., Any], payload: Dict[str, Any]) -> None:
+    db = SessionLocal()
+    try:
+        handler(db, **payload)
+    finally:
+        db.close()
@@ -1,20 +1,48 @@
 """
 Messaging service using the new msg_ table structure.
+
+The inbox (conversation list) is the most polled messenger endpoint. A page
+is read with one query: the other participants and the latest non-deleted
+message of each conversation are attached by LATERAL joins. The first page
+of each user's inbox is also cached; writes that change an inbox record the
+affected users and the caller drops their entries with ``invalidate_inboxes``
+(the professional messaging inbox is cached per user too and dropped with it).
 """
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, func
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import and_, or_, desc, func, literal_column, select, true, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from starlette.concurrency import run_in_threadpool
 from models.msg_conversation import MsgConversation, MsgConversationParticipant
 from models.msg_message import MsgMessage, MsgMessageAttachment, MsgMessageReaction
 from models.user import User
-from typing import List, Dict, Any, Optional
+from core.pagination import encode_cursor, paginate_keyset
+from services.tiered_cache import tiered_cache
+from typing import List, Dict, Any, Optional, Set, Tuple
 from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
+INBOX_CACHE_PREFIX = "inbox"
+# Conversations kept per cached inbox; first pages up to this size are served from it
+INBOX_CACHE_SIZE = 50
+INBOX_CACHE_TTL = 120
+
+
+def inbox_cache_key(user_id: int) -> str:
+    return f"{INBOX_CACHE_PREFIX}:{user_id}"
+
+
+def inbox_summary_cache_key(user_id: int) -> str:
+    """Cache key of the professional messaging inbox (conversations plus total)."""
+    return f"{INBOX_CACHE_PREFIX}:summary:{user_id}"
+
+
 class MsgService:
     def __init__(self, db: Session):
         self.db = db
+        # Users whose cached inbox is stale after this service's writes
+        self.stale_inboxes: Set[int] = set()
 
     def create_conversation(self, user_id: int, participant_ids: List[int], 
                           conversation_type: str = 'direct', title: str = None) -> Dict[str, Any]:
@@ -53,6 +81,8 @@ class MsgService:
                     self.db.add(participant)
             
             self.db.commit()
+            self.stale_inboxes.add(user_id)
+            self.stale_inboxes.update(participant_ids)
             
             logger.info(f"Created conversation {conversation.conversation_id} with {len(participant_ids) + 1} participants")
             
@@ -111,15 +141,15 @@ class MsgService:
                     self.db.add(attachment)
             
             # Update unread counts for other participants
-            self.db.query(MsgConversationParticipant).filter(
-                and_(
+            recipient_ids = self.db.execute(
+                update(MsgConversationParticipant).where(
                     MsgConversationParticipant.conversation_id == conversation_id,
                     MsgConversationParticipant.user_id != sender_id,
                     MsgConversationParticipant.left_at.is_(None)
-                )
-            ).update({
-                MsgConversationParticipant.unread_count: MsgConversationParticipant.unread_count + 1
-            })
+                ).values(
+                    unread_count=MsgConversationParticipant.unread_count + 1
+                ).returning(MsgConversationParticipant.user_id)
+            ).scalars().all()
             
             # Update conversation updated_at
             self.db.query(MsgConversation).filter(
@@ -129,6 +159,8 @@ class MsgService:
             })
             
             self.db.commit()
+            self.stale_inboxes.add(sender_id)
+            self.stale_inboxes.update(recipient_ids)
             
             # Return message data with sender info
             sender = self.db.query(User).filter(User.user_id == sender_id).first()
@@ -154,89 +186,197 @@ class MsgService:
             logger.error(f"Failed to send message: {str(e)}")
             raise
 
+    def _user_conversations_query(self, user_id: int):
+        """
+        The user's active conversations as ``(conversation, participant, ...)``
+        rows carrying the other participants as a JSON list and the latest
+        non-deleted message's columns (all None when there is none).
+        """
+        others = aliased(MsgConversationParticipant)
+        participants = select(
+            func.coalesce(
+                func.json_agg(aggregate_order_by(
+                    func.json_build_object(
+                        'user_id', others.user_id,
+                        'username', User.username,
+                        'name', User.name,
+                        'avatar', User.avatar,
+                        'role', others.role
+                    ),
+                    others.participant_id
+                )),
+                literal_column("'[]'::json")
+            ).label('participants')
+        ).select_from(others).join(
+            User, others.user_id == User.user_id
+        ).where(
+            others.conversation_id == MsgConversation.conversation_id,
+            others.user_id != user_id,
+            others.left_at.is_(None)
+        ).lateral('other_participants')
+
+        latest = select(
+            MsgMessage.message_id,
+            MsgMessage.content,
+            MsgMessage.message_type,
+            MsgMessage.created_at,
+            User.user_id.label('sender_id'),
+            User.username.label('sender_username'),
+            User.name.label('sender_name')
+        ).join(
+            User, MsgMessage.sender_id == User.user_id
+        ).where(
+            MsgMessage.conversation_id == MsgConversation.conversation_id,
+            MsgMessage.is_deleted == False
+        ).order_by(
+            desc(MsgMessage.created_at), desc(MsgMessage.message_id)
+        ).limit(1).lateral('latest_message')
+
+        return self.db.query(
+            MsgConversation,
+            MsgConversationParticipant,
+            participants.c.participants,
+            *latest.c
+        ).join(
+            MsgConversationParticipant,
+            MsgConversation.conversation_id == MsgConversationParticipant.conversation_id
+        ).join(
+            participants, true()
+        ).outerjoin(
+            latest, true()
+        ).filter(
+            and_(
+                MsgConversationParticipant.user_id == user_id,
+                MsgConversationParticipant.left_at.is_(None)
+            )
+        )
+
     def get_conversations(self, user_id: int, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
         """Get user's conversations with latest message info."""
         try:
-            conversations = self.db.query(
-                MsgConversation,
-                MsgConversationParticipant
-            ).join(
-                MsgConversationParticipant,
-                MsgConversation.conversation_id == MsgConversationParticipant.conversation_id
-            ).filter(
-                and_(
-                    MsgConversationParticipant.user_id == user_id,
-                    MsgConversationParticipant.left_at.is_(None)
-                )
-            ).order_by(
-                desc(MsgConversation.updated_at)
+            conversations = self._user_conversations_query(user_id).order_by(
+                desc(MsgConversation.updated_at),
+                desc(MsgConversation.conversation_id)
             ).limit(limit).offset(offset).all()
             
-            result = []
-            for conversation, participant in conversations:
-                # Get other participants
-                other_participants = self.db.query(
-                    MsgConversationParticipant, User
-                ).join(
-                    User, MsgConversationParticipant.user_id == User.user_id
-                ).filter(
-                    and_(
-                        MsgConversationParticipant.conversation_id == conversation.conversation_id,
-                        MsgConversationParticipant.user_id != user_id,
-                        MsgConversationParticipant.left_at.is_(None)
-                    )
-                ).all()
-                
-                # Get latest message
-                latest_message = self.db.query(MsgMessage, User).join(
-                    User, MsgMessage.sender_id == User.user_id
-                ).filter(
-                    and_(
-                        MsgMessage.conversation_id == conversation.conversation_id,
-                        MsgMessage.is_deleted == False
-                    )
-                ).order_by(desc(MsgMessage.created_at)).first()
-                
-                conversation_data = {
-                    'conversation_id': conversation.conversation_id,
-                    'conversation_type': conversation.conversation_type,
-                    'title': conversation.title,
-                    'is_private': conversation.is_private,
-                    'unread_count': participant.unread_count,
-                    'updated_at': conversation.updated_at.isoformat(),
-                    'participants': [
-                        {
-                            'user_id': p.user_id,
-                            'username': u.username,
-                            'name': u.name,
-                            'avatar': u.avatar,
-                            'role': p.role
-                        } for p, u in other_participants
-                    ]
-                }
-                
-                if latest_message:
-                    msg, sender = latest_message
-                    conversation_data['latest_message'] = {
-                        'message_id': msg.message_id,
-                        'content': msg.content,
-                        'message_type': msg.message_type,
-                        'created_at': msg.created_at.isoformat(),
-                        'sender': {
-                            'user_id': sender.user_id,
-                            'username': sender.username,
-                            'name': sender.name
-                        }
-                    }
-                
-                result.append(conversation_data)
-            
-            return result
+            return self._serialize_conversations(conversations)
             
         except Exception as e:
             logger.error(f"Failed to get conversations: {str(e)}")
             raise
 
+    def get_conversations_with_total(
+        self,
+        user_id: int,
+        limit: int = 20,
+        offset: int = 0,
+        search: Optional[str] = None,
+        conversation_type: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        A page of conversations plus the number matching the filters, counted
+        by a window function in the same query. ``search`` matches titles.
+        """
+        query = self._user_conversations_query(user_id).add_columns(
+            func.count().over().label('total_count')
+        )
+        if search:
+            query = query.filter(func.coalesce(MsgConversation.title, '').ilike(f"%{search}%"))
+        if conversation_type:
+            query = query.filter(MsgConversation.conversation_type == conversation_type)
+
+        rows = query.order_by(
+            desc(MsgConversation.updated_at),
+            desc(MsgConversation.conversation_id)
+        ).limit(limit).offset(offset).all()
+
+        if rows:
+            total = rows[0].total_count
+        elif offset:
+            # Past the last page: the window count has no row to ride on
+            total = self.db.query(func.count()).select_from(query.subquery()).scalar() or 0
+        else:
+            total = 0
+        return self._serialize_conversations(rows), total
+
+    def get_conversations_page(self, user_id: int, limit: int = 20, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Keyset-paginated conversations, most recently active first. Pass the
+        returned ``next_cursor`` back as ``cursor`` for the following page.
+        """
+        conversations, next_cursor = paginate_keyset(
+            self._user_conversations_query(user_id),
+            [MsgConversation.updated_at, MsgConversation.conversation_id],
+            limit,
+            cursor,
+            key=lambda row: (row[0].updated_at, row[0].conversation_id)
+        )
+        return {
+            'conversations': self._serialize_conversations(conversations),
+            'next_cursor': next_cursor
+        }
+
+    async def get_inbox_page(self, user_id: int, limit: int = 20, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        ``get_conversations_page`` with first pages of up to INBOX_CACHE_SIZE
+        conversations served from the user's cached inbox.
+        """
+        if cursor or limit > INBOX_CACHE_SIZE:
+            return await run_in_threadpool(self.get_conversations_page, user_id, limit, cursor)
+
+        key = inbox_cache_key(user_id)
+        inbox = await tiered_cache.get(key)
+        if inbox is None:
+            inbox = await run_in_threadpool(self.get_conversations_page, user_id, INBOX_CACHE_SIZE)
+            await tiered_cache.set(key, inbox, ttl=INBOX_CACHE_TTL)
+
+        conversations = inbox['conversations'][:limit]
+        next_cursor = inbox['next_cursor']
+        if len(inbox['conversations']) > limit:
+            last = conversations[-1]
+            next_cursor = encode_cursor(datetime.fromisoformat(last['updated_at']), last['conversation_id'])
+        return {'conversations': conversations, 'next_cursor': next_cursor}
+
+    async def invalidate_inboxes(self) -> None:
+        """Drop the cached inboxes of users affected by this service's writes."""
+        user_ids, self.stale_inboxes = self.stale_inboxes, set()
+        for user_id in user_ids:
+            await tiered_cache.delete(inbox_cache_key(user_id))
+            await tiered_cache.delete(inbox_summary_cache_key(user_id))
+
+    def _serialize_conversations(self, rows) -> List[Dict[str, Any]]:
+        """Build conversation summaries from ``_user_conversations_query`` rows."""
+        result = []
+        for row in rows:
+            conversation, participant = row[0], row[1]
+            conversation_data = {
+                'conversation_id': conversation.conversation_id,
+                'conversation_type': conversation.conversation_type,
+                'title': conversation.title,
+                'is_private': conversation.is_private,
+                'unread_count': participant.unread_count,
+                'created_at': conversation.created_at.isoformat() if conversation.created_at else None,
+                'updated_at': conversation.updated_at.isoformat(),
+                'participants': row.participants
+            }
+            
+            if row.message_id is not None:
+                conversation_data['latest_message'] = {
+                    'message_id': row.message_id,
+                    'content': row.content,
+                    'message_type': row.message_type,
+                    'created_at': row.created_at.isoformat(),
+                    'sender': {
+                        'user_id': row.sender_id,
+                        'username': row.sender_username,
+                        'name': row.sender_name
+                    }
+                }
+            
+            result.append(conversation_data)
+        
+        return result
+
     def get_messages(self, user_id: int, conversation_id: int, 
                     limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
         """Get messages from a conversation."""
@@ -341,6 +481,7 @@ class MsgService:
                 raise ValueError("User is not a participant in this conversation")
             
             self.db.commit()
+            self.stale_inboxes.add(user_id)
             
             return {
                 'conversation_id': conversation_id,
@@ -0,0 +1,420 @@
+"""
+Notification aggregation stage for reaction and comment notifications.
+
+Writing one core_notifications row and sending one websocket push per event
+lets a single viral review produce thousands of rows and pushes for its
+author. Instead, events for the same recipient, notification type and target
+within AGGREGATION_WINDOW share one row, which is upserted on
+(user_id, group_key) and rendered by clients as
+"<actor_name> and 41 others reacted to your review".
+
+Events are micro-batched. Notification jobs submit their event to the
+process's NotificationAggregator and wait until the batch holding it has
+committed, so a job is only marked done once its event is stored. A batch
+resolves every review and comment it references with one query each,
+collapses its events per row in memory and writes them with one multi-row
+upsert. The distinct actors of each row are kept in notification_actors; one
+more statement recounts actor_count, recent_actor_ids and the content of the
+touched rows from that table, so an actor acting again (or a retried job)
+is never counted twice. Each touched row is then pushed once over the
+websocket.
+"""
+
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from database import SessionLocal
+from models.comment import Comment
+from models.notification import Notification
+from models.notification_actor import NotificationActor
+from models.review import Review
+from models.user import User
+from services.enterprise_notification_service import default_expires_at
+
+logger = logging.getLogger(__name__)
+
+EVENT_REACTION = 'reaction'
+EVENT_COMMENT = 'comment'
+
+AGGREGATION_WINDOW = int(os.getenv("NOTIFICATION_AGGREGATION_WINDOW", "21600"))  # seconds
+# How long a batch waits for more events after the first one arrives
+BATCH_LINGER_SECONDS = 0.25
+MAX_BATCH_SIZE = 500
+# Most recent distinct actors kept on an aggregated row
+ACTOR_SAMPLE_SIZE = 3
+
+# Derive actor_count, recent_actor_ids and content from notification_actors
+_RECOUNT_ACTORS_SQL = text("""
+    UPDATE core_notifications n
+    SET notification_data = n.notification_data || jsonb_build_object(
+            'actor_count', c.actor_count,
+            'recent_actor_ids', to_jsonb(ARRAY(
+                SELECT a.actor_id FROM notification_actors a
+                WHERE a.notification_id = n.notification_id
+                ORDER BY a.acted_at DESC, a.actor_id
+                LIMIT :sample
+            ))
+        ),
+        content = CASE WHEN c.actor_count > 1
+            THEN 'and ' || (c.actor_count - 1)
+                 || CASE WHEN c.actor_count = 2 THEN ' other ' ELSE ' others ' END
+                 || (n.notification_data->>'group_verb')
+            ELSE n.notification_data->>'verb' END
+    FROM (
+        SELECT notification_id, COUNT(*) AS actor_count
+        FROM notification_actors
+        WHERE notification_id = ANY(:ids)
+        GROUP BY notification_id
+    ) c
+    WHERE n.notification_id = c.notification_id
+    RETURNING n.*
+""")
+
+
+@dataclass
+class NotificationEvent:
+    """
+    Something that may notify a user. ``target_type``/``target_id`` name the
+    review or comment acted on; recipients are resolved when the batch is
+    written.
+    """
+    kind: str
+    target_type: str
+    target_id: int
+    actor_id: int
+    reaction_type: Optional[str] = None
+    comment_id: Optional[int] = None
+    comment_content: Optional[str] = None
+    occurred_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+@dataclass
+class _Notice:
+    """One event resolved to a recipient and the row it belongs to."""
+    recipient_id: int
+    actor_id: int
+    type: str
+    entity_type: str
+    entity_id: int
+    title: str
+    verb: str
+    group_verb: str
+    priority: str
+    data: Dict[str, Any]
+    occurred_at: datetime
+
+    @property
+    def group_key(self) -> str:
+        window = int(self.occurred_at.timestamp() // AGGREGATION_WINDOW)
+        return f"{self.type}:{self.entity_type}:{self.entity_id}:{window}"
+
+
+def aggregate_content(verb: str, group_verb: str, actor_count: int) -> str:
+    """Text shown after the latest actor's name; same rule as _RECOUNT_ACTORS_SQL."""
+    if actor_count <= 1:
+        return verb
+    others = actor_count - 1
+    return f"and {others} {'other' if others == 1 else 'others'} {group_verb}"
+
+
+class NotificationBatchWriter:
+    """Resolve, collapse and upsert one batch of notification events."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def write(self, events: List[NotificationEvent]) -> Tuple[List[List[int]], List[Dict[str, Any]]]:
+        """
+        Store ``events`` and commit. Returns the notification ids each event
+        went into (empty when it notifies nobody) and the API payload of
+        every row written, for delivery.
+        """
+        notices = self._resolve(events)
+        groups: Dict[Tuple[int, str], List[int]] = {}
+        for index, notice in enumerate(notices):
+            if notice is not None:
+                groups.setdefault((notice.recipient_id, notice.group_key), []).append(index)
+        if not groups:
+            return [[] for _ in events], []
+
+        rows = []
+        # Latest time each distinct actor acted, per row
+        group_actors: Dict[Tuple[int, str], Dict[int, datetime]] = {}
+        for (recipient_id, group_key), indexes in sorted(groups.items()):
+            members = sorted((notices[i] for i in indexes), key=lambda notice: notice.occurred_at)
+            latest = members[-1]
+            actors = {notice.actor_id: notice.occurred_at for notice in members}
+            group_actors[(recipient_id, group_key)] = actors
+            rows.append({
+                'user_id': recipient_id,
+                'actor_id': latest.actor_id,
+                'type': latest.type,
+                'title': latest.title,
+                'content': aggregate_content(latest.verb, latest.group_verb, len(actors)),
+                'entity_type': latest.entity_type,
+                'entity_id': latest.entity_id,
+                'priority': latest.priority,
+                'delivery_status': 'pending',
+                'notification_data': {
+                    **latest.data,
+                    'verb': latest.verb,
+                    'group_verb': latest.group_verb
+                },
+                'expires_at': default_expires_at(latest.priority),
+                'is_read': False,
+                'group_key': group_key,
+                'created_at': latest.occurred_at,
+                'updated_at': latest.occurred_at
+            })
+
+        stmt = pg_insert(Notification).values(rows)
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['user_id', 'group_key'],
+            index_where=text("group_key IS NOT NULL"),
+            set_={
+                'actor_id': excluded.actor_id,
+                'title': excluded.title,
+                # Replaced by the actor recount below
+                'content': excluded.content,
+                'notification_data': Notification.notification_data.op('||')(excluded.notification_data),
+                'is_read': False,
+                'delivery_status': 'pending',
+                'expires_at': excluded.expires_at,
+                # Resurface the row at the top of the feed
+                'created_at': excluded.created_at,
+                'updated_at': func.now()
+            }
+        ).returning(Notification.notification_id, Notification.user_id, Notification.group_key)
+        ids = {(row.user_id, row.group_key): row.notification_id for row in self.db.execute(stmt)}
+
+        actor_rows = [
+            {'notification_id': ids[key], 'actor_id': actor_id, 'acted_at': acted_at}
+            for key, actors in sorted(group_actors.items())
+            for actor_id, acted_at in sorted(actors.items())
+        ]
+        actor_stmt = pg_insert(NotificationActor).values(actor_rows)
+        self.db.execute(actor_stmt.on_conflict_do_update(
+            index_elements=['notification_id', 'actor_id'],
+            set_={'acted_at': func.greatest(NotificationActor.acted_at, actor_stmt.excluded.acted_at)}
+        ))
+
+        notifications = self.db.scalars(
+            select(Notification).from_statement(
+                _RECOUNT_ACTORS_SQL.bindparams(ids=sorted(ids.values()), sample=ACTOR_SAMPLE_SIZE)
+            ),
+            execution_options={"populate_existing": True}
+        ).all()
+
+        # Load the actors in one query so to_dict() finds them in the session
+        actor_ids = {n.actor_id for n in notifications if n.actor_id is not None}
+        if actor_ids:
+            self.db.query(User).filter(User.user_id.in_(actor_ids)).all()
+        payloads = [notification.to_dict() for notification in notifications]
+        self.db.commit()
+
+        event_ids: List[List[int]] = [[] for _ in events]
+        for key, indexes in groups.items():
+            for index in indexes:
+                event_ids[index] = [ids[key]]
+        return event_ids, payloads
+
+    def _resolve(self, events: List[NotificationEvent]) -> List[Optional[_Notice]]:
+        review_ids = {e.target_id for e in events if e.target_type == 'review'}
+        comment_ids = {e.target_id for e in events if e.target_type == 'comment'}
+        reviews = {
+            row.review_id: row for row in self.db.query(
+                Review.review_id, Review.user_id, Review.title
+            ).filter(Review.review_id.in_(review_ids))
+        } if review_ids else {}
+        comments = {
+            row.comment_id: row for row in self.db.query(
+                Comment.comment_id, Comment.user_id, Comment.content
+            ).filter(Comment.comment_id.in_(comment_ids))
+        } if comment_ids else {}
+
+        notices: List[Optional[_Notice]] = []
+        for event in events:
+            if event.target_type == 'review':
+                notice = self._review_notice(event, reviews.get(event.target_id))
+            elif event.target_type == 'comment':
+                notice = self._comment_notice(event, comments.get(event.target_id))
+            else:
+                notice = None
+            # Nobody is notified about their own actions
+            if notice is not None and notice.recipient_id == event.actor_id:
+                notice = None
+            notices.append(notice)
+        return notices
+
+    @staticmethod
+    def _review_notice(event: NotificationEvent, review) -> Optional[_Notice]:
+        if review is None or review.user_id is None:
+            return None
+        review_title = review.title or ''
+        if event.kind == EVENT_REACTION:
+            return _Notice(
+                recipient_id=review.user_id,
+                actor_id=event.actor_id,
+                type='review_reaction',
+                entity_type='review',
+                entity_id=review.review_id,
+                title="New reaction on your review",
+                verb=f"reacted {event.reaction_type} to your review: \"{review_title[:30]}...\"",
+                group_verb=f"reacted to your review: \"{review_title[:30]}...\"",
+                priority='low',
+                data={
+                    'reaction_type': event.reaction_type,
+                    'review_title': review.title,
+                    'review_id': review.review_id
+                },
+                occurred_at=event.occurred_at
+            )
+        if event.kind == EVENT_COMMENT:
+            comment_content = event.comment_content or ''
+            return _Notice(
+                recipient_id=review.user_id,
+                actor_id=event.actor_id,
+                type='review_comment',
+                entity_type='review',
+                entity_id=review.review_id,
+                title="New comment on your review",
+                verb=f"commented on your review: \"{comment_content[:50]}...\"",
+                group_verb=f"commented on your review: \"{review_title[:30]}...\"",
+                priority='normal',
+                data={
+                    'review_title': review.title,
+                    'comment_content': event.comment_content,
+                    'comment_id': event.comment_id
+                },
+                occurred_at=event.occurred_at
+            )
+        return None
+
+    @staticmethod
+    def _comment_notice(event: NotificationEvent, comment) -> Optional[_Notice]:
+        if comment is None or comment.user_id is None or event.kind != EVENT_REACTION:
+            return None
+        return _Notice(
+            recipient_id=comment.user_id,
+            actor_id=event.actor_id,
+            type='comment_reaction',
+            entity_type='comment',
+            entity_id=comment.comment_id,
+            title="New reaction on your comment",
+            verb=f"reacted {event.reaction_type} to your comment",
+            group_verb="reacted to your comment",
+            priority='low',
+            data={
+                'reaction_type': event.reaction_type,
+                'comment_content': (comment.content or '')[:50],
+                'comment_id': comment.comment_id
+            },
+            occurred_at=event.occurred_at
+        )
+
+
+def write_notification_batch(events: List[NotificationEvent]) -> Tuple[List[List[int]], List[Dict[str, Any]]]:
+    """Write one batch on a fresh session (runs on a worker thread)."""
+    db = SessionLocal()
+    try:
+        return NotificationBatchWriter(db).write(events)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+class NotificationAggregator:
+    """Collects events submitted in this process and writes them in batches"""
+
+    def __init__(self, linger: float = BATCH_LINGER_SECONDS, max_batch: int = MAX_BATCH_SIZE):
+        self.linger = linger
+        self.max_batch = max_batch
+        self._pending: List[Tuple[NotificationEvent, asyncio.Future]] = []
+        self._has_events = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def submit(self, event: NotificationEvent) -> List[int]:
+        """Queue ``event`` and wait until it is stored; returns its notification ids."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((event, future))
+        self._has_events.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return await future
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for _, future in self._pending:
+            if not future.done():
+                future.cancel()
+        self._pending = []
+
+    async def _run(self) -> None:
+        while True:
+            await self._has_events.wait()
+            # Let concurrent jobs add their events to this batch
+            await asyncio.sleep(self.linger)
+            while self._pending:
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                await self._flush(batch)
+            self._has_events.clear()
+
+    async def _flush(self, batch: List[Tuple[NotificationEvent, asyncio.Future]]) -> None:
+        try:
+            event_ids, payloads = await run_in_threadpool(
+                write_notification_batch, [event for event, _ in batch]
+            )
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} notification events: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), ids in zip(batch, event_ids):
+            if not future.done():
+                future.set_result(ids)
+        logger.debug(f"Aggregated {len(batch)} notification events into {len(payloads)} notifications")
+        await self._deliver(payloads)
+
+    async def _deliver(self, payloads: List[Dict[str, Any]]) -> None:
+        """One websocket push per written row, however many events it absorbed."""
+        # Import here to avoid circular imports
+        from services.websocket_service import connection_manager
+        for payload in payloads:
+            try:
+                await connection_manager.send_to_user(
+                    payload['user_id'], {"type": "new_notification", "data": payload}
+                )
+            except Exception as e:
+                # WebSocket errors shouldn't fail the batch
+                logger.warning(f"Failed to send WebSocket notification: {e}")
+
+# Global aggregator instance
+_notification_aggregator: Optional[NotificationAggregator] = None
+
+def get_notification_aggregator() -> NotificationAggregator:
+    """Get notification aggregator singleton"""
+    global _notification_aggregator
+    if _notification_aggregator is None:
+        _notification_aggregator = NotificationAggregator()
+    return _notification_aggregator
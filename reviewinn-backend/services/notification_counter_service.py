@@ -0,0 +1,186 @@
+"""
+Per-user notification counters.
+
+The notification bell polls unread, urgent and total counts far more often
+than notifications change. ``notification_counters`` holds them per user and
+the statement-level triggers in database/notification_counters.sql keep them
+current inside the writing transaction, so the dropdown and stats endpoints
+read one primary-key row instead of running COUNT(*) scans.
+
+Counters cover notifications whose delivery_status is not 'expired'. The
+reconciler marks due notifications expired (which the triggers subtract) and
+recounts a rolling range of user ids each pass, so drift from out-of-band
+writes heals without a full rebuild.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Optional
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from database import SessionLocal
+from models.notification import Notification
+from models.notification_counter import NotificationCounter
+
+logger = logging.getLogger(__name__)
+
+RECONCILE_INTERVAL = float(os.getenv("NOTIFICATION_COUNTER_RECONCILE_INTERVAL", "300"))  # seconds
+# User ids recounted per pass; the range wraps around after the highest id
+RECONCILE_USERS_PER_PASS = int(os.getenv("NOTIFICATION_COUNTER_RECONCILE_USERS", "50000"))
+RECONCILE_CHUNK_SIZE = 5000
+EXPIRE_BATCH_SIZE = 5000
+
+# pg advisory lock key so only one process reconciles at a time
+_RECONCILE_LOCK_KEY = 7246005
+
+_EXPIRE_DUE_SQL = text("""
+    UPDATE core_notifications
+    SET delivery_status = 'expired'
+    WHERE notification_id IN (
+        SELECT notification_id FROM core_notifications
+        WHERE expires_at IS NOT NULL
+          AND expires_at < NOW()
+          AND delivery_status <> 'expired'
+        LIMIT :batch
+        FOR UPDATE SKIP LOCKED
+    )
+""")
+
+
+class NotificationCounterService:
+    """Read, expire and reconcile per-user notification counters."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, user_id: int) -> NotificationCounter:
+        """The user's counters; an unsaved zeroed row if they have none yet."""
+        counters = self.db.get(NotificationCounter, user_id)
+        if counters is None:
+            counters = NotificationCounter(
+                user_id=user_id,
+                total_count=0,
+                unread_count=0,
+                urgent_unread_count=0,
+                critical_unread_count=0
+            )
+        return counters
+
+    def expire_due(self, batch_size: int = EXPIRE_BATCH_SIZE) -> int:
+        """Mark notifications past ``expires_at`` expired, committing per batch."""
+        total = 0
+        while True:
+            expired = self.db.execute(_EXPIRE_DUE_SQL, {"batch": batch_size}).rowcount
+            self.db.commit()
+            total += expired
+            if expired < batch_size:
+                return total
+
+    def reconcile(self, start: int, end: int, chunk_size: int = RECONCILE_CHUNK_SIZE) -> int:
+        """
+        Recount the users in ``[start, end)`` from core_notifications, one
+        transaction per ``chunk_size`` ids. Returns the number of counter
+        rows that were wrong.
+        """
+        corrected = 0
+        for chunk_start in range(start, end, chunk_size):
+            chunk_end = min(chunk_start + chunk_size, end)
+            try:
+                corrected += self.db.execute(
+                    text("SELECT notification_counters_rebuild(:start, :end)"),
+                    {"start": chunk_start, "end": chunk_end}
+                ).scalar() or 0
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                logger.error(f"Notification counter reconcile failed for user_id range [{chunk_start}, {chunk_end})")
+                raise
+        return corrected
+
+    def max_user_id(self) -> int:
+        """Highest user id with notifications or counters."""
+        return max(
+            self.db.query(func.max(Notification.user_id)).scalar() or 0,
+            self.db.query(func.max(NotificationCounter.user_id)).scalar() or 0
+        )
+
+
+def reconcile_notification_counters(start: int, users: int = RECONCILE_USERS_PER_PASS) -> int:
+    """
+    One reconciliation pass on a fresh session (runs on a worker thread):
+    expire due notifications, then recount ``users`` user ids from ``start``.
+    Returns the user id the next pass should start from; ``start`` again if
+    another process holds the lock.
+    """
+    db = SessionLocal()
+    try:
+        # Held on its own connection: the session commits per chunk
+        with db.get_bind().connect() as lock_conn:
+            if not lock_conn.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": _RECONCILE_LOCK_KEY}
+            ).scalar():
+                return start
+            try:
+                service = NotificationCounterService(db)
+                expired = service.expire_due()
+                high = service.max_user_id()
+                if start > high:
+                    start = 0
+                end = min(start + users, high + 1)
+                corrected = service.reconcile(start, end)
+                if expired or corrected:
+                    logger.info(
+                        f"Notification counters: expired {expired} notifications, "
+                        f"corrected {corrected} users in [{start}, {end})"
+                    )
+                return 0 if end > high else end
+            finally:
+                lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _RECONCILE_LOCK_KEY})
+    finally:
+        db.close()
+
+
+class NotificationCounterReconciler:
+    """Background task that expires notifications and repairs counter drift"""
+
+    def __init__(self, interval: float = RECONCILE_INTERVAL):
+        self.interval = interval
+        self._next_user_id = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self._next_user_id = await run_in_threadpool(
+                    reconcile_notification_counters, self._next_user_id
+                )
+            except Exception as e:
+                logger.error(f"Notification counter reconcile failed: {e}")
+
+# Global reconciler instance
+_counter_reconciler: Optional[NotificationCounterReconciler] = None
+
+def get_notification_counter_reconciler() -> NotificationCounterReconciler:
+    """Get notification counter reconciler singleton"""
+    global _counter_reconciler
+    if _counter_reconciler is None:
+        _counter_reconciler = NotificationCounterReconciler()
+    return _counter_reconciler
@@ -1,11 +1,21 @@
 """
 Enterprise Notification Trigger Service
 Handles automatic notification creation for key events at 10M+ user scale
+
+Comment and reaction events go through the aggregation stage in
+services/notification_aggregator.py, which batches them and collapses
+repeated events on the same target into one notification.
 """
 
 from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
 from services.enterprise_notification_service import EnterpriseNotificationService
+from services.notification_aggregator import (
+    EVENT_COMMENT,
+    EVENT_REACTION,
+    NotificationEvent,
+    get_notification_aggregator,
+)
 from schemas.notification import NotificationCreate
 from models.user import User
 from models.entity import Entity  
@@ -87,47 +97,31 @@ class NotificationTriggerService:
     ) -> List[int]:
         """
         Trigger notifications for comment-related events.
+        Returns the IDs of the (possibly aggregated) notifications written.
+        Re-raises a failed aggregation batch so the calling job is retried.
         """
         notifications_created = []
         
         try:
-            # Get review details
-            review = self.db.query(Review).filter(Review.review_id == comment.review_id).first()
-            if not review:
-                return notifications_created
-            
-            # Get comment author
-            comment_author = self.db.query(User).filter(User.user_id == comment.user_id).first()
-            if not comment_author:
-                return notifications_created
-            
-            if action == 'created':
-                # Notify review author if different from comment author
-                if review.user_id != comment.user_id:
-                    notification = await self.notification_service.create_notification(
-                        NotificationCreate(
-                            user_id=review.user_id,
-                            actor_id=comment.user_id,
-                            type='review_comment',
-                            title="New comment on your review",
-                            content=f"commented on your review: \"{comment.content[:50]}...\"",
-                            entity_type='review',
-                            entity_id=review.review_id,
-                            priority='normal',
-                            notification_data={
-                                'review_title': review.title,
-                                'comment_content': comment.content,
-                                'comment_id': comment.comment_id
-                            }
-                        )
+            if action == 'created' and comment.review_id and comment.user_id:
+                # Review author is notified unless they wrote the comment
+                notifications_created = await get_notification_aggregator().submit(
+                    NotificationEvent(
+                        kind=EVENT_COMMENT,
+                        target_type='review',
+                        target_id=comment.review_id,
+                        actor_id=comment.user_id,
+                        comment_id=comment.comment_id,
+                        comment_content=comment.content
                     )
-                    notifications_created.append(notification.notification_id)
+                )
                 
                 # Notify other commenters on the same review (future feature)
                 # This would use efficient queries to avoid N+1 problems
                 
         except Exception as e:
             logger.error(f"Failed to trigger comment notifications: {str(e)}")
+            raise
         
         return notifications_created
     
@@ -141,61 +135,27 @@ class NotificationTriggerService:
     ) -> List[int]:
         """
         Trigger notifications for reaction events (review reactions, comment reactions).
+        Returns the IDs of the (possibly aggregated) notifications written.
+        Re-raises a failed aggregation batch so the calling job is retried.
         """
         notifications_created = []
         
         try:
-            # Get reactor user
-            reactor = self.db.query(User).filter(User.user_id == reactor_user_id).first()
-            if not reactor:
-                return notifications_created
-            
-            if target_type == 'review':
-                review = self.db.query(Review).filter(Review.review_id == target_id).first()
-                if review and review.user_id != reactor_user_id and action == 'added':
-                    notification = await self.notification_service.create_notification(
-                        NotificationCreate(
-                            user_id=review.user_id,
-                            actor_id=reactor_user_id,
-                            type='review_reaction',
-                            title=f"New reaction on your review",
-                            content=f"reacted {reaction_type} to your review: \"{review.title[:30]}...\"",
-                            entity_type='review',
-                            entity_id=review.review_id,
-                            priority='low',
-                            notification_data={
-                                'reaction_type': reaction_type,
-                                'review_title': review.title,
-                                'review_id': review.review_id
-                            }
-                        )
+            # The review or comment author is notified unless they reacted themselves
+            if action == 'added' and target_type in ('review', 'comment'):
+                notifications_created = await get_notification_aggregator().submit(
+                    NotificationEvent(
+                        kind=EVENT_REACTION,
+                        target_type=target_type,
+                        target_id=target_id,
+                        actor_id=reactor_user_id,
+                        reaction_type=reaction_type
                     )
-                    notifications_created.append(notification.notification_id)
-            
-            elif target_type == 'comment':
-                comment = self.db.query(Comment).filter(Comment.comment_id == target_id).first()
-                if comment and comment.user_id != reactor_user_id and action == 'added':
-                    notification = await self.notification_service.create_notification(
-                        NotificationCreate(
-                            user_id=comment.user_id,
-                            actor_id=reactor_user_id,
-                            type='comment_reaction',
-                            title="New reaction on your comment",
-                            content=f"reacted {reaction_type} to your comment",
-                            entity_type='comment',
-                            entity_id=comment.comment_id,
-                            priority='low',
-                            notification_data={
-                                'reaction_type': reaction_type,
-                                'comment_content': comment.content[:50],
-                                'comment_id': comment.comment_id
-                            }
-                        )
-                    )
-                    notifications_created.append(notification.notification_id)
+                )
                     
         except Exception as e:
             logger.error(f"Failed to trigger reaction notifications: {str(e)}")
+            raise
         
         return notifications_created
     
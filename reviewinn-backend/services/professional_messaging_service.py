@@ -1,11 +1,20 @@
 """
 Professional Messaging Service - Completely fixed version with no asyncio dependencies
+
+Conversation lists, sending and read receipts go through MsgService: a page
+of the inbox (participants, latest message, unread count and total) is one
+query, and the first page of each user's unfiltered inbox is cached until a
+send or read touches it.
 """
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
 import logging
 
+from services.msg_service import INBOX_CACHE_SIZE, INBOX_CACHE_TTL, MsgService, inbox_summary_cache_key
+from services.tiered_cache import tiered_cache
+
 logger = logging.getLogger(__name__)
 
 class ProfessionalMessagingService:
@@ -13,6 +22,7 @@ class ProfessionalMessagingService:
     
     def __init__(self, db: Session):
         self.db = db
+        self.msg_service = MsgService(db)
     
     # ========== CONVERSATION MANAGEMENT ==========
     
@@ -24,122 +34,26 @@ class ProfessionalMessagingService:
         search: str = None,
         conversation_type: str = None
     ) -> Dict[str, Any]:
-        """Get user's conversations using production-grade SQL queries with robust error handling"""
+        """Get user's conversations, most recently active first, with participants and latest message"""
         try:
-            # First, verify the user exists in core_users table for production data integrity
-            user_exists_query = "SELECT COUNT(*) FROM core_users WHERE user_id = :user_id AND is_active = true"
-            user_exists = self.db.execute(text(user_exists_query), {"user_id": user_id}).scalar()
-            
-            if not user_exists:
-                logger.warning(f"User {user_id} not found in core_users table")
-                return {
-                    "success": True,  # Not an error - user just has no conversations
-                    "conversations": [],
-                    "total_count": 0,
-                    "has_more": False,
-                    "pagination": {
-                        "current_page": 1,
-                        "total_pages": 0,
-                        "limit": limit,
-                        "offset": offset
-                    },
-                    "message": "User has no conversations yet"
-                }
-            
-            # Production-grade query with proper validation and error handling
-            query = """
-            SELECT DISTINCT 
-                c.conversation_id,
-                c.conversation_type,
-                COALESCE(c.title, 'Conversation ' || c.conversation_id::text) as title,
-                COALESCE(c.is_private, false) as is_private,
-                c.created_at,
-                (SELECT COUNT(*) FROM msg_conversation_participants cp2 
-                 WHERE cp2.conversation_id = c.conversation_id 
-                 AND cp2.left_at IS NULL) as participant_count
-            FROM msg_conversations c
-            INNER JOIN msg_conversation_participants cp ON c.conversation_id = cp.conversation_id
-            WHERE cp.user_id = :user_id 
-            AND cp.left_at IS NULL
-            AND c.conversation_id IS NOT NULL
-            """
-            
-            params = {"user_id": user_id}
-            
-            # Add optional filters with proper validation
-            if search and len(search.strip()) > 0:
-                query += " AND COALESCE(c.title, '') ILIKE :search"
-                params["search"] = f"%{search.strip()}%"
-                
-            if conversation_type and conversation_type.strip():
-                query += " AND c.conversation_type = :conversation_type"
-                params["conversation_type"] = conversation_type.strip()
-            
-            query += " ORDER BY c.created_at DESC LIMIT :limit OFFSET :offset"
-            params["limit"] = max(1, min(limit, 100))  # Enforce reasonable limits
-            params["offset"] = max(0, offset)
-            
-            # Execute main query with error handling
-            result = self.db.execute(text(query), params)
-            rows = result.fetchall()
-            
-            # Get total count for pagination
-            count_query = """
-            SELECT COUNT(DISTINCT c.conversation_id)
-            FROM msg_conversations c
-            INNER JOIN msg_conversation_participants cp ON c.conversation_id = cp.conversation_id
-            WHERE cp.user_id = :user_id 
-            AND cp.left_at IS NULL
-            AND c.conversation_id IS NOT NULL
-            """
+            limit = max(1, min(limit, 100))  # Enforce reasonable limits
+            offset = max(0, offset)
+            search = search.strip() if search and search.strip() else None
+            conversation_type = conversation_type.strip() if conversation_type and conversation_type.strip() else None
             
-            count_params = {"user_id": user_id}
-            if search and len(search.strip()) > 0:
-                count_query += " AND COALESCE(c.title, '') ILIKE :search"
-                count_params["search"] = f"%{search.strip()}%"
-            if conversation_type and conversation_type.strip():
-                count_query += " AND c.conversation_type = :conversation_type"
-                count_params["conversation_type"] = conversation_type.strip()
-                
-            total = self.db.execute(text(count_query), count_params).scalar() or 0
-            
-            # Process results with proper data validation
-            conversations = []
-            for row in rows:
-                try:
-                    conversation_data = {
-                        "conversation_id": int(row.conversation_id),
-                        "conversation_type": str(row.conversation_type or "direct"),
-                        "title": str(row.title or f"Conversation {row.conversation_id}"),
-                        "is_private": bool(row.is_private if row.is_private is not None else False),
-                        "participant_count": int(row.participant_count or 0),
-                        "created_at": row.created_at.isoformat() if row.created_at else None,
-                        "unread_count": 0,  # TODO: Implement proper unread count logic
-                        "last_message": None,  # TODO: Implement last message retrieval
-                        "participants": []  # TODO: Implement participant list retrieval
-                    }
-                    conversations.append(conversation_data)
-                except Exception as row_error:
-                    logger.warning(f"Failed to process conversation row: {row_error}")
-                    continue
-            
-            # Calculate pagination metadata
-            total_pages = ((total - 1) // params["limit"]) + 1 if total > 0 else 0
-            current_page = (params["offset"] // params["limit"]) + 1
-            has_more = total > (params["offset"] + params["limit"])
+            rows, total = self.msg_service.get_conversations_with_total(
+                user_id,
+                limit=limit,
+                offset=offset,
+                search=search,
+                conversation_type=conversation_type
+            )
+            conversations = [self._summarize_conversation(row) for row in rows]
             
-            return {
-                "success": True,
-                "conversations": conversations,
-                "total_count": total,
-                "has_more": has_more,
-                "pagination": {
-                    "current_page": current_page,
-                    "total_pages": total_pages,
-                    "limit": params["limit"],
-                    "offset": params["offset"]
-                }
-            }
+            result = self._conversations_page(conversations, total, limit, offset)
+            if total == 0:
+                result["message"] = "User has no conversations yet"
+            return result
             
         except Exception as e:
             # Production-grade error handling and logging
@@ -171,6 +85,71 @@ class ProfessionalMessagingService:
                 "error_code": "CONVERSATION_RETRIEVAL_FAILED"
             }
     
+    async def get_inbox(
+        self,
+        user_id: int,
+        limit: int = 20,
+        offset: int = 0,
+        search: str = None,
+        conversation_type: str = None
+    ) -> Dict[str, Any]:
+        """
+        ``get_conversations`` with unfiltered first pages of up to
+        INBOX_CACHE_SIZE conversations served from the user's cached inbox.
+        """
+        if offset or search or conversation_type or limit > INBOX_CACHE_SIZE:
+            return await run_in_threadpool(
+                self.get_conversations, user_id, limit, offset, search, conversation_type
+            )
+        
+        key = inbox_summary_cache_key(user_id)
+        inbox = await tiered_cache.get(key)
+        if inbox is None:
+            inbox = await run_in_threadpool(self.get_conversations, user_id, INBOX_CACHE_SIZE)
+            if not inbox["success"]:
+                return inbox
+            await tiered_cache.set(key, inbox, ttl=INBOX_CACHE_TTL)
+        
+        result = self._conversations_page(inbox["conversations"][:limit], inbox["total_count"], limit, 0)
+        if "message" in inbox:
+            result["message"] = inbox["message"]
+        return result
+    
+    async def invalidate_inboxes(self) -> None:
+        """Drop the cached inboxes of users affected by this service's writes"""
+        await self.msg_service.invalidate_inboxes()
+    
+    def _summarize_conversation(self, conversation: Dict[str, Any]) -> Dict[str, Any]:
+        """Inbox entry from a MsgService conversation summary"""
+        return {
+            "conversation_id": conversation["conversation_id"],
+            "conversation_type": conversation["conversation_type"] or "direct",
+            "title": conversation["title"] or f"Conversation {conversation['conversation_id']}",
+            "is_private": bool(conversation["is_private"]),
+            # The other participants plus the user
+            "participant_count": len(conversation["participants"]) + 1,
+            "created_at": conversation["created_at"],
+            "updated_at": conversation["updated_at"],
+            "unread_count": conversation["unread_count"] or 0,
+            "last_message": conversation.get("latest_message"),
+            "participants": conversation["participants"]
+        }
+    
+    def _conversations_page(self, conversations: list, total: int, limit: int, offset: int) -> Dict[str, Any]:
+        """Inbox response with pagination metadata"""
+        return {
+            "success": True,
+            "conversations": conversations,
+            "total_count": total,
+            "has_more": total > (offset + limit),
+            "pagination": {
+                "current_page": (offset // limit) + 1,
+                "total_pages": ((total - 1) // limit) + 1 if total > 0 else 0,
+                "limit": limit,
+                "offset": offset
+            }
+        }
+    
     def get_conversation_details(self, conversation_id: int, user_id: int) -> Dict[str, Any]:
         """Get detailed conversation information"""
         try:
@@ -282,8 +261,30 @@ class ProfessionalMessagingService:
     def update_participant(self, *args, **kwargs):
         return {"success": False, "error": "Feature not implemented yet", "code": "NOT_IMPLEMENTED"}
     
-    def send_message(self, *args, **kwargs):
-        return {"success": False, "error": "Feature not implemented yet", "code": "NOT_IMPLEMENTED"}
+    def send_message(
+        self,
+        sender_id: int,
+        conversation_id: int,
+        content: str,
+        message_type: str = "text",
+        reply_to_message_id: Optional[int] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Send a message; threads, attachments and mentions are not supported yet"""
+        try:
+            message = self.msg_service.send_message(
+                sender_id=sender_id,
+                conversation_id=conversation_id,
+                content=content,
+                message_type=message_type,
+                reply_to_message_id=reply_to_message_id
+            )
+            return {"success": True, "message": message}
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+        except Exception as e:
+            logger.error(f"Error sending message to conversation {conversation_id}: {e}")
+            return {"success": False, "error": "Failed to send message"}
     
     def get_messages(self, *args, **kwargs):
         return {"success": False, "error": "Feature not implemented yet", "code": "NOT_IMPLEMENTED"}
@@ -318,8 +319,23 @@ class ProfessionalMessagingService:
     def get_user_presence(self, *args, **kwargs):
         return {"success": False, "error": "Feature not implemented yet", "code": "NOT_IMPLEMENTED"}
     
-    def mark_conversation_read(self, *args, **kwargs):
-        return {"success": False, "error": "Feature not implemented yet", "code": "NOT_IMPLEMENTED"}
+    def mark_conversation_read(
+        self,
+        conversation_id: int,
+        user_id: int,
+        up_to_message_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Mark the whole conversation read (``up_to_message_id`` is not supported yet)"""
+        try:
+            return {
+                "success": True,
+                **self.msg_service.mark_conversation_read(user_id, conversation_id)
+            }
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+        except Exception as e:
+            logger.error(f"Error marking conversation {conversation_id} read: {e}")
+            return {"success": False, "error": "Failed to mark conversation as read"}
     
     def search_messages(self, *args, **kwargs):
         return {"success": False, "error": "Feature not implemented yet", "code": "NOT_IMPLEMENTED"}
@@ -0,0 +1,127 @@
+"""
+Batched reaction summaries for review feeds.
+
+Feed endpoints render a page of reviews, each with a handful of embedded
+comments. Loading reaction counts per item costs two queries per review and
+one per comment; this loader resolves a whole page with one grouped query
+per reaction table.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+from sqlalchemy import case, func, literal
+from sqlalchemy.orm import Session
+
+from models.review_reaction import ReviewReaction
+from models.comment import CommentReaction
+
+logger = logging.getLogger(__name__)
+
+
+def empty_review_reaction_summary() -> Dict:
+    """Summary returned for reviews that have no reactions."""
+    return {
+        "reactions": {},
+        "top_reactions": [],
+        "total_reactions": 0,
+        "total": 0,
+        "user_reaction": None
+    }
+
+
+def empty_comment_reaction_summary() -> Dict:
+    """Summary returned for comments that have no reactions."""
+    return {
+        "reactions": {},
+        "user_reaction": None
+    }
+
+
+class ReactionSummaryLoader:
+    """Load reaction summaries for many reviews and comments at once."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def load(
+        self,
+        review_ids: Iterable[int],
+        comment_ids: Iterable[int],
+        user_id: Optional[int] = None
+    ) -> Tuple[Dict[int, Dict], Dict[int, Dict]]:
+        """Return ``(review_summaries, comment_summaries)`` keyed by id."""
+        return (
+            self.load_review_summaries(review_ids, user_id),
+            self.load_comment_summaries(comment_ids, user_id)
+        )
+
+    def load_review_summaries(self, review_ids: Iterable[int], user_id: Optional[int] = None) -> Dict[int, Dict]:
+        """Reaction summaries in the same shape as ``get_reaction_summary_response``."""
+        ids = _unique_ids(review_ids)
+        summaries = {review_id: empty_review_reaction_summary() for review_id in ids}
+        if not ids:
+            return summaries
+
+        try:
+            rows = self._grouped_counts(ReviewReaction, ReviewReaction.review_id, ids, user_id)
+        except Exception as e:
+            logger.error(f"Error loading reaction summaries for reviews {ids}: {str(e)}")
+            return summaries
+
+        for review_id, reaction_type, count, is_mine in rows:
+            summary = summaries[review_id]
+            summary["reactions"][reaction_type.value] = count
+            if is_mine:
+                summary["user_reaction"] = reaction_type.value
+
+        for summary in summaries.values():
+            reaction_counts = summary["reactions"]
+            top_reactions = sorted(reaction_counts.items(), key=lambda x: x[1], reverse=True)[:3]
+            total = sum(reaction_counts.values())
+            summary["top_reactions"] = [r[0] for r in top_reactions]
+            summary["total_reactions"] = total
+            summary["total"] = total
+
+        return summaries
+
+    def load_comment_summaries(self, comment_ids: Iterable[int], user_id: Optional[int] = None) -> Dict[int, Dict]:
+        """Reaction summaries in the same shape as ``get_comment_reaction_summary_response``."""
+        ids = _unique_ids(comment_ids)
+        summaries = {comment_id: empty_comment_reaction_summary() for comment_id in ids}
+        if not ids:
+            return summaries
+
+        rows = self._grouped_counts(CommentReaction, CommentReaction.comment_id, ids, user_id)
+        for comment_id, reaction_type, count, is_mine in rows:
+            value = reaction_type.value if hasattr(reaction_type, 'value') else str(reaction_type)
+            summary = summaries[comment_id]
+            summary["reactions"][value] = count
+            if is_mine:
+                summary["user_reaction"] = value
+
+        return summaries
+
+    def _grouped_counts(self, model, owner_column, ids: List[int], user_id: Optional[int]):
+        """One ``GROUP BY owner, reaction_type`` query with the viewer's reaction flagged.
+
+        Groups are ordered by their earliest reaction so count maps keep the
+        first-seen ordering the per-item helpers produced.
+        """
+        if user_id:
+            is_mine = func.max(case((model.user_id == user_id, 1), else_=0))
+        else:
+            is_mine = literal(0)
+
+        return (
+            self.db.query(owner_column, model.reaction_type, func.count(model.reaction_id), is_mine)
+            .filter(owner_column.in_(ids))
+            .group_by(owner_column, model.reaction_type)
+            .order_by(owner_column, func.min(model.reaction_id))
+            .all()
+        )
+
+
+def _unique_ids(ids: Iterable[int]) -> List[int]:
+    """De-duplicate ids while keeping their order."""
+    return list(dict.fromkeys(i for i in ids if i is not None))
@@ -0,0 +1,412 @@
+"""
+Realtime delivery brokers for WebSocket fan-out.
+
+ConnectionManager only holds the sockets of its own worker. The broker knows
+which workers own which users, keeps conversation rooms and presence
+cluster-wide, and forwards messages for users connected elsewhere.
+InMemoryBroker covers single-worker deployments; RedisBroker routes over
+one pub/sub channel per worker.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from core.config.redis_client import get_pubsub_client, get_redis_client, pubsub_messages
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "review_platform:ws"
+HEARTBEAT_INTERVAL = 10  # seconds between worker heartbeats
+WORKER_TTL = 30  # a worker without a heartbeat for this long is considered dead
+CONVERSATION_TTL = 24 * 3600
+LISTENER_RETRY_DELAY = 5
+
+# Called with (user_ids, message) to deliver to sockets held by this worker
+DeliverCallback = Callable[[List[int], Dict[str, Any]], Awaitable[None]]
+
+
+class RealtimeBroker(ABC):
+    """Interface shared by the broker implementations; start and stop are optional hooks."""
+
+    name = "base"
+
+    async def start(self, deliver: DeliverCallback) -> None:
+        """Begin receiving messages routed to this worker."""
+
+    async def stop(self) -> None:
+        """Stop receiving messages and withdraw this worker's presence."""
+
+    @abstractmethod
+    async def user_connected(self, user_id: int) -> None:
+        """First socket of ``user_id`` opened on this worker."""
+        pass
+
+    @abstractmethod
+    async def user_disconnected(self, user_id: int) -> None:
+        """Last socket of ``user_id`` closed on this worker."""
+        pass
+
+    @abstractmethod
+    async def route(self, user_ids: Iterable[int], message: Dict[str, Any]) -> Set[int]:
+        """
+        Forward a message to the sockets other workers hold for ``user_ids``;
+        returns the users it was forwarded to.
+        """
+        pass
+
+    @abstractmethod
+    async def join_conversation(self, conversation_id: int, user_id: int) -> None:
+        pass
+
+    @abstractmethod
+    async def leave_conversation(self, conversation_id: int, user_id: int) -> None:
+        pass
+
+    @abstractmethod
+    async def get_conversation_members(self, conversation_id: int) -> Set[int]:
+        pass
+
+    @abstractmethod
+    async def is_user_online(self, user_id: int) -> bool:
+        pass
+
+    @abstractmethod
+    async def get_online_users(self) -> List[int]:
+        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"broker": self.name}
+
+
+class InMemoryBroker(RealtimeBroker):
+    """Single-process broker: every connected user is local, so nothing is routed."""
+
+    name = "memory"
+
+    def __init__(self):
+        self.online_users: Set[int] = set()
+        self.conversation_participants: Dict[int, Set[int]] = {}
+
+    async def user_connected(self, user_id: int) -> None:
+        self.online_users.add(user_id)
+
+    async def user_disconnected(self, user_id: int) -> None:
+        self.online_users.discard(user_id)
+
+    async def route(self, user_ids: Iterable[int], message: Dict[str, Any]) -> Set[int]:
+        return set()
+
+    async def join_conversation(self, conversation_id: int, user_id: int) -> None:
+        self.conversation_participants.setdefault(conversation_id, set()).add(user_id)
+
+    async def leave_conversation(self, conversation_id: int, user_id: int) -> None:
+        participants = self.conversation_participants.get(conversation_id)
+        if participants is not None:
+            participants.discard(user_id)
+            if not participants:
+                del self.conversation_participants[conversation_id]
+
+    async def get_conversation_members(self, conversation_id: int) -> Set[int]:
+        return set(self.conversation_participants.get(conversation_id, ()))
+
+    async def is_user_online(self, user_id: int) -> bool:
+        return user_id in self.online_users
+
+    async def get_online_users(self) -> List[int]:
+        return list(self.online_users)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "broker": self.name,
+            "online_users": len(self.online_users),
+            "conversations": len(self.conversation_participants)
+        }
+
+
+class RedisBroker(RealtimeBroker):
+    """
+    Redis-backed broker for multi-worker deployments.
+
+    Keys (all under ``review_platform:ws``):
+      workers                   ZSET worker_id -> last heartbeat (unix time)
+      worker:{wid}:users        SET of users connected to a worker
+      user:{uid}:workers        SET of workers holding sockets for a user
+      conversation:{cid}        SET of users in a conversation room
+      deliver:{wid}             pub/sub channel carrying messages for a worker
+
+    Presence entries of a crashed worker expire with its heartbeat; routing
+    ignores workers whose heartbeat is older than WORKER_TTL.
+    """
+
+    name = "redis"
+
+    def __init__(self, redis_url: str, worker_id: Optional[str] = None):
+        self.redis = get_redis_client(redis_url)
+        # Idle subscriptions must not hit the shared pool's read timeout
+        self.subscriber = get_pubsub_client(redis_url)
+        self.worker_id = worker_id or uuid.uuid4().hex
+        self.local_users: Set[int] = set()
+        self._deliver: Optional[DeliverCallback] = None
+        self._listener_task: Optional[asyncio.Task] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._stats = {"routed": 0, "received": 0, "errors": 0}
+
+    # Key helpers
+
+    @staticmethod
+    def _key(*parts: Any) -> str:
+        return ":".join([KEY_PREFIX, *(str(p) for p in parts)])
+
+    def _workers_key(self) -> str:
+        return self._key("workers")
+
+    def _worker_users_key(self, worker_id: str) -> str:
+        return self._key("worker", worker_id, "users")
+
+    def _user_workers_key(self, user_id: int) -> str:
+        return self._key("user", user_id, "workers")
+
+    def _conversation_key(self, conversation_id: int) -> str:
+        return self._key("conversation", conversation_id)
+
+    def _deliver_channel(self, worker_id: str) -> str:
+        return self._key("deliver", worker_id)
+
+    def _error(self, action: str, error: Exception) -> None:
+        self._stats["errors"] += 1
+        logger.warning(f"Realtime broker failed to {action}: {error}")
+
+    # Lifecycle
+
+    async def start(self, deliver: DeliverCallback) -> None:
+        self._deliver = deliver
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._listen())
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self._heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def stop(self) -> None:
+        for task in (self._listener_task, self._heartbeat_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._listener_task = self._heartbeat_task = None
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.zrem(self._workers_key(), self.worker_id)
+                pipe.delete(self._worker_users_key(self.worker_id))
+                for user_id in self.local_users:
+                    pipe.srem(self._user_workers_key(user_id), self.worker_id)
+                await pipe.execute()
+        except Exception as e:
+            self._error("withdraw worker presence", e)
+        self.local_users.clear()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            try:
+                await self._send_heartbeat()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._error("send heartbeat", e)
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+    async def _send_heartbeat(self) -> None:
+        now = time.time()
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zadd(self._workers_key(), {self.worker_id: now})
+            pipe.zremrangebyscore(self._workers_key(), "-inf", now - WORKER_TTL)
+            if self.local_users:
+                # Re-assert presence so entries lost to a Redis restart come back
+                pipe.sadd(self._worker_users_key(self.worker_id), *self.local_users)
+                pipe.expire(self._worker_users_key(self.worker_id), WORKER_TTL)
+                for user_id in self.local_users:
+                    pipe.sadd(self._user_workers_key(user_id), self.worker_id)
+                    pipe.expire(self._user_workers_key(user_id), WORKER_TTL)
+            await pipe.execute()
+
+    async def _listen(self) -> None:
+        channel = self._deliver_channel(self.worker_id)
+        while True:
+            pubsub = self.subscriber.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(channel)
+                logger.info(f"Realtime broker worker {self.worker_id} subscribed")
+                async for message in pubsub_messages(pubsub):
+                    await self._handle_delivery(message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._error(f"listen (retrying in {LISTENER_RETRY_DELAY}s)", e)
+                await asyncio.sleep(LISTENER_RETRY_DELAY)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    async def _handle_delivery(self, raw: Any) -> None:
+        try:
+            envelope = json.loads(raw.decode("utf-8") if isinstance(raw, bytes) else raw)
+            user_ids = [int(u) for u in envelope["users"]]
+            message = envelope["message"]
+        except (ValueError, KeyError, TypeError, UnicodeDecodeError):
+            logger.warning(f"Ignoring malformed realtime envelope: {raw!r}")
+            return
+        self._stats["received"] += 1
+        if self._deliver is not None:
+            try:
+                await self._deliver(user_ids, message)
+            except Exception as e:
+                logger.error(f"Realtime delivery failed for users {user_ids}: {e}")
+
+    # Presence
+
+    async def user_connected(self, user_id: int) -> None:
+        self.local_users.add(user_id)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.sadd(self._user_workers_key(user_id), self.worker_id)
+                pipe.expire(self._user_workers_key(user_id), WORKER_TTL)
+                pipe.sadd(self._worker_users_key(self.worker_id), user_id)
+                pipe.expire(self._worker_users_key(self.worker_id), WORKER_TTL)
+                await pipe.execute()
+        except Exception as e:
+            self._error(f"register user {user_id}", e)
+
+    async def user_disconnected(self, user_id: int) -> None:
+        self.local_users.discard(user_id)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.srem(self._user_workers_key(user_id), self.worker_id)
+                pipe.srem(self._worker_users_key(self.worker_id), user_id)
+                await pipe.execute()
+        except Exception as e:
+            self._error(f"unregister user {user_id}", e)
+
+    def _queue_live_workers(self, pipe) -> None:
+        """Queue a lookup of workers with a recent heartbeat on ``pipe``."""
+        pipe.zrangebyscore(self._workers_key(), time.time() - WORKER_TTL, "+inf")
+
+    async def is_user_online(self, user_id: int) -> bool:
+        if user_id in self.local_users:
+            return True
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                self._queue_live_workers(pipe)
+                pipe.smembers(self._user_workers_key(user_id))
+                live, owners = await pipe.execute()
+        except Exception as e:
+            self._error(f"check presence of user {user_id}", e)
+            return False
+        return bool(set(live) & set(owners))
+
+    async def get_online_users(self) -> List[int]:
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                self._queue_live_workers(pipe)
+                live = (await pipe.execute())[0]
+            if not live:
+                return list(self.local_users)
+            members = await self.redis.sunion(
+                [self._worker_users_key(w.decode() if isinstance(w, bytes) else w) for w in live]
+            )
+        except Exception as e:
+            self._error("list online users", e)
+            return list(self.local_users)
+        return list({int(m) for m in members} | self.local_users)
+
+    # Conversation rooms
+
+    async def join_conversation(self, conversation_id: int, user_id: int) -> None:
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.sadd(self._conversation_key(conversation_id), user_id)
+                pipe.expire(self._conversation_key(conversation_id), CONVERSATION_TTL)
+                await pipe.execute()
+        except Exception as e:
+            self._error(f"join conversation {conversation_id}", e)
+
+    async def leave_conversation(self, conversation_id: int, user_id: int) -> None:
+        try:
+            await self.redis.srem(self._conversation_key(conversation_id), user_id)
+        except Exception as e:
+            self._error(f"leave conversation {conversation_id}", e)
+
+    async def get_conversation_members(self, conversation_id: int) -> Set[int]:
+        try:
+            members = await self.redis.smembers(self._conversation_key(conversation_id))
+        except Exception as e:
+            self._error(f"load conversation {conversation_id}", e)
+            return set()
+        return {int(m) for m in members}
+
+    # Routing
+
+    async def route(self, user_ids: Iterable[int], message: Dict[str, Any]) -> Set[int]:
+        # Users connected here may also have sockets on other workers
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return set()
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                self._queue_live_workers(pipe)
+                for user_id in user_ids:
+                    pipe.smembers(self._user_workers_key(user_id))
+                live, *owners = await pipe.execute()
+
+            live = {w.decode() if isinstance(w, bytes) else w for w in live}
+            by_worker: Dict[str, List[int]] = {}
+            for user_id, workers in zip(user_ids, owners):
+                for worker in workers:
+                    worker = worker.decode() if isinstance(worker, bytes) else worker
+                    if worker in live and worker != self.worker_id:
+                        by_worker.setdefault(worker, []).append(user_id)
+            if not by_worker:
+                return set()
+
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for worker, users in by_worker.items():
+                    envelope = json.dumps({"origin": self.worker_id, "users": users, "message": message}, default=str)
+                    pipe.publish(self._deliver_channel(worker), envelope)
+                await pipe.execute()
+        except Exception as e:
+            self._error(f"route message to users {user_ids}", e)
+            return set()
+
+        reached = {u for users in by_worker.values() for u in users}
+        self._stats["routed"] += len(reached)
+        return reached
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "broker": self.name,
+            "worker_id": self.worker_id,
+            "local_users": len(self.local_users),
+            "listener_running": self._listener_task is not None and not self._listener_task.done(),
+            **self._stats
+        }
+
+
+def create_realtime_broker() -> RealtimeBroker:
+    """
+    Build the broker selected by ``REALTIME_BROKER`` ("redis" or "memory").
+    Defaults to Redis whenever the cache service has Redis configured.
+    """
+    from services.cache_service import cache_service
+
+    choice = os.getenv("REALTIME_BROKER", "").strip().lower()
+    if choice == "memory" or (not choice and not cache_service.enabled):
+        return InMemoryBroker()
+    return RedisBroker(cache_service.redis_url)
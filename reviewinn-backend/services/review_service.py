@@ -277,23 +277,18 @@ class ReviewService(BaseService):
         return self.review_repository.find_by_entity_and_user(entity_id, user_id)
     
     async def _update_entity_rating(self, entity_id: int) -> None:
-        """Update entity's average rating (internal method)."""
+        """
+        Refresh the loaded entity's rating fields (internal method).
+        
+        The entity_stats triggers update review_count / average_rating in the
+        same transaction as the review write, so there is nothing to
+        recompute; only expire the identity-map copy so readers see the new
+        values.
+        """
         try:
-            # Calculate new average rating
-            result = self.db.query(
-                self.db.func.avg(Review.rating).label('avg_rating'),
-                self.db.func.count(Review.review_id).label('review_count')
-            ).filter(Review.entity_id == entity_id).first()
-            
-            avg_rating = float(result.avg_rating) if result.avg_rating else 0.0
-            review_count = result.review_count or 0
-            
-            # Update entity
-            entity = self.db.query(Entity).filter(Entity.entity_id == entity_id).first()
-            if entity:
-                entity.average_rating = round(avg_rating, 2)
-                entity.total_reviews = review_count
-                self.db.commit()
+            entity = self.db.identity_map.get(self.db.identity_key(Entity, entity_id))
+            if entity is not None:
+                self.db.expire(entity, ['average_rating', 'review_count'])
                 
         except Exception as e:
             self.log_error(f"Failed to update entity rating for entity {entity_id}: {str(e)}")
@@ -0,0 +1,224 @@
+"""
+Full-text search over reviews, entities, users and categories.
+
+Backed by the weighted ``search_vector`` columns, GIN indexes and triggers in
+database/search_engine.sql. Queries match the tsvector (the last term as a
+prefix, for typeahead) or, for misspellings, a pg_trgm similarity match on
+the name-like columns; results are ordered by ``ts_rank`` plus similarity.
+"""
+
+import logging
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import desc, false, func, literal_column, or_
+from sqlalchemy.orm import Query, Session
+
+from models.entity import Entity
+from models.review import Review
+from models.unified_category import UnifiedCategory
+from models.user import User
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CONFIG = "english"
+SEARCH_TYPES = ("reviews", "entities", "users", "categories")
+MAX_QUERY_TERMS = 8
+# Trigram similarity is on a 0..1 scale; scale it below a strong ts_rank hit
+TRIGRAM_WEIGHT = 0.5
+
+_TERM_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+# kind -> (model, id column, tsvector column, trigram columns)
+_TARGETS = {
+    "reviews": (Review, Review.review_id, "review_main.search_vector", (Review.title,)),
+    "entities": (Entity, Entity.entity_id, "core_entities.search_vector", (Entity.name,)),
+    "users": (User, User.user_id, "core_users.search_vector", (User.username, User.display_name)),
+    "categories": (UnifiedCategory, UnifiedCategory.id, "unified_categories.search_vector", (UnifiedCategory.name,)),
+}
+
+
+def build_tsquery(q: str) -> Optional[str]:
+    """
+    Turn free text into a ``to_tsquery`` expression: terms are AND-ed and the
+    last one is a prefix match. Returns None when no searchable terms remain.
+    """
+    terms = _TERM_RE.findall((q or "").lower())[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    terms[-1] = f"{terms[-1]}:*"
+    return " & ".join(terms)
+
+
+def text_search_clause(kind: str, q: str):
+    """
+    ``(filter, score)`` expressions for searching ``kind`` with ``q``, or None
+    when ``q`` has no searchable terms. Both sides of the filter are served by
+    GIN indexes, so the planner can combine them with a BitmapOr.
+    """
+    tsquery_text = build_tsquery(q)
+    if tsquery_text is None:
+        return None
+
+    _, _, vector_column, trigram_columns = _TARGETS[kind]
+    vector = literal_column(vector_column)
+    tsquery = func.to_tsquery(SEARCH_CONFIG, tsquery_text)
+    needle = q.strip()
+
+    match = or_(
+        vector.op("@@")(tsquery),
+        *[column.op("%")(needle) for column in trigram_columns]
+    )
+    similarity = (
+        func.similarity(trigram_columns[0], needle)
+        if len(trigram_columns) == 1
+        else func.greatest(*[func.coalesce(func.similarity(c, needle), 0) for c in trigram_columns])
+    )
+    score = func.ts_rank(vector, tsquery) + func.coalesce(similarity, 0) * TRIGRAM_WEIGHT
+    return match, score
+
+
+def apply_text_search(query: Query, kind: str, q: str) -> Query:
+    """Filter an ORM query on the ``kind`` model by ``q`` and order it by relevance."""
+    clause = text_search_clause(kind, q)
+    if clause is None:
+        return query.filter(false())
+    match, score = clause
+    return query.filter(match).order_by(desc(score))
+
+
+class SearchService:
+    """Unified ranked search across the searchable tables."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def search_ids(
+        self,
+        kind: str,
+        q: str,
+        limit: int = 20,
+        offset: int = 0,
+        filters: Iterable[Any] = ()
+    ) -> List[Tuple[int, float]]:
+        """Ranked ``(id, score)`` pairs for one kind."""
+        clause = text_search_clause(kind, q)
+        if clause is None:
+            return []
+        match, score = clause
+        _, id_column, _, _ = _TARGETS[kind]
+
+        rows = (
+            self.db.query(id_column, score.label("score"))
+            .filter(match, *filters)
+            .order_by(desc("score"), desc(id_column))
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
+        return [(row[0], float(row[1] or 0)) for row in rows]
+
+    def search(
+        self,
+        q: str,
+        types: Optional[Iterable[str]] = None,
+        limit: int = 10,
+        offset: int = 0
+    ) -> Dict[str, Dict[str, Any]]:
+        """Search every requested kind; each result set is paged independently."""
+        results = {}
+        for kind in (types or SEARCH_TYPES):
+            if kind not in _TARGETS:
+                continue
+            try:
+                ranked = self.search_ids(kind, q, limit + 1, offset, self._default_filters(kind))
+            except Exception as e:
+                logger.error(f"Search failed for {kind} with query {q!r}: {e}")
+                self.db.rollback()
+                ranked = []
+
+            has_more = len(ranked) > limit
+            ranked = ranked[:limit]
+            rows = self._load(kind, [item_id for item_id, _ in ranked])
+            items = []
+            for item_id, score in ranked:
+                row = rows.get(item_id)
+                if row is not None:
+                    items.append({**self._serialize(kind, row), "score": round(score, 4)})
+            results[kind] = {"items": items, "has_more": has_more}
+        return results
+
+    def suggest(self, q: str, limit: int = 8) -> List[Dict[str, Any]]:
+        """Typeahead suggestions: best entity, category and user names for a prefix."""
+        suggestions = []
+        for kind in ("entities", "categories", "users"):
+            for item in self.search(q, [kind], limit=limit)[kind]["items"]:
+                suggestions.append({
+                    "type": kind,
+                    "id": item["id"],
+                    "label": item["label"],
+                    "score": item["score"]
+                })
+        suggestions.sort(key=lambda s: s["score"], reverse=True)
+        return suggestions[:limit]
+
+    @staticmethod
+    def _default_filters(kind: str) -> List[Any]:
+        if kind == "entities":
+            return [Entity.is_active == True]
+        if kind == "users":
+            return [User.is_active == True]
+        if kind == "categories":
+            return [UnifiedCategory.is_active == True]
+        return []
+
+    def _load(self, kind: str, ids: List[int]) -> Dict[int, Any]:
+        if not ids:
+            return {}
+        model, id_column, _, _ = _TARGETS[kind]
+        rows = self.db.query(model).filter(id_column.in_(ids)).all()
+        return {getattr(row, id_column.key): row for row in rows}
+
+    @staticmethod
+    def _serialize(kind: str, row: Any) -> Dict[str, Any]:
+        if kind == "reviews":
+            return {
+                "id": row.review_id,
+                "label": row.title or (row.content or "")[:80],
+                "title": row.title,
+                "snippet": (row.content or "")[:200],
+                "entity_id": row.entity_id,
+                "user_id": None if row.is_anonymous else row.user_id,
+                "overall_rating": row.overall_rating,
+                "created_at": row.created_at.isoformat() if row.created_at else None
+            }
+        if kind == "entities":
+            final_category = row.final_category if isinstance(row.final_category, dict) else {}
+            return {
+                "id": row.entity_id,
+                "label": row.name,
+                "name": row.name,
+                "avatar": row.avatar,
+                "category": final_category.get("name"),
+                "is_verified": row.is_verified,
+                "average_rating": row.average_rating or 0.0,
+                "review_count": row.review_count or 0
+            }
+        if kind == "users":
+            return {
+                "id": row.user_id,
+                "label": row.display_name or row.username,
+                "username": row.username,
+                "display_name": row.display_name,
+                "avatar": row.avatar,
+                "is_verified": row.is_verified
+            }
+        return {
+            "id": row.id,
+            "label": row.name,
+            "name": row.name,
+            "slug": row.slug,
+            "path": row.path,
+            "level": row.level,
+            "icon": row.icon
+        }
@@ -0,0 +1,581 @@
+"""
+Similar-entities index.
+
+Each entity's most similar entities are precomputed into entity_similarities
+so the "similar entities" endpoint is a single range scan. The score blends:
+
+- TF-IDF cosine of name (weighted up) and description text;
+- co-review cosine: users who reviewed X also reviewed Y;
+- a bonus for sharing the final category, or failing that the root category.
+
+Text and co-review similarity come out of two sparse matrix products per
+block of entities. build_similar_entities.py runs a full build nightly and
+refreshes the entities queued by the triggers in
+database/entity_similarity.sql (new or edited entities, new or removed
+reviews) every few minutes. An incremental refresh rewrites the queued
+entities' lists and folds the new scores into the lists of the entities
+they now resemble.
+
+Building the index scans every active entity and every review, so the full
+build saves it to SNAPSHOT_PATH. An incremental refresh loads that snapshot
+and recomputes only the queued entities' rows (against the vocabulary and
+IDF of the last full build), then saves it back. Without a usable snapshot,
+or once it is older than SNAPSHOT_MAX_AGE, the refresh loads from the
+database as the full build does.
+"""
+
+import logging
+import os
+import re
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, desc, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from models.entity import Entity
+from models.entity_similarity import EntitySimilarity, EntitySimilarityQueue
+from models.review import Review
+from services.taste_match_service import fetch_columns
+
+logger = logging.getLogger(__name__)
+
+TOP_K = int(os.getenv("SIMILAR_ENTITIES_TOP_K", "20"))
+TEXT_WEIGHT = 0.5
+CO_REVIEW_WEIGHT = 0.35
+FINAL_CATEGORY_BONUS = 0.15
+ROOT_CATEGORY_BONUS = 0.05
+# Name tokens count this many times more than description tokens
+NAME_WEIGHT = 3
+# Terms in more than this share of entities are treated as stop words
+MAX_DOCUMENT_FREQUENCY = 0.2
+# Reviewers of more entities than this say little about which belong together
+MAX_REVIEWS_PER_USER = 500
+BLOCK_SIZE = 1000
+# Queued entities handled per incremental refresh
+INCREMENTAL_BATCH = 5000
+
+# Index saved by the last full build and kept current by incremental refreshes
+SNAPSHOT_PATH = os.getenv(
+    "SIMILAR_ENTITIES_SNAPSHOT", os.path.join(tempfile.gettempdir(), "similar_entities_index.npz")
+)
+# Snapshots older than this (seconds since their full build) are not reused
+SNAPSHOT_MAX_AGE = float(os.getenv("SIMILAR_ENTITIES_SNAPSHOT_MAX_AGE", str(2 * 86400)))
+SNAPSHOT_VERSION = 1
+
+# pg advisory lock key so only one build runs at a time
+_BUILD_LOCK_KEY = 7246003
+
+_TOKEN = re.compile(r"[a-z0-9]{2,}")
+_STOP_WORDS = frozenset(
+    "an and are as at be but by for from has have in is it its of on or that the this to was were will with".split()
+)
+
+_REVERSE_UPSERT_SQL = text("""
+    INSERT INTO entity_similarities (entity_id, similar_entity_id, score, computed_at)
+    SELECT v.entity_id, v.similar_entity_id, v.score, :computed_at
+    FROM unnest(CAST(:ids AS integer[]), CAST(:similar_ids AS integer[]), CAST(:scores AS double precision[]))
+        AS v(entity_id, similar_entity_id, score)
+    ON CONFLICT (entity_id, similar_entity_id)
+    DO UPDATE SET score = EXCLUDED.score, computed_at = EXCLUDED.computed_at
+""")
+
+_TRIM_SQL = text("""
+    DELETE FROM entity_similarities s
+    USING (
+        SELECT entity_id, similar_entity_id,
+               row_number() OVER (PARTITION BY entity_id ORDER BY score DESC, similar_entity_id) AS rank
+        FROM entity_similarities
+        WHERE entity_id = ANY(CAST(:ids AS integer[]))
+    ) ranked
+    WHERE s.entity_id = ranked.entity_id
+      AND s.similar_entity_id = ranked.similar_entity_id
+      AND ranked.rank > :top_k
+""")
+
+
+class SimilarEntityService:
+    """Read and rebuild the similar-entities index."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def similar(self, entity: Entity, limit: int) -> List[Entity]:
+        """
+        Most similar active entities, best first. Entities the index knows
+        nothing about yet are padded with popular entities from the same
+        category.
+        """
+        similar = self.db.query(Entity).join(
+            EntitySimilarity, EntitySimilarity.similar_entity_id == Entity.entity_id
+        ).filter(
+            EntitySimilarity.entity_id == entity.entity_id,
+            Entity.is_active == True
+        ).order_by(
+            desc(EntitySimilarity.score), EntitySimilarity.similar_entity_id
+        ).limit(limit).all()
+
+        category = entity.final_category or entity.root_category
+        if len(similar) < limit and category and category.get('id') is not None:
+            column = Entity.final_category if entity.final_category else Entity.root_category
+            exclude = [entity.entity_id] + [e.entity_id for e in similar]
+            similar += self.db.query(Entity).filter(
+                column['id'].astext == str(category['id']),
+                Entity.is_active == True,
+                ~Entity.entity_id.in_(exclude)
+            ).order_by(
+                desc(Entity.review_count), Entity.entity_id
+            ).limit(limit - len(similar)).all()
+        return similar
+
+    def rebuild(self, top_k: int = TOP_K, progress: Optional[Callable[[int, int], None]] = None) -> int:
+        """
+        Recompute every entity's list. Each block is replaced in its own
+        transaction; ``progress(entities_done, entities_total)`` is called
+        after each. Returns rows written, or 0 if another build holds the lock.
+        """
+        return self._locked(lambda started: self._rebuild(top_k, started, progress))
+
+    def refresh_queued(self, top_k: int = TOP_K, batch_size: int = INCREMENTAL_BATCH) -> int:
+        """
+        Recompute the lists of queued entities. Returns the number of queued
+        entities handled, or 0 if the queue is empty or another build runs.
+        """
+        return self._locked(lambda started: self._refresh_queued(top_k, batch_size, started))
+
+    def _locked(self, work: Callable[[datetime], int]) -> int:
+        started = datetime.now(timezone.utc)
+        # Held on its own connection: the session commits per block and may
+        # not keep the same pooled connection throughout
+        with self.db.get_bind().connect() as lock_conn:
+            if not lock_conn.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": _BUILD_LOCK_KEY}
+            ).scalar():
+                logger.info("Similar entities build already running elsewhere, skipping")
+                return 0
+            try:
+                return work(started)
+            except Exception:
+                self.db.rollback()
+                raise
+            finally:
+                lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _BUILD_LOCK_KEY})
+
+    def _rebuild(self, top_k: int, started: datetime, progress: Optional[Callable[[int, int], None]]) -> int:
+        index = _SimilarityIndex.load(self.db)
+        written = 0
+        for start in range(0, len(index.entity_ids), BLOCK_SIZE):
+            positions = np.arange(start, min(start + BLOCK_SIZE, len(index.entity_ids)))
+            pairs = index.top_similar(positions, top_k)
+            self._replace(index.entity_ids[positions].tolist(), pairs, started)
+            self.db.commit()
+            written += len(pairs[0])
+            if progress:
+                progress(int(positions[-1]) + 1, len(index.entity_ids))
+
+        # Entities deactivated or deleted since the last build
+        self.db.execute(delete(EntitySimilarity).where(EntitySimilarity.computed_at < started))
+        self.db.execute(delete(EntitySimilarityQueue).where(EntitySimilarityQueue.queued_at <= started))
+        self.db.commit()
+        _save_snapshot(index)
+        return written
+
+    def _refresh_queued(self, top_k: int, batch_size: int, started: datetime) -> int:
+        queued = self.db.execute(
+            select(EntitySimilarityQueue.entity_id)
+            .order_by(EntitySimilarityQueue.queued_at)
+            .limit(batch_size)
+        ).scalars().all()
+        if not queued:
+            return 0
+
+        index = _SimilarityIndex.from_snapshot(SNAPSHOT_PATH)
+        if index is None:
+            index = _SimilarityIndex.load(self.db)
+        else:
+            index.update(self.db, queued)
+        positions = np.searchsorted(index.entity_ids, queued)
+        positions = positions[positions < len(index.entity_ids)]
+        positions = positions[np.isin(index.entity_ids[positions], queued)]
+
+        entity_ids, similar_ids, scores = self._replace(queued, index.top_similar(positions, top_k), started)
+        if entity_ids:
+            # The reverse direction: queued entities may now belong in their neighbours' lists
+            self.db.execute(_REVERSE_UPSERT_SQL, {
+                "ids": similar_ids, "similar_ids": entity_ids, "scores": scores, "computed_at": started
+            })
+            self.db.execute(_TRIM_SQL, {"ids": list(set(similar_ids)), "top_k": top_k})
+
+        # Entities queued again after ``started`` stay for the next run
+        self.db.execute(delete(EntitySimilarityQueue).where(
+            EntitySimilarityQueue.entity_id.in_(queued),
+            EntitySimilarityQueue.queued_at <= started
+        ))
+        self.db.commit()
+        _save_snapshot(index)
+        return len(queued)
+
+    def _replace(self, entity_ids: List[int], pairs, computed_at: datetime) -> Tuple[List[int], List[int], List[float]]:
+        """Swap the stored lists of ``entity_ids`` for ``pairs``; returns the rows written."""
+        sources, targets, scores = (values.tolist() for values in pairs)
+        self.db.execute(delete(EntitySimilarity).where(EntitySimilarity.entity_id.in_(entity_ids)))
+        if sources:
+            self.db.execute(insert(EntitySimilarity), [
+                {"entity_id": s, "similar_entity_id": t, "score": score, "computed_at": computed_at}
+                for s, t, score in zip(sources, targets, scores)
+            ])
+        return sources, targets, scores
+
+
+def _save_snapshot(index: "_SimilarityIndex") -> None:
+    """
+    Save ``index`` for the next refresh. If that fails the old snapshot is
+    removed: it lacks rows whose queue entries were just deleted.
+    """
+    try:
+        index.save(SNAPSHOT_PATH)
+    except Exception as e:
+        logger.warning(f"Could not save similar entities snapshot {SNAPSHOT_PATH}: {e}")
+        try:
+            os.remove(SNAPSHOT_PATH)
+        except OSError:
+            pass
+
+
+class _SimilarityIndex:
+    """
+    Row-normalised text and co-review matrices of all active entities, plus
+    what is needed to recompute single rows later: the vocabulary and term
+    weights (IDF) of the build, the reviewer of each co-review column and
+    the category code tables.
+    """
+
+    def __init__(
+        self,
+        entity_ids: np.ndarray,
+        final_categories: np.ndarray,
+        root_categories: np.ndarray,
+        tfidf: sparse.csr_matrix,
+        co_review: sparse.csr_matrix,
+        vocabulary: Dict[str, int],
+        term_weights: np.ndarray,
+        user_ids: np.ndarray,
+        final_codes: Dict[str, int],
+        root_codes: Dict[str, int],
+        built_at: float
+    ):
+        self.entity_ids = entity_ids
+        self.final_categories = final_categories
+        self.root_categories = root_categories
+        self.tfidf = tfidf
+        self.co_review = co_review
+        self.vocabulary = vocabulary
+        self.term_weights = term_weights
+        self.user_ids = user_ids
+        self.final_codes = final_codes
+        self.root_codes = root_codes
+        self.built_at = built_at
+        self._transpose()
+
+    def _transpose(self) -> None:
+        self.tfidf_t = self.tfidf.T.tocsr()
+        self.co_review_t = self.co_review.T.tocsr()
+
+    @classmethod
+    def load(cls, db: Session) -> "_SimilarityIndex":
+        rows = db.execute(
+            select(
+                Entity.entity_id,
+                Entity.name,
+                Entity.description,
+                Entity.final_category['id'].astext,
+                Entity.root_category['id'].astext
+            ).where(Entity.is_active == True).order_by(Entity.entity_id)
+        ).all()
+        entity_ids = np.asarray([row[0] for row in rows], dtype=np.int64)
+        vocabulary: Dict[str, int] = {}
+        counts = _term_counts([row[1] for row in rows], [row[2] for row in rows], vocabulary, grow=True)
+        term_weights = _term_weights(counts)
+        co_review, user_ids = _co_review_matrix(db, entity_ids)
+        final_codes: Dict[str, int] = {}
+        root_codes: Dict[str, int] = {}
+        return cls(
+            entity_ids,
+            _category_codes([row[3] for row in rows], final_codes),
+            _category_codes([row[4] for row in rows], root_codes),
+            _normalise_rows(counts @ sparse.diags(term_weights)),
+            co_review,
+            vocabulary,
+            term_weights,
+            user_ids,
+            final_codes,
+            root_codes,
+            time.time()
+        )
+
+    @classmethod
+    def from_snapshot(cls, path: str, max_age: float = SNAPSHOT_MAX_AGE) -> Optional["_SimilarityIndex"]:
+        """The index saved by an earlier run; None if missing, unreadable or too old."""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if int(data["version"]) != SNAPSHOT_VERSION or time.time() - float(data["built_at"]) > max_age:
+                    return None
+                return cls(
+                    data["entity_ids"],
+                    data["final_categories"],
+                    data["root_categories"],
+                    _load_csr(data, "tfidf"),
+                    _load_csr(data, "co_review"),
+                    {term: i for i, term in enumerate(data["terms"].tolist())},
+                    data["term_weights"],
+                    data["user_ids"],
+                    {key: i for i, key in enumerate(data["final_keys"].tolist())},
+                    {key: i for i, key in enumerate(data["root_keys"].tolist())},
+                    float(data["built_at"])
+                )
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable similar entities snapshot {path}: {e}")
+            return None
+
+    def save(self, path: str) -> None:
+        """Write the index atomically for the next incremental refresh."""
+        arrays = {
+            "version": np.asarray(SNAPSHOT_VERSION),
+            "built_at": np.asarray(self.built_at),
+            "entity_ids": self.entity_ids,
+            "final_categories": self.final_categories,
+            "root_categories": self.root_categories,
+            "terms": np.asarray(_ordered_keys(self.vocabulary), dtype=str),
+            "term_weights": self.term_weights,
+            "user_ids": self.user_ids,
+            "final_keys": np.asarray(_ordered_keys(self.final_codes), dtype=str),
+            "root_keys": np.asarray(_ordered_keys(self.root_codes), dtype=str)
+        }
+        for name, matrix in (("tfidf", self.tfidf), ("co_review", self.co_review)):
+            arrays.update({
+                f"{name}_data": matrix.data,
+                f"{name}_indices": matrix.indices,
+                f"{name}_indptr": matrix.indptr,
+                f"{name}_shape": np.asarray(matrix.shape)
+            })
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=directory, suffix=".npz", delete=False) as f:
+            np.savez(f, **arrays)
+        os.replace(f.name, path)
+
+    def update(self, db: Session, entity_ids: List[int]) -> None:
+        """
+        Recompute the rows of ``entity_ids`` from the database: drop the ones
+        no longer active, add new ones and re-vectorise the rest against the
+        stored vocabulary and term weights. Terms the build never saw are
+        ignored and other entities' rows are left as they are; the next full
+        build picks both up.
+        """
+        rows = db.execute(
+            select(
+                Entity.entity_id,
+                Entity.name,
+                Entity.description,
+                Entity.final_category['id'].astext,
+                Entity.root_category['id'].astext
+            ).where(Entity.entity_id.in_(entity_ids), Entity.is_active == True).order_by(Entity.entity_id)
+        ).all()
+        active = np.asarray([row[0] for row in rows], dtype=np.int64)
+
+        # Drop queued entities that are gone or inactive, then append new ones
+        keep = ~np.isin(self.entity_ids, np.setdiff1d(np.asarray(entity_ids, dtype=np.int64), active))
+        added = np.setdiff1d(active, self.entity_ids)
+        ids = np.concatenate([self.entity_ids[keep], added])
+        order = np.argsort(ids, kind="stable")
+        padding = np.full(len(added), -1, dtype=np.int64)
+        self.entity_ids = ids[order]
+        self.final_categories = np.concatenate([self.final_categories[keep], padding])[order]
+        self.root_categories = np.concatenate([self.root_categories[keep], padding])[order]
+        self.tfidf = _append_empty_rows(self.tfidf[keep], len(added))[order]
+        self.co_review = _append_empty_rows(self.co_review[keep], len(added))[order]
+
+        if len(active):
+            positions = np.searchsorted(self.entity_ids, active)
+            counts = _term_counts([row[1] for row in rows], [row[2] for row in rows], self.vocabulary, grow=False)
+            text_rows = _normalise_rows(counts @ sparse.diags(self.term_weights))
+            review_rows, self.user_ids = _co_review_rows(db, active, self.user_ids)
+            self.tfidf = _replace_rows(self.tfidf, positions, text_rows)
+            self.co_review = _replace_rows(self.co_review, positions, review_rows)
+            self.final_categories[positions] = _category_codes([row[3] for row in rows], self.final_codes)
+            self.root_categories[positions] = _category_codes([row[4] for row in rows], self.root_codes)
+        self._transpose()
+
+    def top_similar(self, positions: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(entity_id, similar_entity_id, score) arrays, best ``top_k`` per entity at ``positions``."""
+        if not len(positions):
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0)
+
+        combined = (
+            TEXT_WEIGHT * (self.tfidf[positions] @ self.tfidf_t)
+            + CO_REVIEW_WEIGHT * (self.co_review[positions] @ self.co_review_t)
+        ).tocoo()
+        sources = positions[combined.row]
+        keep = combined.col != sources
+        rows, sources, targets, scores = combined.row[keep], sources[keep], combined.col[keep], combined.data[keep]
+
+        same_final = (self.final_categories[sources] >= 0) & (self.final_categories[sources] == self.final_categories[targets])
+        same_root = (self.root_categories[sources] >= 0) & (self.root_categories[sources] == self.root_categories[targets])
+        scores = scores + np.where(same_final, FINAL_CATEGORY_BONUS, np.where(same_root, ROOT_CATEGORY_BONUS, 0.0))
+
+        order = np.lexsort((-scores, rows))
+        rows, sources, targets, scores = rows[order], sources[order], targets[order], scores[order]
+        rank = np.arange(len(rows)) - np.searchsorted(rows, rows, side="left")
+        best = rank < top_k
+        return self.entity_ids[sources[best]], self.entity_ids[targets[best]], scores[best]
+
+
+def _term_counts(
+    names: List[Optional[str]],
+    descriptions: List[Optional[str]],
+    vocabulary: Dict[str, int],
+    grow: bool
+) -> sparse.csr_matrix:
+    """
+    Log-scaled term counts per entity. With ``grow`` unseen terms are added
+    to ``vocabulary``; otherwise they are skipped.
+    """
+    documents, terms = [], []
+    for i, (name, description) in enumerate(zip(names, descriptions)):
+        words = _TOKEN.findall((name or "").lower()) * NAME_WEIGHT + _TOKEN.findall((description or "").lower())
+        for word in words:
+            if word in _STOP_WORDS:
+                continue
+            term = vocabulary.setdefault(word, len(vocabulary)) if grow else vocabulary.get(word)
+            if term is not None:
+                documents.append(i)
+                terms.append(term)
+
+    shape = (len(names), max(len(vocabulary), 1))
+    counts = sparse.csr_matrix((np.ones(len(terms)), (documents, terms)), shape=shape)
+    counts.sum_duplicates()
+    counts.data = np.log1p(counts.data)
+    return counts
+
+
+def _term_weights(counts: sparse.csr_matrix) -> np.ndarray:
+    """IDF per term, zero for terms too rare or too common to tell entities apart."""
+    document_frequency = np.bincount(counts.indices, minlength=counts.shape[1])
+    idf = np.log((counts.shape[0] + 1) / (document_frequency + 1)) + 1
+    # A term in one entity matches nothing; one in most entities matches everything
+    useful = (document_frequency >= 2) & (document_frequency <= MAX_DOCUMENT_FREQUENCY * counts.shape[0])
+    return np.where(useful, idf, 0.0)
+
+
+def _co_review_matrix(db: Session, entity_ids: np.ndarray) -> Tuple[sparse.csr_matrix, np.ndarray]:
+    """
+    Entity x reviewer 0/1 matrix over non-anonymous reviews, rows
+    L2-normalised, and the user id of each column.
+    """
+    reviewed, users = fetch_columns(
+        db,
+        select(Review.entity_id, Review.user_id).where(Review.is_anonymous.isnot(True)).distinct(),
+        (np.int64, np.int64)
+    )
+    positions = np.minimum(np.searchsorted(entity_ids, reviewed), max(len(entity_ids) - 1, 0))
+    active = entity_ids[positions] == reviewed if len(entity_ids) else np.zeros(len(reviewed), dtype=bool)
+    positions, users = positions[active], users[active]
+
+    user_ids, cols = np.unique(users, return_inverse=True)
+    keep = np.bincount(cols, minlength=len(user_ids))[cols] <= MAX_REVIEWS_PER_USER
+    matrix = sparse.csr_matrix(
+        (np.ones(int(keep.sum())), (positions[keep], cols[keep])),
+        shape=(len(entity_ids), max(len(user_ids), 1))
+    )
+    return _normalise_rows(matrix), user_ids
+
+
+def _co_review_rows(db: Session, entity_ids: np.ndarray, user_ids: np.ndarray) -> Tuple[sparse.csr_matrix, np.ndarray]:
+    """
+    Co-review rows for the sorted ``entity_ids`` in the column layout of
+    ``user_ids``; reviewers not seen before get new columns at the end.
+    Returns the rows and the extended column user ids.
+    """
+    reviewed, users = fetch_columns(
+        db,
+        select(Review.entity_id, Review.user_id).where(
+            Review.entity_id.in_(entity_ids.tolist()),
+            Review.is_anonymous.isnot(True)
+        ).distinct(),
+        (np.int64, np.int64)
+    )
+    if len(users):
+        # Same cut as the full build: reviewers of too many entities are ignored
+        entity_count = func.count(func.distinct(Review.entity_id))
+        heavy, _ = fetch_columns(
+            db,
+            select(Review.user_id, entity_count).where(
+                Review.user_id.in_(np.unique(users).tolist()),
+                Review.is_anonymous.isnot(True)
+            ).group_by(Review.user_id).having(entity_count > MAX_REVIEWS_PER_USER),
+            (np.int64, np.int64)
+        )
+        light = ~np.isin(users, heavy)
+        reviewed, users = reviewed[light], users[light]
+
+    user_ids = np.concatenate([user_ids, np.setdiff1d(users, user_ids)])
+    order = np.argsort(user_ids, kind="stable")
+    cols = order[np.searchsorted(user_ids[order], users)]
+    matrix = sparse.csr_matrix(
+        (np.ones(len(users)), (np.searchsorted(entity_ids, reviewed), cols)),
+        shape=(len(entity_ids), max(len(user_ids), 1))
+    )
+    return _normalise_rows(matrix), user_ids
+
+
+def _category_codes(category_ids: List[Optional[str]], codes: Dict[str, int]) -> np.ndarray:
+    """Category ids as small integers from ``codes`` (extended as needed); -1 where an entity has none."""
+    return np.asarray(
+        [codes.setdefault(c, len(codes)) if c else -1 for c in category_ids], dtype=np.int64
+    )
+
+
+def _ordered_keys(codes: Dict[str, int]) -> List[str]:
+    return sorted(codes, key=codes.get)
+
+
+def _load_csr(data, name: str) -> sparse.csr_matrix:
+    return sparse.csr_matrix(
+        (data[f"{name}_data"], data[f"{name}_indices"], data[f"{name}_indptr"]),
+        shape=tuple(data[f"{name}_shape"])
+    )
+
+
+def _append_empty_rows(matrix: sparse.csr_matrix, count: int) -> sparse.csr_matrix:
+    if not count:
+        return matrix
+    return sparse.vstack([matrix, sparse.csr_matrix((count, matrix.shape[1]))], format="csr")
+
+
+def _replace_rows(matrix: sparse.csr_matrix, positions: np.ndarray, rows: sparse.csr_matrix) -> sparse.csr_matrix:
+    """``matrix`` with the rows at ``positions`` swapped for ``rows``, widened to fit."""
+    n_rows, n_cols = matrix.shape[0], max(matrix.shape[1], rows.shape[1])
+    matrix = sparse.csr_matrix((matrix.data, matrix.indices, matrix.indptr), shape=(n_rows, n_cols))
+    rows = sparse.csr_matrix((rows.data, rows.indices, rows.indptr), shape=(rows.shape[0], n_cols))
+    keep = np.ones(n_rows)
+    keep[positions] = 0.0
+    placement = sparse.csr_matrix(
+        (np.ones(len(positions)), (positions, np.arange(len(positions)))),
+        shape=(n_rows, len(positions))
+    )
+    return (sparse.diags(keep) @ matrix + placement @ rows).tocsr()
+
+
+def _normalise_rows(matrix) -> sparse.csr_matrix:
+    matrix = sparse.csr_matrix(matrix)
+    matrix.eliminate_zeros()
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    inverse = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+    return (sparse.diags(inverse) @ matrix).tocsr()
@@ -0,0 +1,268 @@
+"""
+Taste-match neighbours for circle suggestions.
+
+Two users have similar taste when they rate the same entities the same way
+relative to their own average. The nightly build (build_taste_neighbors.py)
+turns reviews into a sparse user x entity matrix of mean-centred ratings,
+L2-normalises the rows and multiplies blocks of users against the whole
+matrix, so the cosine similarity of every pair that shares an entity comes
+out of one sparse product per block. The top K per user are stored in
+user_taste_neighbors together with the number of connections the two users
+have in common, and the suggestions endpoint reads them with one indexed
+query.
+"""
+
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, desc, func, insert, select, text
+from sqlalchemy.orm import Session, aliased
+
+from models.review import Review
+from models.review_circle import SocialCircleMember
+from models.taste_match import UserTasteNeighbor
+from models.user import User
+
+logger = logging.getLogger(__name__)
+
+TOP_K = int(os.getenv("TASTE_MATCH_TOP_K", "50"))
+# Fewer shared entities than this says nothing about taste
+MIN_CO_RATED = 2
+# similarity * n / (n + SHRINKAGE): pairs with few shared entities rank lower
+SHRINKAGE = 5.0
+# Entities reviewed by more users than this are skipped; they carry little
+# taste signal and make every pair of their reviewers a candidate
+MAX_ENTITY_RATERS = int(os.getenv("TASTE_MATCH_MAX_ENTITY_RATERS", "20000"))
+# Upper bound on candidate pairs produced by one block product
+MAX_BLOCK_PAIRS = 20_000_000
+FETCH_SIZE = 100_000
+
+# pg advisory lock key so only one build runs at a time
+_BUILD_LOCK_KEY = 7246002
+
+
+class TasteMatchService:
+    """Read and rebuild per-user taste neighbours."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def neighbors(
+        self,
+        user_id: int,
+        limit: int,
+        min_similarity: float = 0.0,
+        exclude: Iterable = ()
+    ) -> List[Tuple[User, UserTasteNeighbor]]:
+        """
+        Active users most similar to ``user_id``, best first. ``exclude``
+        takes id subqueries (connections, blocks, pending requests).
+        """
+        query = self.db.query(User, UserTasteNeighbor).join(
+            UserTasteNeighbor, UserTasteNeighbor.neighbor_id == User.user_id
+        ).filter(
+            UserTasteNeighbor.user_id == user_id,
+            UserTasteNeighbor.similarity >= min_similarity,
+            User.is_active == True
+        )
+        for ids in exclude:
+            query = query.filter(~User.user_id.in_(ids))
+        return query.order_by(
+            desc(UserTasteNeighbor.similarity), UserTasteNeighbor.neighbor_id
+        ).limit(limit).all()
+
+    def friends_of_friends(self, user_id: int, limit: int, exclude: Iterable = ()) -> List[Tuple[User, int]]:
+        """Active users two hops away, ranked by the number of mutual connections."""
+        first_hop = aliased(SocialCircleMember)
+        second_hop = aliased(SocialCircleMember)
+        mutual = func.count(func.distinct(first_hop.member_id)).label("mutual")
+        query = self.db.query(User, mutual).join(
+            second_hop, second_hop.member_id == User.user_id
+        ).join(
+            first_hop, first_hop.member_id == second_hop.owner_id
+        ).filter(
+            first_hop.owner_id == user_id,
+            User.user_id != user_id,
+            User.is_active == True
+        )
+        for ids in exclude:
+            query = query.filter(~User.user_id.in_(ids))
+        return query.group_by(User.user_id).order_by(desc(mutual), User.user_id).limit(limit).all()
+
+    def rebuild(self, top_k: int = TOP_K, progress: Optional[Callable[[int, int], None]] = None) -> int:
+        """
+        Recompute every user's neighbours from reviews and connections.
+
+        Each block of users is replaced in its own transaction, so readers see
+        either the previous or the new neighbours, never a partial list.
+        ``progress(users_done, users_total)`` is called after each block.
+        Returns the number of neighbour rows written; 0 if another build holds
+        the lock.
+        """
+        started = datetime.now(timezone.utc)
+        # Held on its own connection: the session commits per block and may
+        # not keep the same pooled connection throughout
+        with self.db.get_bind().connect() as lock_conn:
+            if not lock_conn.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": _BUILD_LOCK_KEY}
+            ).scalar():
+                logger.info("Taste match build already running elsewhere, skipping")
+                return 0
+            try:
+                written = self._rebuild(top_k, started, progress)
+                # Users whose reviews are gone since the last build
+                self.db.execute(delete(UserTasteNeighbor).where(UserTasteNeighbor.computed_at < started))
+                self.db.commit()
+                return written
+            except Exception:
+                self.db.rollback()
+                raise
+            finally:
+                lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _BUILD_LOCK_KEY})
+
+    def _rebuild(self, top_k: int, started: datetime, progress: Optional[Callable[[int, int], None]]) -> int:
+        user_ids, ratings, seen = self._rating_matrix()
+        if not len(user_ids):
+            return 0
+        connections = self._connection_matrix(user_ids)
+        ratings_t = ratings.T.tocsr()
+        seen_t = seen.T.tocsr()
+
+        written = 0
+        for start, end in _blocks(seen, seen_t):
+            rows, cols, similarity, co_rated = _block_neighbors(
+                ratings[start:end], ratings_t, seen[start:end], seen_t, start, top_k
+            )
+            rows = rows + start
+            mutual = _mutual_connections(connections, rows, cols)
+
+            block_ids = user_ids[start:end].tolist()
+            self.db.execute(delete(UserTasteNeighbor).where(UserTasteNeighbor.user_id.in_(block_ids)))
+            if len(rows):
+                self.db.execute(insert(UserTasteNeighbor), [
+                    {
+                        "user_id": int(user_ids[r]),
+                        "neighbor_id": int(user_ids[c]),
+                        "similarity": float(s),
+                        "co_rated": int(n),
+                        "mutual_connections": int(m),
+                        "computed_at": started
+                    }
+                    for r, c, s, n, m in zip(rows, cols, similarity, co_rated, mutual)
+                ])
+            self.db.commit()
+            written += len(rows)
+            if progress:
+                progress(end, len(user_ids))
+        return written
+
+    def _rating_matrix(self) -> Tuple[np.ndarray, sparse.csr_matrix, sparse.csr_matrix]:
+        """
+        Sorted user ids, the row-normalised mean-centred rating matrix and the
+        0/1 matrix of which entities each user reviewed.
+        """
+        stmt = select(
+            Review.user_id, Review.entity_id, func.avg(Review.overall_rating)
+        ).where(
+            # Anonymous reviews must not tie a reviewer to what they reviewed
+            Review.is_anonymous.isnot(True)
+        ).group_by(Review.user_id, Review.entity_id)
+        users, entities, stars = fetch_columns(self.db, stmt, (np.int64, np.int64, np.float64))
+        if not len(users):
+            return np.empty(0, dtype=np.int64), sparse.csr_matrix((0, 0)), sparse.csr_matrix((0, 0))
+
+        entity_ids, cols = np.unique(entities, return_inverse=True)
+        raters = np.bincount(cols, minlength=len(entity_ids))
+        keep = raters[cols] <= MAX_ENTITY_RATERS
+        users, cols, stars = users[keep], cols[keep], stars[keep]
+
+        user_ids, rows = np.unique(users, return_inverse=True)
+        shape = (len(user_ids), len(entity_ids))
+        counts = np.bincount(rows, minlength=len(user_ids))
+        means = np.bincount(rows, weights=stars, minlength=len(user_ids)) / np.maximum(counts, 1)
+
+        ratings = sparse.csr_matrix((stars - means[rows], (rows, cols)), shape=shape)
+        ratings.eliminate_zeros()
+        norms = np.sqrt(np.asarray(ratings.multiply(ratings).sum(axis=1)).ravel())
+        inverse = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+        ratings = sparse.diags(inverse) @ ratings
+
+        seen = sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=shape)
+        return user_ids, ratings.tocsr(), seen
+
+    def _connection_matrix(self, user_ids: np.ndarray) -> sparse.csr_matrix:
+        """0/1 matrix: row per rated user, column per connected user id."""
+        owners, members = fetch_columns(
+            self.db, select(SocialCircleMember.owner_id, SocialCircleMember.member_id), (np.int64, np.int64)
+        )
+        positions = np.searchsorted(user_ids, owners)
+        positions = np.minimum(positions, len(user_ids) - 1)
+        rated = user_ids[positions] == owners
+        rows, members = positions[rated], members[rated]
+        if not len(rows):
+            return sparse.csr_matrix((len(user_ids), 1), dtype=np.float32)
+        member_ids, cols = np.unique(members, return_inverse=True)
+        matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(len(user_ids), len(member_ids))
+        )
+        matrix.sum_duplicates()
+        matrix.data[:] = 1.0
+        return matrix
+
+
+def fetch_columns(db: Session, stmt, dtypes: Tuple) -> List[np.ndarray]:
+    """Stream a result into one numpy array per column."""
+    parts = [[] for _ in dtypes]
+    result = db.execute(stmt.execution_options(yield_per=FETCH_SIZE))
+    for chunk in result.partitions():
+        for part, dtype, column in zip(parts, dtypes, zip(*chunk)):
+            part.append(np.asarray(column, dtype=dtype))
+    return [
+        np.concatenate(part) if part else np.empty(0, dtype=dtype)
+        for part, dtype in zip(parts, dtypes)
+    ]
+
+
+def _blocks(seen: sparse.csr_matrix, seen_t: sparse.csr_matrix):
+    """
+    Contiguous user ranges whose candidate pairs fit MAX_BLOCK_PAIRS, using
+    each user's sum of entity rater counts as the upper bound.
+    """
+    raters = np.diff(seen_t.indptr)
+    work = np.cumsum(seen @ raters.astype(np.float64))
+    start = 0
+    while start < len(work):
+        base = work[start - 1] if start else 0.0
+        end = int(np.searchsorted(work, base + MAX_BLOCK_PAIRS, side="right"))
+        end = max(end, start + 1)
+        yield start, end
+        start = end
+
+
+def _block_neighbors(ratings_block, ratings_t, seen_block, seen_t, offset: int, top_k: int):
+    """Top-K (row, col, similarity, co_rated) per user of one block; rows are block-relative."""
+    co_rated = (seen_block @ seen_t).tocoo()
+    keep = (co_rated.data >= MIN_CO_RATED) & (co_rated.col != co_rated.row + offset)
+    rows, cols, shared = co_rated.row[keep], co_rated.col[keep], co_rated.data[keep]
+
+    cosine = (ratings_block @ ratings_t).tocsr()
+    similarity = np.asarray(cosine[rows, cols]).ravel() * shared / (shared + SHRINKAGE)
+    positive = similarity > 0
+    rows, cols, shared, similarity = rows[positive], cols[positive], shared[positive], similarity[positive]
+
+    order = np.lexsort((-similarity, rows))
+    rows, cols, shared, similarity = rows[order], cols[order], shared[order], similarity[order]
+    rank = np.arange(len(rows)) - np.searchsorted(rows, rows, side="left")
+    best = rank < top_k
+    return rows[best], cols[best], similarity[best], shared[best]
+
+
+def _mutual_connections(connections: sparse.csr_matrix, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """Common connections of each (row, col) user pair."""
+    if not len(rows):
+        return np.zeros(0, dtype=np.int64)
+    return np.asarray(connections[rows].multiply(connections[cols]).sum(axis=1)).ravel().astype(np.int64)
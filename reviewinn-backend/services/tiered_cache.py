@@ -0,0 +1,232 @@
+"""
+Two-tier cache for hot, rarely changing read paths.
+An in-process LRU (L1) sits in front of the Redis-backed CacheService (L2).
+Writes and invalidations are broadcast over Redis pub/sub so every worker
+drops its stale L1 entries.
+"""
+import asyncio
+import fnmatch
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Optional, Tuple
+
+from core.config.redis_client import pubsub_messages
+from services.cache_service import CacheService, cache_service
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "cache_invalidation"
+DEFAULT_MAX_ENTRIES = 2048
+DEFAULT_LOCAL_TTL = 60  # seconds; upper bound on cross-worker staleness if pub/sub is down
+LISTENER_RETRY_DELAY = 5
+
+_MISSING = object()
+
+
+def _namespace(key: str) -> str:
+    """Namespace used for stats: the key prefix before the first ':'."""
+    return key.split(":", 1)[0]
+
+
+class LocalLRUCache:
+    """
+    Bounded in-process LRU cache with per-entry TTLs and per-namespace counters.
+    Values are stored by reference; callers must treat cached values as read-only.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, default_ttl: int = DEFAULT_LOCAL_TTL):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0, "sets": 0, "evictions": 0, "invalidations": 0}
+        )
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return ``(found, value)``; expired entries count as misses."""
+        stats = self._stats[_namespace(key)]
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                stats["hits"] += 1
+                return True, value
+            self._entries.pop(key, None)
+        stats["misses"] += 1
+        return False, None
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        ttl = self.default_ttl if ttl is None else min(ttl, self.default_ttl)
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        self._stats[_namespace(key)]["sets"] += 1
+        while len(self._entries) > self.max_entries:
+            evicted_key, _ = self._entries.popitem(last=False)
+            self._stats[_namespace(evicted_key)]["evictions"] += 1
+
+    def delete(self, key: str) -> bool:
+        if self._entries.pop(key, None) is None:
+            return False
+        self._stats[_namespace(key)]["invalidations"] += 1
+        return True
+
+    def delete_pattern(self, pattern: str) -> int:
+        """Drop every key matching a Redis-style glob pattern."""
+        matched = [key for key in self._entries if fnmatch.fnmatchcase(key, pattern)]
+        for key in matched:
+            self.delete(key)
+        return len(matched)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        namespaces = {}
+        for namespace, counters in self._stats.items():
+            lookups = counters["hits"] + counters["misses"]
+            namespaces[namespace] = {
+                **counters,
+                "hit_rate": round(counters["hits"] / lookups * 100, 2) if lookups else 0.0
+            }
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "default_ttl": self.default_ttl,
+            "namespaces": namespaces
+        }
+
+
+class TieredCacheService:
+    """
+    L1 (per-worker LRU) + L2 (Redis) cache with the CacheService interface.
+    get/set/delete/delete_pattern go through both tiers; every other
+    CacheService method is delegated to Redis unchanged.
+    """
+
+    def __init__(
+        self,
+        backend: CacheService,
+        local: Optional[LocalLRUCache] = None,
+        channel: str = INVALIDATION_CHANNEL
+    ):
+        self.backend = backend
+        self.local = local or LocalLRUCache()
+        self.channel = channel
+        self.instance_id = uuid.uuid4().hex
+        self._listener_task: Optional[asyncio.Task] = None
+
+    async def get(self, key: str, default: Any = None) -> Optional[Any]:
+        found, value = self.local.get(key)
+        if found:
+            return value
+
+        value = await self.backend.get(key, _MISSING)
+        if value is _MISSING:
+            return default
+        self.local.set(key, value)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: int = None, serialize_method: str = "json") -> bool:
+        result = await self.backend.set(key, value, ttl, serialize_method)
+        await self._broadcast("delete", key)
+        self.local.set(key, value, ttl)
+        return result
+
+    async def delete(self, key: str) -> bool:
+        self.local.delete(key)
+        result = await self.backend.delete(key)
+        await self._broadcast("delete", key)
+        return result
+
+    async def delete_pattern(self, pattern: str) -> int:
+        self.local.delete_pattern(pattern)
+        result = await self.backend.delete_pattern(pattern)
+        await self._broadcast("pattern", pattern)
+        return result
+
+    async def clear_all(self) -> bool:
+        self.local.clear()
+        result = await self.backend.clear_all()
+        await self._broadcast("clear", "*")
+        return result
+
+    def __getattr__(self, name: str) -> Any:
+        # Hash/list/set/counter operations have no L1 tier
+        return getattr(self.backend, name)
+
+    async def get_stats(self) -> Dict[str, Any]:
+        return {
+            "local": self.local.get_stats(),
+            "redis": await self.backend.get_stats(),
+            "listener_running": self._listener_task is not None and not self._listener_task.done()
+        }
+
+    async def _broadcast(self, op: str, target: str) -> None:
+        message = json.dumps({"origin": self.instance_id, "op": op, "target": target})
+        await self.backend.publish(self.channel, message)
+
+    def _apply_invalidation(self, raw: Any) -> None:
+        try:
+            message = json.loads(raw.decode("utf-8") if isinstance(raw, bytes) else raw)
+        except (ValueError, UnicodeDecodeError):
+            logger.warning(f"Ignoring malformed cache invalidation message: {raw!r}")
+            return
+        if message.get("origin") == self.instance_id:
+            return
+
+        op, target = message.get("op"), message.get("target", "")
+        if op == "delete":
+            self.local.delete(target)
+        elif op == "pattern":
+            self.local.delete_pattern(target)
+        elif op == "clear":
+            self.local.clear()
+
+    async def start_listener(self) -> None:
+        """Start consuming invalidation messages (call once per worker at startup)."""
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._listen())
+
+    async def stop_listener(self) -> None:
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self.backend.pubsub()
+            if pubsub is None:
+                logger.warning("Cache invalidation listener disabled: Redis is not configured")
+                return
+            try:
+                await pubsub.subscribe(self.backend.channel_name(self.channel))
+                # Anything published while we were disconnected is lost
+                self.local.clear()
+                logger.info("Cache invalidation listener subscribed")
+                async for message in pubsub_messages(pubsub):
+                    self._apply_invalidation(message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener error: {e}; retrying in {LISTENER_RETRY_DELAY}s")
+                self.local.clear()
+                await asyncio.sleep(LISTENER_RETRY_DELAY)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
+# Global two-tier cache instance for hot read paths
+tiered_cache = TieredCacheService(cache_service)
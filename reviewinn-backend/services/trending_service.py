@@ -0,0 +1,321 @@
+"""
+Trending engine for entities and reviews.
+
+Reviews, comments, reactions and views add weighted contributions to the
+review and entity they touch, decaying exponentially with a half-life of
+``TRENDING_HALF_LIFE_HOURS``. Scores use forward decay: an event at time t
+adds ``weight * 2 ** ((t - landmark) / half_life)``, so stored scores are
+never decayed in place and their order is always the order of the decayed
+values. The current score is ``stored * 2 ** ((landmark - now) / half_life)``.
+Once the landmark is a week old the refresher rescales every score and moves
+it forward.
+
+TrendingRefresher tails the source tables by primary key and upserts the
+contributions in batches; readers take the top K straight off the
+(subject_type, score DESC) index, so every trending surface is O(K).
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Float, and_, cast, desc, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session
+from starlette.concurrency import run_in_threadpool
+
+from database import SessionLocal
+from models.entity import Entity
+from models.review import Review
+from models.trending import TrendingScore, TrendingState
+
+logger = logging.getLogger(__name__)
+
+ENTITY = "entity"
+REVIEW = "review"
+
+HALF_LIFE_SECONDS = float(os.getenv("TRENDING_HALF_LIFE_HOURS", "48")) * 3600
+REFRESH_INTERVAL = float(os.getenv("TRENDING_REFRESH_INTERVAL", "60"))  # seconds
+BATCH_SIZE = 5000
+MAX_BATCHES_PER_SOURCE = 20
+# Rows younger than this wait for the next pass so ids committed out of order are not skipped
+SETTLE_SECONDS = 30
+# Rescale stored scores and move the landmark once it is this old
+RENORMALIZE_AFTER = timedelta(days=7)
+# Decayed scores below this are dropped when rescaling
+PRUNE_BELOW = 0.01
+LANDMARK_STATE = "landmark"
+# pg advisory lock key so only one process refreshes at a time
+_REFRESH_LOCK_KEY = 7246001
+
+# name -> (batch query, review weight, entity weight). Each query returns
+# (id, review_id, entity_id, at) ordered by id.
+_SOURCES = {
+    "reviews": ("""
+        SELECT review_id AS id, review_id, entity_id, created_at AS at
+        FROM review_main
+        WHERE review_id > :last_id
+        ORDER BY review_id LIMIT :limit
+    """, 1.0, 5.0),
+    "comments": ("""
+        SELECT c.comment_id AS id, c.review_id, r.entity_id, c.created_at AS at
+        FROM review_comments c JOIN review_main r ON r.review_id = c.review_id
+        WHERE c.comment_id > :last_id
+        ORDER BY c.comment_id LIMIT :limit
+    """, 2.0, 2.0),
+    "reactions": ("""
+        SELECT x.reaction_id AS id, x.review_id, r.entity_id, x.created_at AS at
+        FROM review_reactions x JOIN review_main r ON r.review_id = x.review_id
+        WHERE x.reaction_id > :last_id
+        ORDER BY x.reaction_id LIMIT :limit
+    """, 1.0, 1.0),
+    "review_views": ("""
+        SELECT v.view_id AS id, v.review_id, r.entity_id, v.viewed_at AS at
+        FROM review_views v JOIN review_main r ON r.review_id = v.review_id
+        WHERE v.view_id > :last_id AND v.is_valid
+        ORDER BY v.view_id LIMIT :limit
+    """, 0.2, 0.2),
+    "entity_views": ("""
+        SELECT view_id AS id, NULL::integer AS review_id, entity_id, viewed_at AS at
+        FROM entity_views
+        WHERE view_id > :last_id AND is_valid
+        ORDER BY view_id LIMIT :limit
+    """, 0.0, 0.2),
+}
+
+_UPSERT_SQL = text("""
+    INSERT INTO trending_scores (subject_type, subject_id, score, updated_at)
+    SELECT v.subject_type, v.subject_id, v.score, NOW()
+    FROM unnest(CAST(:types AS varchar[]), CAST(:ids AS integer[]), CAST(:scores AS double precision[]))
+        AS v(subject_type, subject_id, score)
+    ON CONFLICT (subject_type, subject_id)
+    DO UPDATE SET score = trending_scores.score + EXCLUDED.score, updated_at = NOW()
+""")
+
+
+def _boost(at: datetime, landmark: datetime) -> float:
+    return 2.0 ** ((at - landmark).total_seconds() / HALF_LIFE_SECONDS)
+
+
+def current_score():
+    """SQL expression for the decayed score of a trending_scores row as of now."""
+    landmark = (
+        select(TrendingState.landmark)
+        .where(TrendingState.name == LANDMARK_STATE)
+        .scalar_subquery()
+    )
+    age = cast(func.extract("epoch", func.now() - landmark), Float)
+    return TrendingScore.score * func.power(2.0, -age / HALF_LIFE_SECONDS)
+
+
+def _joined(subject_type: str, id_column):
+    return and_(TrendingScore.subject_type == subject_type, TrendingScore.subject_id == id_column)
+
+
+def trending_entities_statement(limit: int, offset: int = 0, filters: Iterable[Any] = ()):
+    """``(Entity, score)`` rows, hottest first."""
+    return (
+        select(Entity, current_score().label("trending_score"))
+        .join(TrendingScore, _joined(ENTITY, Entity.entity_id))
+        .where(*filters)
+        .order_by(desc(TrendingScore.score), desc(TrendingScore.subject_id))
+        .offset(offset)
+        .limit(limit)
+    )
+
+
+def fallback_entities_statement(limit: int, offset: int = 0, filters: Iterable[Any] = ()):
+    """Used until the refresher has produced scores: most reviewed, best rated."""
+    return (
+        select(Entity)
+        .where(func.coalesce(Entity.review_count, 0) > 0, *filters)
+        .order_by(desc(Entity.review_count), desc(Entity.average_rating), desc(Entity.entity_id))
+        .offset(offset)
+        .limit(limit)
+    )
+
+
+def order_by_trending(query: Query, grouped: bool = False) -> Query:
+    """Order an ORM query on Entity by trending score (entities without activity last)."""
+    query = query.outerjoin(TrendingScore, _joined(ENTITY, Entity.entity_id))
+    score = func.max(TrendingScore.score) if grouped else TrendingScore.score
+    return query.order_by(desc(func.coalesce(score, 0)), desc(Entity.entity_id))
+
+
+def order_reviews_by_trending(query: Query) -> Query:
+    """Order an ORM query on Review by trending score (reviews without activity last)."""
+    query = query.outerjoin(TrendingScore, _joined(REVIEW, Review.review_id))
+    return query.order_by(desc(func.coalesce(TrendingScore.score, 0)), desc(Review.review_id))
+
+
+async def fetch_trending_entities(
+    session: AsyncSession,
+    limit: int = 10,
+    filters: Iterable[Any] = ()
+) -> List[Tuple[Entity, Optional[float]]]:
+    """Async-session variant of ``TrendingService.top_entities``."""
+    filters = list(filters)
+    rows = (await session.execute(trending_entities_statement(limit, filters=filters))).all()
+    if rows:
+        return [(entity, float(score or 0.0)) for entity, score in rows]
+    entities = (await session.execute(fallback_entities_statement(limit, filters=filters))).scalars().all()
+    return [(entity, None) for entity in entities]
+
+
+class TrendingService:
+    """Read precomputed trending scores and fold new activity into them."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def top_entities(
+        self,
+        limit: int = 10,
+        offset: int = 0,
+        filters: Iterable[Any] = ()
+    ) -> List[Tuple[Entity, Optional[float]]]:
+        """
+        Hottest entities with their current score. Until the refresher has
+        run (or if the trending tables are missing) this falls back to the
+        most reviewed entities, with a score of None.
+        """
+        filters = list(filters)
+        try:
+            # A savepoint, so a failure here leaves the caller's pending work alone
+            with self.db.begin_nested():
+                rows = self.db.execute(trending_entities_statement(limit, offset, filters)).all()
+        except Exception as e:
+            logger.warning(f"Trending scores unavailable, using fallback ordering: {e}")
+            rows = []
+        if rows:
+            return [(entity, float(score or 0.0)) for entity, score in rows]
+        entities = self.db.execute(fallback_entities_statement(limit, offset, filters)).scalars().all()
+        return [(entity, None) for entity in entities]
+
+    def refresh(self, batch_size: int = BATCH_SIZE) -> int:
+        """
+        Fold activity recorded since the previous pass into the scores and
+        return the number of events processed. Returns 0 without doing
+        anything while another process holds the refresh lock.
+        """
+        locked = self.db.execute(
+            text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _REFRESH_LOCK_KEY}
+        ).scalar()
+        if not locked:
+            self.db.rollback()
+            return 0
+
+        try:
+            now = datetime.now(timezone.utc)
+            state = {row.name: row for row in self.db.query(TrendingState).all()}
+
+            landmark_state = state.get(LANDMARK_STATE)
+            if landmark_state is None or landmark_state.landmark is None:
+                landmark_state = landmark_state or TrendingState(name=LANDMARK_STATE, last_id=0)
+                landmark_state.landmark = now
+                self.db.add(landmark_state)
+            elif now - landmark_state.landmark > RENORMALIZE_AFTER:
+                self._move_landmark(landmark_state, now)
+            landmark = landmark_state.landmark
+
+            settled = now - timedelta(seconds=SETTLE_SECONDS)
+            contributions: Dict[Tuple[str, int], float] = {}
+            processed = 0
+
+            for name, (sql, review_weight, entity_weight) in _SOURCES.items():
+                source_state = state.get(name)
+                if source_state is None:
+                    source_state = TrendingState(name=name, last_id=0)
+                    self.db.add(source_state)
+
+                for _ in range(MAX_BATCHES_PER_SOURCE):
+                    rows = self.db.execute(text(sql), {"last_id": source_state.last_id, "limit": batch_size}).all()
+                    caught_up = len(rows) < batch_size
+                    for row in rows:
+                        if row.at is not None and row.at > settled:
+                            caught_up = True
+                            break
+                        boost = _boost(row.at or now, landmark)
+                        if review_weight and row.review_id is not None:
+                            key = (REVIEW, row.review_id)
+                            contributions[key] = contributions.get(key, 0.0) + review_weight * boost
+                        if entity_weight and row.entity_id is not None:
+                            key = (ENTITY, row.entity_id)
+                            contributions[key] = contributions.get(key, 0.0) + entity_weight * boost
+                        source_state.last_id = row.id
+                        processed += 1
+                    if caught_up:
+                        break
+
+            if contributions:
+                keys = list(contributions)
+                self.db.execute(_UPSERT_SQL, {
+                    "types": [subject_type for subject_type, _ in keys],
+                    "ids": [subject_id for _, subject_id in keys],
+                    "scores": [contributions[key] for key in keys]
+                })
+            self.db.commit()
+            return processed
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def _move_landmark(self, landmark_state: TrendingState, now: datetime) -> None:
+        """Rescale every stored score to a landmark of ``now`` and drop negligible ones."""
+        factor = _boost(landmark_state.landmark, now)
+        self.db.execute(text("UPDATE trending_scores SET score = score * :factor"), {"factor": factor})
+        self.db.execute(text("DELETE FROM trending_scores WHERE score < :floor"), {"floor": PRUNE_BELOW})
+        landmark_state.landmark = now
+        logger.info(f"Trending landmark moved to {now.isoformat()} (scores scaled by {factor:.6f})")
+
+
+def refresh_trending_scores(batch_size: int = BATCH_SIZE) -> int:
+    """One refresh pass on a fresh session (runs on a worker thread)."""
+    db = SessionLocal()
+    try:
+        return TrendingService(db).refresh(batch_size)
+    finally:
+        db.close()
+
+
+class TrendingRefresher:
+    """Background task that keeps trending_scores up to date"""
+
+    def __init__(self, interval: float = REFRESH_INTERVAL):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await run_in_threadpool(refresh_trending_scores)
+                if processed:
+                    logger.debug(f"Trending refresh folded in {processed} events")
+            except Exception as e:
+                logger.error(f"Trending refresh failed: {e}")
+            await asyncio.sleep(self.interval)
+
+# Global refresher instance
+_trending_refresher: Optional[TrendingRefresher] = None
+
+def get_trending_refresher() -> TrendingRefresher:
+    """Get trending refresher singleton"""
+    global _trending_refresher
+    if _trending_refresher is None:
+        _trending_refresher = TrendingRefresher()
+    return _trending_refresher
@@ -13,7 +13,7 @@ from datetime import datetime
 from models.unified_category import UnifiedCategory
 from core import ValidationError, BusinessLogicError, NotFoundError, LoggerMixin
 from services.base import BaseService
-from services.cache_service import cache_service
+from services.tiered_cache import tiered_cache
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +30,7 @@ class UnifiedCategoryService(LoggerMixin):
             cache_key = f"{self.cache_prefix}:all_categories:{'with_inactive' if include_inactive else 'active_only'}"
             
             # Try to get from cache first
-            cached_data = await cache_service.get(cache_key)
+            cached_data = await tiered_cache.get(cache_key)
             if cached_data:
                 return cached_data
             
@@ -47,7 +47,7 @@ class UnifiedCategoryService(LoggerMixin):
                 result.append(category_data)
             
             # Cache for 1 hour
-            await cache_service.set(cache_key, result, ttl=3600)
+            await tiered_cache.set(cache_key, result, ttl=3600)
             
             return result
             
@@ -61,7 +61,7 @@ class UnifiedCategoryService(LoggerMixin):
             cache_key = f"{self.cache_prefix}:root_categories"
             
             # Try to get from cache first
-            cached_data = await cache_service.get(cache_key)
+            cached_data = await tiered_cache.get(cache_key)
             if cached_data:
                 return cached_data
             
@@ -70,7 +70,7 @@ class UnifiedCategoryService(LoggerMixin):
             result = [category.to_dict() for category in root_categories]
             
             # Cache for 2 hours
-            await cache_service.set(cache_key, result, ttl=7200)
+            await tiered_cache.set(cache_key, result, ttl=7200)
             
             return result
             
@@ -84,7 +84,7 @@ class UnifiedCategoryService(LoggerMixin):
             cache_key = f"{self.cache_prefix}:category:{category_id}:children_{include_children}:ancestors_{include_ancestors}"
             
             # Try to get from cache first
-            cached_data = await cache_service.get(cache_key)
+            cached_data = await tiered_cache.get(cache_key)
             if cached_data:
                 return cached_data
             
@@ -99,7 +99,7 @@ class UnifiedCategoryService(LoggerMixin):
             category_data = category.to_dict(include_children=include_children, include_ancestors=include_ancestors)
             
             # Cache for 1 hour
-            await cache_service.set(cache_key, category_data, ttl=3600)
+            await tiered_cache.set(cache_key, category_data, ttl=3600)
             
             return category_data
             
@@ -113,7 +113,7 @@ class UnifiedCategoryService(LoggerMixin):
             cache_key = f"{self.cache_prefix}:slug_path:{slug_path}"
             
             # Try to get from cache first
-            cached_data = await cache_service.get(cache_key)
+            cached_data = await tiered_cache.get(cache_key)
             if cached_data:
                 return cached_data
             
@@ -125,7 +125,7 @@ class UnifiedCategoryService(LoggerMixin):
             category_data = category.to_dict(include_children=True, include_ancestors=True)
             
             # Cache for 1 hour
-            await cache_service.set(cache_key, category_data, ttl=3600)
+            await tiered_cache.set(cache_key, category_data, ttl=3600)
             
             return category_data
             
@@ -139,7 +139,7 @@ class UnifiedCategoryService(LoggerMixin):
             cache_key = f"{self.cache_prefix}:children:{parent_id}"
             
             # Try to get from cache first
-            cached_data = await cache_service.get(cache_key)
+            cached_data = await tiered_cache.get(cache_key)
             if cached_data:
                 return cached_data
             
@@ -151,7 +151,7 @@ class UnifiedCategoryService(LoggerMixin):
             result = [child.to_dict() for child in children]
             
             # Cache for 1 hour
-            await cache_service.set(cache_key, result, ttl=3600)
+            await tiered_cache.set(cache_key, result, ttl=3600)
             
             return result
             
@@ -165,7 +165,7 @@ class UnifiedCategoryService(LoggerMixin):
             cache_key = f"{self.cache_prefix}:leaf_categories:{root_category_id or 'all'}"
             
             # Try to get from cache first
-            cached_data = await cache_service.get(cache_key)
+            cached_data = await tiered_cache.get(cache_key)
             if cached_data:
                 return cached_data
             
@@ -174,7 +174,7 @@ class UnifiedCategoryService(LoggerMixin):
             result = [category.to_frontend_format() for category in leaf_categories]
             
             # Cache for 1 hour
-            await cache_service.set(cache_key, result, ttl=3600)
+            await tiered_cache.set(cache_key, result, ttl=3600)
             
             return result
             
@@ -211,7 +211,7 @@ class UnifiedCategoryService(LoggerMixin):
             cache_key = f"{self.cache_prefix}:hierarchy:{category_id or 'all'}"
             
             # Try to get from cache first
-            cached_data = await cache_service.get(cache_key)
+            cached_data = await tiered_cache.get(cache_key)
             if cached_data:
                 return cached_data
             
@@ -235,7 +235,7 @@ class UnifiedCategoryService(LoggerMixin):
                 }
             
             # Cache for 2 hours
-            await cache_service.set(cache_key, hierarchy, ttl=7200)
+            await tiered_cache.set(cache_key, hierarchy, ttl=7200)
             
             return hierarchy
             
@@ -441,7 +441,7 @@ class UnifiedCategoryService(LoggerMixin):
             cache_key = f"{self.cache_prefix}:frontend:{format_type}"
             
             # Try to get from cache first
-            cached_data = await cache_service.get(cache_key)
+            cached_data = await tiered_cache.get(cache_key)
             if cached_data:
                 return cached_data
             
@@ -463,7 +463,7 @@ class UnifiedCategoryService(LoggerMixin):
                 result = root_categories
             
             # Cache for 1 hour
-            await cache_service.set(cache_key, result, ttl=3600)
+            await tiered_cache.set(cache_key, result, ttl=3600)
             
             return result
             
@@ -476,20 +476,20 @@ class UnifiedCategoryService(LoggerMixin):
         try:
             if category_id:
                 # Invalidate specific category caches
-                await cache_service.delete_pattern(f"{self.cache_prefix}:category:{category_id}:*")
-                await cache_service.delete_pattern(f"{self.cache_prefix}:children:{category_id}")
+                await tiered_cache.delete_pattern(f"{self.cache_prefix}:category:{category_id}:*")
+                await tiered_cache.delete_pattern(f"{self.cache_prefix}:children:{category_id}")
                 
                 # Get category to invalidate ancestor caches
                 # This would need database access, so we'll invalidate broader patterns
-                await cache_service.delete_pattern(f"{self.cache_prefix}:children:*")
+                await tiered_cache.delete_pattern(f"{self.cache_prefix}:children:*")
             
             # Invalidate general caches
-            await cache_service.delete_pattern(f"{self.cache_prefix}:all_categories:*")
-            await cache_service.delete_pattern(f"{self.cache_prefix}:root_categories")
-            await cache_service.delete_pattern(f"{self.cache_prefix}:hierarchy:*")
-            await cache_service.delete_pattern(f"{self.cache_prefix}:leaf_categories:*")
-            await cache_service.delete_pattern(f"{self.cache_prefix}:frontend:*")
-            await cache_service.delete_pattern(f"{self.cache_prefix}:slug_path:*")
+            await tiered_cache.delete_pattern(f"{self.cache_prefix}:all_categories:*")
+            await tiered_cache.delete_pattern(f"{self.cache_prefix}:root_categories")
+            await tiered_cache.delete_pattern(f"{self.cache_prefix}:hierarchy:*")
+            await tiered_cache.delete_pattern(f"{self.cache_prefix}:leaf_categories:*")
+            await tiered_cache.delete_pattern(f"{self.cache_prefix}:frontend:*")
+            await tiered_cache.delete_pattern(f"{self.cache_prefix}:slug_path:*")
             
         except Exception as e:
             self.log_error("Error invalidating cache", category_id=category_id, error=str(e))
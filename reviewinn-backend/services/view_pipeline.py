@@ -0,0 +1,652 @@
+"""
+Write-behind view counting for ViewTrackingService.
+
+Tracking a view is one Redis round trip: _ACCEPT_SCRIPT checks the viewer's
+dedupe key and the IP's sliding-window counter and, for an accepted view,
+appends it to a Redis buffer and bumps the item's pending count. The count
+returned to the client is the last flushed database count plus the views
+still pending.
+
+The flusher drains the buffer in batches: one multi-row INSERT into the view
+table, one aggregated view_count update per review or entity and one
+view_analytics upsert per item. A batch stays in a processing list until its
+transaction has committed, so a flush interrupted by a crash is replayed on
+the next run (views are written at least once).
+
+Analytics use constant space per item. View counts go to view_buckets as
+hourly rows, which the flusher rolls into daily rows after a day and drops
+after DAILY_RETENTION_DAYS. Unique viewers and sessions are HyperLogLog
+sketches in Redis, one per item per day (kept HLL_RETENTION_DAYS) plus an
+all-time sketch; a range's uniques are the PFCOUNT union of its day
+sketches.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, insert, or_, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from core.config.redis_client import RedisAvailability, get_redis_client, is_connection_error
+from database import SessionLocal
+from models.entity import Entity
+from models.review import Review
+from models.view_tracking import EntityView, ReviewView, ViewAnalytics, ViewBucket
+
+logger = logging.getLogger(__name__)
+
+REDIS_PREFIX = "views:"
+BUFFER_KEY = REDIS_PREFIX + "buffer"
+PROCESSING_KEY = REDIS_PREFIX + "processing"
+PENDING_KEY = REDIS_PREFIX + "pending"
+FLUSH_LOCK_KEY = REDIS_PREFIX + "flush_lock"
+COUNT_KEY_PREFIX = REDIS_PREFIX + "count:"
+HLL_KEY_PREFIX = REDIS_PREFIX + "hll:"
+
+# More accepted views than this from one IP inside the window is suspicious
+IP_WINDOW_SECONDS = 300
+IP_WINDOW_LIMIT = 10
+# Flushed counts are cached this long; refreshed by every accepted view and flush
+COUNT_TTL_SECONDS = 24 * 3600
+FLUSH_INTERVAL = float(os.getenv("VIEW_FLUSH_INTERVAL", "5"))
+BATCH_SIZE = 1000
+FLUSH_LOCK_SECONDS = 120
+
+# Days kept at hourly resolution (today included) before rolling into daily buckets
+HOURLY_RETENTION_DAYS = 2
+DAILY_RETENTION_DAYS = int(os.getenv("VIEW_DAILY_RETENTION_DAYS", "400"))
+HLL_RETENTION_DAYS = int(os.getenv("VIEW_HLL_RETENTION_DAYS", "90"))
+ROLLUP_INTERVAL = 3600
+
+# Result statuses
+ACCEPTED = "accepted"
+DUPLICATE = "duplicate"
+SUSPICIOUS = "suspicious"
+NOT_FOUND = "not_found"
+UNAVAILABLE = "unavailable"
+
+_SCRIPT_STATUSES = {0: ACCEPTED, 2: DUPLICATE, 3: SUSPICIOUS}
+_SCRIPT_UNKNOWN_ITEM = 1
+
+# KEYS: count, seen, session, ip window, pending hash, buffer,
+#       day users sketch, all-time users sketch, day sessions sketch,
+#       all-time sessions sketch
+# ARGV: now_ms, seen_ttl, session_ttl, ip_window_ms, ip_limit, ip member,
+#       item, event json, count_ttl, anonymous (1/0), user id or '',
+#       day sketch ttl
+# Returns {status, view_count, unique_session}
+_ACCEPT_SCRIPT = """
+local base = redis.call('GET', KEYS[1])
+if not base then
+    return {1, 0, 0}
+end
+local count = tonumber(base) + tonumber(redis.call('HGET', KEYS[5], ARGV[7]) or '0')
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    return {2, count, 0}
+end
+local now = tonumber(ARGV[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[4], '-inf', now - tonumber(ARGV[4]))
+if redis.call('ZCARD', KEYS[4]) > tonumber(ARGV[5]) then
+    return {3, count, 0}
+end
+redis.call('ZADD', KEYS[4], now, ARGV[6])
+redis.call('PEXPIRE', KEYS[4], ARGV[4])
+redis.call('SET', KEYS[2], '1', 'EX', ARGV[2])
+local unique_session = 1
+if ARGV[10] == '0' and not redis.call('SET', KEYS[3], '1', 'EX', ARGV[3], 'NX') then
+    unique_session = 0
+end
+local event = cjson.decode(ARGV[8])
+-- PFADD on the all-time sketch returns 1 when the user is (almost surely) new
+local unique_user = 0
+if ARGV[11] ~= '' then
+    redis.call('PFADD', KEYS[7], ARGV[11])
+    redis.call('EXPIRE', KEYS[7], ARGV[12])
+    unique_user = redis.call('PFADD', KEYS[8], ARGV[11])
+end
+redis.call('PFADD', KEYS[9], event['session_id'])
+redis.call('EXPIRE', KEYS[9], ARGV[12])
+redis.call('PFADD', KEYS[10], event['session_id'])
+event['unique_session'] = unique_session == 1
+event['unique_user'] = unique_user == 1
+redis.call('RPUSH', KEYS[6], cjson.encode(event))
+redis.call('HINCRBY', KEYS[5], ARGV[7], 1)
+redis.call('EXPIRE', KEYS[1], ARGV[9])
+return {0, count + 1, unique_session}
+"""
+
+# KEYS: buffer, processing. ARGV: batch size.
+# A leftover processing list (interrupted flush) is returned again as is.
+_TAKE_BATCH_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 0 then
+    local batch = redis.call('LRANGE', KEYS[1], 0, tonumber(ARGV[1]) - 1)
+    if #batch == 0 then
+        return batch
+    end
+    redis.call('LTRIM', KEYS[1], #batch, -1)
+    redis.call('RPUSH', KEYS[2], unpack(batch))
+end
+return redis.call('LRANGE', KEYS[2], 0, -1)
+"""
+
+# KEYS: processing, pending hash. ARGV: count key prefix, count ttl, then
+# (item, flushed views, new count or -1 when the item is gone) triples
+_SETTLE_BATCH_SCRIPT = """
+redis.call('DEL', KEYS[1])
+for i = 3, #ARGV, 3 do
+    local item = ARGV[i]
+    if redis.call('HINCRBY', KEYS[2], item, -tonumber(ARGV[i + 1])) <= 0 then
+        redis.call('HDEL', KEYS[2], item)
+    end
+    if tonumber(ARGV[i + 2]) >= 0 then
+        redis.call('SET', ARGV[1] .. item, ARGV[i + 2], 'EX', ARGV[2])
+    else
+        redis.call('DEL', ARGV[1] .. item)
+    end
+end
+return 1
+"""
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Extends the flush lock only while this flusher still holds it
+_RENEW_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_ENTITY_VIEW_COUNT_SQL = text("""
+    UPDATE core_entities AS e
+    SET view_count = COALESCE(e.view_count, 0) + v.views
+    FROM unnest(CAST(:ids AS integer[]), CAST(:views AS integer[])) AS v(entity_id, views)
+    WHERE e.entity_id = v.entity_id
+    RETURNING e.entity_id, e.view_count
+""")
+
+
+@dataclass
+class _ContentType:
+    view_model: Any
+    view_fk: Any
+    model: Any
+    pk: Any
+    # None: review_main.view_count is recounted by the review_views insert trigger
+    view_count_sql: Any = None
+
+
+_CONTENT_TYPES: Dict[str, _ContentType] = {
+    "review": _ContentType(ReviewView, ReviewView.review_id, Review, Review.review_id),
+    "entity": _ContentType(EntityView, EntityView.entity_id, Entity, Entity.entity_id, _ENTITY_VIEW_COUNT_SQL),
+}
+
+
+@dataclass
+class ViewResult:
+    status: str
+    view_count: int
+    is_unique_session: bool = False
+
+
+class ViewPipeline:
+    """Accepts views through Redis and writes them to the database in batches"""
+
+    def __init__(self, redis_url: Optional[str] = None, flush_interval: float = FLUSH_INTERVAL):
+        if redis_url is None:
+            # Import here to avoid circular imports
+            from services.cache_service import cache_service
+            redis_url = cache_service.redis_url
+        self.redis = get_redis_client(redis_url)
+        self.flush_interval = flush_interval
+        self._availability = RedisAvailability()
+        self._accept = self.redis.register_script(_ACCEPT_SCRIPT)
+        self._take_batch = self.redis.register_script(_TAKE_BATCH_SCRIPT)
+        self._settle_batch = self.redis.register_script(_SETTLE_BATCH_SCRIPT)
+        self._release_lock = self.redis.register_script(_RELEASE_LOCK_SCRIPT)
+        self._renew_lock = self.redis.register_script(_RENEW_LOCK_SCRIPT)
+        self._task: Optional[asyncio.Task] = None
+
+    async def track(
+        self,
+        db: Session,
+        content_type: str,
+        content_id: int,
+        user_id: Optional[int],
+        ip_address: str,
+        user_agent: str,
+        session_id: str,
+        window_seconds: int,
+        session_window_seconds: int
+    ) -> ViewResult:
+        """
+        Count a view unless the viewer already viewed the item within
+        ``window_seconds`` or their IP is over the sliding-window limit.
+        Anonymous viewers are identified by ``session_id``. The database is
+        only read the first time an item is seen after its cached count
+        expired, or when Redis is down (views are then not counted).
+        """
+        content = _CONTENT_TYPES[content_type]
+        if not await self._availability.check(self.redis):
+            return await self._untracked(db, content, content_id)
+
+        item = f"{content_type}:{content_id}"
+        count_key = COUNT_KEY_PREFIX + item
+        viewer = f"user:{user_id}" if user_id else f"session:{session_id}"
+        now = time.time()
+        day = _day_suffix(datetime.fromtimestamp(now, timezone.utc))
+        users_sketch, sessions_sketch = _sketch_keys(item)
+        event = json.dumps({
+            "content_type": content_type,
+            "content_id": content_id,
+            "user_id": user_id,
+            "ip_address": ip_address,
+            "user_agent": user_agent[:500],
+            "session_id": session_id,
+            "viewed_at": now,
+            "window_seconds": window_seconds
+        })
+        keys = [
+            count_key,
+            f"{REDIS_PREFIX}seen:{item}:{viewer}",
+            f"{REDIS_PREFIX}session:{item}:{session_id}",
+            f"{REDIS_PREFIX}ip:{ip_address}",
+            PENDING_KEY,
+            BUFFER_KEY,
+            users_sketch + day,
+            users_sketch,
+            sessions_sketch + day,
+            sessions_sketch
+        ]
+        args = [
+            int(now * 1000), window_seconds, session_window_seconds, IP_WINDOW_SECONDS * 1000,
+            IP_WINDOW_LIMIT, uuid.uuid4().hex, item, event, COUNT_TTL_SECONDS, 0 if user_id else 1,
+            user_id or '', (HLL_RETENTION_DAYS + 1) * 86400
+        ]
+        try:
+            status, count, unique_session = await self._accept(keys=keys, args=args)
+            if status == _SCRIPT_UNKNOWN_ITEM:
+                # Cold item: seed its count from the database and try again
+                db_count = await run_in_threadpool(_load_view_count, db, content, content_id)
+                if db_count is None:
+                    return ViewResult(NOT_FOUND, 0)
+                await self.redis.set(count_key, db_count, ex=COUNT_TTL_SECONDS, nx=True)
+                status, count, unique_session = await self._accept(keys=keys, args=args)
+                if status == _SCRIPT_UNKNOWN_ITEM:
+                    return ViewResult(UNAVAILABLE, db_count)
+        except Exception as e:
+            self._handle_error(e)
+            logger.warning(f"View tracking failed for {item}: {e}")
+            return await self._untracked(db, content, content_id)
+        return ViewResult(_SCRIPT_STATUSES[status], int(count), bool(unique_session))
+
+    async def flush(self) -> int:
+        """Write buffered views to the database; returns the number written"""
+        if not await self._availability.check(self.redis):
+            return 0
+        token = uuid.uuid4().hex
+        flushed = 0
+        try:
+            # One flusher at a time across all workers
+            if not await self.redis.set(FLUSH_LOCK_KEY, token, nx=True, ex=FLUSH_LOCK_SECONDS):
+                return 0
+            try:
+                while True:
+                    # Each batch gets a full lock period; stop if another flusher took over
+                    if not await self._renew_lock(keys=[FLUSH_LOCK_KEY], args=[token, FLUSH_LOCK_SECONDS * 1000]):
+                        logger.warning(f"View flush lock lost after {flushed} views; stopping this flush")
+                        break
+                    raw = await self._take_batch(keys=[BUFFER_KEY, PROCESSING_KEY], args=[BATCH_SIZE])
+                    if not raw:
+                        break
+                    events = [json.loads(item) for item in raw]
+                    flushed_per_item = Counter(f"{e['content_type']}:{e['content_id']}" for e in events)
+                    uniques = await self._all_time_uniques(list(flushed_per_item))
+                    counts = await run_in_threadpool(write_view_batch, events, uniques)
+                    args: List[Any] = [COUNT_KEY_PREFIX, COUNT_TTL_SECONDS]
+                    for item, views in flushed_per_item.items():
+                        args += [item, views, counts.get(item, -1)]
+                    await self._settle_batch(keys=[PROCESSING_KEY, PENDING_KEY], args=args)
+                    flushed += len(events)
+                    if len(raw) < BATCH_SIZE:
+                        break
+            finally:
+                await self._release_lock(keys=[FLUSH_LOCK_KEY], args=[token])
+        except Exception as e:
+            self._handle_error(e)
+            logger.error(f"View flush failed after {flushed} views: {e}")
+        return flushed
+
+    async def unique_counts(
+        self, content_type: str, content_id: int, start: datetime, end: datetime
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Estimated (unique users, unique sessions) for views in the UTC days
+        from ``start`` to ``end``, limited to the last HLL_RETENTION_DAYS
+        days; None when Redis is unavailable.
+        """
+        if not await self._availability.check(self.redis):
+            return None
+        oldest = _day_start(datetime.now(timezone.utc)) - timedelta(days=HLL_RETENTION_DAYS)
+        day = max(_day_start(start), oldest)
+        suffixes = []
+        while day < end:
+            suffixes.append(_day_suffix(day))
+            day += timedelta(days=1)
+        if not suffixes:
+            return 0, 0
+        users_sketch, sessions_sketch = _sketch_keys(f"{content_type}:{content_id}")
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.pfcount(*[users_sketch + suffix for suffix in suffixes])
+                pipe.pfcount(*[sessions_sketch + suffix for suffix in suffixes])
+                users, sessions = await pipe.execute()
+        except Exception as e:
+            self._handle_error(e)
+            logger.warning(f"Unique view count failed for {content_type} {content_id}: {e}")
+            return None
+        return int(users), int(sessions)
+
+    async def _all_time_uniques(self, items: List[str]) -> Dict[str, Tuple[int, int]]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for item in items:
+                users_sketch, sessions_sketch = _sketch_keys(item)
+                pipe.pfcount(users_sketch)
+                pipe.pfcount(sessions_sketch)
+            results = await pipe.execute()
+        return {item: (int(results[2 * i]), int(results[2 * i + 1])) for i, item in enumerate(items)}
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher and write whatever is still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        last_rollup = 0.0
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            flushed = await self.flush()
+            if flushed:
+                logger.debug(f"Flushed {flushed} views")
+            if time.monotonic() - last_rollup >= ROLLUP_INTERVAL:
+                try:
+                    await run_in_threadpool(roll_up_view_buckets)
+                except Exception as e:
+                    logger.error(f"View bucket rollup failed: {e}")
+                last_rollup = time.monotonic()
+
+    async def _untracked(self, db: Session, content: _ContentType, content_id: int) -> ViewResult:
+        count = await run_in_threadpool(_load_view_count, db, content, content_id)
+        if count is None:
+            return ViewResult(NOT_FOUND, 0)
+        return ViewResult(UNAVAILABLE, count)
+
+    def _handle_error(self, error: Exception) -> None:
+        if is_connection_error(error):
+            self._availability.mark_failed()
+
+
+def _load_view_count(db: Session, content: _ContentType, content_id: int) -> Optional[int]:
+    row = db.execute(select(content.model.view_count).where(content.pk == content_id)).first()
+    if row is None:
+        return None
+    return row[0] or 0
+
+
+def write_view_batch(events: List[Dict[str, Any]], uniques: Dict[str, Tuple[int, int]]) -> Dict[str, int]:
+    """
+    Persist a batch of accepted views in one transaction. ``uniques`` holds
+    the all-time (users, sessions) estimates per "type:id" item. Returns the
+    new view_count per item; items that no longer exist are skipped.
+    """
+    db = SessionLocal()
+    try:
+        counts: Dict[str, int] = {}
+        for content_type, content in _CONTENT_TYPES.items():
+            batch = [e for e in events if e["content_type"] == content_type]
+            if batch:
+                for content_id, count in _write_views(db, content_type, content, batch, uniques).items():
+                    counts[f"{content_type}:{content_id}"] = count
+        db.commit()
+        return counts
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _write_views(
+    db: Session,
+    content_type: str,
+    content: _ContentType,
+    batch: List[Dict[str, Any]],
+    uniques: Dict[str, Tuple[int, int]]
+) -> Dict[int, int]:
+    ids = sorted({e["content_id"] for e in batch})
+    existing = set(db.execute(select(content.pk).where(content.pk.in_(ids))).scalars())
+    batch = [e for e in batch if e["content_id"] in existing]
+    if not batch:
+        return {}
+    ids = sorted(existing)
+
+    rows = []
+    views: Counter = Counter()
+    hourly: Counter = Counter()
+    last_view_at: Dict[int, datetime] = {}
+    for e in batch:
+        content_id = e["content_id"]
+        viewed_at = datetime.fromtimestamp(e["viewed_at"], timezone.utc)
+        rows.append({
+            content.view_fk.key: content_id,
+            "user_id": e["user_id"],
+            "ip_address": e["ip_address"][:45],
+            "user_agent": e["user_agent"],
+            "session_id": e["session_id"],
+            "viewed_at": viewed_at,
+            "expires_at": viewed_at + timedelta(seconds=e["window_seconds"]),
+            "is_unique_user": e.get("unique_user", False),
+            "is_unique_session": e["unique_session"],
+            "is_valid": True
+        })
+        views[content_id] += 1
+        hourly[(content_id, viewed_at.replace(minute=0, second=0, microsecond=0))] += 1
+        last_view_at[content_id] = max(last_view_at.get(content_id, viewed_at), viewed_at)
+
+    db.execute(insert(content.view_model), rows)
+
+    if content.view_count_sql is not None:
+        counts = db.execute(content.view_count_sql, {
+            "ids": ids, "views": [views[content_id] for content_id in ids]
+        }).all()
+    else:
+        counts = db.execute(select(content.pk, content.model.view_count).where(content.pk.in_(ids))).all()
+
+    buckets = pg_insert(ViewBucket).values([
+        {
+            "content_type": content_type,
+            "content_id": content_id,
+            "granularity": "hour",
+            "bucket_start": hour,
+            "views": count
+        }
+        for (content_id, hour), count in sorted(hourly.items())
+    ])
+    db.execute(buckets.on_conflict_do_update(
+        index_elements=[ViewBucket.content_type, ViewBucket.content_id, ViewBucket.granularity, ViewBucket.bucket_start],
+        set_={"views": ViewBucket.views + buckets.excluded.views}
+    ))
+
+    # views_today / _this_week / _this_month are recomputed from view_buckets by the rollup
+    stmt = pg_insert(ViewAnalytics).values([
+        {
+            "content_type": content_type,
+            "content_id": content_id,
+            "total_views": views[content_id],
+            "valid_views": views[content_id],
+            "unique_users": uniques.get(f"{content_type}:{content_id}", (0, 0))[0],
+            "unique_sessions": uniques.get(f"{content_type}:{content_id}", (0, 0))[1],
+            "last_view_at": last_view_at[content_id]
+        }
+        for content_id in ids
+    ])
+    added = stmt.excluded
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[ViewAnalytics.content_type, ViewAnalytics.content_id],
+        set_={
+            "total_views": func.coalesce(ViewAnalytics.total_views, 0) + added.total_views,
+            "valid_views": func.coalesce(ViewAnalytics.valid_views, 0) + added.valid_views,
+            # Sketches start empty on deploy; keep the larger of the stored and estimated counts
+            "unique_users": func.greatest(ViewAnalytics.unique_users, added.unique_users),
+            "unique_sessions": func.greatest(ViewAnalytics.unique_sessions, added.unique_sessions),
+            "last_view_at": func.greatest(ViewAnalytics.last_view_at, added.last_view_at),
+            "last_updated": func.now()
+        }
+    ))
+    return {content_id: count or 0 for content_id, count in counts}
+
+
+_ROLL_UP_HOURS_SQL = text("""
+    WITH moved AS (
+        DELETE FROM view_buckets
+        WHERE granularity = 'hour' AND bucket_start < :cutoff
+        RETURNING content_type, content_id, bucket_start, views
+    )
+    INSERT INTO view_buckets (content_type, content_id, granularity, bucket_start, views)
+    SELECT content_type, content_id, 'day',
+           date_trunc('day', bucket_start AT TIME ZONE 'UTC') AT TIME ZONE 'UTC', SUM(views)
+    FROM moved
+    GROUP BY 1, 2, 4
+    ON CONFLICT (content_type, content_id, granularity, bucket_start)
+    DO UPDATE SET views = view_buckets.views + EXCLUDED.views
+""")
+
+_REFRESH_WINDOWS_SQL = text("""
+    UPDATE view_analytics a
+    SET views_today = COALESCE(w.today, 0),
+        views_this_week = COALESCE(w.week, 0),
+        views_this_month = COALESCE(w.month, 0)
+    FROM view_analytics t
+    LEFT JOIN (
+        SELECT content_type, content_id,
+               SUM(views) FILTER (WHERE bucket_start >= :today) AS today,
+               SUM(views) FILTER (WHERE bucket_start >= :week) AS week,
+               SUM(views) AS month
+        FROM view_buckets
+        WHERE bucket_start >= :month
+        GROUP BY content_type, content_id
+    ) w ON w.content_type = t.content_type AND w.content_id = t.content_id
+    WHERE a.analytics_id = t.analytics_id
+      AND (w.content_id IS NOT NULL OR COALESCE(a.views_this_month, 0) <> 0)
+      AND (a.views_today, a.views_this_week, a.views_this_month)
+          IS DISTINCT FROM (COALESCE(w.today, 0), COALESCE(w.week, 0), COALESCE(w.month, 0))
+""")
+
+
+def roll_up_view_buckets() -> None:
+    """
+    Fold hourly buckets older than HOURLY_RETENTION_DAYS into daily ones,
+    drop daily buckets past DAILY_RETENTION_DAYS and recompute the
+    view_analytics day/week/month columns.
+    """
+    today = _day_start(datetime.now(timezone.utc))
+    db = SessionLocal()
+    try:
+        db.execute(_ROLL_UP_HOURS_SQL, {"cutoff": today - timedelta(days=HOURLY_RETENTION_DAYS - 1)})
+        db.query(ViewBucket).filter(
+            ViewBucket.bucket_start < today - timedelta(days=DAILY_RETENTION_DAYS)
+        ).delete(synchronize_session=False)
+        db.execute(_REFRESH_WINDOWS_SQL, _calendar_windows(today))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def view_counts(
+    db: Session, content_type: str, content_id: int, ranges: Dict[str, Tuple[datetime, datetime]]
+) -> Dict[str, int]:
+    """
+    Views of one item per named [start, end) range, in one query. Ranges
+    resolve to the hour while hourly buckets are kept and to the whole UTC
+    day before that.
+    """
+    columns = []
+    for name, (start, end) in ranges.items():
+        in_range = or_(
+            and_(ViewBucket.granularity == "hour", ViewBucket.bucket_start >= start),
+            and_(ViewBucket.granularity == "day", ViewBucket.bucket_start >= _day_start(start))
+        )
+        columns.append(
+            func.coalesce(func.sum(ViewBucket.views).filter(in_range, ViewBucket.bucket_start < end), 0).label(name)
+        )
+    row = db.execute(select(*columns).where(
+        ViewBucket.content_type == content_type,
+        ViewBucket.content_id == content_id
+    )).one()
+    return {name: int(row._mapping[name]) for name in ranges}
+
+
+def calendar_ranges(now: datetime) -> Dict[str, Tuple[datetime, datetime]]:
+    """Today, the last 7 and the last 30 UTC days, each ending at ``now``."""
+    windows = _calendar_windows(_day_start(now))
+    return {
+        "views_today": (windows["today"], now),
+        "views_this_week": (windows["week"], now),
+        "views_this_month": (windows["month"], now)
+    }
+
+
+def _calendar_windows(today: datetime) -> Dict[str, datetime]:
+    return {"today": today, "week": today - timedelta(days=6), "month": today - timedelta(days=29)}
+
+
+def _day_start(moment: datetime) -> datetime:
+    return moment.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _day_suffix(moment: datetime) -> str:
+    return moment.astimezone(timezone.utc).strftime(":%Y%m%d")
+
+
+def _sketch_keys(item: str) -> Tuple[str, str]:
+    """All-time (users, sessions) sketch keys of an item; day sketches append _day_suffix."""
+    return f"{HLL_KEY_PREFIX}{item}:users", f"{HLL_KEY_PREFIX}{item}:sessions"
+
+
+# Global view pipeline instance
+_view_pipeline: Optional[ViewPipeline] = None
+
+def get_view_pipeline() -> ViewPipeline:
+    """Get view pipeline singleton"""
+    global _view_pipeline
+    if _view_pipeline is None:
+        _view_pipeline = ViewPipeline()
+    return _view_pipeline
@@ -1,28 +1,43 @@
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, List, Set
+from typing import Dict, Iterable, List, Optional, Set
 import json
-import asyncio
+import logging
 from datetime import datetime
 
+from services.realtime_broker import RealtimeBroker, create_realtime_broker
+
+logger = logging.getLogger(__name__)
+
+
 class ConnectionManager:
-    def __init__(self):
-        # user_id -> list of websockets
+    """
+    Holds the WebSockets connected to this worker and delivers messages
+    cluster-wide through a RealtimeBroker. Users connected to another
+    worker are reached via the broker; presence and conversation rooms
+    are resolved by the broker as well.
+    """
+
+    def __init__(self, broker: Optional[RealtimeBroker] = None):
+        self.broker = broker or create_realtime_broker()
+        # user_id -> list of websockets on this worker
         self.active_connections: Dict[int, List[WebSocket]] = {}
-        # conversation_id -> set of user_ids
-        self.conversation_participants: Dict[int, Set[int]] = {}
         # websocket -> user_id mapping
         self.websocket_users: Dict[WebSocket, int] = {}
+        # user_id -> conversations joined from this worker
+        self.user_conversations: Dict[int, Set[int]] = {}
+
+    async def start(self):
+        """Start receiving messages routed to this worker (call once per worker)."""
+        await self.broker.start(self._deliver_local)
+
+    async def stop(self):
+        await self.broker.stop()
 
     async def connect(self, websocket: WebSocket, user_id: int):
-        """Connect a websocket for a user"""
+        """Accept and register a websocket for a user"""
         await websocket.accept()
-        
-        if user_id not in self.active_connections:
-            self.active_connections[user_id] = []
-        
-        self.active_connections[user_id].append(websocket)
-        self.websocket_users[websocket] = user_id
-        
+        await self.register(websocket, user_id)
+
         # Send connection confirmation
         await self.send_personal_message({
             "type": "connection",
@@ -30,75 +45,94 @@ class ConnectionManager:
             "timestamp": datetime.utcnow().isoformat()
         }, websocket)
 
-    def disconnect(self, websocket: WebSocket):
+    async def register(self, websocket: WebSocket, user_id: int):
+        """Register an already accepted websocket for a user"""
+        first_connection = user_id not in self.active_connections
+        self.active_connections.setdefault(user_id, []).append(websocket)
+        self.websocket_users[websocket] = user_id
+        if first_connection:
+            await self.broker.user_connected(user_id)
+
+    async def disconnect(self, websocket: WebSocket):
         """Disconnect a websocket"""
-        user_id = self.websocket_users.get(websocket)
-        if user_id and user_id in self.active_connections:
-            self.active_connections[user_id].remove(websocket)
-            if not self.active_connections[user_id]:
-                del self.active_connections[user_id]
-        
-        if websocket in self.websocket_users:
-            del self.websocket_users[websocket]
+        user_id = self.websocket_users.pop(websocket, None)
+        if user_id is None or user_id not in self.active_connections:
+            return
+
+        connections = self.active_connections[user_id]
+        if websocket in connections:
+            connections.remove(websocket)
+        if not connections:
+            del self.active_connections[user_id]
+            await self.broker.user_disconnected(user_id)
 
     async def send_personal_message(self, message: dict, websocket: WebSocket):
         """Send message to a specific websocket"""
         try:
             await websocket.send_text(json.dumps(message))
-        except:
+        except Exception:
             # Connection might be closed
-            self.disconnect(websocket)
+            await self.disconnect(websocket)
 
-    async def send_to_user(self, user_id: int, message: dict):
-        """Send message to all connections of a specific user"""
-        if user_id in self.active_connections:
-            connections_count = len(self.active_connections[user_id])
-            print(f"🔄 Sending to user {user_id} with {connections_count} active connections")
-            print(f"📝 Message type: {message.get('type')}, content: {message}")
-            disconnected = []
-            for websocket in self.active_connections[user_id]:
+    async def _deliver_local(self, user_ids: Iterable[int], message: dict):
+        """Send a message to the sockets this worker holds for ``user_ids``."""
+        payload = json.dumps(message, default=str)
+        disconnected = []
+        for user_id in user_ids:
+            for websocket in list(self.active_connections.get(user_id, ())):
                 try:
-                    await websocket.send_text(json.dumps(message))
-                    print(f"✅ Message sent successfully to user {user_id}")
+                    await websocket.send_text(payload)
                 except Exception as e:
-                    print(f"❌ Failed to send to user {user_id}: {e}")
+                    logger.debug(f"Failed to send to user {user_id}: {e}")
                     disconnected.append(websocket)
-            
-            # Clean up disconnected sockets
-            for websocket in disconnected:
-                self.disconnect(websocket)
-        else:
-            print(f"❌ User {user_id} not found in active connections")
-            print(f"📊 Currently active users: {list(self.active_connections.keys())}")
+
+        # Clean up disconnected sockets
+        for websocket in disconnected:
+            await self.disconnect(websocket)
+
+    async def send_to_users(self, user_ids: Iterable[int], message: dict) -> int:
+        """
+        Send message to every connection of the given users, wherever they
+        are connected. A user with sockets here and on other workers gets it
+        on all of them. Returns the number of distinct users reached.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        local = [user_id for user_id in user_ids if user_id in self.active_connections]
+
+        if local:
+            await self._deliver_local(local, message)
+        routed = await self.broker.route(user_ids, message) if user_ids else set()
+        return len(routed.union(local))
+
+    async def send_to_user(self, user_id: int, message: dict) -> bool:
+        """Send message to all connections of a specific user"""
+        return await self.send_to_users([user_id], message) > 0
 
     async def send_to_conversation(self, conversation_id: int, message: dict, exclude_user_id: int = None):
         """Send message to all participants in a conversation"""
-        if conversation_id in self.conversation_participants:
-            participants = self.conversation_participants[conversation_id]
-            print(f"Sending message to conversation {conversation_id}, participants: {participants}, exclude: {exclude_user_id}")
-            for user_id in participants:
-                if exclude_user_id and user_id == exclude_user_id:
-                    print(f"Excluding user {user_id} from broadcast")
-                    continue
-                print(f"Sending message to user {user_id}")
-                await self.send_to_user(user_id, message)
-        else:
-            print(f"No participants found for conversation {conversation_id}")
-
-    def join_conversation(self, user_id: int, conversation_id: int):
+        participants = await self.broker.get_conversation_members(conversation_id)
+        if exclude_user_id:
+            participants.discard(exclude_user_id)
+        if participants:
+            await self.send_to_users(participants, message)
+
+    async def join_conversation(self, user_id: int, conversation_id: int):
         """Add user to conversation participants"""
-        if conversation_id not in self.conversation_participants:
-            self.conversation_participants[conversation_id] = set()
-        self.conversation_participants[conversation_id].add(user_id)
-        print(f"🔗 User {user_id} joined conversation {conversation_id}")
-        print(f"🔗 Conversation {conversation_id} now has participants: {self.conversation_participants[conversation_id]}")
+        self.user_conversations.setdefault(user_id, set()).add(conversation_id)
+        await self.broker.join_conversation(conversation_id, user_id)
 
-    def leave_conversation(self, user_id: int, conversation_id: int):
+    async def leave_conversation(self, user_id: int, conversation_id: int):
         """Remove user from conversation participants"""
-        if conversation_id in self.conversation_participants:
-            self.conversation_participants[conversation_id].discard(user_id)
-            if not self.conversation_participants[conversation_id]:
-                del self.conversation_participants[conversation_id]
+        conversations = self.user_conversations.get(user_id)
+        if conversations is not None:
+            conversations.discard(conversation_id)
+            if not conversations:
+                del self.user_conversations[user_id]
+        await self.broker.leave_conversation(conversation_id, user_id)
+
+    def get_user_conversations(self, user_id: int) -> Set[int]:
+        """Conversations the user joined through this worker"""
+        return set(self.user_conversations.get(user_id, ()))
 
     async def broadcast_typing(self, conversation_id: int, user_id: int, username: str, is_typing: bool):
         """Broadcast typing indicator to conversation participants"""
@@ -148,13 +182,27 @@ class ConnectionManager:
         }
         await self.send_to_conversation(conversation_id, message)
 
-    def get_online_users(self) -> List[int]:
-        """Get list of currently online user IDs"""
-        return list(self.active_connections.keys())
+    def has_local_connections(self, user_id: int) -> bool:
+        """Check if a user has a connection on this worker"""
+        return bool(self.active_connections.get(user_id))
+
+    async def get_online_users(self) -> List[int]:
+        """Get list of currently online user IDs across all workers"""
+        return await self.broker.get_online_users()
 
-    def is_user_online(self, user_id: int) -> bool:
-        """Check if a user is currently online"""
-        return user_id in self.active_connections and len(self.active_connections[user_id]) > 0
+    async def is_user_online(self, user_id: int) -> bool:
+        """Check if a user is currently online on any worker"""
+        if self.has_local_connections(user_id):
+            return True
+        return await self.broker.is_user_online(user_id)
+
+    def get_stats(self) -> dict:
+        """Local connection counts plus broker state"""
+        return {
+            "local_users": len(self.active_connections),
+            "local_connections": len(self.websocket_users),
+            **self.broker.get_stats()
+        }
 
 # Global connection manager instance
-connection_manager = ConnectionManager()
\ No newline at end of file
+connection_manager = ConnectionManager()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Background job worker (services/job_queue.py). Run one or more alongside
+the API processes; jobs are shared through the background_jobs table.
+
+Usage:
+    python worker.py                                   # every job type
+    python worker.py --types notifications.comment notifications.reaction
+    python worker.py --list
+"""
+import argparse
+import asyncio
+import logging
+import signal
+import sys
+
+from core.logging_simple import setup_logging
+from services.job_queue import POLL_INTERVAL, JobWorker, registered_job_types
+from services.notification_aggregator import get_notification_aggregator
+import services.job_handlers  # noqa: F401  registers the handlers
+
+logger = logging.getLogger(__name__)
+
+
+async def run(job_types, poll_interval: float) -> None:
+    worker = JobWorker(job_types, poll_interval=poll_interval)
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, worker.stop)
+    await worker.run()
+    # Jobs still waiting on a notification batch fail and are retried
+    await get_notification_aggregator().stop()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--types", nargs="+", help="only run these job types")
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL, help="seconds between polls when idle")
+    parser.add_argument("--list", action="store_true", help="list job types and their limits")
+    args = parser.parse_args()
+
+    if args.list:
+        for job_type in registered_job_types().values():
+            print(f"{job_type.name}: concurrency={job_type.concurrency} timeout={job_type.timeout:.0f}s")
+        return 0
+
+    setup_logging()
+    try:
+        asyncio.run(run(args.types, args.poll_interval))
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    logger.info("Job worker stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
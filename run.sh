@@ -325,10 +325,23 @@ start_services() {
     echo -e "${GREEN}Backend API: http://localhost:8000${NC}"
     echo -e "${GREEN}Admin Panel: http://localhost:8001${NC}"
     echo -e "${BLUE}Database: localhost:5432${NC}"
+    echo -e "${BLUE}Job worker: use './run.sh logs worker' to follow background jobs${NC}"
     echo -e "${BLUE}Use './run.sh logs' to view logs${NC}"
     echo -e "${BLUE}Use './run.sh status' to check service status${NC}"
 }
 
+# Function to (re)start the background job worker
+start_worker() {
+    print_header "Starting $PROJECT_NAME Job Worker"
+    check_docker
+    check_docker_compose
+    
+    info "Starting background job worker..."
+    $DOCKER_COMPOSE up -d --build worker
+    
+    log "Job worker started! Use './run.sh logs worker' to view its logs"
+}
+
 # Function to stop services
 stop_services() {
     print_header "Stopping $PROJECT_NAME Services"
@@ -387,6 +400,7 @@ restart_services() {
     echo -e "${GREEN}Backend API: http://localhost:8000${NC}"
     echo -e "${GREEN}Admin Panel: http://localhost:8001${NC}"
     echo -e "${BLUE}Database: localhost:5432${NC}"
+    echo -e "${BLUE}Job worker: use './run.sh logs worker' to follow background jobs${NC}"
     echo -e "${BLUE}Use './run.sh logs' to view logs${NC}"
     echo -e "${BLUE}Use './run.sh status' to check service status${NC}"
 }
@@ -466,6 +480,13 @@ show_status() {
         echo -e "Admin Panel: ${RED}✗ Not responding${NC}"
     fi
     
+    # Check job worker
+    if [ -n "$(docker ps -q --filter "name=reviewinn_worker" --filter "status=running" 2>/dev/null)" ]; then
+        echo -e "Job Worker: ${GREEN}✓ Running${NC}"
+    else
+        echo -e "Job Worker: ${RED}✗ Not running${NC} (start it with './run.sh worker')"
+    fi
+    
     echo -e "\n${YELLOW}Recent Backups:${NC}"
     ls -la "$BACKUP_DIR"/reviewinn_recent_*.backup 2>/dev/null | tail -n 3 || echo "  No recent backups found"
 }
@@ -565,8 +586,9 @@ show_help() {
     echo "  stop           Stop all Docker containers completely (with backup)"
     echo "  restart        Stop containers & restart WITHOUT cache (with backup)"
     echo "  rebuild        Rebuild and restart services (with automatic backup)"
+    echo "  worker         Start (or rebuild) the background job worker"
     echo "  status         Show service status and health"
-    echo "  logs [service] Show logs (backend|frontend|db|admin|all)"
+    echo "  logs [service] Show logs (backend|worker|frontend|db|admin|all)"
     echo "  clean          Clean up Docker resources (with backup)"
     echo "  dev            Start in development mode (with backup)"
     echo "  prod           Start in production mode (with backup)"
@@ -610,6 +632,7 @@ show_help() {
     echo "  $0 list-backups                  # Show all backups"
     echo "  $0 restore recent_backup         # Restore from backup"
     echo "  $0 logs backend                  # Show backend logs"
+    echo "  $0 logs worker                   # Show job worker logs"
 }
 
 # Main script logic
@@ -626,6 +649,9 @@ case "${1:-help}" in
     rebuild)
         rebuild_services
         ;;
+    worker)
+        start_worker
+        ;;
     logs)
         show_logs "$@"
         ;;